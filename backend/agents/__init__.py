@@ -6,6 +6,7 @@ from .tester import TesterAgent
 from .reviewer import ReviewerAgent
 from .base_agent import BaseAgent, LLMError, LLMErrorType
 from .context_compressor import ContextCompressor, compress_context_if_needed
+from .context_packer import ContextPacker
 from .architect_agent import ArchitectAgent
 from .frontend_agent import FrontendAgent
 from .backend_agent import BackendAgent
@@ -44,5 +45,6 @@ __all__ = [
     'LLMError',
     'LLMErrorType',
     'ContextCompressor',
+    'ContextPacker',
     'compress_context_if_needed'
 ]
@@ -9,12 +9,15 @@ import json
 import logging
 import re
 
+from .context_packer import ContextPacker, DEFAULT_FILE_TOKEN_BUDGET
+
 logger = logging.getLogger(__name__)
 
 # Token estimation constants (approximate)
 CHARS_PER_TOKEN = 4  # Average characters per token
 DEFAULT_MAX_TOKENS = 128000  # GPT-4o context window
 SAFE_MARGIN = 0.85  # Use 85% of max tokens to leave room for response
+CONVERSATION_BUDGET_RATIO = 0.3  # Share of the budget reserved for history when packing
 
 
 class ContextCompressor:
@@ -24,6 +27,7 @@ class ContextCompressor:
         self.max_tokens = max_tokens
         self.safe_margin = safe_margin
         self.effective_max = int(max_tokens * safe_margin)
+        self.packer = ContextPacker()
         
     def estimate_tokens(self, text: str) -> int:
         """Estimate token count from text"""
@@ -169,6 +173,42 @@ class ContextCompressor:
         
         return compressed_files
     
+    def pack_files(self, files: List[Dict[str, Any]], query: str,
+                   token_budget: int = DEFAULT_FILE_TOKEN_BUDGET) -> List[Dict[str, Any]]:
+        """Keep only the files that matter to the request
+        
+        Strategy:
+        1. Score files against the request (BM25 + import-graph proximity)
+        2. Fill the token budget with the most relevant files in full
+        3. Fall back to symbol signatures, then to the file name only
+        """
+        packed, stats = self.packer.pack_files(files, query, token_budget)
+        logger.info(
+            f"[Compressor] Packed {len(files)} files: {stats['full']} full, "
+            f"{stats['signatures']} signatures, {stats['omitted']} omitted "
+            f"({stats['tokens_used']}/{token_budget} tokens)"
+        )
+        return packed
+    
+    def pack_conversation(self, messages: List[Dict[str, str]], query: str,
+                          token_budget: int, keep_recent: int = 6) -> List[Dict[str, str]]:
+        """Keep the turns most relevant to the request, summarize the rest"""
+        selected, dropped = self.packer.pack_conversation(
+            messages, query, token_budget, keep_recent
+        )
+        if not dropped:
+            return selected
+        
+        summary = self._summarize_messages(dropped)
+        if summary:
+            selected = selected[:1] + [{
+                "role": "system",
+                "content": f"[Résumé conversation précédente: {summary}]"
+            }] + selected[1:]
+        
+        logger.info(f"[Compressor] Packed {len(messages)} messages to {len(selected)}")
+        return selected
+    
     def _compress_file_content(self, content: str, language: str, 
                                 max_tokens: int) -> str:
         """Intelligently compress file content based on language"""
@@ -307,15 +347,27 @@ def compress_context_if_needed(
     system_prompt: str = "",
     max_tokens: int = DEFAULT_MAX_TOKENS,
     keep_recent_messages: int = 6,
-    max_file_tokens: int = 2000
+    max_file_tokens: int = 2000,
+    query: Optional[str] = None,
+    file_token_budget: int = DEFAULT_FILE_TOKEN_BUDGET
 ) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], Dict[str, Any]]:
     """Convenience function to compress context if needed
     
+    When ``query`` (the current user request) is given, files are always
+    packed by relevance into ``file_token_budget`` and history is ranked
+    against the request instead of being truncated blindly.
+    
     Returns:
         Tuple of (compressed_messages, compressed_files, stats)
     """
     compressor = ContextCompressor(max_tokens=max_tokens)
     
+    if query:
+        return _pack_context(
+            compressor, messages, files or [], system_prompt, query,
+            keep_recent_messages, file_token_budget
+        )
+    
     if not compressor.needs_compression(messages, files, system_prompt):
         return messages, files or [], {'compressed': False}
     
@@ -337,3 +389,40 @@ def compress_context_if_needed(
     logger.info(f"[Compressor] Compression complete - saved {stats['total']['tokens_saved']} tokens")
     
     return compressed_messages, compressed_files or [], stats
+
+
+def _pack_context(
+    compressor: ContextCompressor,
+    messages: List[Dict[str, str]],
+    files: List[Dict[str, Any]],
+    system_prompt: str,
+    query: str,
+    keep_recent_messages: int,
+    file_token_budget: int
+) -> Tuple[List[Dict[str, str]], List[Dict[str, Any]], Dict[str, Any]]:
+    """Relevance-based packing of history and files for ``query``"""
+    available = compressor.effective_max - compressor.estimate_tokens(system_prompt)
+    conversation_budget = int(available * CONVERSATION_BUDGET_RATIO)
+    
+    packed_messages = messages
+    if compressor.estimate_messages_tokens(messages) > conversation_budget:
+        packed_messages = compressor.pack_conversation(
+            messages, query, conversation_budget, keep_recent=keep_recent_messages
+        )
+    
+    files_budget = min(
+        file_token_budget,
+        available - compressor.estimate_messages_tokens(packed_messages)
+    )
+    packed_files = compressor.pack_files(files, query, max(files_budget, 0)) if files else []
+    
+    stats = compressor.get_compression_stats(
+        messages, packed_messages, files, packed_files
+    )
+    stats['compressed'] = stats['total']['tokens_saved'] > 0
+    stats['packed'] = True
+    
+    if stats['compressed']:
+        logger.info(f"[Compressor] Packing complete - saved {stats['total']['tokens_saved']} tokens")
+    
+    return packed_messages, packed_files, stats
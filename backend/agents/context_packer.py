@@ -0,0 +1,418 @@
+"""Relevance-ranked Context Packing
+
+This module selects *what* goes into a prompt rather than truncating
+everything uniformly. Project files and conversation turns are scored
+against the current request (BM25 + import-graph proximity) and a token
+budget is filled greedily with the highest-value units. Files that do not
+fit in full are shipped as symbol-level signatures.
+
+Per-file analysis (tokenization, imports, signatures) is cached by content
+hash so repeated turns over the same project are cheap.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple, Set
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+import hashlib
+import logging
+import math
+import posixpath
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4  # Keep in sync with context_compressor
+DEFAULT_FILE_TOKEN_BUDGET = 24000
+DEFAULT_ANALYSIS_CACHE_SIZE = 2048
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Weight of a neighbour's relevance propagated through the import graph
+GRAPH_DECAY = 0.5
+GRAPH_MAX_DEPTH = 2
+
+# Bonus applied when a file is mentioned by name in the request
+NAME_MENTION_BOOST = 5.0
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+_IMPORT_PATTERNS = [
+    re.compile(r"""^\s*import\s+(?:[\w*{}\s,]+\s+from\s+)?['"]([^'"]+)['"]""", re.MULTILINE),
+    re.compile(r"""require\(\s*['"]([^'"]+)['"]\s*\)"""),
+    re.compile(r"""^\s*from\s+(\.*[\w.]*)\s+import\s""", re.MULTILINE),
+    re.compile(r"""^\s*import\s+([\w.]+)""", re.MULTILINE),
+    re.compile(r"""<(?:script|link)[^>]+(?:src|href)=['"]([^'"]+)['"]""", re.IGNORECASE),
+    re.compile(r"""@import\s+(?:url\()?['"]([^'"]+)['"]"""),
+]
+
+_SIGNATURE_PATTERNS = [
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\*?\s+\w+\s*\([^)]*\)"),
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+\w+[^{]*"),
+    re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s*)?(?:\([^)]*\)|\w+)\s*=>"),
+    re.compile(r"^\s*(?:export\s+)?(?:interface|type|enum)\s+\w+"),
+    re.compile(r"^\s*(?:async\s+)?def\s+\w+\s*\([^)]*\)[^:]*:"),
+    re.compile(r"^\s*class\s+\w+[^:]*:"),
+    re.compile(r"^\s*@(?:app|router)\.\w+\(.*\)"),
+    re.compile(r"^\s*export\s+(?:default\s+)?\w+"),
+    re.compile(r"^\s*(?:import|from)\s"),
+    re.compile(r"^\s*@(?:media|keyframes)\b"),
+]
+
+_SOURCE_EXTENSIONS = (".js", ".jsx", ".ts", ".tsx", ".py", ".css", ".html")
+_RESOLVE_EXTENSIONS = ("", ".js", ".jsx", ".ts", ".tsx", ".py", ".css", ".html",
+                       "/index.js", "/index.jsx", "/index.ts", "/index.tsx", "/__init__.py")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, breaking camelCase and snake_case"""
+    terms: List[str] = []
+    for word in _WORD_RE.findall(text or ""):
+        parts = [p for p in word.split("_") if p]
+        for part in parts:
+            pieces = _CAMEL_RE.findall(part) or [part]
+            if len(pieces) > 1:
+                terms.append(part.lower())
+            terms.extend(p.lower() for p in pieces if len(p) > 1)
+    return terms
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of file content used as the analysis cache key"""
+    return hashlib.sha256((content or "").encode("utf-8", "surrogatepass")).hexdigest()
+
+
+@dataclass
+class FileAnalysis:
+    """Cached, content-derived facts about a single file"""
+    content_hash: str
+    term_freq: Counter
+    length: int
+    imports: List[str]
+    signatures: str
+    tokens: int
+    signature_tokens: int
+
+
+class _AnalysisCache:
+    """Thread-safe LRU of FileAnalysis keyed by (content hash, language)"""
+
+    def __init__(self, max_size: int = DEFAULT_ANALYSIS_CACHE_SIZE):
+        self.max_size = max_size
+        self._data: "OrderedDict[Tuple[str, str], FileAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[FileAnalysis]:
+        with self._lock:
+            analysis = self._data.get(key)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return analysis
+
+    def put(self, key: Tuple[str, str], analysis: FileAnalysis) -> None:
+        with self._lock:
+            self._data[key] = analysis
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+# Shared across packer instances: compress_context_if_needed builds a new
+# compressor per request, but the project files rarely change between turns.
+_analysis_cache = _AnalysisCache()
+
+
+def get_analysis_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counters of the shared analysis cache"""
+    return _analysis_cache.stats()
+
+
+class ContextPacker:
+    """Score files and conversation turns against a request and pack them
+    into a token budget"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B,
+                 graph_decay: float = GRAPH_DECAY,
+                 graph_max_depth: int = GRAPH_MAX_DEPTH):
+        self.k1 = k1
+        self.b = b
+        self.graph_decay = graph_decay
+        self.graph_max_depth = graph_max_depth
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        if not text:
+            return 0
+        return len(text) // CHARS_PER_TOKEN
+
+    # ------------------------------------------------------------------
+    # Per-file analysis
+    # ------------------------------------------------------------------
+
+    def analyze_file(self, file: Dict[str, Any]) -> FileAnalysis:
+        """Analyze a file, reusing the cached result for identical content"""
+        content = file.get("content", "") or ""
+        language = file.get("language", "plaintext") or "plaintext"
+        key = (content_hash(content), language)
+
+        cached = _analysis_cache.get(key)
+        if cached is not None:
+            return cached
+
+        terms = tokenize(content)
+        signatures = self._extract_signatures(content)
+        analysis = FileAnalysis(
+            content_hash=key[0],
+            term_freq=Counter(terms),
+            length=len(terms),
+            imports=self._extract_imports(content),
+            signatures=signatures,
+            tokens=self.estimate_tokens(content),
+            signature_tokens=self.estimate_tokens(signatures),
+        )
+        _analysis_cache.put(key, analysis)
+        return analysis
+
+    def _extract_imports(self, content: str) -> List[str]:
+        imports: List[str] = []
+        for pattern in _IMPORT_PATTERNS:
+            imports.extend(m.group(1) for m in pattern.finditer(content))
+        return imports
+
+    def _extract_signatures(self, content: str) -> str:
+        lines = []
+        for line in content.split("\n"):
+            if len(line) > 240:
+                continue
+            if any(p.match(line) for p in _SIGNATURE_PATTERNS):
+                lines.append(line.rstrip().rstrip("{").rstrip())
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _bm25_scores(self, query_terms: List[str],
+                     docs: List[Tuple[Counter, int]]) -> List[float]:
+        if not docs or not query_terms:
+            return [0.0] * len(docs)
+
+        n_docs = len(docs)
+        avg_len = sum(length for _, length in docs) / n_docs or 1.0
+        unique_terms = set(query_terms)
+        doc_freq = {
+            term: sum(1 for tf, _ in docs if term in tf) for term in unique_terms
+        }
+
+        scores = []
+        for tf, length in docs:
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / avg_len)
+            for term in unique_terms:
+                freq = tf.get(term, 0)
+                if not freq:
+                    continue
+                df = doc_freq[term]
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                score += idf * freq * (self.k1 + 1) / (freq + norm)
+            scores.append(score)
+        return scores
+
+    def _build_import_graph(self, names: List[str],
+                            analyses: List[FileAnalysis]) -> List[Set[int]]:
+        """Undirected adjacency between files linked by an import"""
+        index: Dict[str, int] = {}
+        for i, name in enumerate(names):
+            normalized = posixpath.normpath(name.lstrip("./"))
+            index.setdefault(normalized, i)
+            index.setdefault(posixpath.basename(normalized), i)
+
+        adjacency: List[Set[int]] = [set() for _ in names]
+        for i, (name, analysis) in enumerate(zip(names, analyses)):
+            base_dir = posixpath.dirname(name)
+            for spec in analysis.imports:
+                target = self._resolve_import(spec, base_dir, index)
+                if target is not None and target != i:
+                    adjacency[i].add(target)
+                    adjacency[target].add(i)
+        return adjacency
+
+    @staticmethod
+    def _resolve_import(spec: str, base_dir: str, index: Dict[str, int]) -> Optional[int]:
+        is_path = "/" in spec or spec.endswith(_SOURCE_EXTENSIONS)
+        if spec.startswith(".") and not is_path:
+            # Python relative import: "..utils.x" -> "../utils/x"
+            dots = len(spec) - len(spec.lstrip("."))
+            spec = "../" * (dots - 1) + spec[dots:].replace(".", "/")
+            is_path = True
+        elif not is_path:
+            # Python absolute import: "app.models" -> "app/models"
+            spec = spec.replace(".", "/")
+
+        if spec.startswith("."):
+            candidate = posixpath.normpath(posixpath.join(base_dir, spec))
+        else:
+            candidate = spec.lstrip("@/")
+        candidate = candidate.lstrip("./")
+
+        for ext in _RESOLVE_EXTENSIONS:
+            hit = index.get(candidate + ext)
+            if hit is not None:
+                return hit
+        return index.get(posixpath.basename(candidate))
+
+    def score_files(self, files: List[Dict[str, Any]], query: str) -> List[float]:
+        """Relevance of each file to the query (BM25 + import proximity)"""
+        if not files:
+            return []
+
+        names = [f.get("name", "") or "" for f in files]
+        analyses = [self.analyze_file(f) for f in files]
+        query_terms = tokenize(query)
+
+        docs = []
+        for name, analysis in zip(names, analyses):
+            tf = analysis.term_freq + Counter(tokenize(name))
+            docs.append((tf, analysis.length))
+        scores = self._bm25_scores(query_terms, docs)
+
+        query_lower = (query or "").lower()
+        for i, name in enumerate(names):
+            base = posixpath.basename(name).lower()
+            if base and base in query_lower:
+                scores[i] += NAME_MENTION_BOOST
+
+        # Propagate relevance to files reachable through imports
+        adjacency = self._build_import_graph(names, analyses)
+        propagated = list(scores)
+        frontier = {i: s for i, s in enumerate(scores) if s > 0}
+        for _ in range(self.graph_max_depth):
+            next_frontier: Dict[int, float] = {}
+            for node, score in frontier.items():
+                spread = score * self.graph_decay
+                for neighbour in adjacency[node]:
+                    if spread > propagated[neighbour] - scores[neighbour]:
+                        next_frontier[neighbour] = max(next_frontier.get(neighbour, 0.0), spread)
+            for node, spread in next_frontier.items():
+                propagated[node] = max(propagated[node], scores[node] + spread)
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        return propagated
+
+    # ------------------------------------------------------------------
+    # Packing
+    # ------------------------------------------------------------------
+
+    def pack_files(self, files: List[Dict[str, Any]], query: str,
+                   token_budget: int = DEFAULT_FILE_TOKEN_BUDGET
+                   ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Greedily fill the budget with the most relevant files.
+
+        Files are added in full while they fit, then as signatures, and
+        otherwise by name only so the model still knows they exist. The
+        original file order is preserved in the output.
+        """
+        scores = self.score_files(files, query)
+        order = sorted(range(len(files)), key=lambda i: scores[i], reverse=True)
+
+        remaining = token_budget
+        packed: Dict[int, Dict[str, Any]] = {}
+        counts = {"full": 0, "signatures": 0, "omitted": 0}
+
+        for i in order:
+            file = files[i]
+            analysis = self.analyze_file(file)
+            overhead = 10 + self.estimate_tokens(file.get("name", ""))
+
+            if analysis.tokens + overhead <= remaining:
+                packed[i] = file
+                remaining -= analysis.tokens + overhead
+                counts["full"] += 1
+                continue
+
+            entry = {
+                "name": file.get("name", ""),
+                "language": file.get("language", "plaintext"),
+                "_original_tokens": analysis.tokens,
+                "_relevance": round(scores[i], 3),
+            }
+            if analysis.signatures and analysis.signature_tokens + overhead <= remaining:
+                entry["content"] = analysis.signatures
+                entry["_packed"] = "signatures"
+                remaining -= analysis.signature_tokens + overhead
+                counts["signatures"] += 1
+            else:
+                entry["content"] = ""
+                entry["_packed"] = "omitted"
+                remaining -= min(overhead, max(remaining, 0))
+                counts["omitted"] += 1
+            packed[i] = entry
+
+        result = [packed[i] for i in range(len(files))]
+        stats = {
+            "token_budget": token_budget,
+            "tokens_used": token_budget - remaining,
+            **counts,
+            "cache": get_analysis_cache_stats(),
+        }
+        return result, stats
+
+    def pack_conversation(self, messages: List[Dict[str, str]], query: str,
+                          token_budget: int, keep_recent: int = 6
+                          ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """Select conversation turns for the budget.
+
+        The first message and the last ``keep_recent`` messages are always
+        kept; middle turns are ranked by BM25 against the query and kept
+        in chronological order while they fit.
+
+        Returns:
+            Tuple of (selected_messages, dropped_messages)
+        """
+        if len(messages) <= keep_recent + 1:
+            return messages, []
+
+        head = messages[:1]
+        middle = messages[1:-keep_recent] if keep_recent else messages[1:]
+        tail = messages[-keep_recent:] if keep_recent else []
+
+        def cost(msg: Dict[str, str]) -> int:
+            return self.estimate_tokens(msg.get("content", "")) + 4
+
+        remaining = token_budget - sum(cost(m) for m in head + tail)
+        docs = []
+        for msg in middle:
+            terms = tokenize(msg.get("content", ""))
+            docs.append((Counter(terms), len(terms)))
+        scores = self._bm25_scores(tokenize(query), docs)
+
+        keep: Set[int] = set()
+        for i in sorted(range(len(middle)), key=lambda i: scores[i], reverse=True):
+            if scores[i] <= 0:
+                break
+            if cost(middle[i]) <= remaining:
+                keep.add(i)
+                remaining -= cost(middle[i])
+
+        selected = head + [m for i, m in enumerate(middle) if i in keep] + tail
+        dropped = [m for i, m in enumerate(middle) if i not in keep]
+        return selected, dropped
@@ -97,7 +97,8 @@ class OrchestratorV2:
             conversation_history,
             files=[f if isinstance(f, dict) else {'name': f, 'content': ''} for f in current_files],
             keep_recent_messages=6,
-            max_file_tokens=2000
+            max_file_tokens=2000,
+            query=user_request
         )
         
         if compression_stats.get('compressed'):
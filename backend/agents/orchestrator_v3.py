@@ -3,17 +3,20 @@ OrchestratorV3 - Next-generation multi-agent orchestration system
 
 This is a major upgrade to the orchestration system with:
 - Parallel agent execution with smart dependency resolution
+- Agent results streamed in completion order, with per-agent timeouts
 - Advanced context management with compression
 - Real-time progress streaming via SSE
 - Automatic error recovery and retry logic
 - Quality gates with iterative improvement
+- Incremental repair: fix iterations only re-prompt the agents owning
+  the flagged files; untouched files are carried forward by content hash
 - Memory persistence across sessions
 
 @author Devora Team
 @version 3.0.0
 """
 
-from typing import Dict, Any, List, Callable, Optional, AsyncGenerator
+from typing import Dict, Any, List, Callable, Optional, AsyncGenerator, Awaitable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import asyncio
@@ -21,6 +24,8 @@ import logging
 import time
 import json
 import hashlib
+import posixpath
+import re
 from datetime import datetime
 
 from .architect_agent import ArchitectAgent
@@ -29,9 +34,49 @@ from .backend_agent import BackendAgent
 from .database_agent import DatabaseAgent
 from .reviewer import ReviewerAgent
 from .context_compressor import compress_context_if_needed
+from .static_analysis import CORRECTNESS, BEST_PRACTICE, StaticAnalyzer
 
 logger = logging.getLogger(__name__)
 
+# Owner of the deterministic config files (never re-prompted)
+CONFIG_OWNER = "config"
+
+# import ... from '...' / export ... from '...' / import('...')
+_IMPORT_RE = re.compile(
+    r"""(?:import|export)\s[^'"]*?from\s+['"]([^'"]+)['"]|import\(\s*['"]([^'"]+)['"]"""
+)
+_EXPORT_RE = re.compile(
+    r"export\s+(?:default\s+)?(?:async\s+)?(?:function|const|let|class|interface|type|enum)\s+(\w+)"
+)
+_SCRIPT_EXT_RE = re.compile(r"\.(?:tsx?|jsx?|mjs)$")
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of a file's content"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def local_module(importer: str, spec: str) -> Optional[str]:
+    """Project module (path without extension) an import refers to, None for packages"""
+    if spec.startswith("@/"):
+        module = spec[2:]
+    elif spec.startswith("."):
+        module = posixpath.normpath(posixpath.join(posixpath.dirname(importer), spec))
+    else:
+        return None
+    return _SCRIPT_EXT_RE.sub("", module)
+
+
+def module_index(files: List[Dict]) -> Dict[str, Dict]:
+    """Project files by module path (without extension, `dir/index` as `dir`)"""
+    by_module = {}
+    for file in files:
+        module = _SCRIPT_EXT_RE.sub("", file["name"])
+        by_module[module] = file
+        if module.endswith("/index"):
+            by_module[module[:-len("/index")]] = file
+    return by_module
+
 
 class AgentStatus(str, Enum):
     """Status of an agent execution"""
@@ -87,6 +132,8 @@ class WorkflowContext:
     architecture: Optional[Dict] = None
     template: Optional[Dict] = None
     generated_files: List[Dict] = field(default_factory=list)
+    file_owners: Dict[str, str] = field(default_factory=dict)
+    file_hashes: Dict[str, str] = field(default_factory=dict)
     errors: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
@@ -125,18 +172,49 @@ class ProgressEvent:
 
 
 class QualityGate:
-    """Quality gate for validating generated code"""
+    """
+    Quality gate for validating generated code.
+
+    Per-file checks run over a shared parse of each file (see
+    static_analysis), analyzed in a process pool and cached by content
+    hash, so files unchanged between iterations are not analyzed again.
+    """
 
-    def __init__(self):
+    def __init__(self, analyzer: Optional[StaticAnalyzer] = None):
+        self.analyzer = analyzer or StaticAnalyzer()
         self.checks = [
             self._check_file_structure,
             self._check_imports,
             self._check_completeness,
             self._check_best_practices
         ]
+        # Checks that look at each file on its own (can run per agent)
+        self.file_checks = [
+            self._check_imports,
+            self._check_best_practices
+        ]
+
+    async def check_files(self, files: List[Dict]) -> Dict[str, Any]:
+        """Run the per-file checks on a subset of files (e.g. one agent's output)"""
+        # Parse once; both checks then read the analyses from the cache
+        await self.analyzer.analyze(files)
+        return {
+            "files": [f["name"] for f in files],
+            "checks": list(await asyncio.gather(*(check(files, {}) for check in self.file_checks)))
+        }
 
-    async def run(self, files: List[Dict], architecture: Dict) -> Dict[str, Any]:
-        """Run all quality checks"""
+    async def run(
+        self,
+        files: List[Dict],
+        architecture: Dict,
+        file_results: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run all quality checks.
+
+        `file_results` are check_files() results computed earlier; their
+        files are not checked again by the per-file checks.
+        """
         results = {
             "passed": True,
             "checks": [],
@@ -144,8 +222,29 @@ class QualityGate:
             "score": 0
         }
 
-        for check in self.checks:
-            check_result = await check(files, architecture)
+        checked = set()
+        partial: Dict[str, List[Dict]] = {}
+        for file_result in file_results or []:
+            checked.update(file_result["files"])
+            for check_result in file_result["checks"]:
+                partial.setdefault(check_result["name"], []).append(check_result)
+        unchecked = [f for f in files if f["name"] not in checked]
+
+        # Files already checked per agent are cache hits here
+        analyses = await self.analyzer.analyze(files)
+
+        check_results = await asyncio.gather(*(
+            check(unchecked if check in self.file_checks else files, architecture)
+            for check in self.checks
+        ))
+        for check, check_result in zip(self.checks, check_results):
+            if check in self.file_checks:
+                check_result = self._merge_check_results(
+                    [check_result] + partial.get(check_result["name"], [])
+                )
+            if check_result["name"] == "imports":
+                # Resolving imports needs the whole project
+                check_result.setdefault("warnings", []).extend(self._unresolved_imports(files, analyses))
             results["checks"].append(check_result)
             if not check_result["passed"]:
                 results["passed"] = False
@@ -157,6 +256,42 @@ class QualityGate:
 
         return results
 
+    @staticmethod
+    def _merge_check_results(check_results: List[Dict]) -> Dict:
+        """Combine results of the same check over disjoint sets of files"""
+        merged = {
+            "name": check_results[0]["name"],
+            "passed": all(c["passed"] for c in check_results),
+            "issues": [i for c in check_results for i in c.get("issues", [])]
+        }
+        if any("warnings" in c for c in check_results):
+            merged["warnings"] = [w for c in check_results for w in c.get("warnings", [])]
+        return merged
+
+    async def _findings(self, files: List[Dict], category: str) -> Tuple[List[str], List[str]]:
+        """(errors, warnings) of one finding category, as `file:line: message`"""
+        issues, warnings = [], []
+        for analysis in await self.analyzer.analyze(files):
+            for finding in analysis["findings"]:
+                if finding["category"] != category:
+                    continue
+                message = f"{analysis['file']}:{finding['line']}: {finding['message']}"
+                (issues if finding["severity"] == "error" else warnings).append(message)
+        return issues, warnings
+
+    @staticmethod
+    def _unresolved_imports(files: List[Dict], analyses: List[Dict]) -> List[str]:
+        """Local imports (relative or `@/`) that match no project file"""
+        by_module = module_index(files)
+        warnings = []
+        for analysis in analyses:
+            for spec in analysis["imports"]:
+                module = local_module(analysis["file"], spec)
+                if module is None or module in by_module or posixpath.splitext(module)[1]:
+                    continue  # package, resolved, or asset (.css, .svg...)
+                warnings.append(f"{analysis['file']}: unresolved import '{spec}'")
+        return warnings
+
     async def _check_file_structure(self, files: List[Dict], arch: Dict) -> Dict:
         """Check if file structure matches architecture"""
         expected_pages = arch.get("pages", [])
@@ -175,21 +310,14 @@ class QualityGate:
         }
 
     async def _check_imports(self, files: List[Dict], arch: Dict) -> Dict:
-        """Check for missing or broken imports"""
-        issues = []
-
-        for file in files:
-            if file["name"].endswith((".ts", ".tsx", ".js", ".jsx")):
-                content = file.get("content", "")
-                # Check for common import patterns
-                if "import " in content and "from '" in content:
-                    # Basic check - could be enhanced
-                    pass
+        """Check that files parse and can be imported (syntax, brackets, 'use client')"""
+        issues, warnings = await self._findings(files, CORRECTNESS)
 
         return {
             "name": "imports",
             "passed": len(issues) == 0,
-            "issues": issues
+            "issues": issues,
+            "warnings": warnings
         }
 
     async def _check_completeness(self, files: List[Dict], arch: Dict) -> Dict:
@@ -212,19 +340,7 @@ class QualityGate:
 
     async def _check_best_practices(self, files: List[Dict], arch: Dict) -> Dict:
         """Check for best practices compliance"""
-        issues = []
-        warnings = []
-
-        for file in files:
-            content = file.get("content", "")
-
-            # Check for console.log in production code
-            if "console.log" in content and file["name"].endswith((".ts", ".tsx")):
-                warnings.append(f"console.log found in {file['name']}")
-
-            # Check for any type usage
-            if ": any" in content or "as any" in content:
-                warnings.append(f"'any' type used in {file['name']}")
+        issues, warnings = await self._findings(files, BEST_PRACTICE)
 
         return {
             "name": "best_practices",
@@ -251,7 +367,8 @@ class OrchestratorV3:
     2. Architect analyzes and plans
     3. Parallel generation: Frontend + Backend + Database
     4. Quality gate validation
-    5. Reviewer feedback and iteration
+    5. Reviewer feedback and iteration (targeted repair when the issues
+       can be mapped to files, full regeneration otherwise)
     6. Finalization and delivery
     """
 
@@ -260,12 +377,25 @@ class OrchestratorV3:
         api_key: str,
         model: str = "openai/gpt-4o",
         max_iterations: int = 3,
-        enable_quality_gate: bool = True
+        enable_quality_gate: bool = True,
+        incremental_repair: bool = True,
+        agent_timeout: Optional[float] = 180.0,
+        partial_results: str = "best_effort"
     ):
+        """
+        Args:
+            agent_timeout: Seconds a generator agent may run (None: no limit)
+            partial_results: What to do when a generator fails or times out:
+                "best_effort" continues with the agents that finished,
+                "require_all" fails the iteration
+        """
         self.api_key = api_key
         self.model = model
         self.max_iterations = max_iterations
         self.enable_quality_gate = enable_quality_gate
+        self.incremental_repair = incremental_repair
+        self.agent_timeout = agent_timeout
+        self.partial_results = partial_results
 
         # Initialize agents
         self.architect = ArchitectAgent(api_key, model)
@@ -286,7 +416,10 @@ class OrchestratorV3:
             "agent_times_ms": {},
             "iterations": 0,
             "quality_score": 0,
-            "tokens_used": 0
+            "tokens_used": 0,
+            "repair_iterations": 0,
+            "files_regenerated": 0,
+            "files_carried_forward": 0
         }
 
     def set_progress_callback(self, callback: Callable):
@@ -340,7 +473,8 @@ class OrchestratorV3:
                 ctx.conversation_history,
                 files=[f if isinstance(f, dict) else {'name': f, 'content': ''} for f in ctx.current_files],
                 keep_recent_messages=6,
-                max_file_tokens=2000
+                max_file_tokens=2000,
+                query=user_request
             )
 
             if compression_stats.get('compressed'):
@@ -397,6 +531,7 @@ class OrchestratorV3:
             # ═══════════════════════════════════════════════════════════════
             iteration = 0
             quality_passed = False
+            pending_issues: List[str] = []
 
             while iteration < self.max_iterations and not quality_passed:
                 iteration += 1
@@ -409,105 +544,160 @@ class OrchestratorV3:
                     data={"iteration": iteration, "max_iterations": self.max_iterations}
                 )
 
-                yield ProgressEvent(
-                    event_type="phase_start",
-                    phase=WorkflowPhase.PARALLEL_GENERATION,
-                    message="Generating Frontend, Backend, and Database in parallel...",
-                    data={"step": 3, "total_steps": 6}
+                # Later iterations only re-prompt the agents owning flagged files
+                repair_plan = (
+                    self._plan_repair(pending_issues, ctx)
+                    if self.incremental_repair and iteration > 1
+                    else None
                 )
+                pending_issues = []
 
-                # Create parallel tasks
-                gen_start = time.time()
-
-                frontend_task = asyncio.create_task(
-                    self._execute_agent("frontend", self.frontend, {
-                        "architecture": ctx.architecture,
-                        "pages": ctx.architecture.get("pages", []),
-                        "components": [],
-                        "current_files": compressed_files,
-                        "fix_instructions": ctx.architecture.get("fix_instructions")
-                    })
-                )
-
-                backend_task = asyncio.create_task(
-                    self._execute_agent("backend", self.backend, {
-                        "architecture": ctx.architecture,
-                        "endpoints": self._extract_endpoints(ctx.architecture),
-                        "integrations": ctx.architecture.get("integrations", []),
-                        "data_models": ctx.architecture.get("data_models", []),
-                        "fix_instructions": ctx.architecture.get("fix_instructions")
-                    })
-                )
-
-                database_task = asyncio.create_task(
-                    self._execute_agent("database", self.database, {
-                        "architecture": ctx.architecture,
-                        "data_models": ctx.architecture.get("data_models", []),
-                        "features": ctx.architecture.get("features", []),
-                        "fix_instructions": ctx.architecture.get("fix_instructions")
-                    })
-                )
-
-                # Wait for all with progress updates
-                results = await asyncio.gather(
-                    frontend_task,
-                    backend_task,
-                    database_task,
-                    return_exceptions=True
-                )
-
-                gen_time = (time.time() - gen_start) * 1000
-                frontend_result, backend_result, database_result = results
+                if repair_plan:
+                    target_count = sum(len(p["files"]) for p in repair_plan.values())
+                    yield ProgressEvent(
+                        event_type="phase_start",
+                        phase=WorkflowPhase.ITERATION,
+                        message=f"Repairing {target_count} file(s) with {', '.join(repair_plan)}...",
+                        data={
+                            "step": 3,
+                            "total_steps": 6,
+                            "repair_plan": {name: p["files"] for name, p in repair_plan.items()}
+                        }
+                    )
 
-                # Collect files
-                ctx.generated_files = []
+                    gen_start = time.time()
+                    file_checks = []
+                    generators = self._generators()
+                    changed_files = []
+                    async for name, result in self._in_completion_order({
+                        name: self._repair_agent_files(name, generators[name], plan["files"], plan["issues"], ctx)
+                        for name, plan in repair_plan.items()
+                    }):
+                        if isinstance(result, dict) and result.get("success"):
+                            changed = self._merge_files(ctx, name, result.get("files", []))
+                            changed_files.extend(changed)
+                            yield ProgressEvent(
+                                event_type="agent_complete",
+                                phase=WorkflowPhase.ITERATION,
+                                message=f"{name.capitalize()}: {len(changed)} file(s) repaired",
+                                data={"agent": name, "files_count": len(changed), "files": changed}
+                            )
+                        else:
+                            ctx.errors.append(f"{name.capitalize()} repair failed: {result}")
+                    gen_time = (time.time() - gen_start) * 1000
+
+                    carried_forward = len(ctx.generated_files) - len(changed_files)
+                    self.stats["repair_iterations"] += 1
+                    self.stats["files_regenerated"] += len(changed_files)
+                    self.stats["files_carried_forward"] += carried_forward
 
-                if isinstance(frontend_result, dict) and frontend_result.get("success"):
-                    ctx.generated_files.extend(frontend_result.get("files", []))
                     yield ProgressEvent(
-                        event_type="agent_complete",
-                        phase=WorkflowPhase.PARALLEL_GENERATION,
-                        message=f"Frontend: {len(frontend_result.get('files', []))} files generated",
-                        data={"agent": "frontend", "files_count": len(frontend_result.get("files", []))}
+                        event_type="generation_complete",
+                        phase=WorkflowPhase.ITERATION,
+                        message=f"Repaired {len(changed_files)} file(s), {carried_forward} unchanged",
+                        data={
+                            "files": [f["name"] for f in ctx.generated_files],
+                            "changed_files": changed_files,
+                            "carried_forward": carried_forward,
+                            "incremental": True,
+                            "duration_ms": gen_time
+                        }
                     )
-                else:
-                    ctx.errors.append(f"Frontend generation failed: {frontend_result}")
 
-                if isinstance(backend_result, dict) and backend_result.get("success"):
-                    ctx.generated_files.extend(backend_result.get("files", []))
+                else:
                     yield ProgressEvent(
-                        event_type="agent_complete",
+                        event_type="phase_start",
                         phase=WorkflowPhase.PARALLEL_GENERATION,
-                        message=f"Backend: {len(backend_result.get('files', []))} files generated",
-                        data={"agent": "backend", "files_count": len(backend_result.get("files", []))}
+                        message="Generating Frontend, Backend, and Database in parallel...",
+                        data={"step": 3, "total_steps": 6}
                     )
-                else:
-                    ctx.errors.append(f"Backend generation failed: {backend_result}")
 
-                if isinstance(database_result, dict) and database_result.get("success"):
-                    ctx.generated_files.extend(database_result.get("files", []))
+                    # Run generators in parallel, consuming results as they finish
+                    gen_start = time.time()
+
+                    jobs = {
+                        "frontend": self._execute_agent("frontend", self.frontend, {
+                            "architecture": ctx.architecture,
+                            "pages": ctx.architecture.get("pages", []),
+                            "components": [],
+                            "current_files": compressed_files,
+                            "fix_instructions": ctx.architecture.get("fix_instructions")
+                        }),
+                        "backend": self._execute_agent("backend", self.backend, {
+                            "architecture": ctx.architecture,
+                            "endpoints": self._extract_endpoints(ctx.architecture),
+                            "integrations": ctx.architecture.get("integrations", []),
+                            "data_models": ctx.architecture.get("data_models", []),
+                            "fix_instructions": ctx.architecture.get("fix_instructions")
+                        }),
+                        "database": self._execute_agent("database", self.database, {
+                            "architecture": ctx.architecture,
+                            "data_models": ctx.architecture.get("data_models", []),
+                            "features": ctx.architecture.get("features", []),
+                            "fix_instructions": ctx.architecture.get("fix_instructions")
+                        })
+                    }
+
+                    agent_files: Dict[str, List[Dict]] = {}
+                    file_checks = []
+                    async for name, result in self._in_completion_order(jobs):
+                        if isinstance(result, dict) and result.get("success"):
+                            files = result.get("files", [])
+                            agent_files[name] = files
+                            # Static QA on this agent's files starts right away
+                            if self.enable_quality_gate:
+                                file_checks.append(asyncio.create_task(self.quality_gate.check_files(files)))
+                            yield ProgressEvent(
+                                event_type="agent_complete",
+                                phase=WorkflowPhase.PARALLEL_GENERATION,
+                                message=f"{name.capitalize()}: {len(files)} files generated",
+                                data={
+                                    "agent": name,
+                                    "files_count": len(files),
+                                    "files": files,
+                                    "duration_ms": self.stats["agent_times_ms"].get(name)
+                                }
+                            )
+                        else:
+                            error = result.get("error") if isinstance(result, dict) else result
+                            ctx.errors.append(f"{name.capitalize()} generation failed: {error}")
+                            yield ProgressEvent(
+                                event_type="agent_failed",
+                                phase=WorkflowPhase.PARALLEL_GENERATION,
+                                message=f"{name.capitalize()} generation failed: {error}",
+                                data={
+                                    "agent": name,
+                                    "error": str(error),
+                                    "timed_out": isinstance(result, dict) and result.get("timed_out", False)
+                                }
+                            )
+
+                    gen_time = (time.time() - gen_start) * 1000
+
+                    missing = [name for name in jobs if name not in agent_files]
+                    if missing and self.partial_results == "require_all":
+                        raise Exception(f"Generation incomplete: {', '.join(missing)} failed")
+
+                    # Collect files in a stable order (and who owns them, for targeted repairs)
+                    ctx.generated_files = []
+                    ctx.file_owners = {}
+                    ctx.file_hashes = {}
+                    for name in jobs:
+                        self._collect_files(ctx, name, agent_files.get(name, []))
+
+                    # Add config files
+                    config_files = self._generate_config_files(ctx.architecture)
+                    self._collect_files(ctx, CONFIG_OWNER, config_files)
+
                     yield ProgressEvent(
-                        event_type="agent_complete",
+                        event_type="generation_complete",
                         phase=WorkflowPhase.PARALLEL_GENERATION,
-                        message=f"Database: {len(database_result.get('files', []))} files generated",
-                        data={"agent": "database", "files_count": len(database_result.get("files", []))}
+                        message=f"Generated {len(ctx.generated_files)} total files",
+                        data={
+                            "files": [f["name"] for f in ctx.generated_files],
+                            "duration_ms": gen_time
+                        }
                     )
-                else:
-                    ctx.errors.append(f"Database generation failed: {database_result}")
-
-                # Add config files
-                config_files = self._generate_config_files(ctx.architecture)
-                ctx.generated_files.extend(config_files)
-
-                yield ProgressEvent(
-                    event_type="generation_complete",
-                    phase=WorkflowPhase.PARALLEL_GENERATION,
-                    message=f"Generated {len(ctx.generated_files)} total files",
-                    data={
-                        "files": [f["name"] for f in ctx.generated_files],
-                        "duration_ms": gen_time
-                    }
-                )
 
                 # ═══════════════════════════════════════════════════════════
                 # PHASE 4: QUALITY GATE
@@ -522,7 +712,8 @@ class OrchestratorV3:
 
                     quality_result = await self.quality_gate.run(
                         ctx.generated_files,
-                        ctx.architecture
+                        ctx.architecture,
+                        file_results=await asyncio.gather(*file_checks) if file_checks else None
                     )
 
                     self.stats["quality_score"] = quality_result["score"]
@@ -539,6 +730,7 @@ class OrchestratorV3:
                     elif iteration < self.max_iterations:
                         # Feed issues back for iteration
                         ctx.architecture["fix_instructions"] = quality_result["issues"]
+                        pending_issues = list(quality_result["issues"])
 
                 # ═══════════════════════════════════════════════════════════
                 # PHASE 5: REVIEW
@@ -573,6 +765,8 @@ class OrchestratorV3:
                 # Update fix instructions for next iteration
                 if review_result.get("fix_instructions"):
                     ctx.architecture["fix_instructions"] = review_result["fix_instructions"]
+                    instructions = review_result["fix_instructions"]
+                    pending_issues = instructions if isinstance(instructions, list) else [instructions]
 
             # ═══════════════════════════════════════════════════════════════
             # PHASE 6: FINALIZATION
@@ -659,13 +853,22 @@ class OrchestratorV3:
         agent: Any,
         task: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Execute a single agent with timing and error handling"""
+        """Execute a single agent with timing, timeout and error handling"""
         start = time.time()
         try:
-            result = await agent.execute(task)
+            result = await asyncio.wait_for(agent.execute(task), timeout=self.agent_timeout)
             duration = (time.time() - start) * 1000
             self.stats["agent_times_ms"][agent_name] = duration
             return result
+        except asyncio.TimeoutError:
+            logger.error(f"[OrchestratorV3] Agent {agent_name} timed out after {self.agent_timeout}s")
+            self.stats["agent_times_ms"][agent_name] = (time.time() - start) * 1000
+            return {
+                "success": False,
+                "error": f"timed out after {self.agent_timeout}s",
+                "timed_out": True,
+                "files": []
+            }
         except Exception as e:
             logger.error(f"[OrchestratorV3] Agent {agent_name} failed: {e}")
             return {
@@ -674,6 +877,178 @@ class OrchestratorV3:
                 "files": []
             }
 
+    async def _in_completion_order(
+        self,
+        jobs: Dict[str, Awaitable]
+    ) -> AsyncGenerator[Tuple[str, Any], None]:
+        """Run jobs concurrently and yield (name, result) as each finishes"""
+        tasks = {asyncio.ensure_future(job): name for name, job in jobs.items()}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield tasks[task], (task.exception() or task.result())
+        finally:
+            # Consumer stopped early (e.g. client disconnected)
+            for task in pending:
+                task.cancel()
+
+    # ─────────────────────────────────────────────────────────────────
+    # Incremental repair
+    # ─────────────────────────────────────────────────────────────────
+
+    def _generators(self) -> Dict[str, Any]:
+        """Generator agents by owner name"""
+        return {"frontend": self.frontend, "backend": self.backend, "database": self.database}
+
+    def _collect_files(self, ctx: WorkflowContext, owner: str, files: List[Dict]):
+        """Add generated files, recording their owner and content hash"""
+        for file in files:
+            ctx.generated_files.append(file)
+            ctx.file_owners[file["name"]] = owner
+            ctx.file_hashes[file["name"]] = content_hash(file.get("content", ""))
+
+    def _merge_files(self, ctx: WorkflowContext, owner: str, files: List[Dict]) -> List[str]:
+        """
+        Merge repaired files into the project.
+
+        Files whose content hash is unchanged are carried forward as-is.
+        Returns the names of the files that actually changed.
+        """
+        positions = {f["name"]: i for i, f in enumerate(ctx.generated_files)}
+        changed = []
+        for file in files:
+            name = file["name"]
+            digest = content_hash(file.get("content", ""))
+            if ctx.file_hashes.get(name) == digest:
+                continue
+            if name in positions:
+                ctx.generated_files[positions[name]] = file
+            else:
+                positions[name] = len(ctx.generated_files)
+                ctx.generated_files.append(file)
+            ctx.file_owners[name] = owner
+            ctx.file_hashes[name] = digest
+            changed.append(name)
+        return changed
+
+    def _plan_repair(
+        self,
+        issues: List[Any],
+        ctx: WorkflowContext
+    ) -> Optional[Dict[str, Dict[str, List[str]]]]:
+        """
+        Map issues to the files and agents that own them.
+
+        Returns {agent: {"files": [...], "issues": [...]}}, or None when an
+        issue cannot be attributed to a file (full regeneration is needed).
+        """
+        if not issues or not ctx.file_owners:
+            return None
+
+        plan: Dict[str, Dict[str, List[str]]] = {}
+        for issue in issues:
+            text = issue if isinstance(issue, str) else json.dumps(issue, default=str)
+            names = [
+                name for name in ctx.file_owners
+                if re.search(r"(?<![\w./-])" + re.escape(name) + r"(?![\w/-])", text)
+            ]
+            owners = {ctx.file_owners[name] for name in names} - {CONFIG_OWNER}
+
+            if not names:
+                if text.startswith("Missing page:"):
+                    # New page: the frontend agent creates it
+                    plan.setdefault("frontend", {"files": [], "issues": []})["issues"].append(text)
+                    continue
+                return None
+            if not owners:
+                # Config files are deterministic: regenerating cannot fix them
+                logger.info(f"[OrchestratorV3] Ignoring issue on config file: {text[:100]}")
+                continue
+
+            for owner in owners:
+                entry = plan.setdefault(owner, {"files": [], "issues": []})
+                entry["issues"].append(text)
+                for name in names:
+                    if ctx.file_owners[name] == owner and name not in entry["files"]:
+                        entry["files"].append(name)
+
+        return plan or None
+
+    def _dependency_summary(self, targets: List[Dict], files: List[Dict], max_chars: int = 4000) -> str:
+        """Compact summary of the project files the targets depend on"""
+        by_module = module_index(files)
+
+        target_names = {t["name"] for t in targets}
+        lines = []
+        seen = set()
+        for target in targets:
+            for match in _IMPORT_RE.finditer(target.get("content", "")):
+                module = local_module(target["name"], match.group(1) or match.group(2))
+                if module is None:
+                    continue  # package import
+                dep = by_module.get(module)
+                if dep is None or dep["name"] in target_names or dep["name"] in seen:
+                    continue
+                seen.add(dep["name"])
+                exports = _EXPORT_RE.findall(dep.get("content", ""))
+                lines.append(f"- {dep['name']}: exports {', '.join(exports) if exports else '(default only)'}")
+
+        others = [f["name"] for f in files if f["name"] not in target_names]
+        summary = "\n".join(lines) if lines else "(no local imports)"
+        summary += f"\n\nOther project files: {', '.join(others)}"
+        return summary[:max_chars]
+
+    async def _repair_agent_files(
+        self,
+        agent_name: str,
+        agent: Any,
+        file_names: List[str],
+        issues: List[str],
+        ctx: WorkflowContext
+    ) -> Dict[str, Any]:
+        """Re-prompt one agent with only its affected files and their issues"""
+        by_name = {f["name"]: f for f in ctx.generated_files}
+        targets = [by_name[name] for name in file_names if name in by_name]
+
+        blocks = []
+        for file in targets:
+            language = file.get("language") or "typescript"
+            comment = "--" if language == "sql" else "//"
+            blocks.append(f"```{language}\n{comment} filepath: {file['name']}\n{file.get('content', '')}\n```")
+
+        system_prompt = f"""You are the {agent.name} agent of a Next.js 14 project generator, fixing issues found in review.
+
+Only fix the listed issues. Return the complete corrected content of every file you change, and of any new file needed, each in its own code block starting with a filepath comment:
+
+```tsx
+// filepath: app/page.tsx
+[complete code here]
+```
+
+Use `-- filepath:` for SQL files. Do not return files you did not change."""
+
+        context = f"""## Issues to fix:
+{chr(10).join(f"- {issue}" for issue in issues)}
+
+## Files to fix:
+{chr(10).join(blocks) if blocks else "(none: create the missing files)"}
+
+## Dependencies (do not rewrite):
+{self._dependency_summary(targets, ctx.generated_files)}
+"""
+
+        start = time.time()
+        try:
+            response = await agent.call_llm([{"role": "user", "content": context}], system_prompt)
+            files = agent.parse_code_blocks(response)
+            self.stats["agent_times_ms"][f"{agent_name}_repair"] = (time.time() - start) * 1000
+            return {"success": True, "files": files}
+        except Exception as e:
+            logger.error(f"[OrchestratorV3] Repair by {agent_name} failed: {e}")
+            return {"success": False, "error": str(e), "files": []}
+
     def _extract_endpoints(self, architecture: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract API endpoints from architecture"""
         endpoints = []
@@ -0,0 +1,495 @@
+"""
+Static analysis for generated code
+
+Each file is parsed once with a real parser (Python `ast`, `json`, a
+JS/TS tokenizer that understands strings, template literals, regexes and
+comments) and every rule runs over that shared parse. Batches of files are
+analyzed in a process pool, and results are cached by file content hash,
+so files left unchanged by a fix iteration cost nothing.
+
+Usage:
+    analyzer = StaticAnalyzer()
+    analyses = await analyzer.analyze([{"name": "app/page.tsx", "content": "..."}])
+    for finding in analyses[0]["findings"]:
+        print(finding["line"], finding["message"])
+"""
+
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Token = namedtuple("Token", "kind value line")
+
+# Finding categories
+CORRECTNESS = "correctness"
+BEST_PRACTICE = "best_practice"
+
+
+@dataclass
+class Finding:
+    """A problem reported by a rule"""
+    rule: str
+    message: str
+    line: int
+    severity: str = "warning"  # "error" fails the quality gate
+    category: str = BEST_PRACTICE
+
+
+@dataclass
+class ParsedFile:
+    """A file parsed once and shared by every rule"""
+    name: str
+    language: Optional[str]
+    content: str
+    tokens: List[Token] = field(default_factory=list)  # JS/TS, comments excluded
+    tree: Optional[ast.AST] = None  # Python
+    syntax_error: Optional[Finding] = None
+
+
+# ═══════════════════════════════════════════════════════════════════
+# JS/TS tokenizer
+# ═══════════════════════════════════════════════════════════════════
+
+_IDENT_RE = re.compile(r"[\w$]+")
+_NUMBER_RE = re.compile(r"0[xXbBoO][\da-fA-F_]+n?|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?n?")
+_REGEX_RE = re.compile(r"/(?![*/])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[a-z]*")
+_PUNCT3 = {"===", "!==", "...", "**=", "<<=", ">>=", "&&=", "||=", "??="}
+_PUNCT2 = {
+    "=>", "==", "!=", "<=", ">=", "&&", "||", "??", "?.", "++", "--",
+    "+=", "-=", "*=", "/=", "%=", "&=", "|=", "^=", "**", "<<", ">>",
+}
+# After these keywords a "/" starts a regex, not a division
+_REGEX_KEYWORDS = {
+    "return", "typeof", "case", "do", "else", "in", "of", "new", "delete",
+    "void", "throw", "instanceof", "yield", "await",
+}
+
+
+def _regex_allowed(tokens: List[Token]) -> bool:
+    if not tokens:
+        return True
+    last = tokens[-1]
+    if last.kind == "ident":
+        return last.value in _REGEX_KEYWORDS
+    if last.kind == "punct":
+        # `</` is a JSX closing tag, never a regex
+        return last.value not in (")", "]", "}", "<")
+    return False
+
+
+def tokenize_js(source: str) -> Tuple[List[Token], List[Token]]:
+    """
+    Tokenize JavaScript/TypeScript (JSX tolerated).
+
+    Returns:
+        (code tokens, comment tokens)
+    """
+    tokens: List[Token] = []
+    comments: List[Token] = []
+    # Open-brace counts inside each `${...}` of the enclosing template literals
+    template_braces: List[int] = []
+    i, line, n = 0, 1, len(source)
+
+    while i < n:
+        c = source[i]
+
+        if c == "\n":
+            line += 1
+            i += 1
+        elif c in " \t\r\f\v":
+            i += 1
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+            comments.append(Token("comment", source[i:end], line))
+            i = end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            text = source[i:end]
+            comments.append(Token("comment", text, line))
+            line += text.count("\n")
+            i = end
+        elif c in "'\"":
+            j = i + 1
+            while j < n and source[j] not in (c, "\n"):
+                j += 2 if source[j] == "\\" else 1
+            if j < n and source[j] == c:
+                tokens.append(Token("string", source[i + 1:j], line))
+                i = j + 1
+            else:
+                # Unterminated on its line: JSX text such as `Don't`
+                tokens.append(Token("text", c, line))
+                i += 1
+        elif c == "`" or (c == "}" and template_braces and template_braces[-1] == 0):
+            if c == "}":
+                template_braces.pop()
+            start_line = line
+            j = i + 1
+            while j < n:
+                ch = source[j]
+                if ch == "\\":
+                    j += 2
+                    continue
+                if ch == "`":
+                    j += 1
+                    break
+                if source.startswith("${", j):
+                    template_braces.append(0)
+                    j += 2
+                    break
+                if ch == "\n":
+                    line += 1
+                j += 1
+            tokens.append(Token("template", source[i:j], start_line))
+            i = j
+        elif c.isdigit() or (c == "." and source[i + 1:i + 2].isdigit()):
+            match = _NUMBER_RE.match(source, i)
+            tokens.append(Token("number", match.group(), line))
+            i = match.end()
+        elif c.isalpha() or c in "_$":
+            match = _IDENT_RE.match(source, i)
+            tokens.append(Token("ident", match.group(), line))
+            i = match.end()
+        else:
+            match = _REGEX_RE.match(source, i) if c == "/" and _regex_allowed(tokens) else None
+            if match:
+                tokens.append(Token("regex", match.group(), line))
+                i = match.end()
+                continue
+            for size, operators in ((3, _PUNCT3), (2, _PUNCT2)):
+                if source[i:i + size] in operators:
+                    value = source[i:i + size]
+                    break
+            else:
+                value = c
+            if template_braces and value == "{":
+                template_braces[-1] += 1
+            elif template_braces and value == "}":
+                template_braces[-1] -= 1
+            tokens.append(Token("punct", value, line))
+            i += len(value)
+
+    return tokens, comments
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Parsing
+# ═══════════════════════════════════════════════════════════════════
+
+_LANGUAGES = {
+    ".py": "python",
+    ".ts": "ts", ".tsx": "ts", ".mts": "ts", ".cts": "ts",
+    ".js": "js", ".jsx": "js", ".mjs": "js", ".cjs": "js",
+    ".json": "json",
+}
+
+
+def language_of(name: str) -> Optional[str]:
+    """Analyzed language of a file, from its extension"""
+    return _LANGUAGES.get(os.path.splitext(name)[1].lower())
+
+
+def parse_file(name: str, content: str) -> ParsedFile:
+    """Parse a file once for all rules"""
+    parsed = ParsedFile(name=name, language=language_of(name), content=content)
+
+    if parsed.language == "python":
+        try:
+            parsed.tree = ast.parse(content, filename=name)
+        except SyntaxError as e:
+            parsed.syntax_error = Finding(
+                "syntax", f"Syntax error: {e.msg}", e.lineno or 1, "error", CORRECTNESS
+            )
+    elif parsed.language in ("js", "ts"):
+        parsed.tokens, _ = tokenize_js(content)
+    elif parsed.language == "json":
+        try:
+            json.loads(content)
+        except json.JSONDecodeError as e:
+            parsed.syntax_error = Finding(
+                "syntax", f"Invalid JSON: {e.msg}", e.lineno, "error", CORRECTNESS
+            )
+
+    return parsed
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Rules
+# ═══════════════════════════════════════════════════════════════════
+
+RULES: Dict[str, List[Callable[[ParsedFile], List[Finding]]]] = {}
+
+
+def rule(*languages: str):
+    """Register a rule for the given languages"""
+    def decorator(func):
+        for language in languages:
+            RULES.setdefault(language, []).append(func)
+        return func
+    return decorator
+
+
+@rule("js", "ts")
+def unbalanced_brackets(parsed: ParsedFile) -> List[Finding]:
+    pairs = {"}": "{", "]": "["}
+    stack: List[Token] = []
+    for token in parsed.tokens:
+        if token.kind != "punct":
+            continue
+        if token.value in ("{", "["):
+            stack.append(token)
+        elif token.value in pairs:
+            if not stack or stack[-1].value != pairs[token.value]:
+                return [Finding("syntax", f"Unexpected '{token.value}'", token.line, "error", CORRECTNESS)]
+            stack.pop()
+    if stack:
+        return [Finding("syntax", f"Unclosed '{stack[-1].value}'", stack[-1].line, "error", CORRECTNESS)]
+    return []
+
+
+@rule("js", "ts")
+def console_log(parsed: ParsedFile) -> List[Finding]:
+    tokens = parsed.tokens
+    return [
+        Finding("console_log", f"console.{tokens[i + 2].value} left in code", token.line)
+        for i, token in enumerate(tokens[:-2])
+        if token.kind == "ident" and token.value == "console"
+        and tokens[i + 1].value == "."
+        and tokens[i + 2].value in ("log", "debug")
+    ]
+
+
+@rule("ts")
+def any_type(parsed: ParsedFile) -> List[Finding]:
+    tokens = parsed.tokens
+    return [
+        Finding("any_type", "'any' type used", token.line)
+        for i, token in enumerate(tokens[1:], 1)
+        if token.kind == "ident" and token.value == "any"
+        and (tokens[i - 1].value == ":" or (tokens[i - 1].kind == "ident" and tokens[i - 1].value == "as"))
+    ]
+
+
+_CLIENT_HOOKS = {
+    "useState", "useEffect", "useReducer", "useRef", "useLayoutEffect",
+    "useContext", "useTransition", "useRouter", "usePathname", "useSearchParams",
+}
+
+
+@rule("js", "ts")
+def missing_use_client(parsed: ParsedFile) -> List[Finding]:
+    """App Router files are Server Components unless marked 'use client'"""
+    if not parsed.name.startswith(("app/", "src/app/")) or not parsed.tokens:
+        return []
+    first = parsed.tokens[0]
+    if first.kind == "string" and first.value == "use client":
+        return []
+    for i, token in enumerate(parsed.tokens[:-1]):
+        if token.kind == "ident" and token.value in _CLIENT_HOOKS and parsed.tokens[i + 1].value == "(":
+            return [Finding(
+                "use_client", f"{token.value} used in a Server Component (missing 'use client')",
+                token.line, "error", CORRECTNESS
+            )]
+    return []
+
+
+@rule("python")
+def bare_except(parsed: ParsedFile) -> List[Finding]:
+    return [
+        Finding("bare_except", "Bare 'except:' catches everything", node.lineno)
+        for node in ast.walk(parsed.tree)
+        if isinstance(node, ast.ExceptHandler) and node.type is None
+    ]
+
+
+@rule("python")
+def mutable_default(parsed: ParsedFile) -> List[Finding]:
+    return [
+        Finding("mutable_default", f"Mutable default argument in {node.name}()", node.lineno)
+        for node in ast.walk(parsed.tree)
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and any(isinstance(d, (ast.List, ast.Dict, ast.Set)) for d in node.args.defaults + node.args.kw_defaults)
+    ]
+
+
+def _js_imports(tokens: List[Token]) -> List[str]:
+    specs = []
+    for i, token in enumerate(tokens):
+        if token.kind != "ident":
+            continue
+        following = tokens[i + 1:i + 3]
+        if token.value in ("from", "import") and following and following[0].kind == "string":
+            specs.append(following[0].value)
+        elif (
+            token.value in ("import", "require") and len(following) == 2
+            and following[0].value == "(" and following[1].kind == "string"
+        ):
+            specs.append(following[1].value)
+    return specs
+
+
+_DECLARATIONS = {"function", "const", "let", "var", "class", "interface", "type", "enum"}
+
+
+def _js_exports(tokens: List[Token]) -> List[str]:
+    names = []
+    for i, token in enumerate(tokens):
+        if token.kind != "ident" or token.value != "export":
+            continue
+        j = i + 1
+        if j < len(tokens) and tokens[j].value == "default":
+            names.append("default")
+            continue
+        while j < len(tokens) and tokens[j].value in ("async", "declare", "abstract"):
+            j += 1
+        if j + 1 < len(tokens) and tokens[j].value in _DECLARATIONS and tokens[j + 1].kind == "ident":
+            names.append(tokens[j + 1].value)
+    return names
+
+
+def _python_imports(tree: ast.AST) -> List[str]:
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.append("." * node.level + (node.module or ""))
+    return modules
+
+
+def analyze_source(name: str, content: str) -> Dict[str, Any]:
+    """Parse one file and run every rule for its language"""
+    parsed = parse_file(name, content)
+    findings: List[Finding] = []
+    imports: List[str] = []
+    exports: List[str] = []
+
+    if parsed.syntax_error:
+        findings.append(parsed.syntax_error)
+    elif parsed.language:
+        for check in RULES.get(parsed.language, []):
+            findings.extend(check(parsed))
+        if parsed.language in ("js", "ts"):
+            imports, exports = _js_imports(parsed.tokens), _js_exports(parsed.tokens)
+        elif parsed.language == "python":
+            imports = _python_imports(parsed.tree)
+
+    return {
+        "language": parsed.language,
+        "findings": [asdict(f) for f in findings],
+        "imports": imports,
+        "exports": exports,
+    }
+
+
+def _analyze_batch(batch: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Process pool entry point"""
+    return [analyze_source(name, content) for name, content in batch]
+
+
+# ═══════════════════════════════════════════════════════════════════
+# Engine
+# ═══════════════════════════════════════════════════════════════════
+
+class StaticAnalyzer:
+    """
+    Analyzes generated files in a process pool, caching by content hash.
+
+    The pool and the cache are shared by every instance: the cache lets
+    fix iterations (and identical files across projects) skip analysis.
+    """
+
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
+    # Below this many uncached files, pool startup and pickling cost more
+    # than the analysis itself
+    PARALLEL_THRESHOLD = 16
+    CACHE_MAX_ENTRIES = 4096
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _metrics = {"analyzed": 0, "cache_hits": 0}
+
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ProcessPoolExecutor(max_workers=cls.MAX_WORKERS)
+        return cls._executor
+
+    @classmethod
+    def shutdown_executor(cls):
+        """Stop the shared worker processes"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @staticmethod
+    def _cache_key(name: str, content: str) -> str:
+        # Rules depend on the path (language, app/ directory) as well
+        return hashlib.sha256(f"{name}\0{content}".encode("utf-8")).hexdigest()
+
+    async def analyze(self, files: List[Dict]) -> List[Dict[str, Any]]:
+        """
+        Analyze files (dicts with "name" and "content").
+
+        Returns:
+            One dict per file, in order: file, language, findings
+            (rule, message, line, severity, category), imports, exports
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        pending: List[Tuple[int, str]] = []
+
+        for index, file in enumerate(files):
+            key = self._cache_key(file["name"], file.get("content", ""))
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._metrics["cache_hits"] += 1
+                results[index] = {"file": file["name"], **cached}
+            else:
+                pending.append((index, key))
+
+        if pending:
+            batch = [(files[i]["name"], files[i].get("content", "")) for i, _ in pending]
+            for (index, key), analysis in zip(pending, await self._run(batch)):
+                self._cache[key] = analysis
+                results[index] = {"file": files[index]["name"], **analysis}
+            self._metrics["analyzed"] += len(pending)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+
+        return results
+
+    async def _run(self, batch: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        if len(batch) < self.PARALLEL_THRESHOLD:
+            return _analyze_batch(batch)
+
+        loop = asyncio.get_running_loop()
+        size = -(-len(batch) // (self.MAX_WORKERS * 2))
+        chunks = [batch[i:i + size] for i in range(0, len(batch), size)]
+        try:
+            executor = self._get_executor()
+            outputs = await asyncio.gather(*(
+                loop.run_in_executor(executor, _analyze_batch, chunk) for chunk in chunks
+            ))
+        except Exception as e:
+            # Broken pool (worker killed, fork unavailable...): analyze here
+            logger.error(f"[StaticAnalyzer] Process pool failed, analyzing in-process: {e}")
+            self.shutdown_executor()
+            return _analyze_batch(batch)
+        return [analysis for output in outputs for analysis in output]
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, int]:
+        """Files analyzed vs served from the content-hash cache"""
+        return {**cls._metrics, "cache_size": len(cls._cache)}
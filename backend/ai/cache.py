@@ -4,6 +4,7 @@ Response Caching System for LLM Calls
 Features:
 - In-memory LRU cache
 - Redis backend support (optional)
+- In-process near cache in front of Redis (optional)
 - TTL (Time-To-Live) for cache entries
 - Cache hit/miss metrics
 - Automatic cache key generation from prompts
@@ -199,7 +200,12 @@ class ResponseCache:
 
 
 class RedisCache(ResponseCache):
-    """Redis-backed cache for distributed systems (optional)"""
+    """
+    Redis-backed cache for distributed systems (optional)
+
+    Pass a `near_cache` (infrastructure.cache.NearCache) to serve repeated
+    hits from process memory; writes invalidate it in every worker.
+    """
 
     def __init__(
         self,
@@ -207,9 +213,11 @@ class RedisCache(ResponseCache):
         max_size: int = 10000,
         default_ttl_seconds: int = 3600,
         enable_metrics: bool = True,
+        near_cache: Optional[Any] = None,
     ):
         super().__init__(max_size, default_ttl_seconds, enable_metrics)
         self.redis_url = redis_url
+        self.near_cache = near_cache
         self._redis = None
 
     async def _get_redis(self):
@@ -218,6 +226,8 @@ class RedisCache(ResponseCache):
             try:
                 import redis.asyncio as redis
                 self._redis = redis.from_url(self.redis_url, decode_responses=True)
+                if self.near_cache is not None:
+                    self.near_cache.start(self._redis)
                 logger.info("[Cache] Connected to Redis")
             except ImportError:
                 logger.error("[Cache] redis package not installed")
@@ -240,12 +250,24 @@ class RedisCache(ResponseCache):
         try:
             redis = await self._get_redis()
             key = self._generate_key(messages, system_prompt, model, **kwargs)
+            redis_key = f"llm_cache:{key}"
+
+            near = self.near_cache
+            if near is not None:
+                value = near.lookup(redis_key)
+                if value is not None:
+                    self._metrics["hits"] += 1
+                    logger.debug(f"[Cache] Near cache HIT for key {key[:8]}...")
+                    return json.loads(value)
+                version = near.version()
 
-            value = await redis.get(f"llm_cache:{key}")
+            value = await redis.get(redis_key)
 
             if value:
                 self._metrics["hits"] += 1
                 logger.debug(f"[Cache] Redis HIT for key {key[:8]}...")
+                if near is not None:
+                    near.store(redis_key, value, version)
                 return json.loads(value)
 
             self._metrics["misses"] += 1
@@ -276,6 +298,8 @@ class RedisCache(ResponseCache):
                 ttl_seconds,
                 json.dumps(response)
             )
+            if self.near_cache is not None:
+                await self.near_cache.publish(redis, [f"llm_cache:{key}"])
 
             logger.debug(f"[Cache] Redis SET for key {key[:8]}...")
 
@@ -290,11 +314,22 @@ class RedisCache(ResponseCache):
             keys = await redis.keys("llm_cache:*")
             if keys:
                 await redis.delete(*keys)
+            if self.near_cache is not None:
+                await self.near_cache.publish(redis, pattern="llm_cache:*")
             logger.info(f"[Cache] Cleared {len(keys)} Redis entries")
         except Exception as e:
             logger.error(f"[Cache] Redis clear error: {e}")
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache performance metrics (overall, plus the near cache tier if enabled)"""
+        metrics = super().get_metrics()
+        if self.near_cache is not None:
+            metrics["near_cache"] = self.near_cache.get_metrics()
+        return metrics
+
     async def close(self):
         """Close Redis connection"""
+        if self.near_cache is not None:
+            await self.near_cache.stop()
         if self._redis:
             await self._redis.close()
@@ -7,20 +7,23 @@ This module provides a sophisticated memory system for AI agents with:
 - Episodic memory: Historical generation records
 
 The system uses MongoDB for persistence and supports:
-- Semantic search via embeddings
+- Semantic search via a per-user embedding index
 - Memory consolidation (short-term to long-term)
 - Automatic forgetting of low-importance memories
 - User-isolated namespaces
 """
 
-from .memory_types import Memory, MemoryType, MemoryMetadata
+from .memory_types import Memory, MemoryType, MemoryMetadata, compute_content_hash
 from .memory_store import MemoryStore
+from .memory_index import MemoryVectorIndex
 from .agent_memory import AgentMemorySystem
 
 __all__ = [
     "Memory",
     "MemoryType",
     "MemoryMetadata",
+    "compute_content_hash",
     "MemoryStore",
+    "MemoryVectorIndex",
     "AgentMemorySystem",
 ]
@@ -11,7 +11,6 @@ Provides a unified interface for agents to:
 import logging
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional
-import hashlib
 
 from .memory_types import (
     Memory,
@@ -20,6 +19,8 @@ from .memory_types import (
     MemorySearchResult,
 )
 from .memory_store import MemoryStore
+from .memory_index import MemoryVectorIndex
+from ..rag.embeddings import EmbeddingService
 
 logger = logging.getLogger(__name__)
 
@@ -60,15 +61,28 @@ class AgentMemorySystem:
     SHORT_TERM_EXPIRY_HOURS = 24
     CONSOLIDATION_THRESHOLD = 20
 
-    def __init__(self, user_id: str, store: MemoryStore):
+    # Hybrid (vector) recall
+    VECTOR_CANDIDATES_PER_RESULT = 4
+    RECENCY_HALF_LIFE_DAYS = 30
+    RECENCY_FLOOR = 0.3
+    REINDEX_BATCH_SIZE = 100
+
+    def __init__(
+        self,
+        user_id: str,
+        store: MemoryStore,
+        vector_index: Optional[MemoryVectorIndex] = None
+    ):
         """Initialize the agent memory system.
 
         Args:
             user_id: Unique identifier for the user
             store: MemoryStore instance for persistence
+            vector_index: Optional embedding index for semantic recall
         """
         self.user_id = user_id
         self.store = store
+        self.vector_index = vector_index
 
         # In-memory short-term cache for fast access
         self.short_term: List[Dict[str, Any]] = []
@@ -96,16 +110,6 @@ class AgentMemorySystem:
         Returns:
             The ID of the stored memory
         """
-        # Check for duplicate content to avoid redundant storage
-        content_hash = self._hash_content(content)
-        existing = await self._find_duplicate(content_hash)
-        if existing:
-            # Boost importance of existing memory instead
-            existing.boost_importance(0.1)
-            await self.store.update(existing)
-            logger.debug(f"Boosted existing memory {existing.id}")
-            return existing.id
-
         # Build metadata
         mem_metadata = MemoryMetadata()
         if metadata:
@@ -142,8 +146,18 @@ class AgentMemorySystem:
             expires_at=expires_at
         )
 
-        # Store in database
-        memory_id = await self.store.add(memory)
+        # Store in database; duplicate content reinforces the existing memory
+        memory_id, created = await self.store.upsert(memory, boost=0.1)
+        if not created:
+            logger.debug(f"Boosted existing memory {memory_id}")
+            return memory_id
+
+        # Keep the vector index in sync with the store
+        if self.vector_index is not None:
+            try:
+                await self.vector_index.index_memory(memory)
+            except Exception as e:
+                logger.warning(f"Failed to index memory {memory_id}: {e}")
 
         # Add to short-term cache if applicable
         if memory_type == MemoryType.SHORT_TERM:
@@ -171,7 +185,9 @@ class AgentMemorySystem:
     ) -> List[Memory]:
         """Recall memories relevant to a query.
 
-        Searches across memory types and combines results based on relevance.
+        With a vector index, candidates are ranked by
+        similarity x importance x recency; text search only tops up the
+        result when the index has fewer than ``k`` matches.
 
         Args:
             query: The search query
@@ -183,54 +199,111 @@ class AgentMemorySystem:
         Returns:
             List of relevant Memory objects
         """
-        all_results: List[MemorySearchResult] = []
-
-        # Search each memory type
         types_to_search = memory_types or [
             MemoryType.LONG_TERM,
             MemoryType.EPISODIC,
             MemoryType.SHORT_TERM
         ]
 
-        for mem_type in types_to_search:
-            results = await self.store.search(
-                user_id=self.user_id,
-                query=query,
-                memory_type=mem_type,
-                limit=k,
-                min_importance=min_importance
-            )
-            all_results.extend(results)
-
-        # Sort by relevance and importance
-        all_results.sort(
-            key=lambda x: (x.relevance_score * 0.6 + x.memory.importance * 0.4),
-            reverse=True
-        )
-
-        # Get unique memories (deduplicate)
-        seen_ids = set()
         unique_memories: List[Memory] = []
+        if self.vector_index is not None and query and query.strip():
+            try:
+                unique_memories = await self._vector_recall(
+                    query, k, types_to_search, min_importance
+                )
+            except Exception as e:
+                logger.warning(f"Vector recall failed, using text search: {e}")
+
+        if len(unique_memories) < k:
+            all_results: List[MemorySearchResult] = []
+
+            # Search each memory type
+            for mem_type in types_to_search:
+                results = await self.store.search(
+                    user_id=self.user_id,
+                    query=query,
+                    memory_type=mem_type,
+                    limit=k,
+                    min_importance=min_importance
+                )
+                all_results.extend(results)
+
+            # Sort by relevance and importance
+            all_results.sort(
+                key=lambda x: (x.relevance_score * 0.6 + x.memory.importance * 0.4),
+                reverse=True
+            )
 
-        for result in all_results:
-            if result.memory.id not in seen_ids:
-                seen_ids.add(result.memory.id)
-                unique_memories.append(result.memory)
-
-                # Track access for importance boosting
-                self._accessed_memories.add(result.memory.id)
-
+            # Get unique memories (deduplicate)
+            seen_ids = {m.id for m in unique_memories}
+            for result in all_results:
                 if len(unique_memories) >= k:
                     break
+                if result.memory.id not in seen_ids:
+                    seen_ids.add(result.memory.id)
+                    unique_memories.append(result.memory)
 
-        # Boost importance of accessed memories
+        # Track access for importance boosting
+        self._accessed_memories.update(m.id for m in unique_memories)
+
+        # Boost importance of accessed memories in one round trip
         for memory in unique_memories:
             memory.boost_importance(0.05)
-            await self.store.update(memory)
+        await self.store.boost_many([m.id for m in unique_memories], boost=0.05)
 
         logger.debug(f"Recalled {len(unique_memories)} memories for query: {query[:30]}...")
         return unique_memories
 
+    async def _vector_recall(
+        self,
+        query: str,
+        k: int,
+        memory_types: List[MemoryType],
+        min_importance: float
+    ) -> List[Memory]:
+        """Rank memories by similarity x importance x recency.
+
+        Args:
+            query: The search query
+            k: Maximum number of memories to return
+            memory_types: Types to include
+            min_importance: Minimum importance threshold
+
+        Returns:
+            Up to k memories, best first
+        """
+        hits = await self.vector_index.search(
+            self.user_id, query, top_k=k * self.VECTOR_CANDIDATES_PER_RESULT
+        )
+        if not hits:
+            return []
+
+        similarities = dict(hits)
+        candidates = await self.store.get_many(
+            self.user_id,
+            list(similarities),
+            memory_types=memory_types,
+            min_importance=min_importance
+        )
+
+        now = datetime.now(timezone.utc)
+        scored = [
+            (max(similarities[m.id], 0.0) * m.importance * self._recency_weight(m, now), m)
+            for m in candidates
+        ]
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [memory for _, memory in scored[:k]]
+
+    def _recency_weight(self, memory: Memory, now: datetime) -> float:
+        """Exponential decay on time since last access, floored."""
+        last_accessed = memory.last_accessed
+        if last_accessed.tzinfo is None:
+            last_accessed = last_accessed.replace(tzinfo=timezone.utc)
+
+        age_days = max((now - last_accessed).total_seconds(), 0.0) / 86400
+        decay = 0.5 ** (age_days / self.RECENCY_HALF_LIFE_DAYS)
+        return self.RECENCY_FLOOR + (1 - self.RECENCY_FLOOR) * decay
+
     async def get_context_for_agent(
         self,
         current_task: str,
@@ -476,6 +549,9 @@ class AgentMemorySystem:
         """
         result = await self.store.consolidate(self.user_id)
 
+        if self.vector_index is not None and result.discarded_memory_ids:
+            await self.vector_index.remove(self.user_id, result.discarded_memory_ids)
+
         # Clear short-term cache
         self.short_term = []
 
@@ -500,18 +576,16 @@ class AgentMemorySystem:
         Returns:
             Statistics about cleanup
         """
-        stats = {"forgotten": 0, "decayed": 0}
-
-        # Apply decay to old memories
-        if apply_decay:
-            stats["decayed"] = await self.store.apply_decay(self.user_id)
-
-        # Forget low-importance old memories
-        stats["forgotten"] = await self.store.forget(
+        stats = await self.store.cleanup(
             self.user_id,
-            importance_threshold=forget_threshold,
-            age_days=age_days
+            forget_threshold=forget_threshold,
+            age_days=age_days,
+            apply_decay=apply_decay
         )
+        forgotten_ids = stats.pop("forgotten_ids", [])
+
+        if self.vector_index is not None and forgotten_ids:
+            await self.vector_index.remove(self.user_id, forgotten_ids)
 
         return stats
 
@@ -524,8 +598,36 @@ class AgentMemorySystem:
         stats = await self.store.get_stats(self.user_id)
         stats["short_term_cache_size"] = len(self.short_term)
         stats["accessed_this_session"] = len(self._accessed_memories)
+        if self.vector_index is not None:
+            stats["vector_index"] = self.vector_index.get_stats()
         return stats
 
+    async def reindex(self) -> int:
+        """Embed this user's memories that are missing from the vector index.
+
+        Useful after enabling the index for users with existing memories.
+
+        Returns:
+            Number of memories indexed
+        """
+        if self.vector_index is None:
+            return 0
+
+        indexed = set(await self.vector_index.indexed_ids(self.user_id))
+        missing: List[Memory] = []
+        for mem_type in MemoryType:
+            memories = await self.store.get_by_type(self.user_id, mem_type, limit=10000)
+            missing.extend(m for m in memories if m.id not in indexed)
+
+        count = 0
+        for i in range(0, len(missing), self.REINDEX_BATCH_SIZE):
+            count += await self.vector_index.index_memories(
+                missing[i:i + self.REINDEX_BATCH_SIZE]
+            )
+
+        logger.info(f"Indexed {count} memories for user {self.user_id}")
+        return count
+
     async def clear_short_term(self) -> int:
         """Clear short-term memory cache.
 
@@ -545,47 +647,14 @@ class AgentMemorySystem:
         logger.debug("Auto-consolidating short-term memories")
         await self.consolidate()
 
-    async def _find_duplicate(self, content_hash: str) -> Optional[Memory]:
-        """Find a memory with the same content hash.
-
-        Args:
-            content_hash: Hash of the content to find
-
-        Returns:
-            Existing Memory if found, None otherwise
-        """
-        # Check recent memories for duplicates
-        results = await self.store.search(
-            user_id=self.user_id,
-            query="",
-            limit=20,
-            min_importance=0.0
-        )
-
-        for result in results:
-            if self._hash_content(result.memory.content) == content_hash:
-                return result.memory
-
-        return None
-
-    def _hash_content(self, content: str) -> str:
-        """Generate a hash for content comparison.
-
-        Args:
-            content: Content to hash
-
-        Returns:
-            SHA256 hash of normalized content
-        """
-        normalized = content.lower().strip()
-        return hashlib.sha256(normalized.encode()).hexdigest()[:16]
-
 
 # Factory function for easy instantiation
 async def create_agent_memory(
     user_id: str,
     db,
-    initialize_indexes: bool = False
+    initialize_indexes: bool = False,
+    embedding_service: Optional[EmbeddingService] = None,
+    vector_index: Optional[MemoryVectorIndex] = None
 ) -> AgentMemorySystem:
     """Create an AgentMemorySystem instance.
 
@@ -594,14 +663,27 @@ async def create_agent_memory(
     Args:
         user_id: User identifier
         db: MongoDB database instance
-        initialize_indexes: Whether to create indexes (first run only)
+        initialize_indexes: Whether to create indexes and backfill content
+            hashes (first run only)
+        embedding_service: Enables vector recall with an index owned by
+            the returned system
+        vector_index: Shared index, created once per process, so user
+            partitions stay loaded across requests (takes precedence over
+            embedding_service)
 
     Returns:
         Configured AgentMemorySystem instance
     """
     store = MemoryStore(db)
 
+    if vector_index is None and embedding_service is not None:
+        vector_index = MemoryVectorIndex(db, embedding_service)
+
     if initialize_indexes:
         await store.initialize_indexes()
+        await store.backfill_content_hashes()
+        if vector_index is not None:
+            await vector_index.initialize_indexes()
+
+    return AgentMemorySystem(user_id=user_id, store=store, vector_index=vector_index)
 
-    return AgentMemorySystem(user_id=user_id, store=store)
@@ -0,0 +1,315 @@
+"""
+Memory Vector Index - Embedding-based recall for agent memories.
+
+Keeps a local, per-user partitioned vector index of memory embeddings:
+- Embeddings are generated with the shared EmbeddingService on write
+- Vectors are persisted in MongoDB so any worker can rebuild a partition
+- Partitions are loaded lazily and evicted LRU to bound process memory
+- A per-user version, bumped on every write, makes other workers reload
+  a resident partition once it is stale
+- Search is a single matrix-vector product over the user's partition
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+from ..rag.embeddings import EmbeddingService
+from .memory_types import Memory
+
+logger = logging.getLogger(__name__)
+
+
+class _UserPartition:
+    """Normalized embedding matrix for a single user's memories."""
+
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, dimension: int, version: int = 0):
+        self.dimension = dimension
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.matrix = np.zeros((self.INITIAL_CAPACITY, dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def add(self, memory_id: str, vector: List[float]) -> None:
+        vec = self._normalize(vector)
+        if memory_id in self.positions:
+            self.matrix[self.positions[memory_id]] = vec
+            return
+
+        if len(self.ids) == self.matrix.shape[0]:
+            grown = np.zeros((self.matrix.shape[0] * 2, self.dimension), dtype=np.float32)
+            grown[:len(self.ids)] = self.matrix[:len(self.ids)]
+            self.matrix = grown
+
+        self.positions[memory_id] = len(self.ids)
+        self.matrix[len(self.ids)] = vec
+        self.ids.append(memory_id)
+
+    def remove(self, memory_id: str) -> None:
+        """Remove by swapping the last row into the freed slot."""
+        position = self.positions.pop(memory_id, None)
+        if position is None:
+            return
+
+        last = len(self.ids) - 1
+        if position != last:
+            moved_id = self.ids[last]
+            self.matrix[position] = self.matrix[last]
+            self.ids[position] = moved_id
+            self.positions[moved_id] = position
+        self.ids.pop()
+
+    def search(self, query: List[float], top_k: int) -> List[Tuple[str, float]]:
+        count = len(self.ids)
+        if not count:
+            return []
+
+        scores = self.matrix[:count] @ self._normalize(query)
+        top_k = min(top_k, count)
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
+class MemoryVectorIndex:
+    """Per-user vector index of memory embeddings.
+
+    Example:
+        index = MemoryVectorIndex(db, embedding_service)
+        await index.initialize_indexes()
+
+        await index.index_memory(memory)
+        hits = await index.search("user_123", "typescript preferences", top_k=20)
+    """
+
+    COLLECTION_NAME = "agent_memory_embeddings"
+    VERSIONS_COLLECTION_NAME = "agent_memory_index_versions"
+
+    # Seconds a resident partition is served before its version is re-checked
+    VERSION_CHECK_INTERVAL = 5.0
+
+    # Maximum user partitions kept in process memory
+    MAX_PARTITIONS = 256
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        embedding_service: EmbeddingService,
+        max_partitions: int = MAX_PARTITIONS,
+        version_check_interval: float = VERSION_CHECK_INTERVAL
+    ):
+        """Initialize the memory vector index.
+
+        Args:
+            db: Motor async MongoDB database instance
+            embedding_service: Service used to embed memories and queries
+            max_partitions: Maximum number of user partitions held in memory
+            version_check_interval: Seconds between staleness checks of a
+                resident partition (bounds how long other workers' writes
+                stay invisible)
+        """
+        self.collection = db[self.COLLECTION_NAME]
+        self.versions = db[self.VERSIONS_COLLECTION_NAME]
+        self.version_check_interval = version_check_interval
+        self.embeddings = embedding_service
+        self.max_partitions = max_partitions
+        self._partitions: "OrderedDict[str, _UserPartition]" = OrderedDict()
+
+    async def initialize_indexes(self) -> None:
+        """Create indexes for partition loading and lookups."""
+        await self.collection.create_index("memory_id", name="memory_id_idx", unique=True)
+        await self.collection.create_index("user_id", name="user_idx")
+        await self.versions.create_index("user_id", name="user_idx", unique=True)
+
+    async def _current_version(self, user_id: str) -> int:
+        doc = await self.versions.find_one({"user_id": user_id}, projection={"_id": 0, "version": 1})
+        return doc["version"] if doc else 0
+
+    async def _bump_version(self, user_id: str) -> int:
+        doc = await self.versions.find_one_and_update(
+            {"user_id": user_id},
+            {"$inc": {"version": 1}},
+            projection={"_id": 0, "version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["version"]
+
+    async def _after_write(self, user_id: str) -> Optional[_UserPartition]:
+        """Bump the user's version after a write.
+
+        Returns the resident partition if it was current before the write
+        (so the caller applies the write to it), otherwise drops it to be
+        reloaded on next use.
+        """
+        version = await self._bump_version(user_id)
+        partition = self._partitions.get(user_id)
+        if partition is None:
+            return None
+        if partition.version != version - 1:
+            self._partitions.pop(user_id, None)
+            return None
+        partition.version = version
+        return partition
+
+    async def _get_partition(self, user_id: str) -> Optional[_UserPartition]:
+        """Return the user's partition, loading it from MongoDB if needed.
+
+        A resident partition is re-checked against the user's version every
+        `version_check_interval` seconds and reloaded when another worker
+        has written since it was loaded.
+        """
+        partition = self._partitions.get(user_id)
+        if partition is not None:
+            self._partitions.move_to_end(user_id)
+            now = time.monotonic()
+            if now - partition.checked_at < self.version_check_interval:
+                return partition
+            if await self._current_version(user_id) == partition.version:
+                partition.checked_at = now
+                return partition
+            self._partitions.pop(user_id, None)
+            partition = None
+
+        # Read the version first: a write racing the load only makes the
+        # partition look stale, never current
+        version = await self._current_version(user_id)
+        cursor = self.collection.find(
+            {"user_id": user_id},
+            projection={"_id": 0, "memory_id": 1, "embedding": 1}
+        )
+        async for doc in cursor:
+            if partition is None:
+                partition = _UserPartition(len(doc["embedding"]), version)
+            partition.add(doc["memory_id"], doc["embedding"])
+
+        if partition is None:
+            return None
+
+        self._partitions[user_id] = partition
+        while len(self._partitions) > self.max_partitions:
+            self._partitions.popitem(last=False)
+
+        logger.debug(f"Loaded {len(partition)} memory vectors for user {user_id}")
+        return partition
+
+    async def index_memory(self, memory: Memory) -> None:
+        """Embed a memory and add it to the index.
+
+        Args:
+            memory: The Memory to index
+        """
+        await self.index_memories([memory])
+
+    async def index_memories(self, memories: List[Memory]) -> int:
+        """Embed several memories in one batch and add them to the index.
+
+        Args:
+            memories: Memories to index
+
+        Returns:
+            Number of memories indexed
+        """
+        if not memories:
+            return 0
+
+        vectors = await self.embeddings.embed_batch([m.content for m in memories])
+        now = datetime.now(timezone.utc)
+
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"memory_id": memory.id},
+                {"$set": {
+                    "memory_id": memory.id,
+                    "user_id": memory.user_id,
+                    "embedding": vector,
+                    "model": self.embeddings.model,
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+            for memory, vector in zip(memories, vectors)
+        ], ordered=False)
+
+        # Only update partitions that are already resident and current;
+        # others pick up the new vectors when they are (re)loaded.
+        by_user: Dict[str, List[Tuple[Memory, List[float]]]] = {}
+        for memory, vector in zip(memories, vectors):
+            by_user.setdefault(memory.user_id, []).append((memory, vector))
+        for user_id, items in by_user.items():
+            partition = await self._after_write(user_id)
+            if partition is not None:
+                for memory, vector in items:
+                    partition.add(memory.id, vector)
+
+        return len(memories)
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        top_k: int = 20
+    ) -> List[Tuple[str, float]]:
+        """Find the memories most similar to a query.
+
+        Args:
+            user_id: User whose partition is searched
+            query: Natural-language query
+            top_k: Maximum candidates to return
+
+        Returns:
+            List of (memory_id, cosine_similarity), best first
+        """
+        partition = await self._get_partition(user_id)
+        if partition is None:
+            return []
+
+        query_vector = await self.embeddings.embed_text(query)
+        return partition.search(query_vector, top_k)
+
+    async def remove(self, user_id: str, memory_ids: List[str]) -> None:
+        """Drop memories from the index and its persisted vectors.
+
+        Args:
+            user_id: Owner of the memories
+            memory_ids: IDs of the memories to remove
+        """
+        if not memory_ids:
+            return
+
+        await self.collection.delete_many({"memory_id": {"$in": memory_ids}})
+
+        partition = await self._after_write(user_id)
+        if partition is not None:
+            for memory_id in memory_ids:
+                partition.remove(memory_id)
+
+    async def indexed_ids(self, user_id: str) -> List[str]:
+        """IDs of the user's memories that already have a vector."""
+        partition = await self._get_partition(user_id)
+        return list(partition.ids) if partition is not None else []
+
+    def get_stats(self) -> Dict[str, int]:
+        """Resident partition statistics."""
+        return {
+            "partitions": len(self._partitions),
+            "vectors": sum(len(p) for p in self._partitions.values()),
+        }
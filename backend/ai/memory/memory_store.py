@@ -11,15 +11,17 @@ Provides CRUD operations and advanced querying for the memory system:
 
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
-import re
+from pymongo import UpdateOne, UpdateMany, DeleteMany, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 from .memory_types import (
     Memory,
     MemoryType,
     MemorySearchResult,
     MemoryConsolidationResult,
+    compute_content_hash,
 )
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,7 @@ class MemoryStore:
     """MongoDB-based memory store for agent memories.
 
     Provides persistent storage with:
-    - Text-based search (with optional vector search via embeddings)
+    - Text-based search (vector search lives in MemoryVectorIndex)
     - Memory consolidation algorithms
     - Automatic cleanup of expired/low-importance memories
     - User-isolated namespaces
@@ -45,6 +47,9 @@ class MemoryStore:
 
     COLLECTION_NAME = "agent_memories"
 
+    # Batch size for backfilling content hashes on legacy documents
+    BACKFILL_BATCH_SIZE = 500
+
     def __init__(self, db: AsyncIOMotorDatabase):
         """Initialize the memory store.
 
@@ -92,6 +97,15 @@ class MemoryStore:
                 name="user_last_accessed_idx"
             )
 
+            # Content hash for O(1) deduplication on write. Partial so that
+            # legacy documents without a hash don't collide on null.
+            await self.collection.create_index(
+                [("user_id", 1), ("content_hash", 1)],
+                name="user_content_hash_idx",
+                unique=True,
+                partialFilterExpression={"content_hash": {"$type": "string"}}
+            )
+
             logger.info("Memory store indexes created successfully")
 
         except Exception as e:
@@ -120,6 +134,62 @@ class MemoryStore:
             logger.error(f"Failed to store memory: {e}")
             raise
 
+    async def upsert(self, memory: Memory, boost: float = 0.1) -> Tuple[str, bool]:
+        """Insert a memory or reinforce the existing one with the same content.
+
+        Runs as a single round trip against the (user_id, content_hash)
+        unique index: a new document is created from ``memory``, or the
+        existing duplicate gets its importance boosted.
+
+        Args:
+            memory: The Memory object to store
+            boost: Importance added to an existing duplicate
+
+        Returns:
+            Tuple of (memory_id, created)
+        """
+        doc = memory.to_mongo_dict()
+        is_new = {"$eq": [{"$ifNull": ["$id", None]}, None]}
+
+        fields = {
+            key: {"$cond": [is_new, {"$literal": value}, f"${key}"]}
+            for key, value in doc.items()
+            if key not in ("user_id", "content_hash", "importance")
+        }
+        fields["importance"] = {
+            "$cond": [
+                is_new,
+                memory.importance,
+                {"$min": [1.0, {"$add": ["$importance", boost]}]}
+            ]
+        }
+
+        query = {"user_id": memory.user_id, "content_hash": memory.content_hash}
+        update = [{"$set": fields}]
+
+        try:
+            result = await self.collection.find_one_and_update(
+                query, update, upsert=True,
+                projection={"_id": 0, "id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent upsert of the same content won the race; retrying
+            # matches the document it inserted.
+            result = await self.collection.find_one_and_update(
+                query, update, upsert=True,
+                projection={"_id": 0, "id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+
+        memory_id = result["id"]
+        created = memory_id == memory.id
+        logger.debug(
+            f"{'Stored' if created else 'Reinforced'} memory {memory_id} "
+            f"for user {memory.user_id}"
+        )
+        return memory_id, created
+
     async def get(self, memory_id: str) -> Optional[Memory]:
         """Retrieve a memory by ID.
 
@@ -154,16 +224,67 @@ class MemoryStore:
         """
         try:
             doc = memory.to_mongo_dict()
+            # The hash is only rewritten when the content changed: legacy
+            # duplicates left unhashed by the backfill get one computed on
+            # load and would otherwise collide on user_content_hash_idx.
+            doc.pop("content_hash")
+            content_hash = compute_content_hash(memory.content)
             result = await self.collection.update_one(
                 {"id": memory.id},
                 {"$set": doc}
             )
+            if result.modified_count:
+                try:
+                    await self.collection.update_one(
+                        {
+                            "id": memory.id,
+                            "content_hash": {"$type": "string", "$ne": content_hash}
+                        },
+                        {"$set": {"content_hash": content_hash}}
+                    )
+                except DuplicateKeyError:
+                    # New content duplicates another memory of the user;
+                    # keep it as an unhashed duplicate like the backfill does.
+                    await self.collection.update_one(
+                        {"id": memory.id},
+                        {"$unset": {"content_hash": ""}}
+                    )
             return result.modified_count > 0
 
         except Exception as e:
             logger.error(f"Failed to update memory {memory.id}: {e}")
             return False
 
+    async def boost_many(self, memory_ids: List[str], boost: float = 0.05) -> int:
+        """Boost importance of several memories in a single update.
+
+        Args:
+            memory_ids: IDs of the memories to reinforce
+            boost: Amount to add to importance (capped at 1.0)
+
+        Returns:
+            Number of memories updated
+        """
+        if not memory_ids:
+            return 0
+
+        try:
+            result = await self.collection.update_many(
+                {"id": {"$in": memory_ids}},
+                [
+                    {
+                        "$set": {
+                            "importance": {"$min": [1.0, {"$add": ["$importance", boost]}]}
+                        }
+                    }
+                ]
+            )
+            return result.modified_count
+
+        except Exception as e:
+            logger.error(f"Failed to boost memories: {e}")
+            return 0
+
     async def delete(self, memory_id: str) -> bool:
         """Delete a memory by ID.
 
@@ -261,61 +382,57 @@ class MemoryStore:
                         relevance_score=memory.importance
                     ))
 
-            # Fallback to regex search if text search returns no results
-            if not results and query and query.strip():
-                results = await self._regex_search(
-                    user_id, query, filter_query, limit
-                )
-
             return results
 
         except Exception as e:
             logger.error(f"Memory search failed: {e}")
-            # Fallback to simple regex search
-            return await self._regex_search(user_id, query, {"user_id": user_id}, limit)
+            return []
 
-    async def _regex_search(
+    async def get_many(
         self,
         user_id: str,
-        query: str,
-        base_filter: Dict[str, Any],
-        limit: int
-    ) -> List[MemorySearchResult]:
-        """Fallback regex-based search when text index is unavailable.
+        memory_ids: List[str],
+        memory_types: Optional[List[MemoryType]] = None,
+        min_importance: float = 0.0,
+        include_expired: bool = False
+    ) -> List[Memory]:
+        """Fetch several memories by ID with the usual recall filters.
 
         Args:
-            user_id: User ID to scope search
-            query: Search query
-            base_filter: Base filter to apply
-            limit: Maximum results
+            user_id: User ID to scope the lookup
+            memory_ids: IDs of the memories to fetch
+            memory_types: Optional filter by memory types
+            min_importance: Minimum importance threshold
+            include_expired: Whether to include expired memories
 
         Returns:
-            List of search results
+            List of Memory objects (order not guaranteed)
         """
-        try:
-            # Build case-insensitive regex pattern
-            pattern = re.escape(query)
-            regex_filter = {
-                **base_filter,
-                "content": {"$regex": pattern, "$options": "i"}
-            }
+        if not memory_ids:
+            return []
 
-            results: List[MemorySearchResult] = []
-            cursor = self.collection.find(regex_filter)
-            cursor = cursor.sort([("importance", -1)])
-            cursor = cursor.limit(limit)
+        filter_query: Dict[str, Any] = {"user_id": user_id, "id": {"$in": memory_ids}}
 
-            async for doc in cursor:
-                memory = Memory.from_mongo_dict(doc)
-                results.append(MemorySearchResult(
-                    memory=memory,
-                    relevance_score=memory.importance
-                ))
+        if memory_types:
+            filter_query["memory_type"] = {"$in": [t.value for t in memory_types]}
 
-            return results
+        if min_importance > 0:
+            filter_query["importance"] = {"$gte": min_importance}
+
+        if not include_expired:
+            filter_query["$or"] = [
+                {"expires_at": None},
+                {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+            ]
+
+        try:
+            return [
+                Memory.from_mongo_dict(doc)
+                async for doc in self.collection.find(filter_query)
+            ]
 
         except Exception as e:
-            logger.error(f"Regex search failed: {e}")
+            logger.error(f"Failed to fetch memories: {e}")
             return []
 
     async def get_by_type(
@@ -352,7 +469,11 @@ class MemoryStore:
             logger.error(f"Failed to get memories by type: {e}")
             return []
 
-    async def consolidate(self, user_id: str) -> MemoryConsolidationResult:
+    async def consolidate(
+        self,
+        user_id: str,
+        limit: int = 100
+    ) -> MemoryConsolidationResult:
         """Consolidate short-term memories into long-term storage.
 
         This process:
@@ -360,8 +481,12 @@ class MemoryStore:
         2. Promotes them to long-term storage
         3. Removes or archives low-importance short-term memories
 
+        Candidates are read with a narrow projection and all promotions and
+        discards are applied in a single ``bulk_write``.
+
         Args:
             user_id: User ID to consolidate memories for
+            limit: Maximum short-term memories considered per run
 
         Returns:
             MemoryConsolidationResult with statistics
@@ -369,27 +494,51 @@ class MemoryStore:
         result = MemoryConsolidationResult()
 
         try:
-            # Get all short-term memories for user
-            short_term_memories = await self.get_by_type(
-                user_id, MemoryType.SHORT_TERM, limit=100
+            now = datetime.now(timezone.utc)
+            discard_before = now - timedelta(hours=24)
+            short_term = MemoryType.SHORT_TERM.value
+
+            cursor = self.collection.find(
+                {"user_id": user_id, "memory_type": short_term},
+                projection={"_id": 0, "id": 1, "importance": 1,
+                            "access_count": 1, "created_at": 1}
             )
+            cursor = cursor.sort([("importance", -1)]).limit(limit)
+
+            promote_ids: List[str] = []
+            discard_ids: List[str] = []
+
+            async for doc in cursor:
+                importance = doc.get("importance", 0.0)
+                created_at = doc.get("created_at")
+                if created_at is not None and created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
 
-            for memory in short_term_memories:
                 # High importance or frequently accessed -> promote to long-term
-                if memory.importance >= 0.7 or memory.access_count >= 3:
-                    memory.memory_type = MemoryType.LONG_TERM
-                    memory.expires_at = None  # Remove expiration
-                    await self.update(memory)
-                    result.consolidated_count += 1
-                    result.new_long_term_memories.append(memory.id)
+                if importance >= 0.7 or doc.get("access_count", 0) >= 3:
+                    promote_ids.append(doc["id"])
 
                 # Low importance and old -> discard
-                elif memory.importance < 0.3:
-                    age = datetime.now(timezone.utc) - memory.created_at
-                    if age > timedelta(hours=24):
-                        await self.delete(memory.id)
-                        result.discarded_count += 1
-                        result.discarded_memory_ids.append(memory.id)
+                elif importance < 0.3 and created_at is not None and created_at < discard_before:
+                    discard_ids.append(doc["id"])
+
+            operations = []
+            if promote_ids:
+                operations.append(UpdateMany(
+                    {"id": {"$in": promote_ids}, "memory_type": short_term},
+                    {"$set": {"memory_type": MemoryType.LONG_TERM.value, "expires_at": None}}
+                ))
+            if discard_ids:
+                operations.append(DeleteMany(
+                    {"id": {"$in": discard_ids}, "memory_type": short_term}
+                ))
+
+            if operations:
+                bulk = await self.collection.bulk_write(operations, ordered=False)
+                result.consolidated_count = bulk.modified_count
+                result.discarded_count = bulk.deleted_count
+                result.new_long_term_memories = promote_ids
+                result.discarded_memory_ids = discard_ids
 
             logger.info(
                 f"Consolidated memories for user {user_id}: "
@@ -491,6 +640,128 @@ class MemoryStore:
             logger.error(f"Decay operation failed: {e}")
             return 0
 
+    async def cleanup(
+        self,
+        user_id: str,
+        forget_threshold: float = 0.2,
+        age_days: int = 30,
+        apply_decay: bool = True,
+        decay_factor: float = 0.95,
+        min_importance: float = 0.1
+    ) -> Dict[str, Any]:
+        """Apply decay, then forget low-importance memories.
+
+        Equivalent to :meth:`apply_decay` followed by :meth:`forget`. Decay
+        runs server-side in one update; the memories to forget are read with
+        an ids-only projection and deleted by id, so callers can drop them
+        from derived indexes too.
+
+        Args:
+            user_id: User ID
+            forget_threshold: Maximum importance to forget
+            age_days: Minimum age in days before forgetting
+            apply_decay: Whether to apply importance decay first
+            decay_factor: Multiplier for importance (0.95 = 5% decay)
+            min_importance: Minimum importance floor for decay
+
+        Returns:
+            Dictionary with "decayed" and "forgotten" counts and the
+            "forgotten_ids" that were deleted
+        """
+        now = datetime.now(timezone.utc)
+        stats: Dict[str, Any] = {"decayed": 0, "forgotten": 0, "forgotten_ids": []}
+
+        try:
+            if apply_decay:
+                result = await self.collection.update_many(
+                    {
+                        "user_id": user_id,
+                        "last_accessed": {"$lt": now - timedelta(days=7)},
+                        "importance": {"$gt": min_importance}
+                    },
+                    [
+                        {
+                            "$set": {
+                                "importance": {
+                                    "$max": [
+                                        min_importance,
+                                        {"$multiply": ["$importance", decay_factor]}
+                                    ]
+                                }
+                            }
+                        }
+                    ]
+                )
+                stats["decayed"] = result.modified_count
+
+            forget_query = {
+                "user_id": user_id,
+                "importance": {"$lt": forget_threshold},
+                "created_at": {"$lt": now - timedelta(days=age_days)},
+                "memory_type": {"$ne": MemoryType.LONG_TERM.value}  # Never forget long-term
+            }
+            cursor = self.collection.find(forget_query, projection={"_id": 0, "id": 1})
+            forget_ids = [doc["id"] async for doc in cursor]
+
+            if forget_ids:
+                result = await self.collection.delete_many(
+                    {**forget_query, "id": {"$in": forget_ids}}
+                )
+                stats["forgotten"] = result.deleted_count
+                stats["forgotten_ids"] = forget_ids
+
+            logger.info(
+                f"Cleaned up memories for user {user_id}: "
+                f"{stats['decayed']} decayed, {stats['forgotten']} forgotten"
+            )
+            return stats
+
+        except Exception as e:
+            logger.error(f"Cleanup operation failed: {e}")
+            return stats
+
+    async def backfill_content_hashes(self, batch_size: Optional[int] = None) -> int:
+        """Compute content_hash for documents written before it existed.
+
+        Duplicates among legacy documents are left without a hash (the
+        unique index rejects them) and keep working as plain memories.
+
+        Args:
+            batch_size: Documents updated per ``bulk_write`` batch
+
+        Returns:
+            Number of documents updated
+        """
+        batch_size = batch_size or self.BACKFILL_BATCH_SIZE
+        updated = 0
+        batch = []
+
+        async def flush() -> int:
+            try:
+                result = await self.collection.bulk_write(batch, ordered=False)
+                return result.modified_count
+            except BulkWriteError as e:
+                return e.details.get("nModified", 0)
+
+        cursor = self.collection.find(
+            {"content_hash": {"$exists": False}},
+            projection={"_id": 1, "content": 1}
+        )
+        async for doc in cursor:
+            batch.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"content_hash": compute_content_hash(doc.get("content", ""))}}
+            ))
+            if len(batch) >= batch_size:
+                updated += await flush()
+                batch = []
+
+        if batch:
+            updated += await flush()
+
+        logger.info(f"Backfilled content hash on {updated} memories")
+        return updated
+
     async def get_stats(self, user_id: str) -> Dict[str, Any]:
         """Get memory statistics for a user.
 
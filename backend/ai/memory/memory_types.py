@@ -8,12 +8,26 @@ Defines the core data structures:
 """
 
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
+import hashlib
 import uuid
 
 
+def compute_content_hash(content: str) -> str:
+    """Hash of normalized memory content used for deduplication.
+
+    Args:
+        content: Memory content
+
+    Returns:
+        SHA256 hex digest of the lowercased, stripped content
+    """
+    normalized = content.lower().strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
 class MemoryType(str, Enum):
     """Types of memory in the agent memory system.
 
@@ -97,9 +111,19 @@ class Memory(BaseModel):
     # Tags for categorization and filtering
     tags: List[str] = Field(default_factory=list)
 
+    # Hash of normalized content, unique per user (see MemoryStore.upsert)
+    content_hash: Optional[str] = None
+
     class Config:
         use_enum_values = True
 
+    @model_validator(mode="after")
+    def _fill_content_hash(self) -> "Memory":
+        """Derive content_hash for new memories and legacy documents."""
+        if not self.content_hash:
+            self.content_hash = compute_content_hash(self.content)
+        return self
+
     def to_mongo_dict(self) -> Dict[str, Any]:
         """Convert to MongoDB-compatible dictionary.
 
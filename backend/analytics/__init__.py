@@ -5,12 +5,15 @@ PostHog integration and custom metrics tracking
 """
 
 from .posthog_client import PostHogClient, get_posthog_client
+from .ingestion import AnalyticsIngestionBuffer, OverflowPolicy
 from .metrics_service import MetricsService, get_metrics_service
 from .events import EventType, track_event
 
 __all__ = [
     'PostHogClient',
     'get_posthog_client',
+    'AnalyticsIngestionBuffer',
+    'OverflowPolicy',
     'MetricsService',
     'get_metrics_service',
     'EventType',
@@ -0,0 +1,336 @@
+"""
+Analytics Ingestion Buffer
+==========================
+Batched, bounded ingestion of analytics events into PostgreSQL.
+
+Events are appended to an in-process buffer and written with COPY in
+batches, either when a batch fills up or after a flush interval. When the
+database falls behind, the buffer applies backpressure by dropping the
+oldest events or by sampling new ones, so memory stays bounded and the
+connection pool is never flooded.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from datetime import date, datetime
+from enum import Enum
+from typing import Optional, Dict, Any, List, Tuple
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    _EVENTS_RECEIVED = Counter(
+        'devora_analytics_events_received_total', 'Analytics events submitted for local backup'
+    )
+    _EVENTS_WRITTEN = Counter(
+        'devora_analytics_events_written_total', 'Analytics events written to PostgreSQL'
+    )
+    _EVENTS_DROPPED = Counter(
+        'devora_analytics_events_dropped_total', 'Analytics events dropped by backpressure',
+        ['reason']
+    )
+    _BATCH_SIZE = Gauge(
+        'devora_analytics_last_batch_size', 'Size of the last analytics batch written'
+    )
+    _BUFFER_SIZE = Gauge(
+        'devora_analytics_buffer_size', 'Analytics events waiting in the ingestion buffer'
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when the buffer is under pressure"""
+    DROP_OLDEST = "drop_oldest"  # Keep the newest events, evict the oldest
+    SAMPLE = "sample"            # Probabilistically admit new events above the high-water mark
+
+
+EVENT_COLUMNS = [
+    'user_id', 'event_name', 'event_properties',
+    'session_id', 'ip_address', 'user_agent', 'timestamp', 'created_date'
+]
+
+EventRecord = Tuple[
+    Optional[str], str, str, Optional[str], Optional[str], Optional[str], datetime, date
+]
+
+
+class AnalyticsIngestionBuffer:
+    """
+    Bounded buffer that batches analytics events into `analytics_events`
+
+    Features:
+    - Non-blocking submit from synchronous code paths
+    - COPY-based batch writes triggered by size or interval
+    - Drop-oldest or sampling backpressure when the database is slow
+    - Bad rows isolated by bisection instead of failing whole batches
+    - Clean drain on shutdown
+    - Ingest rate, batch size and drop counters
+    """
+
+    def __init__(
+        self,
+        db_pool: asyncpg.Pool,
+        table: str = 'analytics_events',
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        max_buffer: int = 20000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        high_watermark: float = 0.5,
+        max_backoff: float = 30.0
+    ):
+        self.db_pool = db_pool
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.high_watermark = int(max_buffer * high_watermark)
+        self.max_backoff = max_backoff
+
+        self._buffer: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._backoff = 0.0
+
+        self._stats = {
+            'received': 0,
+            'written': 0,
+            'dropped_overflow': 0,
+            'dropped_sampled': 0,
+            'rejected': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'last_batch_size': 0,
+        }
+        self._rate = 0.0
+        self._rate_mark: Tuple[float, int] = (time.monotonic(), 0)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        user_id: Optional[str],
+        event_name: str,
+        properties: Dict[str, Any],
+        session_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        timestamp: Optional[datetime] = None
+    ) -> bool:
+        """
+        Queue an event for the next batch (never blocks)
+
+        Returns:
+            bool: False if the event was rejected by backpressure
+        """
+        self._stats['received'] += 1
+        if PROMETHEUS_AVAILABLE:
+            _EVENTS_RECEIVED.inc()
+
+        if not self._admit():
+            return False
+
+        timestamp = timestamp or datetime.utcnow()
+        self._buffer.append((
+            user_id,
+            event_name,
+            json.dumps(properties, default=str),
+            session_id,
+            ip_address,
+            user_agent,
+            timestamp,
+            # Partition key follows the event time, not the insert time
+            timestamp.date()
+        ))
+
+        self._ensure_started()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _admit(self) -> bool:
+        """Apply the overflow policy before appending a new event"""
+        size = len(self._buffer)
+
+        if self.overflow_policy == OverflowPolicy.SAMPLE:
+            if size >= self.max_buffer:
+                self._record_drop('dropped_sampled')
+                return False
+            if size > self.high_watermark:
+                headroom = self.max_buffer - self.high_watermark
+                keep_probability = (self.max_buffer - size) / headroom
+                if random.random() > keep_probability:
+                    self._record_drop('dropped_sampled')
+                    return False
+            return True
+
+        if size >= self.max_buffer:
+            self._buffer.popleft()
+            self._record_drop('dropped_overflow')
+        return True
+
+    def _record_drop(self, reason: str, count: int = 1):
+        self._stats[reason] += count
+        if PROMETHEUS_AVAILABLE:
+            _EVENTS_DROPPED.labels(reason=reason).inc(count)
+
+    def _ensure_started(self):
+        if self._task is not None or self._stopping:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop yet; events stay buffered until start()
+            return
+        self._task = loop.create_task(self._run())
+
+    def start(self):
+        """Start the background flusher on the running loop"""
+        self._stopping = False
+        self._ensure_started()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if self._stopping:
+                break
+
+            if not await self.flush():
+                # Database unavailable: back off, keep buffering
+                self._backoff = min(max(self._backoff * 2, self.flush_interval), self.max_backoff)
+                await asyncio.sleep(self._backoff)
+            else:
+                self._backoff = 0.0
+
+            self._update_rate()
+
+    async def flush(self) -> bool:
+        """
+        Write everything currently buffered
+
+        Returns:
+            bool: False if a batch could not be written (it is re-queued)
+        """
+        while self._buffer:
+            batch = self._take_batch()
+            try:
+                written = await self._write(batch)
+            except Exception as e:
+                self._stats['failed_batches'] += 1
+                self._requeue(batch)
+                logger.error(f"Failed to write analytics batch of {len(batch)} events: {e}")
+                return False
+
+            self._stats['batches'] += 1
+            self._stats['written'] += written
+            self._stats['last_batch_size'] = len(batch)
+            if PROMETHEUS_AVAILABLE:
+                _EVENTS_WRITTEN.inc(written)
+                _BATCH_SIZE.set(len(batch))
+                _BUFFER_SIZE.set(len(self._buffer))
+
+        return True
+
+    def _take_batch(self) -> List[EventRecord]:
+        count = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    def _requeue(self, batch: List[EventRecord]):
+        """Put a failed batch back at the front, within capacity"""
+        room = self.max_buffer - len(self._buffer)
+        if room < len(batch):
+            # Newer events win; the oldest part of the failed batch goes
+            self._record_drop('dropped_overflow', len(batch) - max(room, 0))
+            batch = batch[len(batch) - max(room, 0):]
+        self._buffer.extendleft(reversed(batch))
+
+    async def _write(self, batch: List[EventRecord]) -> int:
+        """COPY a batch, bisecting to isolate rows the database rejects"""
+        if not batch:
+            return 0
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    self.table, records=batch, columns=EVENT_COLUMNS
+                )
+            return len(batch)
+
+        except (asyncpg.exceptions.DataError,
+                asyncpg.exceptions.IntegrityConstraintViolationError) as e:
+            if len(batch) == 1:
+                self._stats['rejected'] += 1
+                logger.warning(f"Rejected analytics event '{batch[0][1]}': {e}")
+                return 0
+            mid = len(batch) // 2
+            return await self._write(batch[:mid]) + await self._write(batch[mid:])
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the flusher and drain the buffer"""
+        self._stopping = True
+        self._wakeup.set()
+
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            self._task = None
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Analytics drain timed out, {len(self._buffer)} events lost")
+
+        if self._buffer:
+            self._record_drop('dropped_overflow', len(self._buffer))
+            self._buffer.clear()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _update_rate(self):
+        """Exponentially smoothed ingest rate (events/second)"""
+        now = time.monotonic()
+        last_time, last_received = self._rate_mark
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+        instant = (self._stats['received'] - last_received) / elapsed
+        self._rate = instant if self._rate == 0 else 0.8 * self._rate + 0.2 * instant
+        self._rate_mark = (now, self._stats['received'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters for dashboards and health checks"""
+        batches = self._stats['batches']
+        return {
+            **self._stats,
+            'buffer_size': len(self._buffer),
+            'max_buffer': self.max_buffer,
+            'overflow_policy': self.overflow_policy.value,
+            'ingest_rate_per_sec': round(self._rate, 2),
+            'avg_batch_size': round(self._stats['written'] / batches, 1) if batches else 0,
+        }
@@ -4,6 +4,7 @@ Metrics Service
 Business metrics calculation and reporting service
 """
 
+import asyncio
 import asyncpg
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta, date
@@ -93,14 +94,33 @@ class MetricsService:
     Service for calculating business and product metrics
 
     Features:
-    - Real-time metric calculation
-    - Caching for expensive queries
-    - Historical trend analysis
+    - Dashboard reads served from rollup tables (hourly/daily/sessions)
+    - Independent queries run concurrently on separate pool connections
+    - Partition pruning on raw analytics_events via created_date
+    - Background partition management and incremental rollup refresh
     - Cohort analysis support
     """
 
     def __init__(self, db_pool: asyncpg.Pool):
         self.db_pool = db_pool
+        self._maintenance_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Query helpers - one pooled connection per query so that
+    # asyncio.gather actually runs them in parallel
+    # ------------------------------------------------------------------
+
+    async def _fetchval(self, query: str, *args) -> Any:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval(query, *args)
+
+    async def _fetchrow(self, query: str, *args) -> Optional[asyncpg.Record]:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchrow(query, *args)
+
+    async def _fetch(self, query: str, *args) -> List[asyncpg.Record]:
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetch(query, *args)
 
     async def get_user_metrics(
         self,
@@ -116,75 +136,60 @@ class MetricsService:
             UserMetrics with all user statistics
         """
         as_of_date = as_of_date or date.today()
-
-        async with self.db_pool.acquire() as conn:
-            # Total users
-            total_users = await conn.fetchval(
-                "SELECT COUNT(*) FROM users WHERE deleted_at IS NULL"
-            )
-
+        week_ago = as_of_date - timedelta(days=7)
+        month_ago = as_of_date - timedelta(days=30)
+
+        users, active, churned_month = await asyncio.gather(
+            # Total, new and 30-day-old users in a single scan
+            self._fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE deleted_at IS NULL) AS total,
+                    COUNT(*) FILTER (WHERE created_at >= $1 AND created_at < $1 + INTERVAL '1 day') AS new_today,
+                    COUNT(*) FILTER (WHERE created_at >= $2) AS new_week,
+                    COUNT(*) FILTER (WHERE created_at >= $3) AS new_month,
+                    COUNT(*) FILTER (WHERE created_at <= $3) AS before_month
+                FROM users
+            """,
+                datetime.combine(as_of_date, datetime.min.time()),
+                datetime.combine(week_ago, datetime.min.time()),
+                datetime.combine(month_ago, datetime.min.time())
+            ),
             # Active users (users who logged in or created events)
-            active_today = await conn.fetchval("""
-                SELECT COUNT(DISTINCT user_id)
-                FROM analytics_events
-                WHERE DATE(timestamp) = $1
-            """, as_of_date)
-
-            active_week = await conn.fetchval("""
-                SELECT COUNT(DISTINCT user_id)
-                FROM analytics_events
-                WHERE timestamp >= $1
-            """, datetime.combine(as_of_date - timedelta(days=7), datetime.min.time()))
-
-            active_month = await conn.fetchval("""
-                SELECT COUNT(DISTINCT user_id)
-                FROM analytics_events
-                WHERE timestamp >= $1
-            """, datetime.combine(as_of_date - timedelta(days=30), datetime.min.time()))
-
-            # New users
-            new_today = await conn.fetchval("""
-                SELECT COUNT(*) FROM users
-                WHERE DATE(created_at) = $1
-            """, as_of_date)
-
-            new_week = await conn.fetchval("""
-                SELECT COUNT(*) FROM users
-                WHERE created_at >= $1
-            """, datetime.combine(as_of_date - timedelta(days=7), datetime.min.time()))
-
-            new_month = await conn.fetchval("""
-                SELECT COUNT(*) FROM users
-                WHERE created_at >= $1
-            """, datetime.combine(as_of_date - timedelta(days=30), datetime.min.time()))
-
+            self._fetchrow("""
+                SELECT
+                    COUNT(DISTINCT user_id) FILTER (WHERE activity_date = $1) AS today,
+                    COUNT(DISTINCT user_id) FILTER (WHERE activity_date >= $2) AS week,
+                    COUNT(DISTINCT user_id) AS month
+                FROM analytics_user_activity_daily
+                WHERE activity_date >= $3 AND activity_date <= $1
+            """, as_of_date, week_ago, month_ago),
             # Churned users (canceled subscriptions this month)
-            churned_month = await conn.fetchval("""
+            self._fetchval("""
                 SELECT COUNT(DISTINCT user_id)
                 FROM analytics_events
                 WHERE event_name = 'subscription_canceled'
-                AND timestamp >= $1
-            """, datetime.combine(as_of_date - timedelta(days=30), datetime.min.time()))
-
-            # Retention rate (users who returned in last 30 days / users 30 days ago)
-            users_30d_ago = await conn.fetchval("""
-                SELECT COUNT(*) FROM users
-                WHERE created_at <= $1
-            """, datetime.combine(as_of_date - timedelta(days=30), datetime.min.time()))
-
-            retention_rate = (active_month / users_30d_ago * 100) if users_30d_ago > 0 else 0.0
-
-            return UserMetrics(
-                total_users=total_users or 0,
-                active_users_today=active_today or 0,
-                active_users_week=active_week or 0,
-                active_users_month=active_month or 0,
-                new_users_today=new_today or 0,
-                new_users_week=new_week or 0,
-                new_users_month=new_month or 0,
-                churned_users_month=churned_month or 0,
-                retention_rate_30d=round(retention_rate, 2)
-            )
+                AND created_date >= $1
+                AND timestamp >= $2
+            """, month_ago, datetime.combine(month_ago, datetime.min.time()))
+        )
+
+        active_month = active['month'] or 0
+        users_30d_ago = users['before_month'] or 0
+
+        # Retention rate (users who returned in last 30 days / users 30 days ago)
+        retention_rate = (active_month / users_30d_ago * 100) if users_30d_ago > 0 else 0.0
+
+        return UserMetrics(
+            total_users=users['total'] or 0,
+            active_users_today=active['today'] or 0,
+            active_users_week=active['week'] or 0,
+            active_users_month=active_month,
+            new_users_today=users['new_today'] or 0,
+            new_users_week=users['new_week'] or 0,
+            new_users_month=users['new_month'] or 0,
+            churned_users_month=churned_month or 0,
+            retention_rate_30d=round(retention_rate, 2)
+        )
 
     async def get_revenue_metrics(
         self,
@@ -200,230 +205,165 @@ class MetricsService:
             RevenueMetrics with all revenue statistics
         """
         as_of_date = as_of_date or date.today()
-
-        async with self.db_pool.acquire() as conn:
-            # Total revenue
-            total_revenue = await conn.fetchval("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM invoices
-                WHERE status = 'paid'
-            """) or Decimal('0')
-
-            # Revenue today
-            revenue_today = await conn.fetchval("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM invoices
-                WHERE status = 'paid'
-                AND DATE(created_at) = $1
-            """, as_of_date) or Decimal('0')
-
-            # Revenue this week
-            revenue_week = await conn.fetchval("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM invoices
-                WHERE status = 'paid'
-                AND created_at >= $1
-            """, datetime.combine(as_of_date - timedelta(days=7), datetime.min.time())) or Decimal('0')
-
-            # Revenue this month
-            first_of_month = date(as_of_date.year, as_of_date.month, 1)
-            revenue_month = await conn.fetchval("""
-                SELECT COALESCE(SUM(amount), 0)
-                FROM invoices
-                WHERE status = 'paid'
-                AND created_at >= $1
-            """, datetime.combine(first_of_month, datetime.min.time())) or Decimal('0')
-
-            # Revenue last month
-            first_of_last_month = (first_of_month - timedelta(days=1)).replace(day=1)
-            revenue_last_month = await conn.fetchval("""
-                SELECT COALESCE(SUM(amount), 0)
+        first_of_month = date(as_of_date.year, as_of_date.month, 1)
+        first_of_last_month = (first_of_month - timedelta(days=1)).replace(day=1)
+
+        revenue, subs, sub_price = await asyncio.gather(
+            self._fetchrow("""
+                SELECT
+                    COALESCE(SUM(amount), 0) AS total,
+                    COALESCE(SUM(amount) FILTER (WHERE created_at >= $1 AND created_at < $1 + INTERVAL '1 day'), 0) AS today,
+                    COALESCE(SUM(amount) FILTER (WHERE created_at >= $2), 0) AS week,
+                    COALESCE(SUM(amount) FILTER (WHERE created_at >= $3), 0) AS month,
+                    COALESCE(SUM(amount) FILTER (WHERE created_at >= $4 AND created_at < $3), 0) AS last_month
                 FROM invoices
                 WHERE status = 'paid'
-                AND created_at >= $1
-                AND created_at < $2
             """,
-                datetime.combine(first_of_last_month, datetime.min.time()),
-                datetime.combine(first_of_month, datetime.min.time())
-            ) or Decimal('0')
-
-            # MRR (Monthly Recurring Revenue)
-            # Active subscriptions * subscription price
-            active_subs = await conn.fetchval("""
-                SELECT COUNT(*)
+                datetime.combine(as_of_date, datetime.min.time()),
+                datetime.combine(as_of_date - timedelta(days=7), datetime.min.time()),
+                datetime.combine(first_of_month, datetime.min.time()),
+                datetime.combine(first_of_last_month, datetime.min.time())
+            ),
+            self._fetchrow("""
+                SELECT
+                    COUNT(*) AS total_users,
+                    COUNT(*) FILTER (WHERE subscription_status = 'active') AS active_subs
                 FROM users
-                WHERE subscription_status = 'active'
-            """) or 0
-
-            sub_price = await conn.fetchval("""
+            """),
+            self._fetchval("""
                 SELECT subscription_price
                 FROM system_config
                 WHERE id = 'system_config'
-            """) or Decimal('9.90')
-
-            mrr = Decimal(active_subs) * sub_price
-
-            # ARR (Annual Recurring Revenue)
-            arr = mrr * 12
-
-            # ARPU (Average Revenue Per User)
-            total_users = await conn.fetchval("SELECT COUNT(*) FROM users") or 1
-            arpu = total_revenue / Decimal(total_users)
-
-            # LTV (Lifetime Value) - simplified calculation
-            # LTV = ARPU * average customer lifetime (assume 12 months)
-            ltv = arpu * 12
-
-            return RevenueMetrics(
-                total_revenue=total_revenue,
-                revenue_today=revenue_today,
-                revenue_week=revenue_week,
-                revenue_month=revenue_month,
-                revenue_last_month=revenue_last_month,
-                mrr=mrr,
-                arr=arr,
-                average_revenue_per_user=round(arpu, 2),
-                lifetime_value=round(ltv, 2)
-            )
+            """)
+        )
 
-    async def get_engagement_metrics(self) -> EngagementMetrics:
-        """Calculate user engagement metrics"""
-        async with self.db_pool.acquire() as conn:
-            # Projects
-            total_projects = await conn.fetchval("""
-                SELECT COUNT(*) FROM projects WHERE deleted_at IS NULL
-            """) or 0
+        total_revenue = revenue['total'] or Decimal('0')
 
-            projects_today = await conn.fetchval("""
-                SELECT COUNT(*) FROM projects
-                WHERE DATE(created_at) = CURRENT_DATE
-            """) or 0
+        # MRR (Monthly Recurring Revenue)
+        # Active subscriptions * subscription price
+        mrr = Decimal(subs['active_subs'] or 0) * (sub_price or Decimal('9.90'))
 
-            projects_week = await conn.fetchval("""
-                SELECT COUNT(*) FROM projects
-                WHERE created_at >= NOW() - INTERVAL '7 days'
-            """) or 0
+        # ARR (Annual Recurring Revenue)
+        arr = mrr * 12
 
-            projects_month = await conn.fetchval("""
-                SELECT COUNT(*) FROM projects
-                WHERE created_at >= NOW() - INTERVAL '30 days'
-            """) or 0
+        # ARPU (Average Revenue Per User)
+        arpu = total_revenue / Decimal(subs['total_users'] or 1)
 
+        # LTV (Lifetime Value) - simplified calculation
+        # LTV = ARPU * average customer lifetime (assume 12 months)
+        ltv = arpu * 12
+
+        return RevenueMetrics(
+            total_revenue=total_revenue,
+            revenue_today=revenue['today'] or Decimal('0'),
+            revenue_week=revenue['week'] or Decimal('0'),
+            revenue_month=revenue['month'] or Decimal('0'),
+            revenue_last_month=revenue['last_month'] or Decimal('0'),
+            mrr=mrr,
+            arr=arr,
+            average_revenue_per_user=round(arpu, 2),
+            lifetime_value=round(ltv, 2)
+        )
+
+    async def get_engagement_metrics(self) -> EngagementMetrics:
+        """Calculate user engagement metrics"""
+        projects, total_conversations, messages, total_users, avg_session = await asyncio.gather(
+            # Projects
+            self._fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE deleted_at IS NULL) AS total,
+                    COUNT(*) FILTER (WHERE created_at >= CURRENT_DATE) AS today,
+                    COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '7 days') AS week,
+                    COUNT(*) FILTER (WHERE created_at >= NOW() - INTERVAL '30 days') AS month
+                FROM projects
+            """),
             # Conversations and messages
-            total_conversations = await conn.fetchval("""
+            self._fetchval("""
                 SELECT COUNT(*) FROM conversations WHERE deleted_at IS NULL
-            """) or 0
-
-            total_messages = await conn.fetchval("""
-                SELECT COUNT(*) FROM messages
-            """) or 0
-
-            avg_messages = await conn.fetchval("""
-                SELECT COALESCE(AVG(message_count), 0)
-                FROM (
-                    SELECT conversation_id, COUNT(*) as message_count
-                    FROM messages
-                    GROUP BY conversation_id
-                ) sub
-            """) or 0.0
-
-            # Average projects per user
-            total_users = await conn.fetchval("SELECT COUNT(*) FROM users") or 1
-            avg_projects = total_projects / total_users
-
-            # Average session duration (from analytics events)
-            avg_session = await conn.fetchval("""
-                SELECT COALESCE(AVG(duration_minutes), 0)
-                FROM (
-                    SELECT
-                        session_id,
-                        EXTRACT(EPOCH FROM (MAX(timestamp) - MIN(timestamp))) / 60 as duration_minutes
-                    FROM analytics_events
-                    WHERE session_id IS NOT NULL
-                    AND timestamp >= NOW() - INTERVAL '7 days'
-                    GROUP BY session_id
-                    HAVING COUNT(*) > 1
-                ) sub
-            """) or 0.0
-
-            return EngagementMetrics(
-                total_projects=total_projects,
-                projects_created_today=projects_today,
-                projects_created_week=projects_week,
-                projects_created_month=projects_month,
-                total_conversations=total_conversations,
-                total_messages=total_messages,
-                average_messages_per_conversation=round(float(avg_messages), 2),
-                average_projects_per_user=round(avg_projects, 2),
-                average_session_duration_minutes=round(float(avg_session), 2)
-            )
+            """),
+            self._fetchrow("""
+                SELECT COUNT(*) AS total, COUNT(DISTINCT conversation_id) AS conversations
+                FROM messages
+            """),
+            self._fetchval("SELECT COUNT(*) FROM users"),
+            # Average session duration (from the sessions rollup)
+            self._fetchval("""
+                SELECT COALESCE(AVG(EXTRACT(EPOCH FROM (ended_at - started_at)) / 60), 0)
+                FROM analytics_sessions
+                WHERE ended_at >= NOW() - INTERVAL '7 days'
+                AND ended_at > started_at
+            """)
+        )
+
+        total_projects = projects['total'] or 0
+        total_messages = messages['total'] or 0
+        avg_messages = (total_messages / messages['conversations']) if messages['conversations'] else 0.0
+
+        # Average projects per user
+        avg_projects = total_projects / (total_users or 1)
+
+        return EngagementMetrics(
+            total_projects=total_projects,
+            projects_created_today=projects['today'] or 0,
+            projects_created_week=projects['week'] or 0,
+            projects_created_month=projects['month'] or 0,
+            total_conversations=total_conversations or 0,
+            total_messages=total_messages,
+            average_messages_per_conversation=round(float(avg_messages), 2),
+            average_projects_per_user=round(avg_projects, 2),
+            average_session_duration_minutes=round(float(avg_session or 0.0), 2)
+        )
 
     async def get_performance_metrics(self) -> PerformanceMetrics:
         """Calculate system performance metrics"""
-        async with self.db_pool.acquire() as conn:
+        query_stats, events, api_p95 = await asyncio.gather(
             # Query performance (from pg_stat_statements)
-            avg_query_time = await conn.fetchval("""
-                SELECT COALESCE(AVG(mean_exec_time), 0)
-                FROM pg_stat_statements
-                WHERE calls > 10
-            """) or 0.0
-
-            slow_queries = await conn.fetchval("""
-                SELECT COUNT(*)
+            self._fetchrow("""
+                SELECT
+                    COALESCE(AVG(mean_exec_time) FILTER (WHERE calls > 10), 0) AS avg_time,
+                    COUNT(*) FILTER (WHERE mean_exec_time > 100) AS slow
                 FROM pg_stat_statements
-                WHERE mean_exec_time > 100
-            """) or 0
-
-            # Error rate (from analytics events)
-            total_events = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM analytics_events
-                WHERE timestamp >= NOW() - INTERVAL '24 hours'
-            """) or 1
-
-            error_events = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM analytics_events
-                WHERE event_name IN ('error_occurred', 'api_error')
-                AND timestamp >= NOW() - INTERVAL '24 hours'
-            """) or 0
-
-            error_rate = (error_events / total_events * 100)
-
-            # Deployment metrics (from analytics events)
-            deploy_success = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM analytics_events
-                WHERE event_name IN ('vercel_deploy_succeeded', 'github_push_succeeded')
-                AND timestamp >= NOW() - INTERVAL '30 days'
-            """) or 0
-
-            deploy_failed = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM analytics_events
-                WHERE event_name IN ('vercel_deploy_failed', 'github_push_failed')
-                AND timestamp >= NOW() - INTERVAL '30 days'
-            """) or 0
-
-            total_deploys = deploy_success + deploy_failed
-            deploy_success_rate = (deploy_success / total_deploys * 100) if total_deploys > 0 else 100.0
-
+            """),
+            # Error and deployment counts (from the hourly rollup)
+            self._fetchrow("""
+                SELECT
+                    COALESCE(SUM(event_count) FILTER (
+                        WHERE bucket >= NOW() - INTERVAL '24 hours'), 0) AS total_24h,
+                    COALESCE(SUM(event_count) FILTER (
+                        WHERE bucket >= NOW() - INTERVAL '24 hours'
+                        AND event_name IN ('error_occurred', 'api_error')), 0) AS errors_24h,
+                    COALESCE(SUM(event_count) FILTER (
+                        WHERE event_name IN ('vercel_deploy_succeeded', 'github_push_succeeded')), 0) AS deploy_success,
+                    COALESCE(SUM(event_count) FILTER (
+                        WHERE event_name IN ('vercel_deploy_failed', 'github_push_failed')), 0) AS deploy_failed
+                FROM analytics_events_hourly
+                WHERE bucket >= NOW() - INTERVAL '30 days'
+            """),
             # API response time (simplified - from search queries)
-            api_p95 = await conn.fetchval("""
+            self._fetchval("""
                 SELECT PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY execution_time_ms)
                 FROM search_queries
                 WHERE timestamp >= NOW() - INTERVAL '24 hours'
-            """) or 0.0
-
-            return PerformanceMetrics(
-                average_query_time_ms=round(float(avg_query_time), 2),
-                slow_queries_count=slow_queries,
-                error_rate=round(error_rate, 2),
-                api_response_time_p95=round(float(api_p95), 2),
-                successful_deployments=deploy_success,
-                failed_deployments=deploy_failed,
-                deployment_success_rate=round(deploy_success_rate, 2)
-            )
+            """)
+        )
+
+        total_events = events['total_24h'] or 1
+        error_rate = (events['errors_24h'] / total_events * 100)
+
+        deploy_success = events['deploy_success']
+        deploy_failed = events['deploy_failed']
+        total_deploys = deploy_success + deploy_failed
+        deploy_success_rate = (deploy_success / total_deploys * 100) if total_deploys > 0 else 100.0
+
+        return PerformanceMetrics(
+            average_query_time_ms=round(float(query_stats['avg_time'] or 0.0), 2),
+            slow_queries_count=query_stats['slow'] or 0,
+            error_rate=round(float(error_rate), 2),
+            api_response_time_p95=round(float(api_p95 or 0.0), 2),
+            successful_deployments=int(deploy_success),
+            failed_deployments=int(deploy_failed),
+            deployment_success_rate=round(float(deploy_success_rate), 2)
+        )
 
     async def get_dashboard_metrics(
         self,
@@ -438,10 +378,12 @@ class MetricsService:
         Returns:
             DashboardMetrics with all statistics
         """
-        user_metrics = await self.get_user_metrics(as_of_date)
-        revenue_metrics = await self.get_revenue_metrics(as_of_date)
-        engagement_metrics = await self.get_engagement_metrics()
-        performance_metrics = await self.get_performance_metrics()
+        user_metrics, revenue_metrics, engagement_metrics, performance_metrics = await asyncio.gather(
+            self.get_user_metrics(as_of_date),
+            self.get_revenue_metrics(as_of_date),
+            self.get_engagement_metrics(),
+            self.get_performance_metrics()
+        )
 
         return DashboardMetrics(
             user_metrics=user_metrics,
@@ -466,46 +408,124 @@ class MetricsService:
         Returns:
             Retention data for the cohort
         """
-        async with self.db_pool.acquire() as conn:
-            # Users in cohort
-            cohort_users = await conn.fetch("""
-                SELECT id, email
+        cohort_start = datetime.combine(cohort_date, datetime.min.time())
+
+        cohort_size, rows = await asyncio.gather(
+            self._fetchval("""
+                SELECT COUNT(*)
                 FROM users
-                WHERE DATE(created_at) = $1
-            """, cohort_date)
-
-            cohort_size = len(cohort_users)
-            if cohort_size == 0:
-                return {"cohort_date": cohort_date, "cohort_size": 0, "retention": []}
-
-            user_ids = [user['id'] for user in cohort_users]
-
-            # Calculate retention for each day
-            retention_data = []
-            for day in range(1, period_days + 1):
-                check_date = cohort_date + timedelta(days=day)
-
-                active_count = await conn.fetchval("""
-                    SELECT COUNT(DISTINCT user_id)
-                    FROM analytics_events
-                    WHERE user_id = ANY($1)
-                    AND DATE(timestamp) = $2
-                """, user_ids, check_date)
-
-                retention_rate = (active_count / cohort_size * 100) if cohort_size > 0 else 0
-
-                retention_data.append({
-                    "day": day,
-                    "date": check_date.isoformat(),
-                    "active_users": active_count,
-                    "retention_rate": round(retention_rate, 2)
-                })
-
-            return {
-                "cohort_date": cohort_date.isoformat(),
-                "cohort_size": cohort_size,
-                "retention": retention_data
-            }
+                WHERE created_at >= $1 AND created_at < $1 + INTERVAL '1 day'
+            """, cohort_start),
+            # Daily active cohort members, one grouped scan of the rollup
+            self._fetch("""
+                SELECT a.activity_date, COUNT(*) AS active_users
+                FROM analytics_user_activity_daily a
+                JOIN users u ON u.id = a.user_id
+                WHERE u.created_at >= $1 AND u.created_at < $1 + INTERVAL '1 day'
+                AND a.activity_date > $2
+                AND a.activity_date <= $3
+                GROUP BY a.activity_date
+            """, cohort_start, cohort_date, cohort_date + timedelta(days=period_days))
+        )
+
+        if not cohort_size:
+            return {"cohort_date": cohort_date, "cohort_size": 0, "retention": []}
+
+        active_by_date = {row['activity_date']: row['active_users'] for row in rows}
+
+        # Calculate retention for each day
+        retention_data = []
+        for day in range(1, period_days + 1):
+            check_date = cohort_date + timedelta(days=day)
+            active_count = active_by_date.get(check_date, 0)
+            retention_rate = active_count / cohort_size * 100
+
+            retention_data.append({
+                "day": day,
+                "date": check_date.isoformat(),
+                "active_users": active_count,
+                "retention_rate": round(retention_rate, 2)
+            })
+
+        return {
+            "cohort_date": cohort_date.isoformat(),
+            "cohort_size": cohort_size,
+            "retention": retention_data
+        }
+
+    # ------------------------------------------------------------------
+    # Partition and rollup maintenance
+    # ------------------------------------------------------------------
+
+    async def run_maintenance(
+        self,
+        months_ahead: int = 3,
+        retention_months: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Create upcoming partitions, refresh rollups and apply retention
+
+        Args:
+            months_ahead: Monthly partitions to keep ready ahead of today
+            retention_months: Drop raw partitions older than this (None keeps all)
+
+        Returns:
+            Summary of the maintenance run
+        """
+        async with self.db_pool.acquire() as conn:
+            created = await conn.fetchval(
+                "SELECT ensure_analytics_partitions($1)", months_ahead
+            )
+            watermark = await conn.fetchval("SELECT refresh_analytics_rollups()")
+            dropped = 0
+            if retention_months is not None:
+                dropped = await conn.fetchval(
+                    "SELECT drop_analytics_partitions($1)", retention_months
+                )
+
+        return {
+            "partitions_created": created,
+            "partitions_dropped": dropped,
+            "rollup_watermark": watermark,
+        }
+
+    def start_maintenance(
+        self,
+        interval: float = 300.0,
+        retention_months: Optional[int] = None
+    ):
+        """
+        Run maintenance periodically in the background
+
+        Args:
+            interval: Seconds between runs (bounds rollup staleness)
+            retention_months: Passed through to run_maintenance
+        """
+        if self._maintenance_task is not None:
+            return
+
+        async def _loop():
+            while True:
+                try:
+                    await self.run_maintenance(retention_months=retention_months)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Analytics maintenance failed: {e}")
+                await asyncio.sleep(interval)
+
+        self._maintenance_task = asyncio.get_running_loop().create_task(_loop())
+
+    async def stop_maintenance(self):
+        """Stop the background maintenance task"""
+        if self._maintenance_task is None:
+            return
+        self._maintenance_task.cancel()
+        try:
+            await self._maintenance_task
+        except asyncio.CancelledError:
+            pass
+        self._maintenance_task = None
 
 
 # Singleton instance
@@ -12,6 +12,8 @@ from posthog import Posthog
 from functools import lru_cache
 import asyncpg
 
+from .ingestion import AnalyticsIngestionBuffer, OverflowPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +24,7 @@ class PostHogClient:
     Features:
     - Event tracking with automatic batching
     - User identification and traits
-    - Local PostgreSQL backup for analytics
+    - Local PostgreSQL backup for analytics (batched, bounded buffer)
     - Offline mode fallback
     """
 
@@ -31,13 +33,29 @@ class PostHogClient:
         api_key: Optional[str] = None,
         host: str = "https://app.posthog.com",
         db_pool: Optional[asyncpg.Pool] = None,
-        enable_local_backup: bool = True
+        enable_local_backup: bool = True,
+        backup_batch_size: int = 500,
+        backup_flush_interval: float = 2.0,
+        backup_max_buffer: int = 20000,
+        backup_overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST
     ):
         self.api_key = api_key or os.getenv('POSTHOG_API_KEY')
         self.host = host
         self.db_pool = db_pool
         self.enable_local_backup = enable_local_backup
 
+        # Local backup goes through a batching buffer instead of one
+        # INSERT (and one pool connection) per event
+        self.ingestion: Optional[AnalyticsIngestionBuffer] = None
+        if enable_local_backup and db_pool is not None:
+            self.ingestion = AnalyticsIngestionBuffer(
+                db_pool,
+                batch_size=backup_batch_size,
+                flush_interval=backup_flush_interval,
+                max_buffer=backup_max_buffer,
+                overflow_policy=backup_overflow_policy
+            )
+
         # Initialize PostHog if API key is provided
         if self.api_key:
             self.client = Posthog(
@@ -58,37 +76,27 @@ class PostHogClient:
         logger.error(f"PostHog error: {error}")
         logger.debug(f"Failed batch: {batch}")
 
-    async def _backup_to_db(
+    def _backup_to_db(
         self,
         user_id: Optional[str],
         event_name: str,
         properties: Dict[str, Any],
         session_id: Optional[str] = None,
         ip_address: Optional[str] = None,
-        user_agent: Optional[str] = None
+        user_agent: Optional[str] = None,
+        timestamp: Optional[datetime] = None
     ):
-        """Backup event to local PostgreSQL database"""
-        if not self.enable_local_backup or not self.db_pool:
+        """Queue event for the batched local PostgreSQL backup"""
+        if not self.enable_local_backup or self.ingestion is None:
             return
 
-        try:
-            async with self.db_pool.acquire() as conn:
-                await conn.execute('''
-                    INSERT INTO analytics_events (
-                        user_id, event_name, event_properties,
-                        session_id, ip_address, user_agent, timestamp
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                ''',
-                    user_id,
-                    event_name,
-                    properties,
-                    session_id,
-                    ip_address,
-                    user_agent,
-                    datetime.utcnow()
-                )
-        except Exception as e:
-            logger.error(f"Failed to backup event to database: {e}")
+        self.ingestion.submit(
+            user_id, event_name, properties,
+            session_id=session_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            timestamp=timestamp
+        )
 
     def capture(
         self,
@@ -140,20 +148,11 @@ class PostHogClient:
             except Exception as e:
                 logger.error(f"Failed to send event to PostHog: {e}")
 
-        # Backup to local database (async, don't wait)
-        if self.enable_local_backup:
-            import asyncio
-            try:
-                loop = asyncio.get_event_loop()
-                loop.create_task(
-                    self._backup_to_db(
-                        user_id, event, properties,
-                        session_id, ip_address, user_agent
-                    )
-                )
-            except RuntimeError:
-                # No event loop, skip backup
-                pass
+        # Backup to local database (buffered, flushed in batches)
+        self._backup_to_db(
+            user_id, event, properties,
+            session_id, ip_address, user_agent, timestamp
+        )
 
         return success
 
@@ -310,6 +309,18 @@ class PostHogClient:
             logger.error(f"Failed to get feature flag: {e}")
             return default
 
+    def get_backup_stats(self) -> Dict[str, Any]:
+        """Ingestion counters of the local backup (rate, batches, drops)"""
+        if self.ingestion is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.ingestion.get_stats()}
+
+    async def aclose(self):
+        """Drain the local backup buffer, then shut down PostHog"""
+        if self.ingestion is not None:
+            await self.ingestion.stop()
+        self.shutdown()
+
     def shutdown(self):
         """Flush and shutdown PostHog client"""
         if self.client:
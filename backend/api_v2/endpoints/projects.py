@@ -10,6 +10,8 @@ from auth import get_current_user
 from config import settings
 from api_v2.middleware import limiter, RateLimits
 from api_v2.middleware.cache import cached, CacheConfig, invalidate_project_cache
+from infrastructure.cache.tags import CacheTags
+from services.project_files import ProjectFileStore
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,7 @@ router = APIRouter()
 # MongoDB connection
 client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
 
 
 @router.get(
@@ -28,7 +31,11 @@ db = client[settings.DB_NAME]
     description="Get all projects for the authenticated user with caching"
 )
 @limiter.limit(RateLimits.PROJECT_LIST)
-@cached(ttl=CacheConfig.PROJECT_LIST, key_prefix="projects")
+@cached(
+    ttl=CacheConfig.PROJECT_LIST,
+    key_prefix="projects",
+    tags=lambda current_user, **_: [CacheTags.user(current_user['user_id'])]
+)
 async def list_projects(current_user: dict = Depends(get_current_user)):
     """
     List all projects for current user
@@ -37,14 +44,13 @@ async def list_projects(current_user: dict = Depends(get_current_user)):
         current_user: Authenticated user from JWT
 
     Returns:
-        List of projects
+        List of projects (metadata and file count, without file contents)
 
     Cache:
         15 minutes TTL, invalidated on project create/update/delete
     """
-    projects = await db.projects.find(
-        {"user_id": current_user['user_id']},
-        {"_id": 0}
+    projects = await db.projects.aggregate(
+        project_files.metadata_pipeline({"user_id": current_user['user_id']})
     ).to_list(1000)
 
     # Parse datetime fields
@@ -99,8 +105,8 @@ async def create_project(
     project_dict['created_at'] = project_dict['created_at'].isoformat()
     project_dict['updated_at'] = project_dict['updated_at'].isoformat()
 
-    # Insert into database
-    await db.projects.insert_one(project_dict)
+    # Insert into database (files go to the project file store)
+    await project_files.create_project(project_dict)
 
     logger.info(f"Project created: {new_project.id} by user {current_user['user_id']}")
 
@@ -117,7 +123,11 @@ async def create_project(
     summary="Get project details",
     description="Get detailed information about a specific project"
 )
-@cached(ttl=CacheConfig.PROJECT_DETAIL, key_prefix="project")
+@cached(
+    ttl=CacheConfig.PROJECT_DETAIL,
+    key_prefix="project",
+    tags=lambda project_id, *_, **__: [CacheTags.project(project_id)]
+)
 async def get_project(
     project_id: str,
     current_user: dict = Depends(get_current_user)
@@ -154,6 +164,8 @@ async def get_project(
             detail="Accès non autorisé à ce projet"
         )
 
+    await project_files.hydrate(project)
+
     # Parse datetime fields
     if isinstance(project.get('created_at'), str):
         project['created_at'] = datetime.fromisoformat(project['created_at'])
@@ -191,10 +203,10 @@ async def update_project(
         HTTPException 403: User doesn't own project
 
     Side effects:
-        Invalidates project cache
+        Invalidates project cache and the user's project list
     """
     # Verify project exists and user owns it
-    project = await db.projects.find_one({"id": project_id}, {"_id": 0})
+    project = await db.projects.find_one({"id": project_id}, {"_id": 0, "user_id": 1})
 
     if not project:
         raise HTTPException(
@@ -212,9 +224,8 @@ async def update_project(
     update_data = updates.model_dump(exclude_unset=True)
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
 
-    # Convert file and message objects to dicts
-    if 'files' in update_data:
-        update_data['files'] = [f.model_dump() if hasattr(f, 'model_dump') else f for f in update_data['files']]
+    # Files are saved through the project file store, never on the document
+    files = update_data.pop('files', None)
     if 'conversation_history' in update_data:
         update_data['conversation_history'] = [m.model_dump() if hasattr(m, 'model_dump') else m for m in update_data['conversation_history']]
 
@@ -223,11 +234,18 @@ async def update_project(
         {"id": project_id},
         {"$set": update_data}
     )
+    if files is not None:
+        # Only files whose content changed are written
+        await project_files.save_files(
+            project_id, [f.model_dump() if hasattr(f, 'model_dump') else f for f in files]
+        )
 
     logger.info(f"Project updated: {project_id}")
 
     # Invalidate cache
     await invalidate_project_cache(project_id)
+    from api_v2.middleware.cache import invalidate_user_cache
+    await invalidate_user_cache(current_user['user_id'])
 
     # Get updated project
     updated_project = await get_project(project_id, current_user)
@@ -259,7 +277,7 @@ async def delete_project(
         Invalidates project cache
     """
     # Verify ownership
-    project = await db.projects.find_one({"id": project_id}, {"_id": 0})
+    project = await db.projects.find_one({"id": project_id}, {"_id": 0, "user_id": 1})
 
     if not project:
         raise HTTPException(
@@ -281,6 +299,7 @@ async def delete_project(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Échec de suppression"
         )
+    await project_files.delete_files([project_id])
 
     logger.info(f"Project deleted: {project_id}")
 
@@ -1,19 +1,27 @@
 """
 Redis Caching Middleware
 Improves API performance by caching expensive operations
+
+Entries declare the entity tags they depend on (see CacheTags); bumping a
+tag's generation invalidates all of them without scanning keys.
 """
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Iterable
 from functools import wraps
 import hashlib
 import json
 import logging
 from datetime import timedelta
 
+from infrastructure.cache.tags import CacheTags, TagVersions
+
 logger = logging.getLogger(__name__)
 
 # Redis client (to be initialized in main app)
 redis_client: Optional[Any] = None
 
+# Tag generation counters, stored in the same Redis
+tag_versions = TagVersions()
+
 
 class CacheConfig:
     """Cache TTL configurations for different data types"""
@@ -150,12 +158,37 @@ def generate_cache_key(*args, **kwargs) -> str:
     return hashlib.md5(key_data.encode()).hexdigest()
 
 
-def cached(ttl: timedelta, key_prefix: str = ""):
+async def invalidate_tags(*tags: str):
+    """
+    Invalidate every cache entry depending on any of the tags
+
+    Args:
+        *tags: Tags to invalidate (e.g., CacheTags.user("123"))
+    """
+    if not redis_client:
+        return
+
+    try:
+        await tag_versions.bump(redis_client, *tags)
+        logger.debug(f"Invalidated cache tags: {', '.join(tags)}")
+    except Exception as e:
+        logger.error(f"Cache invalidation error: {e}")
+
+
+def cached(
+    ttl: timedelta,
+    key_prefix: str = "",
+    tags: Optional[Callable[..., Iterable[str]]] = None
+):
     """
     Decorator for caching function results
 
     Usage:
-        @cached(ttl=CacheConfig.PROJECT_LIST, key_prefix="projects")
+        @cached(
+            ttl=CacheConfig.PROJECT_LIST,
+            key_prefix="projects",
+            tags=lambda user_id: [CacheTags.user(user_id)]
+        )
         async def get_projects(user_id: str):
             # Expensive database query
             return projects
@@ -163,6 +196,8 @@ def cached(ttl: timedelta, key_prefix: str = ""):
     Args:
         ttl: Cache time-to-live
         key_prefix: Prefix for cache key (e.g., "projects")
+        tags: Function returning the tags an entry depends on, called
+            with the decorated function's arguments
 
     Returns:
         Decorator function
@@ -174,6 +209,14 @@ def cached(ttl: timedelta, key_prefix: str = ""):
             arg_hash = generate_cache_key(*args, **kwargs)
             cache_key = f"{key_prefix}:{func.__name__}:{arg_hash}"
 
+            # Stamp it with the current generation of its tags
+            if tags and redis_client:
+                try:
+                    cache_key = await tag_versions.stamp(redis_client, cache_key, tags(*args, **kwargs))
+                except Exception as e:
+                    logger.error(f"Cache tag lookup error: {e}")
+                    return await func(*args, **kwargs)
+
             # Try to get from cache
             cached_value = await get_cached(cache_key)
             if cached_value:
@@ -199,10 +242,10 @@ def cached(ttl: timedelta, key_prefix: str = ""):
 
 # Utility functions for common cache invalidation patterns
 async def invalidate_user_cache(user_id: str):
-    """Invalidate all cache entries for a specific user"""
-    await invalidate_cache(f"user:{user_id}:*")
+    """Invalidate all cache entries tagged with a specific user"""
+    await invalidate_tags(CacheTags.user(user_id))
 
 
 async def invalidate_project_cache(project_id: str):
-    """Invalidate all cache entries for a specific project"""
-    await invalidate_cache(f"project:{project_id}:*")
+    """Invalidate all cache entries tagged with a specific project"""
+    await invalidate_tags(CacheTags.project(project_id))
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark: React -> React Native conversion
+
+Compares the single-pass tokenizer converter (with memoized Tailwind
+mapping) against the previous per-tag regex loop on a generated project.
+Usage:
+    python benchmark_mobile_export.py
+    python benchmark_mobile_export.py --files=500 --elements=120
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Dict, List, Tuple
+
+from services.mobile_export_service import (
+    CSSToStyleSheetConverter,
+    ReactToReactNativeConverter,
+)
+
+CLASS_STRINGS = [
+    "flex items-center justify-between p-4 bg-white rounded-lg",
+    "text-xl font-bold text-gray-900",
+    "text-sm text-gray-500 mt-2",
+    "flex flex-col gap-4 px-6 py-4",
+    "w-full h-12 rounded-md border-gray-300",
+    "bg-blue-600 text-white font-semibold px-4 py-2 rounded-lg",
+    "grid gap-2 p-2",
+    "absolute top-0 right-0 m-4",
+    "overflow-hidden rounded-2xl bg-gray-100",
+    "text-center text-3xl font-extrabold",
+]
+
+ELEMENTS = [
+    '<div className="{cls}">',
+    '<p className="{cls}">Lorem ipsum {i}</p>',
+    '<span className="{cls}">{{value}}</span>',
+    '<button className="{cls}" onClick={{() => setCount(c => c + 1)}}>Click</button>',
+    '<img src="https://cdn.example.com/{i}.png" className="{cls}" />',
+    '<input type="password" onChange={{onChange}} className="{cls}" />',
+    '<Card title="{i}"><h2 className="{cls}">Title</h2></Card>',
+    '<section className="{cls}"><ul><li>One</li><li>Two</li></ul></section>',
+    '</div>',
+]
+
+
+def generate_component(index: int, elements: int, rng: random.Random) -> str:
+    body = "\n      ".join(
+        rng.choice(ELEMENTS).format(cls=rng.choice(CLASS_STRINGS), i=i)
+        for i in range(elements)
+    )
+    return (
+        "import React, { useState } from 'react';\n"
+        "import ReactDOM from 'react-dom';\n\n"
+        f"function Component{index}({{ onChange }}) {{\n"
+        "  const [count, setCount] = useState(0);\n"
+        "  return (\n"
+        f"    <main className=\"flex-1\">\n      {body}\n    </main>\n"
+        "  );\n"
+        "}\n\n"
+        f"export default Component{index};\n"
+    )
+
+
+class LegacyConverter(ReactToReactNativeConverter):
+    """The previous algorithm: several full-source regex scans per tag"""
+
+    def convert_component(self, content: str, filename: str) -> Tuple[str, List[str]]:
+        warnings = []
+        result = content
+        rn_imports = set(["View", "Text", "StyleSheet"])
+
+        for html_tag, rn_component in self.HTML_TO_RN.items():
+            if re.findall(rf'<{html_tag}(\s[^>]*)?>|<{html_tag}>', result, re.IGNORECASE):
+                rn_imports.add(rn_component)
+            result = re.sub(rf'<{html_tag}(\s)', f'<{rn_component}\\1', result, flags=re.IGNORECASE)
+            result = re.sub(rf'<{html_tag}>', f'<{rn_component}>', result, flags=re.IGNORECASE)
+            result = re.sub(rf'</{html_tag}>', f'</{rn_component}>', result, flags=re.IGNORECASE)
+            result = re.sub(rf'<{html_tag}(\s[^>]*)?\/>', f'<{rn_component}\\1/>', result, flags=re.IGNORECASE)
+
+        def replace_classname(match):
+            styles = legacy_tailwind(match.group(1))
+            if styles:
+                self.style_counter += 1
+                style_name = f"style{self.style_counter}"
+                self.extracted_styles[style_name] = styles
+                return f'style={{styles.{style_name}}}'
+            return ''
+
+        result = re.sub(r'className="([^"]+)"', replace_classname, result)
+        if self.extracted_styles:
+            styles_code = self._generate_stylesheet()
+            if "export default" in result:
+                result = re.sub(r'(export default \w+;?)', f'{styles_code}\n\n\\1', result)
+            else:
+                result += f"\n\n{styles_code}"
+
+        result = re.sub(r'onClick=', 'onPress=', result)
+        if 'href=' in result:
+            rn_imports.add("Linking")
+            warnings.append(f"{filename}: href converted to onPress with Linking")
+        result = re.sub(r'src=\{([^}]+)\}', r'source={{\1}}', result)
+        result = re.sub(r'src="([^"]+)"', r'source={{uri: "\1"}}', result)
+        if "TextInput" in rn_imports:
+            result = re.sub(r'type="password"', 'secureTextEntry={true}', result)
+            result = re.sub(r'onChange=', 'onChangeText=', result)
+        if result.count('<View') > 5:
+            rn_imports.add("ScrollView")
+            warnings.append(f"{filename}: Consider wrapping in ScrollView for scrollable content")
+
+        import_statement = f"import {{ {', '.join(sorted(rn_imports))} }} from 'react-native';"
+        result = re.sub(r"import.*from\s+['\"]react-dom['\"];?", "", result)
+        result = re.sub(r"(import.*from\s+['\"]react['\"];?)", f"\\1\n{import_statement}", result)
+        if "import" not in result or "react" not in result.lower():
+            result = f"import React from 'react';\n{import_statement}\n\n{result}"
+        return result, warnings
+
+
+# Unmemoized per-class mapping, as before
+_convert_class = CSSToStyleSheetConverter._convert_class.__func__.__wrapped__
+
+
+def legacy_tailwind(class_string: str) -> Dict:
+    styles = {}
+    for css_class in class_string.split():
+        styles.update(_convert_class(CSSToStyleSheetConverter, css_class))
+    return styles
+
+
+def run(converter_cls, sources: List[str]) -> Tuple[float, List[str]]:
+    start = time.perf_counter()
+    outputs = [
+        converter_cls().convert_component(source, f"Component{i}.jsx")[0]
+        for i, source in enumerate(sources)
+    ]
+    return time.perf_counter() - start, outputs
+
+
+def main(files: int, elements: int, seed: int) -> None:
+    rng = random.Random(seed)
+    sources = [generate_component(i, elements, rng) for i in range(files)]
+    total_kb = sum(len(s) for s in sources) / 1024
+    print(f"Generated {files} components ({total_kb:.0f} KB, {elements} elements each)")
+
+    legacy_time, legacy_out = run(LegacyConverter, sources)
+
+    CSSToStyleSheetConverter._convert_class_string.cache_clear()
+    CSSToStyleSheetConverter._convert_class.cache_clear()
+    cold_time, new_out = run(ReactToReactNativeConverter, sources)
+    warm_time, _ = run(ReactToReactNativeConverter, sources)
+
+    identical = sum(a == b for a, b in zip(legacy_out, new_out))
+    cache = CSSToStyleSheetConverter._convert_class_string.cache_info()
+
+    print(json.dumps({
+        "legacy_seconds": round(legacy_time, 3),
+        "tokenizer_cold_seconds": round(cold_time, 3),
+        "tokenizer_warm_seconds": round(warm_time, 3),
+        "speedup_cold": round(legacy_time / cold_time, 1),
+        "speedup_warm": round(legacy_time / warm_time, 1),
+        "identical_outputs": f"{identical}/{files}",
+        "class_string_cache": {"hits": cache.hits, "misses": cache.misses},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark React -> React Native conversion")
+    parser.add_argument("--files", type=int, default=300, help="Components to generate (default: 300)")
+    parser.add_argument("--elements", type=int, default=80, help="JSX elements per component (default: 80)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    main(args.files, args.elements, args.seed)
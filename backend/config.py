@@ -20,6 +20,12 @@ class Settings(BaseSettings):
     # Database
     MONGO_URL: str
     DB_NAME: str = "devora_db"
+    # "normalized": fichiers des projets dans la collection project_files
+    # "embedded": fichiers embarqués dans le document projet (ancien format)
+    # Les deltas de fichiers sont transactionnels sur replica set / mongos ;
+    # sur un Mongo standalone, un delta en échec est annulé par compensation
+    # (fichiers et files_version restaurés), sans isolation des lectures.
+    PROJECT_FILES_STORAGE: str = "normalized"
     
     # JWT Authentication
     SECRET_KEY: str  # Must be set in environment variables
@@ -1,22 +1,51 @@
 """
 Service pour gérer la configuration système stockée en DB.
 Les configurations Stripe/Resend peuvent être modifiées via l'admin panel.
+
+La configuration est mise en cache en mémoire (TTL) et partagée par toutes
+les instances de ConfigService du processus. Le cache est invalidé :
+- immédiatement par update_config dans le worker qui fait la modification
+- dans les autres workers par watch_changes (change stream Mongo), ou à
+  l'expiration du TTL si le serveur ne supporte pas les change streams
 """
+import asyncio
+import logging
+import time
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
 from models import SystemConfig, SystemConfigUpdate
-from typing import Optional
+from typing import Optional, Dict, Tuple
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
 
 class ConfigService:
     """Service de gestion de la configuration système"""
     
+    CACHE_TTL = 30.0  # secondes
+    
+    # Cache partagé par base de données: {db_name: (expires_at, config)}
+    _cache: Dict[str, Tuple[float, SystemConfig]] = {}
+    
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = db.system_config
     
+    @property
+    def _cache_key(self) -> str:
+        return str(getattr(self.db, "name", id(self.db)))
+    
+    def invalidate(self):
+        """Vide le cache de configuration de cette base"""
+        self._cache.pop(self._cache_key, None)
+    
     async def get_config(self) -> SystemConfig:
         """Récupère la configuration système (crée si n'existe pas)"""
+        cached = self._cache.get(self._cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1].model_copy()
+        
         config_data = await self.collection.find_one(
             {"id": "system_config"},
             {"_id": 0}
@@ -24,11 +53,13 @@ class ConfigService:
         
         if not config_data:
             # Créer la config par défaut
-            default_config = SystemConfig()
-            await self.collection.insert_one(default_config.model_dump())
-            return default_config
+            config = SystemConfig()
+            await self.collection.insert_one(config.model_dump())
+        else:
+            config = SystemConfig(**config_data)
         
-        return SystemConfig(**config_data)
+        self._cache[self._cache_key] = (time.monotonic() + self.CACHE_TTL, config)
+        return config.model_copy()
     
     async def update_config(
         self, 
@@ -49,8 +80,32 @@ class ConfigService:
             upsert=True
         )
         
+        self.invalidate()
         return await self.get_config()
     
+    async def watch_changes(self):
+        """
+        Invalide le cache à chaque modification de la configuration faite
+        par un autre worker. À lancer en tâche de fond au démarrage.
+
+        Les change streams nécessitent un replica set : sans, on s'arrête
+        et le TTL reste le seul mécanisme d'invalidation.
+        """
+        while True:
+            try:
+                async with self.collection.watch() as stream:
+                    async for _ in stream:
+                        self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                if getattr(e, "code", None) in (40573, 40324):
+                    logger.info("Config change stream unavailable, relying on cache TTL")
+                    return
+                logger.warning(f"Config change stream interrupted: {e}")
+                self.invalidate()
+                await asyncio.sleep(5)
+    
     async def get_stripe_keys(self) -> tuple[Optional[str], Optional[str], bool]:
         """Retourne (api_key, webhook_secret, test_mode)"""
         config = await self.get_config()
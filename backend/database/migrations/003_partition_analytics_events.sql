@@ -0,0 +1,300 @@
+-- ============================================================================
+-- MIGRATION 003: Partition analytics_events + rollup tables
+-- ============================================================================
+-- Description: Convertit analytics_events en table partitionnée par mois
+--              (RANGE sur created_date) et ajoute les tables de rollup qui
+--              alimentent le dashboard (MetricsService).
+-- Author: Data Squad - Database Architect
+-- Date: 2026-10-18
+-- Rollback: 003_rollback_partition_analytics_events.sql
+-- Prérequis: PostgreSQL 11+, schema.sql (fonctions de partitionnement)
+-- ============================================================================
+
+BEGIN;
+
+-- ----------------------------------------------------------------------------
+-- 1. Détacher l'ancienne table
+-- ----------------------------------------------------------------------------
+
+DROP MATERIALIZED VIEW IF EXISTS mv_daily_user_activity CASCADE;
+DROP POLICY IF EXISTS analytics_user_isolation ON analytics_events;
+
+ALTER TABLE analytics_events RENAME TO analytics_events_legacy;
+
+DROP INDEX IF EXISTS idx_analytics_user;
+DROP INDEX IF EXISTS idx_analytics_event_name;
+DROP INDEX IF EXISTS idx_analytics_timestamp;
+DROP INDEX IF EXISTS idx_analytics_created_date;
+DROP INDEX IF EXISTS idx_analytics_properties;
+
+-- ----------------------------------------------------------------------------
+-- 2. Table partitionnée + rollups
+-- ----------------------------------------------------------------------------
+
+CREATE TABLE analytics_events (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    event_name VARCHAR(255) NOT NULL,
+    event_properties JSONB DEFAULT '{}'::jsonb,
+    session_id UUID,
+    ip_address INET,
+    user_agent TEXT,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_date DATE NOT NULL DEFAULT CURRENT_DATE,
+    PRIMARY KEY (id, created_date)
+) PARTITION BY RANGE (created_date);
+
+CREATE TABLE analytics_events_default PARTITION OF analytics_events DEFAULT;
+
+CREATE TABLE IF NOT EXISTS analytics_events_hourly (
+    bucket TIMESTAMPTZ NOT NULL,
+    event_name VARCHAR(255) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    unique_users INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, event_name)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_user_activity_daily (
+    activity_date DATE NOT NULL,
+    user_id UUID NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (activity_date, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_sessions (
+    session_id UUID PRIMARY KEY,
+    user_id UUID,
+    started_at TIMESTAMPTZ NOT NULL,
+    ended_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    rollup_name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_dirty_days (
+    day DATE NOT NULL,
+    marked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- ----------------------------------------------------------------------------
+-- 3. Fonctions de gestion et trigger (identiques à schema.sql)
+-- ----------------------------------------------------------------------------
+
+-- Function: ensure_analytics_partitions
+-- Crée les partitions mensuelles manquantes de p_from jusqu'au mois courant
+-- + p_months_ahead. À appeler périodiquement (MetricsService.run_maintenance
+-- ou pg_cron) pour que la partition DEFAULT reste vide.
+CREATE OR REPLACE FUNCTION ensure_analytics_partitions(
+    p_months_ahead INTEGER DEFAULT 3,
+    p_from DATE DEFAULT CURRENT_DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_month DATE := DATE_TRUNC('month', p_from)::date;
+    v_last DATE := (DATE_TRUNC('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::date;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := format('analytics_events_%s', to_char(v_month, 'YYYY_MM'));
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF analytics_events FOR VALUES FROM (%L) TO (%L)',
+                v_name, v_month, (v_month + INTERVAL '1 month')::date
+            );
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: drop_analytics_partitions
+-- Supprime les partitions plus anciennes que la rétention (les rollups restent)
+CREATE OR REPLACE FUNCTION drop_analytics_partitions(p_retention_months INTEGER DEFAULT 24)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cutoff DATE := (DATE_TRUNC('month', CURRENT_DATE) - make_interval(months => p_retention_months))::date;
+    v_partition RECORD;
+    v_dropped INTEGER := 0;
+BEGIN
+    FOR v_partition IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'analytics_events'
+          AND c.relname ~ '^analytics_events_[0-9]{4}_[0-9]{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') < v_cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', v_partition.relname);
+        v_dropped := v_dropped + 1;
+    END LOOP;
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: refresh_analytics_rollups
+-- Rafraîchissement incrémental: recalcule uniquement les jours marqués par
+-- le trigger d'insertion (analytics_rollup_dirty_days), quel que soit le
+-- retard des événements. Au premier appel, tous les jours existants.
+-- Idempotent: les buckets des jours recalculés sont remplacés, pas incrémentés.
+CREATE OR REPLACE FUNCTION refresh_analytics_rollups()
+RETURNS TIMESTAMPTZ AS $$
+DECLARE
+    v_now TIMESTAMPTZ := NOW();
+    v_days DATE[];
+BEGIN
+    -- Serialize concurrent refreshes across workers
+    PERFORM pg_advisory_xact_lock(hashtext('refresh_analytics_rollups'));
+
+    IF NOT EXISTS (SELECT 1 FROM analytics_rollup_state WHERE rollup_name = 'analytics_events') THEN
+        INSERT INTO analytics_rollup_dirty_days (day)
+        SELECT DISTINCT created_date FROM analytics_events;
+    END IF;
+
+    -- Les marques posées par des transactions encore en cours restent
+    -- pour le prochain rafraîchissement
+    WITH consumed AS (
+        DELETE FROM analytics_rollup_dirty_days RETURNING day
+    )
+    SELECT ARRAY_AGG(DISTINCT day) INTO v_days FROM consumed;
+
+    IF v_days IS NOT NULL THEN
+        INSERT INTO analytics_events_hourly (bucket, event_name, event_count, unique_users)
+        SELECT DATE_TRUNC('hour', timestamp), event_name, COUNT(*), COUNT(DISTINCT user_id)
+        FROM analytics_events
+        WHERE created_date = ANY(v_days)
+        GROUP BY 1, 2
+        ON CONFLICT (bucket, event_name) DO UPDATE
+        SET event_count = EXCLUDED.event_count,
+            unique_users = EXCLUDED.unique_users;
+
+        INSERT INTO analytics_user_activity_daily (activity_date, user_id, event_count)
+        SELECT created_date, user_id, COUNT(*)
+        FROM analytics_events
+        WHERE created_date = ANY(v_days)
+          AND user_id IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (activity_date, user_id) DO UPDATE
+        SET event_count = EXCLUDED.event_count;
+
+        INSERT INTO analytics_sessions (session_id, user_id, started_at, ended_at)
+        SELECT session_id, (ARRAY_AGG(user_id))[1], MIN(timestamp), MAX(timestamp)
+        FROM analytics_events
+        WHERE created_date = ANY(v_days)
+          AND session_id IS NOT NULL
+        GROUP BY session_id
+        ON CONFLICT (session_id) DO UPDATE
+        SET started_at = LEAST(analytics_sessions.started_at, EXCLUDED.started_at),
+            ended_at = GREATEST(analytics_sessions.ended_at, EXCLUDED.ended_at),
+            user_id = COALESCE(analytics_sessions.user_id, EXCLUDED.user_id);
+    END IF;
+
+    INSERT INTO analytics_rollup_state (rollup_name, watermark)
+    VALUES ('analytics_events', v_now)
+    ON CONFLICT (rollup_name) DO UPDATE SET watermark = EXCLUDED.watermark;
+
+    RETURN v_now;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: backfill_analytics_rollups
+-- Recalcule explicitement une plage de jours (ex: après un chargement
+-- effectué triggers désactivés)
+CREATE OR REPLACE FUNCTION backfill_analytics_rollups(p_from DATE, p_to DATE DEFAULT CURRENT_DATE)
+RETURNS TIMESTAMPTZ AS $$
+BEGIN
+    INSERT INTO analytics_rollup_dirty_days (day)
+    SELECT generate_series(p_from, p_to, INTERVAL '1 day')::date;
+    RETURN refresh_analytics_rollups();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Function: mark_analytics_days_dirty
+-- Trigger (par instruction) : marque les jours touchés par un lot inséré.
+-- Journal sans clé unique: les insertions ne se bloquent jamais entre
+-- elles ni sur un rafraîchissement en cours.
+CREATE OR REPLACE FUNCTION mark_analytics_days_dirty()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO analytics_rollup_dirty_days (day)
+    SELECT DISTINCT created_date FROM new_events;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER mark_analytics_days_dirty AFTER INSERT ON analytics_events
+    REFERENCING NEW TABLE AS new_events
+    FOR EACH STATEMENT EXECUTE FUNCTION mark_analytics_days_dirty();
+
+-- ----------------------------------------------------------------------------
+-- 4. Partitions pour l'historique existant, puis copie des données
+-- ----------------------------------------------------------------------------
+
+SELECT ensure_analytics_partitions(
+    3,
+    COALESCE((SELECT MIN(created_date) FROM analytics_events_legacy), CURRENT_DATE)
+);
+
+INSERT INTO analytics_events (
+    id, user_id, event_name, event_properties,
+    session_id, ip_address, user_agent, timestamp, created_date
+)
+SELECT
+    id, user_id, event_name, event_properties,
+    session_id, ip_address, user_agent, timestamp, created_date
+FROM analytics_events_legacy;
+
+DROP TABLE analytics_events_legacy;
+
+-- ----------------------------------------------------------------------------
+-- 5. Indexes, RLS et vue matérialisée
+-- ----------------------------------------------------------------------------
+
+CREATE INDEX idx_analytics_user ON analytics_events(user_id);
+CREATE INDEX idx_analytics_event_name ON analytics_events(event_name);
+CREATE INDEX idx_analytics_timestamp ON analytics_events(timestamp DESC);
+CREATE INDEX idx_analytics_event_timestamp ON analytics_events(event_name, timestamp DESC);
+CREATE INDEX idx_analytics_properties ON analytics_events USING GIN(event_properties);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_hourly_event ON analytics_events_hourly(event_name, bucket DESC);
+CREATE INDEX IF NOT EXISTS idx_analytics_activity_user ON analytics_user_activity_daily(user_id, activity_date);
+CREATE INDEX IF NOT EXISTS idx_analytics_sessions_ended ON analytics_sessions(ended_at DESC);
+
+ALTER TABLE analytics_events ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY analytics_user_isolation ON analytics_events
+    FOR SELECT
+    USING (user_id = current_setting('app.user_id')::uuid);
+
+CREATE MATERIALIZED VIEW mv_daily_user_activity AS
+SELECT
+    DATE(timestamp) as activity_date,
+    user_id,
+    COUNT(*) as event_count,
+    COUNT(DISTINCT session_id) as session_count,
+    MAX(timestamp) as last_activity
+FROM analytics_events
+GROUP BY DATE(timestamp), user_id;
+
+CREATE UNIQUE INDEX idx_mv_daily_activity ON mv_daily_user_activity(activity_date, user_id);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON
+    analytics_events, analytics_events_hourly, analytics_user_activity_daily,
+    analytics_sessions, analytics_rollup_state, analytics_rollup_dirty_days
+TO app_user;
+
+-- ----------------------------------------------------------------------------
+-- 6. Rollups initiaux
+-- ----------------------------------------------------------------------------
+
+SELECT refresh_analytics_rollups();
+
+INSERT INTO schema_migrations (version, description)
+VALUES ('003', 'Monthly partitioning of analytics_events with rollup tables');
+
+COMMIT;
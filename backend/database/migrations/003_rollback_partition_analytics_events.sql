@@ -0,0 +1,81 @@
+-- ============================================================================
+-- ROLLBACK 003: Rollback analytics_events partitioning
+-- ============================================================================
+-- Restaure une table analytics_events non partitionnée. Les événements sont
+-- conservés; les tables de rollup sont supprimées.
+-- ============================================================================
+
+BEGIN;
+
+DROP MATERIALIZED VIEW IF EXISTS mv_daily_user_activity CASCADE;
+DROP POLICY IF EXISTS analytics_user_isolation ON analytics_events;
+
+ALTER TABLE analytics_events RENAME TO analytics_events_partitioned;
+
+DROP INDEX IF EXISTS idx_analytics_user;
+DROP INDEX IF EXISTS idx_analytics_event_name;
+DROP INDEX IF EXISTS idx_analytics_timestamp;
+DROP INDEX IF EXISTS idx_analytics_event_timestamp;
+DROP INDEX IF EXISTS idx_analytics_properties;
+
+CREATE TABLE analytics_events (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    event_name VARCHAR(255) NOT NULL,
+    event_properties JSONB DEFAULT '{}'::jsonb,
+    session_id UUID,
+    ip_address INET,
+    user_agent TEXT,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_date DATE NOT NULL DEFAULT CURRENT_DATE
+);
+
+INSERT INTO analytics_events
+SELECT id, user_id, event_name, event_properties,
+       session_id, ip_address, user_agent, timestamp, created_date
+FROM analytics_events_partitioned;
+
+-- Supprime aussi toutes les partitions mensuelles et la partition DEFAULT
+DROP TABLE analytics_events_partitioned CASCADE;
+
+CREATE INDEX idx_analytics_user ON analytics_events(user_id);
+CREATE INDEX idx_analytics_event_name ON analytics_events(event_name);
+CREATE INDEX idx_analytics_timestamp ON analytics_events(timestamp DESC);
+CREATE INDEX idx_analytics_created_date ON analytics_events(created_date);
+CREATE INDEX idx_analytics_properties ON analytics_events USING GIN(event_properties);
+
+ALTER TABLE analytics_events ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY analytics_user_isolation ON analytics_events
+    FOR SELECT
+    USING (user_id = current_setting('app.user_id')::uuid);
+
+CREATE MATERIALIZED VIEW mv_daily_user_activity AS
+SELECT
+    DATE(timestamp) as activity_date,
+    user_id,
+    COUNT(*) as event_count,
+    COUNT(DISTINCT session_id) as session_count,
+    MAX(timestamp) as last_activity
+FROM analytics_events
+GROUP BY DATE(timestamp), user_id;
+
+CREATE UNIQUE INDEX idx_mv_daily_activity ON mv_daily_user_activity(activity_date, user_id);
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON analytics_events TO app_user;
+
+DROP FUNCTION IF EXISTS backfill_analytics_rollups(DATE, DATE) CASCADE;
+DROP FUNCTION IF EXISTS refresh_analytics_rollups() CASCADE;
+DROP FUNCTION IF EXISTS mark_analytics_days_dirty() CASCADE;
+DROP FUNCTION IF EXISTS drop_analytics_partitions(INTEGER) CASCADE;
+DROP FUNCTION IF EXISTS ensure_analytics_partitions(INTEGER, DATE) CASCADE;
+
+DROP TABLE IF EXISTS analytics_rollup_dirty_days CASCADE;
+DROP TABLE IF EXISTS analytics_rollup_state CASCADE;
+DROP TABLE IF EXISTS analytics_sessions CASCADE;
+DROP TABLE IF EXISTS analytics_user_activity_daily CASCADE;
+DROP TABLE IF EXISTS analytics_events_hourly CASCADE;
+
+DELETE FROM schema_migrations WHERE version = '003';
+
+COMMIT;
@@ -22,6 +22,12 @@ from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
 from pymongo.errors import OperationFailure
 import redis.asyncio as redis
 
+from infrastructure.cache.codec import CacheCodec
+from infrastructure.cache.near_cache import NearCache
+from infrastructure.cache.stampede import StampedeGuard, unwrap
+from infrastructure.cache.tags import CacheTags, TagVersions
+from services.project_files import ProjectFileStore
+
 # Configuration
 logger = logging.getLogger(__name__)
 
@@ -416,16 +422,29 @@ class RedisCache:
     """
     Cache Redis pour queries fréquentes
     Réduction de 67% du query time
+
+    Valeurs encodées en BSON (compressé au-delà d'un seuil) : les
+    ObjectId et datetime des documents Mongo sont préservés
+
+    `near_cache` (optionnel) : cache L1 en mémoire devant Redis pour les
+    clés chaudes, invalidé entre workers via pub/sub
     """
 
     def __init__(
         self,
         redis_url: str,
         default_ttl: int = 300,  # 5 minutes par défaut
+        codec: Optional[Any] = None,
+        near_cache: Optional[NearCache] = None,
     ):
         self.redis_url = redis_url
         self.default_ttl = default_ttl
         self.redis_client: Optional[redis.Redis] = None
+        self.codec = codec or CacheCodec()
+        self.near_cache = near_cache
+        self._tags = TagVersions(near_cache=near_cache)
+        self._guard = StampedeGuard(codec=self.codec)
+        self._metrics = {"hits": 0, "misses": 0}
 
     async def connect(self):
         """
@@ -434,16 +453,19 @@ class RedisCache:
         if self.redis_client is None:
             self.redis_client = await redis.from_url(
                 self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                decode_responses=False,
                 max_connections=50,
             )
+            if self.near_cache is not None:
+                self.near_cache.start(self.redis_client)
             logger.info("✅ Redis cache connected")
 
     async def disconnect(self):
         """
         Fermer connexion Redis
         """
+        if self.near_cache is not None:
+            await self.near_cache.stop()
         if self.redis_client:
             await self.redis_client.close()
             logger.info("Redis cache disconnected")
@@ -464,10 +486,21 @@ class RedisCache:
         if not self.redis_client:
             return None
 
+        near = self.near_cache
+        if near is not None:
+            payload = near.lookup(key)
+            if payload is not None:
+                return unwrap(self.codec.decode(payload))
+            version = near.version()
+
         try:
             value = await self.redis_client.get(key)
             if value:
-                return json.loads(value)
+                self._metrics["hits"] += 1
+                if near is not None:
+                    near.store(key, value, version)
+                return unwrap(self.codec.decode(value))
+            self._metrics["misses"] += 1
             return None
         except Exception as e:
             logger.error(f"Redis get error: {e}")
@@ -486,15 +519,118 @@ class RedisCache:
             return
 
         try:
-            serialized = json.dumps(value, default=str)
             await self.redis_client.setex(
                 key,
                 ttl or self.default_ttl,
-                serialized
+                self.codec.encode(value)
             )
+            if self.near_cache is not None:
+                await self.near_cache.publish(self.redis_client, [key])
         except Exception as e:
             logger.error(f"Redis set error: {e}")
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Récupérer plusieurs clés en un seul MGET
+
+        Retourne {clé: valeur} pour les clés présentes uniquement
+        """
+        if not self.redis_client or not keys:
+            return {}
+
+        # Clés servies par le L1, le reste en un seul MGET
+        near = self.near_cache
+        payloads = {}
+        if near is not None:
+            for key in keys:
+                payload = near.lookup(key)
+                if payload is not None:
+                    payloads[key] = payload
+            version = near.version()
+        remote = [key for key in keys if key not in payloads]
+
+        if remote:
+            try:
+                values = await self.redis_client.mget(remote)
+            except Exception as e:
+                logger.error(f"Redis mget error: {e}")
+                values = [None] * len(remote)
+            for key, value in zip(remote, values):
+                if value:
+                    payloads[key] = value
+                    self._metrics["hits"] += 1
+                    if near is not None:
+                        near.store(key, value, version)
+                else:
+                    self._metrics["misses"] += 1
+
+        found = {}
+        for key, payload in payloads.items():
+            try:
+                found[key] = unwrap(self.codec.decode(payload))
+            except Exception as e:
+                logger.error(f"Redis decode error for {key}: {e}")
+        return found
+
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        ttl: Optional[int] = None
+    ):
+        """
+        Stocker plusieurs clés en un aller-retour (pipeline MULTI/EXEC)
+        """
+        if not self.redis_client or not mapping:
+            return
+
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                for key, value in mapping.items():
+                    pipe.setex(key, ttl or self.default_ttl, self.codec.encode(value))
+                await pipe.execute()
+            if self.near_cache is not None:
+                await self.near_cache.publish(self.redis_client, list(mapping))
+        except Exception as e:
+            logger.error(f"Redis set_many error: {e}")
+
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
+    ) -> Any:
+        """
+        Lecture depuis le cache, ou calcul protégé contre les stampedes :
+        un seul calcul par clé et par processus, un seul worker à la fois
+        (lease Redis), rafraîchissement anticipé des clés chaudes pendant
+        lequel les autres appelants reçoivent la valeur courante
+        """
+        if tags:
+            key = await self.tagged_key(key, tags)
+
+        if not self.redis_client or key is None:
+            value = factory()
+            return await value if asyncio.iscoroutine(value) else value
+
+        near = self.near_cache
+        if near is not None:
+            payload = near.lookup(key)
+            if payload is not None:
+                return unwrap(self.codec.decode(payload))
+            version = near.version()
+
+        value, from_cache = await self._guard.get_or_compute(
+            self.redis_client, key, factory, ttl or self.default_ttl
+        )
+        self._metrics["hits" if from_cache else "misses"] += 1
+        if near is not None:
+            if from_cache:
+                near.store(key, self.codec.encode(value), version)
+            else:
+                await near.publish(self.redis_client, [key])
+        return value
+
     async def delete(self, key: str):
         """
         Supprimer du cache
@@ -504,6 +640,8 @@ class RedisCache:
 
         try:
             await self.redis_client.delete(key)
+            if self.near_cache is not None:
+                await self.near_cache.publish(self.redis_client, [key])
         except Exception as e:
             logger.error(f"Redis delete error: {e}")
 
@@ -522,20 +660,69 @@ class RedisCache:
             if keys:
                 await self.redis_client.delete(*keys)
                 logger.info(f"Invalidated {len(keys)} cache keys")
+            if self.near_cache is not None:
+                await self.near_cache.publish(self.redis_client, pattern=pattern)
         except Exception as e:
             logger.error(f"Redis invalidate error: {e}")
 
+    async def tagged_key(self, key: str, tags: Optional[List[str]]) -> Optional[str]:
+        """
+        Clé d'une entrée dépendant de `tags` (voir CacheTags)
+
+        Retourne None si les générations des tags sont illisibles :
+        l'entrée ne doit alors être ni lue ni écrite.
+        """
+        if not self.redis_client:
+            return key
+
+        try:
+            return await self._tags.stamp(self.redis_client, key, tags)
+        except Exception as e:
+            logger.error(f"Redis tag lookup error: {e}")
+            return None
+
+    async def invalidate_tags(self, *tags: str):
+        """
+        Invalider toutes les entrées dépendant d'un des tags (O(1), sans SCAN)
+        """
+        if not self.redis_client:
+            return
+
+        try:
+            await self._tags.bump(self.redis_client, *tags)
+        except Exception as e:
+            logger.error(f"Redis invalidate tags error: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Hits/misses par niveau (Redis, et L1 si activé)
+        """
+        total = self._metrics["hits"] + self._metrics["misses"]
+        metrics = {
+            "redis": {
+                **self._metrics,
+                "hit_rate": round(self._metrics["hits"] / total, 4) if total else 0.0,
+            }
+        }
+        if self.near_cache is not None:
+            metrics["near_cache"] = self.near_cache.get_metrics()
+        return metrics
+
     def cached(
         self,
         prefix: str,
         ttl: Optional[int] = None,
-        key_builder: Optional[Callable] = None
+        key_builder: Optional[Callable] = None,
+        tags: Optional[Callable] = None
     ):
         """
         Décorateur pour cacher les résultats de fonction
 
         Usage:
-            @cache.cached("user_projects", ttl=600)
+            @cache.cached(
+                "user_projects", ttl=600,
+                tags=lambda user_id: [CacheTags.user(user_id)]
+            )
             async def get_user_projects(user_id: str):
                 return await db.projects.find({"user_id": user_id}).to_list()
         """
@@ -551,6 +738,10 @@ class RedisCache:
                         args=args,
                         kwargs=kwargs
                     )
+                if tags:
+                    cache_key = await self.tagged_key(cache_key, tags(*args, **kwargs))
+                    if cache_key is None:
+                        return await func(*args, **kwargs)
 
                 # Check cache
                 cached_value = await self.get(cache_key)
@@ -578,8 +769,28 @@ class RedisCache:
 class QueryOptimizer:
     """
     Patterns d'optimisation pour queries MongoDB
+
+    Les résultats sont taggés (CacheTags) : appeler invalidate_user /
+    invalidate_templates après une écriture.
     """
 
+    @staticmethod
+    async def invalidate_user(cache: RedisCache, user_id: str):
+        """
+        Invalider les projets et recherches cachés d'un utilisateur
+        """
+        await cache.invalidate_tags(CacheTags.user(user_id))
+
+    @staticmethod
+    async def invalidate_templates(cache: RedisCache, template_id: Optional[str] = None):
+        """
+        Invalider les listes de templates (et un template précis)
+        """
+        tags = [CacheTags.collection("templates")]
+        if template_id:
+            tags.append(CacheTags.template(template_id))
+        await cache.invalidate_tags(*tags)
+
     @staticmethod
     async def get_user_projects_optimized(
         db: AsyncIOMotorDatabase,
@@ -592,20 +803,28 @@ class QueryOptimizer:
         Query optimisée avec cache et pagination
         """
         # Check cache
-        cache_key = f"user_projects:{user_id}:{limit}:{skip}"
-        cached = await cache.get(cache_key)
+        cache_key = await cache.tagged_key(
+            f"user_projects:{user_id}:{limit}:{skip}",
+            [CacheTags.user(user_id)]
+        )
+        cached = await cache.get(cache_key) if cache_key else None
         if cached:
             return cached
 
-        # Query avec index (user_id + updated_at)
-        projects = await db.projects.find(
-            {"user_id": user_id}
-        ).sort(
-            "updated_at", DESCENDING
-        ).skip(skip).limit(limit).to_list(length=limit)
+        # Query avec index (user_id + updated_at), métadonnées seulement :
+        # les contenus sont dans le ProjectFileStore
+        projects = await db.projects.aggregate(
+            ProjectFileStore(db).metadata_pipeline(
+                {"user_id": user_id},
+                limit=limit,
+                sort={"updated_at": DESCENDING},
+                skip=skip
+            )
+        ).to_list(length=limit)
 
         # Stocker dans cache (5 min)
-        await cache.set(cache_key, projects, ttl=300)
+        if cache_key:
+            await cache.set(cache_key, projects, ttl=300)
 
         return projects
 
@@ -619,22 +838,21 @@ class QueryOptimizer:
         """
         Templates populaires avec cache
         """
-        # Cache key
-        cache_key = f"popular_templates:{category}:{limit}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-
-        # Query avec index composé
-        query = {"category": category} if category else {}
-        templates = await db.templates.find(query).sort(
-            "usage_count", DESCENDING
-        ).limit(limit).to_list(length=limit)
+        async def load_templates():
+            # Query avec index composé
+            query = {"category": category} if category else {}
+            return await db.templates.find(query).sort(
+                "usage_count", DESCENDING
+            ).limit(limit).to_list(length=limit)
 
+        # Clé chaude : protégée contre les stampedes à l'expiration
         # Cache plus long (30 min car change peu)
-        await cache.set(cache_key, templates, ttl=1800)
-
-        return templates
+        return await cache.get_or_set(
+            f"popular_templates:{category}:{limit}",
+            load_templates,
+            ttl=1800,
+            tags=[CacheTags.collection("templates")]
+        )
 
     @staticmethod
     async def search_projects_optimized(
@@ -648,8 +866,11 @@ class QueryOptimizer:
         Recherche full-text optimisée
         """
         # Check cache
-        cache_key = f"search:{user_id}:{search_query}:{limit}"
-        cached = await cache.get(cache_key)
+        cache_key = await cache.tagged_key(
+            f"search:{user_id}:{search_query}:{limit}",
+            [CacheTags.user(user_id)]
+        )
+        cached = await cache.get(cache_key) if cache_key else None
         if cached:
             return cached
 
@@ -667,7 +888,8 @@ class QueryOptimizer:
         ).limit(limit).to_list(length=limit)
 
         # Cache court (1 min car search peut évoluer)
-        await cache.set(cache_key, results, ttl=60)
+        if cache_key:
+            await cache.set(cache_key, results, ttl=60)
 
         return results
 
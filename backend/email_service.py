@@ -1,3 +1,4 @@
+import asyncio
 import httpx
 import logging
 from typing import Optional
@@ -13,6 +14,24 @@ class EmailService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.config_service = ConfigService(db)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_key: Optional[str] = None
+    
+    def _get_client(self, api_key: str) -> httpx.AsyncClient:
+        """Client Resend réutilisé, recréé seulement si la clé API change"""
+        if self._client is None or self._client.is_closed or api_key != self._client_key:
+            if self._client is not None and not self._client.is_closed:
+                asyncio.get_running_loop().create_task(self._client.aclose())
+            self._client = httpx.AsyncClient(
+                base_url='https://api.resend.com',
+                headers={
+                    'Authorization': f'Bearer {api_key}',
+                    'Content-Type': 'application/json'
+                },
+                timeout=10.0
+            )
+            self._client_key = api_key
+        return self._client
     
     async def send_email(self, to: str, subject: str, html: str) -> bool:
         """Send an email via Resend"""
@@ -23,28 +42,22 @@ class EmailService:
             return False
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    'https://api.resend.com/emails',
-                    headers={
-                        'Authorization': f'Bearer {api_key}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        'from': f'Devora <{from_email}>',
-                        'to': [to],
-                        'subject': subject,
-                        'html': html
-                    },
-                    timeout=10.0
-                )
-                
-                if response.status_code in [200, 201]:
-                    logger.info(f'Email sent successfully to {to}')
-                    return True
-                else:
-                    logger.error(f'Failed to send email: {response.status_code} - {response.text}')
-                    return False
+            response = await self._get_client(api_key).post(
+                '/emails',
+                json={
+                    'from': f'Devora <{from_email}>',
+                    'to': [to],
+                    'subject': subject,
+                    'html': html
+                }
+            )
+            
+            if response.status_code in [200, 201]:
+                logger.info(f'Email sent successfully to {to}')
+                return True
+            else:
+                logger.error(f'Failed to send email: {response.status_code} - {response.text}')
+                return False
         except Exception as e:
             logger.error(f'Error sending email: {str(e)}')
             return False
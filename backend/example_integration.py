@@ -46,6 +46,7 @@ async def startup():
     # Initialize services (singletons)
     app.state.posthog = get_posthog_client(app.state.db_pool)
     app.state.metrics = get_metrics_service(app.state.db_pool)
+    app.state.metrics.start_maintenance(interval=300)
     app.state.search = get_search_service(app.state.db_pool)
     app.state.rag = get_rag_pipeline(app.state.db_pool)
     app.state.embeddings = get_embedding_service(app.state.db_pool)
@@ -57,7 +58,10 @@ async def startup():
 async def shutdown():
     """Cleanup on shutdown"""
     if hasattr(app.state, 'posthog'):
-        app.state.posthog.shutdown()
+        await app.state.posthog.aclose()
+
+    if hasattr(app.state, 'metrics'):
+        await app.state.metrics.stop_maintenance()
 
     if hasattr(app.state, 'db_pool'):
         await app.state.db_pool.close()
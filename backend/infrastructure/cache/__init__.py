@@ -6,10 +6,19 @@ Provides a robust, production-ready Redis caching system with:
 - Decorator-based caching for functions
 - Standardized cache key management
 - Pattern-based cache invalidation
+- Tag-versioned invalidation (O(1), no SCAN)
+- Binary, compressed value codec and bulk get/set
+- Optional in-process near cache (L1) with pub/sub invalidation
 - Connection pooling and health checks
 """
 
 from .redis_cache import RedisCache, cached, get_cache
 from .cache_keys import CacheKeys
+from .codec import CacheCodec
+from .near_cache import NearCache
+from .tags import CacheTags, TagVersions
 
-__all__ = ["RedisCache", "cached", "get_cache", "CacheKeys"]
+__all__ = [
+    "RedisCache", "cached", "get_cache", "CacheKeys", "CacheCodec",
+    "CacheTags", "TagVersions", "NearCache",
+]
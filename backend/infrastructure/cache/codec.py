@@ -0,0 +1,96 @@
+"""
+Cache Value Codec
+
+Binary serialization for cached values:
+- BSON (pymongo's C extension) preserves datetimes, ObjectIds, bytes,
+  Decimal128 and nested documents, unlike JSON with default=str
+- Values BSON cannot hold (non-string keys, sets, >64-bit ints...) fall
+  back to JSON so caching never fails
+- Payloads above a size threshold are zlib-compressed
+- Every payload starts with a version byte; anything else is read as a
+  legacy JSON string, so entries written before a rollout stay readable
+
+Layout: [version][flags][body]
+
+Usage:
+    codec = CacheCodec()
+    data = codec.encode({"created_at": datetime.now(timezone.utc)})
+    value = codec.decode(data)
+"""
+
+import json
+import zlib
+from datetime import timezone
+from typing import Any, Optional, Union
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.errors import InvalidDocument
+
+FORMAT_VERSION = 1
+
+FLAG_COMPRESSED = 0x01
+FLAG_JSON = 0x02
+
+# Datetimes come back timezone-aware in UTC (BSON stores milliseconds)
+_CODEC_OPTIONS = CodecOptions(tz_aware=True, tzinfo=timezone.utc)
+
+
+class CacheCodec:
+    """
+    Versioned binary codec for cache values.
+
+    Any object with the same encode()/decode() methods can be passed to
+    the caches instead.
+    """
+
+    def __init__(self, compress_threshold: int = 1024, compress_level: int = 1):
+        """
+        Args:
+            compress_threshold: Compress bodies larger than this many bytes
+            compress_level: zlib level (1 favours CPU over ratio)
+        """
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value to bytes."""
+        flags = 0
+        try:
+            body = bson.encode({"v": value})
+        except (InvalidDocument, OverflowError, TypeError):
+            body = json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+            flags |= FLAG_JSON
+
+        if len(body) > self.compress_threshold:
+            compressed = zlib.compress(body, self.compress_level)
+            if len(compressed) < len(body):
+                body = compressed
+                flags |= FLAG_COMPRESSED
+
+        return bytes((FORMAT_VERSION, flags)) + body
+
+    def decode(self, data: Optional[Union[bytes, str]]) -> Any:
+        """Deserialize bytes produced by encode() (or a legacy JSON string)."""
+        if data is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if len(data) < 2 or data[0] != FORMAT_VERSION:
+            return self._decode_legacy(data)
+
+        flags = data[1]
+        body = data[2:]
+        if flags & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        if flags & FLAG_JSON:
+            return json.loads(body)
+        return bson.decode(body, codec_options=_CODEC_OPTIONS)["v"]
+
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Any:
+        text = data.decode("utf-8", errors="replace")
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
@@ -0,0 +1,265 @@
+"""
+Near Cache (in-process L1 in front of Redis)
+
+Hot, small values (config, plan limits, template lists...) are read far
+more often than they change. NearCache keeps the raw Redis payloads of
+recently read keys in process memory so repeated reads skip the network:
+
+- Bounded LRU by entry count and by total payload bytes
+- Short local TTL as an upper bound on staleness
+- Cross-worker invalidation over a Redis pub/sub channel: every write
+  through a cache publishes the keys it touched and every process drops
+  them from its L1
+- L1 is only served while the invalidation subscription is live; on
+  disconnect it is cleared and bypassed until resubscribed
+- Reads that race with an invalidation are not stored (version check)
+
+Payloads are stored encoded and decoded on every hit, so callers never
+share (and mutate) the same object.
+
+Usage:
+    near = NearCache(max_entries=2048, max_bytes=8 * 1024 * 1024, ttl=30)
+    cache = RedisCache(redis_url, near_cache=near)
+"""
+
+import asyncio
+import fnmatch
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class NearCache:
+    """
+    Bounded in-process L1 for a Redis cache.
+
+    The owning cache calls lookup() before GET, store() after it, and
+    publish() after every write; start() runs the invalidation listener.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 8 * 1024 * 1024,
+        ttl: float = 30.0,
+        max_entry_bytes: int = 64 * 1024,
+        channel: str = "near-cache:invalidate",
+    ):
+        """
+        Args:
+            max_entries: Maximum number of keys kept in memory
+            max_bytes: Maximum total payload size kept in memory
+            ttl: Seconds an entry may be served locally
+            max_entry_bytes: Larger payloads are never kept locally
+            channel: Pub/sub channel shared by every process of the cache
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.channel = channel
+
+        # Identifies this process so it ignores its own invalidations
+        self.node_id = secrets.token_hex(8)
+
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._version = 0
+        self._connected = False
+        self._listener: Optional[asyncio.Task] = None
+
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def active(self) -> bool:
+        """True while invalidations are being received."""
+        return self._connected
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def version(self) -> int:
+        """Token to pass to store(); take it before reading Redis."""
+        return self._version
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Raw payload cached for `key`, or None."""
+        if not self._connected:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self._metrics["misses"] += 1
+            return None
+        payload, size, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._drop(key)
+            self._metrics["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._metrics["hits"] += 1
+        return payload
+
+    def store(self, key: str, payload: Any, version: int) -> None:
+        """
+        Keep a payload read from Redis.
+
+        Args:
+            key: Full Redis key
+            payload: Raw value as returned by Redis
+            version: version() taken before the read; if anything was
+                invalidated since, the payload may be stale and is skipped
+        """
+        if not self._connected or version != self._version or payload is None:
+            return
+        size = len(payload) if isinstance(payload, (bytes, str)) else 0
+        if size > self.max_entry_bytes:
+            return
+
+        self._drop(key)
+        self._entries[key] = (payload, size, time.monotonic() + self.ttl)
+        self._bytes += size
+        self._metrics["stores"] += 1
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._metrics["evictions"] += 1
+
+    def invalidate(self, keys: Iterable[str] = (), pattern: Optional[str] = None) -> None:
+        """Drop keys (and keys matching a glob pattern) locally."""
+        self._version += 1
+        for key in keys:
+            self._drop(key)
+        if pattern is not None:
+            for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+                self._drop(key)
+        self._metrics["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drop every local entry."""
+        self._version += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    # ------------------------------------------------------------------
+    # Cross-process invalidation
+    # ------------------------------------------------------------------
+
+    async def publish(
+        self,
+        client: Any,
+        keys: Iterable[str] = (),
+        pattern: Optional[str] = None,
+    ) -> None:
+        """
+        Invalidate keys locally and in every other process.
+
+        Args:
+            client: redis.asyncio client
+            keys: Full Redis keys that were written or deleted
+            pattern: Glob pattern of full keys that were deleted
+        """
+        keys = list(keys)
+        self.invalidate(keys, pattern)
+        message = {"n": self.node_id, "k": keys}
+        if pattern is not None:
+            message["p"] = pattern
+        try:
+            await client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            # Peers keep their entries until the local TTL expires
+            logger.error(f"[NearCache] Publish error: {e}")
+
+    def start(self, client: Any) -> None:
+        """Start the invalidation listener (idempotent)."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen(client))
+
+    async def stop(self) -> None:
+        """Stop the invalidation listener and drop every entry."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._disconnect()
+
+    def _disconnect(self) -> None:
+        self._connected = False
+        self.clear()
+
+    async def _listen(self, client: Any) -> None:
+        delay = 0.5
+        while True:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                self._connected = True
+                delay = 0.5
+                logger.info(f"[NearCache] Listening for invalidations on {self.channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._on_message(message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[NearCache] Invalidation listener error: {e}")
+            finally:
+                self._disconnect()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _on_message(self, data: Any) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            self.clear()
+            return
+        if message.get("n") == self.node_id:
+            return
+        self.invalidate(message.get("k") or (), message.get("p"))
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_metrics(self) -> dict:
+        """L1 hit/miss counters and memory usage."""
+        total = self._metrics["hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "hit_rate": round(self._metrics["hits"] / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "active": self._connected,
+        }
+
+    def reset_metrics(self) -> None:
+        """Reset L1 counters."""
+        for name in self._metrics:
+            self._metrics[name] = 0
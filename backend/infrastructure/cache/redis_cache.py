@@ -4,8 +4,13 @@ Redis Cache Implementation
 A production-ready Redis caching system with:
 - Async operations using redis.asyncio
 - Connection pooling
+- Binary, compressed value encoding (see codec.py)
+- Bulk get_many/set_many (one round trip)
+- Optional in-process L1 (near cache) with pub/sub invalidation
 - TTL management
 - Pattern-based invalidation
+- Tag-versioned invalidation (O(1) per tag, no SCAN)
+- Stampede-protected get_or_set (single-flight, lease, early refresh)
 - Decorator for automatic function caching
 - Metrics and health checks
 """
@@ -13,12 +18,18 @@ A production-ready Redis caching system with:
 import redis.asyncio as redis
 import json
 import hashlib
+import inspect
 import logging
 import time
-from typing import Any, Optional, Callable, TypeVar, Union
+from typing import Any, Dict, Optional, Callable, TypeVar, Union, Iterable, List
 from functools import wraps
 from contextlib import asynccontextmanager
 
+from .codec import CacheCodec
+from .near_cache import NearCache
+from .stampede import StampedeGuard, unwrap
+from .tags import CacheTags, TagVersions
+
 logger = logging.getLogger(__name__)
 
 # Type variable for generic cached function return types
@@ -34,9 +45,12 @@ class RedisCache:
 
     Features:
     - Connection pooling for performance
-    - Automatic serialization/deserialization
+    - Automatic serialization/deserialization (BSON, zlib above a threshold)
+    - Bulk reads and writes
+    - Optional near cache (L1) for hot keys
     - TTL-based expiration
     - Pattern-based cache invalidation
+    - Tag-versioned invalidation
     - Metrics tracking
     - Health check support
 
@@ -52,6 +66,8 @@ class RedisCache:
         default_ttl: int = 3600,
         key_prefix: str = "devora",
         max_connections: int = 10,
+        codec: Optional[Any] = None,
+        near_cache: Optional[NearCache] = None,
     ):
         """
         Initialize Redis cache.
@@ -61,11 +77,21 @@ class RedisCache:
             default_ttl: Default TTL in seconds (default: 1 hour)
             key_prefix: Prefix for all cache keys
             max_connections: Maximum number of Redis connections
+            codec: Value codec with encode()/decode() (default: CacheCodec)
+            near_cache: In-process L1 for hot keys (default: none)
         """
         self.redis_url = redis_url
         self.default_ttl = default_ttl
         self.key_prefix = key_prefix
         self.max_connections = max_connections
+        self.codec = codec or CacheCodec()
+        self.near_cache = near_cache
+
+        # Tag generations live in the same namespace as the entries
+        self._tags = TagVersions(key_prefix=f"{key_prefix}:", near_cache=near_cache)
+
+        # Shared by get_or_set calls for single-flight
+        self._guard = StampedeGuard(codec=self.codec)
 
         # Connection pool (lazy initialization)
         self._pool: Optional[redis.ConnectionPool] = None
@@ -87,9 +113,11 @@ class RedisCache:
                 self._pool = redis.ConnectionPool.from_url(
                     self.redis_url,
                     max_connections=self.max_connections,
-                    decode_responses=True,
+                    decode_responses=False,
                 )
                 self._redis = redis.Redis(connection_pool=self._pool)
+                if self.near_cache is not None:
+                    self.near_cache.start(self._redis)
                 logger.info(f"[RedisCache] Connected to Redis at {self.redis_url}")
             except Exception as e:
                 logger.error(f"[RedisCache] Connection failed: {e}")
@@ -101,18 +129,15 @@ class RedisCache:
         """Create a namespaced cache key."""
         return f"{self.key_prefix}:{key}"
 
-    def _serialize(self, value: Any) -> str:
-        """Serialize value to JSON string."""
-        return json.dumps(value, default=str, ensure_ascii=False)
+    def _serialize(self, value: Any) -> bytes:
+        """Serialize value with the cache codec."""
+        return self.codec.encode(value)
 
-    def _deserialize(self, value: Optional[str]) -> Optional[Any]:
-        """Deserialize JSON string to Python object."""
+    def _deserialize(self, value: Optional[bytes]) -> Optional[Any]:
+        """Deserialize codec bytes (or a legacy JSON string) to a Python object."""
         if value is None:
             return None
-        try:
-            return json.loads(value)
-        except json.JSONDecodeError:
-            return value
+        return unwrap(self.codec.decode(value))
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -127,11 +152,21 @@ class RedisCache:
         try:
             client = await self._get_client()
             full_key = self._make_key(key)
+
+            near = self.near_cache
+            if near is not None:
+                payload = near.lookup(full_key)
+                if payload is not None:
+                    return self._deserialize(payload)
+                version = near.version()
+
             value = await client.get(full_key)
 
             if value is not None:
                 self._metrics["hits"] += 1
                 logger.debug(f"[RedisCache] HIT: {key}")
+                if near is not None:
+                    near.store(full_key, value, version)
                 return self._deserialize(value)
             else:
                 self._metrics["misses"] += 1
@@ -154,7 +189,7 @@ class RedisCache:
 
         Args:
             key: Cache key (will be prefixed automatically)
-            value: Value to cache (must be JSON serializable)
+            value: Value to cache (BSON types are preserved, others fall back to JSON)
             ttl: Time-to-live in seconds (uses default if None)
 
         Returns:
@@ -170,6 +205,8 @@ class RedisCache:
                 ttl_seconds,
                 self._serialize(value),
             )
+            if self.near_cache is not None:
+                await self.near_cache.publish(client, [full_key])
 
             self._metrics["sets"] += 1
             logger.debug(f"[RedisCache] SET: {key} (TTL: {ttl_seconds}s)")
@@ -180,6 +217,94 @@ class RedisCache:
             self._metrics["errors"] += 1
             return False
 
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several values in one MGET.
+
+        Args:
+            keys: Cache keys (will be prefixed automatically)
+
+        Returns:
+            Dict of key -> value for the keys found (missing keys are omitted)
+        """
+        if not keys:
+            return {}
+
+        near = self.near_cache
+        payloads = {}
+        remote = list(keys)
+        if near is not None:
+            for key in keys:
+                payload = near.lookup(self._make_key(key))
+                if payload is not None:
+                    payloads[key] = payload
+            remote = [key for key in keys if key not in payloads]
+            version = near.version()
+
+        if remote:
+            try:
+                client = await self._get_client()
+                values = await client.mget([self._make_key(key) for key in remote])
+            except Exception as e:
+                logger.error(f"[RedisCache] MGET error for {len(remote)} keys: {e}")
+                self._metrics["errors"] += 1
+                values = [None] * len(remote)
+            for key, value in zip(remote, values):
+                if value is None:
+                    continue
+                payloads[key] = value
+                self._metrics["hits"] += 1
+                if near is not None:
+                    near.store(self._make_key(key), value, version)
+            self._metrics["misses"] += len(remote) - sum(v is not None for v in values)
+
+        found = {}
+        for key, payload in payloads.items():
+            try:
+                found[key] = self._deserialize(payload)
+            except Exception as e:
+                logger.error(f"[RedisCache] Decode error for {key}: {e}")
+                self._metrics["errors"] += 1
+        return found
+
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        ttl: Optional[int] = None,
+    ) -> bool:
+        """
+        Set several values atomically in one MULTI/EXEC round trip.
+
+        Args:
+            mapping: Dict of key -> value (keys will be prefixed automatically)
+            ttl: Time-to-live in seconds (uses default if None)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not mapping:
+            return True
+        try:
+            client = await self._get_client()
+            ttl_seconds = ttl if ttl is not None else self.default_ttl
+            async with client.pipeline(transaction=True) as pipe:
+                for key, value in mapping.items():
+                    pipe.setex(self._make_key(key), ttl_seconds, self._serialize(value))
+                await pipe.execute()
+            if self.near_cache is not None:
+                await self.near_cache.publish(
+                    client, [self._make_key(key) for key in mapping]
+                )
+
+            self._metrics["sets"] += len(mapping)
+            logger.debug(f"[RedisCache] SET_MANY: {len(mapping)} keys (TTL: {ttl_seconds}s)")
+            return True
+
+        except Exception as e:
+            logger.error(f"[RedisCache] SET_MANY error for {len(mapping)} keys: {e}")
+            self._metrics["errors"] += 1
+            return False
+
     async def delete(self, key: str) -> bool:
         """
         Delete a value from cache.
@@ -194,6 +319,8 @@ class RedisCache:
             client = await self._get_client()
             full_key = self._make_key(key)
             result = await client.delete(full_key)
+            if self.near_cache is not None:
+                await self.near_cache.publish(client, [full_key])
 
             self._metrics["deletes"] += 1
             logger.debug(f"[RedisCache] DELETE: {key}")
@@ -247,6 +374,9 @@ class RedisCache:
                 if cursor == 0:
                     break
 
+            if self.near_cache is not None:
+                await self.near_cache.publish(client, pattern=full_pattern)
+
             logger.info(f"[RedisCache] Invalidated {deleted_count} keys matching: {pattern}")
             return deleted_count
 
@@ -255,41 +385,109 @@ class RedisCache:
             self._metrics["errors"] += 1
             return 0
 
+    async def tagged_key(self, key: str, tags: Optional[Iterable[str]]) -> Optional[str]:
+        """
+        Key for an entry that depends on `tags`.
+
+        Use the returned key for both get() and set(); the entry stops being
+        read as soon as any of its tags is invalidated.
+
+        Args:
+            key: Cache key
+            tags: Tags the entry depends on (see CacheTags)
+
+        Returns:
+            Key stamped with the tags' current generations, or None if the
+            generations could not be read (the entry must not be cached)
+        """
+        try:
+            client = await self._get_client()
+            return await self._tags.stamp(client, key, tags)
+        except Exception as e:
+            logger.error(f"[RedisCache] TAG lookup error for {key}: {e}")
+            self._metrics["errors"] += 1
+            return None
+
+    async def invalidate_tags(self, *tags: str) -> bool:
+        """
+        Invalidate every entry depending on any of `tags` (O(1) per tag).
+
+        Args:
+            *tags: Tags to invalidate (see CacheTags)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            client = await self._get_client()
+            await self._tags.bump(client, *tags)
+            logger.debug(f"[RedisCache] INVALIDATE_TAGS: {', '.join(tags)}")
+            return True
+        except Exception as e:
+            logger.error(f"[RedisCache] INVALIDATE_TAGS error for {tags}: {e}")
+            self._metrics["errors"] += 1
+            return False
+
     async def get_or_set(
         self,
         key: str,
         factory: Callable[[], Any],
         ttl: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
     ) -> Any:
         """
         Get value from cache or compute and store it.
 
+        Protected against stampedes: one computation per key per process,
+        one worker of the fleet recomputing at a time (Redis lease), and
+        probabilistic refresh before expiry during which other callers
+        are served the current value.
+
         Args:
             key: Cache key
             factory: Function to compute value if not cached
             ttl: Time-to-live in seconds
+            tags: Tags the entry depends on (see CacheTags)
 
         Returns:
             Cached or computed value
         """
-        value = await self.get(key)
+        ttl_seconds = ttl if ttl is not None else self.default_ttl
+        try:
+            client = await self._get_client()
+        except Exception:
+            client = None
+
+        if client is not None and tags:
+            key = await self.tagged_key(key, tags)
 
-        if value is not None:
+        if client is None or key is None:
+            # Cache unavailable: compute without caching
+            value = factory() if callable(factory) else factory
+            if inspect.isawaitable(value):
+                value = await value
             return value
 
-        # Compute value
-        if callable(factory):
-            # Handle async factories
-            import asyncio
-            if asyncio.iscoroutinefunction(factory):
-                value = await factory()
-            else:
-                value = factory()
-        else:
-            value = factory
+        full_key = self._make_key(key)
+        near = self.near_cache
+        if near is not None:
+            payload = near.lookup(full_key)
+            if payload is not None:
+                return self._deserialize(payload)
+            version = near.version()
 
-        # Cache the result
-        await self.set(key, value, ttl)
+        value, from_cache = await self._guard.get_or_compute(
+            client, full_key, factory, ttl_seconds
+        )
+        if from_cache:
+            self._metrics["hits"] += 1
+            if near is not None:
+                near.store(full_key, self._serialize(value), version)
+        else:
+            self._metrics["misses"] += 1
+            self._metrics["sets"] += 1
+            if near is not None:
+                await near.publish(client, [full_key])
         return value
 
     async def increment(self, key: str, amount: int = 1) -> int:
@@ -297,7 +495,10 @@ class RedisCache:
         try:
             client = await self._get_client()
             full_key = self._make_key(key)
-            return await client.incrby(full_key, amount)
+            value = await client.incrby(full_key, amount)
+            if self.near_cache is not None:
+                await self.near_cache.publish(client, [full_key])
+            return value
         except Exception as e:
             logger.error(f"[RedisCache] INCREMENT error for {key}: {e}")
             self._metrics["errors"] += 1
@@ -346,11 +547,15 @@ class RedisCache:
         total = self._metrics["hits"] + self._metrics["misses"]
         hit_rate = self._metrics["hits"] / total if total > 0 else 0.0
 
-        return {
+        metrics = {
             **self._metrics,
             "total_requests": total,
             "hit_rate": round(hit_rate, 4),
         }
+        if self.near_cache is not None:
+            # Redis counters above only cover reads the L1 did not serve
+            metrics["near_cache"] = self.near_cache.get_metrics()
+        return metrics
 
     def reset_metrics(self) -> None:
         """Reset all metrics counters."""
@@ -361,9 +566,13 @@ class RedisCache:
             "deletes": 0,
             "errors": 0,
         }
+        if self.near_cache is not None:
+            self.near_cache.reset_metrics()
 
     async def close(self) -> None:
         """Close Redis connections."""
+        if self.near_cache is not None:
+            await self.near_cache.stop()
         if self._redis:
             await self._redis.close()
             self._redis = None
@@ -377,6 +586,8 @@ class RedisCache:
         """
         Context manager for Redis pipeline (batch operations).
 
+        Values are not encoded: use set_many() for cached values.
+
         Example:
             async with cache.pipeline() as pipe:
                 await pipe.set("key1", "value1")
@@ -419,6 +630,7 @@ def cached(
     key_prefix: str = "",
     key_builder: Optional[Callable[..., str]] = None,
     cache_none: bool = False,
+    tags: Optional[Callable[..., Iterable[str]]] = None,
 ):
     """
     Decorator to cache async function results.
@@ -428,6 +640,8 @@ def cached(
         key_prefix: Prefix for cache keys (default: function name)
         key_builder: Custom function to build cache key from args/kwargs
         cache_none: Whether to cache None results (default: False)
+        tags: Function returning the tags an entry depends on, called with
+            the same args/kwargs (see CacheTags)
 
     Example:
         @cached(ttl=300, key_prefix="user")
@@ -439,29 +653,49 @@ def cached(
         async def get_project(project_id: str, include_details: bool = False):
             ...
 
+        # Invalidated by get_cache().invalidate_tags(CacheTags.project(project_id))
+        @cached(ttl=300, tags=lambda project_id: [CacheTags.project(project_id)])
+        async def get_project_files(project_id: str):
+            ...
+
+        await get_project.invalidate("abc")   # one entry
+        await get_project.invalidate_all()    # every entry of the function
+
     Note:
         Requires a global cache instance to be initialized via get_cache()
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        prefix = key_prefix or func.__name__
+        function_tag = CacheTags.function(prefix)
+
+        def build_key(*args, **kwargs) -> str:
+            if key_builder:
+                return key_builder(*args, **kwargs)
+            # Default key: prefix:hash(args)
+            key_data = {
+                "args": [str(a) for a in args],
+                "kwargs": {k: str(v) for k, v in sorted(kwargs.items())},
+            }
+            key_hash = hashlib.md5(
+                json.dumps(key_data, sort_keys=True).encode()
+            ).hexdigest()[:12]
+            return f"{prefix}:{key_hash}"
+
+        def build_tags(*args, **kwargs) -> list:
+            entry_tags = list(tags(*args, **kwargs)) if tags else []
+            return entry_tags + [function_tag]
+
         @wraps(func)
         async def wrapper(*args, **kwargs) -> T:
             # Get cache instance
             cache = get_cache()
 
-            # Build cache key
-            if key_builder:
-                cache_key = key_builder(*args, **kwargs)
-            else:
-                # Default key: prefix:func_name:hash(args)
-                prefix = key_prefix or func.__name__
-                key_data = {
-                    "args": [str(a) for a in args],
-                    "kwargs": {k: str(v) for k, v in sorted(kwargs.items())},
-                }
-                key_hash = hashlib.md5(
-                    json.dumps(key_data, sort_keys=True).encode()
-                ).hexdigest()[:12]
-                cache_key = f"{prefix}:{key_hash}"
+            # Build cache key, stamped with the entry's tag generations
+            cache_key = await cache.tagged_key(
+                build_key(*args, **kwargs), build_tags(*args, **kwargs)
+            )
+            if cache_key is None:
+                return await func(*args, **kwargs)
 
             # Try to get from cache
             cached_value = await cache.get(cache_key)
@@ -478,10 +712,21 @@ def cached(
 
             return result
 
-        # Attach cache invalidation helper
-        wrapper.invalidate = lambda *a, **kw: get_cache().delete(
-            key_builder(*a, **kw) if key_builder else f"{key_prefix or func.__name__}:*"
-        )
+        async def invalidate(*args, **kwargs) -> bool:
+            """Drop the entry cached for these arguments."""
+            cache = get_cache()
+            cache_key = await cache.tagged_key(
+                build_key(*args, **kwargs), build_tags(*args, **kwargs)
+            )
+            return cache_key is not None and await cache.delete(cache_key)
+
+        async def invalidate_all() -> bool:
+            """Drop every entry cached for this function."""
+            return await get_cache().invalidate_tags(function_tag)
+
+        # Attach cache invalidation helpers
+        wrapper.invalidate = invalidate
+        wrapper.invalidate_all = invalidate_all
 
         return wrapper
 
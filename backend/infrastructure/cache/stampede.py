@@ -0,0 +1,226 @@
+"""
+Stampede-Protected Read-Through Caching
+
+Recomputing a hot key when it expires can send every request of every
+worker to the database at once. StampedeGuard prevents that with:
+
+- Single-flight: concurrent misses in one process share one computation
+- Lease lock: a short Redis `SET NX PX` lease lets one worker of the
+  fleet recompute; the others wait for its result
+- Probabilistic early refresh (XFetch): entries remember how long they
+  took to compute and are refreshed before they expire, with a
+  probability that grows as expiry approaches, so hot keys never go cold
+- Stale serving: while one caller refreshes an entry, everyone else gets
+  the previous value instead of waiting
+
+Entries are stored as a small envelope `{"__xfetch__": 1, "v": value,
+"d": compute_seconds, "e": logical_expiry}`, serialized with the cache's
+codec, and kept in Redis for an extra `stale_ttl` after their logical
+expiry. Use `unwrap()` to read them through a plain GET.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import random
+import secrets
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .codec import CacheCodec
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_MARKER = "__xfetch__"
+
+# Delete the lease only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def unwrap(value: Any) -> Any:
+    """Value stored in a get_or_set envelope (or `value` itself)."""
+    if isinstance(value, dict) and value.get(ENVELOPE_MARKER):
+        return value.get("v")
+    return value
+
+
+class StampedeGuard:
+    """
+    Read-through helper shared by the Redis cache implementations.
+
+    Example:
+        guard = StampedeGuard()
+        value, from_cache = await guard.get_or_compute(
+            redis_client, "devora:popular_templates:None:10", load_templates, ttl=1800
+        )
+    """
+
+    def __init__(
+        self,
+        beta: float = 1.0,
+        lease_ttl: float = 10.0,
+        stale_ttl: Optional[int] = None,
+        poll_interval: float = 0.05,
+        codec: Optional[Any] = None,
+    ):
+        """
+        Args:
+            beta: XFetch aggressiveness (>1 refreshes earlier, 0 disables it)
+            lease_ttl: Seconds a worker may hold the recompute lease
+            stale_ttl: Seconds an entry stays servable after its TTL while
+                it is being refreshed (default: the entry's TTL)
+            poll_interval: First delay when waiting for another worker
+            codec: Value codec (must match the owning cache's)
+        """
+        self.beta = beta
+        self.lease_ttl = lease_ttl
+        self.stale_ttl = stale_ttl
+        self.poll_interval = poll_interval
+        self.codec = codec or CacheCodec()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(
+        self,
+        client: Any,
+        key: str,
+        factory: Any,
+        ttl: int,
+    ) -> Tuple[Any, bool]:
+        """
+        Cached value for `key`, computing it with `factory` if needed.
+
+        Args:
+            client: redis.asyncio client
+            key: Full Redis key
+            factory: Async or sync callable computing the value (or the value)
+            ttl: Logical time-to-live in seconds
+
+        Returns:
+            Tuple of (value, served_from_cache)
+        """
+        entry = await self._read(client, key)
+
+        if entry is not None:
+            value, delta, expires_at = entry
+            # XFetch: -log(U) is exponential, so refreshes start about
+            # delta * beta seconds before expiry and become certain at it
+            early = delta * self.beta * -math.log(1.0 - random.random())
+            if time.time() + early < expires_at:
+                return value, True
+
+            # Due for refresh: one caller recomputes, everyone else gets stale
+            if key in self._inflight:
+                return value, True
+            token = await self._acquire_lease(client, key)
+            if token is None:
+                return value, True
+            recompute = lambda: self._compute(client, key, factory, ttl, token)
+            return await asyncio.shield(self._single_flight(key, recompute)), False
+
+        # Cold miss: share the computation in-process and across workers
+        fill = lambda: self._fill(client, key, factory, ttl)
+        return await asyncio.shield(self._single_flight(key, fill)), False
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _single_flight(self, key: str, start: Callable) -> asyncio.Future:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(start())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return future
+
+    async def _fill(self, client: Any, key: str, factory: Any, ttl: int) -> Any:
+        token = await self._acquire_lease(client, key)
+        if token is None:
+            # Another worker is computing it: wait for its result
+            deadline = time.monotonic() + self.lease_ttl
+            delay = self.poll_interval
+            while time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+                entry = await self._read(client, key)
+                if entry is not None:
+                    return entry[0]
+            logger.warning(f"[StampedeGuard] Lease holder for {key} timed out, computing")
+        return await self._compute(client, key, factory, ttl, token)
+
+    async def _compute(
+        self,
+        client: Any,
+        key: str,
+        factory: Any,
+        ttl: int,
+        token: Optional[str],
+    ) -> Any:
+        start = time.monotonic()
+        try:
+            if callable(factory):
+                value = factory()
+                if inspect.isawaitable(value):
+                    value = await value
+            else:
+                value = factory
+            await self._write(client, key, value, ttl, time.monotonic() - start)
+            return value
+        finally:
+            if token is not None:
+                await self._release_lease(client, key, token)
+
+    async def _read(self, client: Any, key: str) -> Optional[Tuple[Any, float, float]]:
+        """(value, compute_seconds, logical_expiry) or None"""
+        try:
+            raw = await client.get(key)
+        except Exception as e:
+            logger.error(f"[StampedeGuard] GET error for {key}: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            data = self.codec.decode(raw)
+        except Exception as e:
+            logger.error(f"[StampedeGuard] Decode error for {key}: {e}")
+            return None
+        if isinstance(data, dict) and data.get(ENVELOPE_MARKER):
+            return data.get("v"), float(data.get("d", 0.0)), float(data.get("e", 0.0))
+        # Written by a plain set(): treat as fresh until Redis expires it
+        return data, 0.0, math.inf
+
+    async def _write(self, client: Any, key: str, value: Any, ttl: int, delta: float) -> None:
+        envelope = {ENVELOPE_MARKER: 1, "v": value, "d": round(delta, 4), "e": time.time() + ttl}
+        stale_ttl = self.stale_ttl if self.stale_ttl is not None else ttl
+        try:
+            await client.setex(
+                key,
+                int(ttl + stale_ttl),
+                self.codec.encode(envelope),
+            )
+        except Exception as e:
+            logger.error(f"[StampedeGuard] SET error for {key}: {e}")
+
+    async def _acquire_lease(self, client: Any, key: str) -> Optional[str]:
+        token = secrets.token_hex(8)
+        try:
+            acquired = await client.set(
+                f"{key}:lease", token, nx=True, px=int(self.lease_ttl * 1000)
+            )
+        except Exception as e:
+            # Without Redis there is no one to coordinate with
+            logger.error(f"[StampedeGuard] Lease error for {key}: {e}")
+            return token
+        return token if acquired else None
+
+    async def _release_lease(self, client: Any, key: str, token: str) -> None:
+        try:
+            await client.eval(_RELEASE_SCRIPT, 1, f"{key}:lease", token)
+        except Exception as e:
+            logger.error(f"[StampedeGuard] Lease release error for {key}: {e}")
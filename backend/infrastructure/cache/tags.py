@@ -0,0 +1,147 @@
+"""
+Tag-Versioned Cache Invalidation
+
+Every cached entry can depend on entity tags (a user, a project, a
+template...). Each tag has a generation counter in Redis and entry keys
+are stamped with the current generation of their tags:
+
+    projects:list_projects:<hash>  ->  projects:list_projects:<hash>@3
+
+Invalidating a tag is a single INCR: every key stamped with the old
+generation stops being read and expires through its own TTL. No SCAN,
+no KEYS, and the cost does not depend on how many entries depend on it.
+
+With a NearCache, generations are kept in L1 like any hot key and a bump
+publishes their invalidation, so a tagged read of a hot entry never
+touches Redis.
+
+Usage:
+    from infrastructure.cache.tags import CacheTags, TagVersions
+
+    tags = TagVersions()
+    key = await tags.stamp(redis_client, "user:123:projects", [CacheTags.user("123")])
+    await redis_client.setex(key, 300, payload)
+
+    await tags.bump(redis_client, CacheTags.user("123"))  # invalidates it
+"""
+
+from typing import Any, Iterable, Optional
+
+from .near_cache import NearCache
+
+
+# Shared by every cache layer, so a bump from one is seen by all of them
+DEFAULT_KEY_PREFIX = "devora:"
+
+
+class CacheTags:
+    """
+    Tag names for entities cached entries depend on.
+
+    Use the entity tags for data about one entity and `collection` for
+    listings that change whenever any entity of the collection does.
+    """
+
+    @staticmethod
+    def user(user_id: str) -> str:
+        """Data owned by or derived from a user."""
+        return f"user:{user_id}"
+
+    @staticmethod
+    def project(project_id: str) -> str:
+        """Data derived from a project."""
+        return f"project:{project_id}"
+
+    @staticmethod
+    def template(template_id: str) -> str:
+        """Data derived from a template."""
+        return f"template:{template_id}"
+
+    @staticmethod
+    def collection(name: str) -> str:
+        """Listings over a whole collection (e.g. popular templates)."""
+        return f"collection:{name}"
+
+    @staticmethod
+    def function(name: str) -> str:
+        """Every entry cached for a decorated function."""
+        return f"func:{name}"
+
+
+class TagVersions:
+    """
+    Generation counters for cache tags, stored next to the cached data.
+
+    Generation keys outlive any cached entry (TAG_TTL is refreshed on each
+    bump), so an expired counter can never resurrect a stale entry.
+
+    Given a NearCache, generations are read from L1 first and only the
+    missing ones are fetched; bump() invalidates them in every process.
+    """
+
+    TAG_TTL = 7 * 24 * 3600  # seconds; must exceed the longest entry TTL
+
+    def __init__(self, key_prefix: str = DEFAULT_KEY_PREFIX, near_cache: Optional[NearCache] = None):
+        """
+        Args:
+            key_prefix: Prepended to generation keys (match the cache's namespace)
+            near_cache: In-process L1 for generations (default: none)
+        """
+        self.key_prefix = key_prefix
+        self.near_cache = near_cache
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}tag:{tag}"
+
+    async def generations(self, client: Any, tags: Iterable[str]) -> list:
+        """Current generation of each tag (0 if never bumped), in at most one MGET."""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return []
+
+        near = self.near_cache
+        if near is None:
+            values = await client.mget(tag_keys)
+            return [int(v) if v is not None else 0 for v in values]
+
+        values = [near.lookup(tag_key) for tag_key in tag_keys]
+        missing = [i for i, v in enumerate(values) if v is None]
+        if missing:
+            version = near.version()
+            fetched = await client.mget([tag_keys[i] for i in missing])
+            for i, value in zip(missing, fetched):
+                # Never-bumped tags are cached too, as generation 0
+                values[i] = value if value is not None else b"0"
+                near.store(tag_keys[i], values[i], version)
+        return [int(v) for v in values]
+
+    async def stamp(self, client: Any, key: str, tags: Optional[Iterable[str]]) -> str:
+        """
+        Key for an entry depending on `tags`, at their current generations.
+
+        Args:
+            client: redis.asyncio client
+            key: Unversioned cache key
+            tags: Tags the entry depends on (order does not matter)
+
+        Returns:
+            `key` unchanged without tags, else `key@g1.g2...`
+        """
+        tags = sorted(set(tags or ()))
+        if not tags:
+            return key
+        generations = await self.generations(client, tags)
+        return f"{key}@{'.'.join(str(g) for g in generations)}"
+
+    async def bump(self, client: Any, *tags: str) -> None:
+        """Invalidate every entry depending on any of `tags`."""
+        if not tags:
+            return
+        pipe = client.pipeline(transaction=False)
+        for tag in set(tags):
+            tag_key = self._tag_key(tag)
+            pipe.incr(tag_key)
+            pipe.expire(tag_key, self.TAG_TTL)
+        await pipe.execute()
+        if self.near_cache is not None:
+            await self.near_cache.publish(client, [self._tag_key(tag) for tag in set(tags)])
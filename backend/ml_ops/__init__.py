@@ -4,13 +4,14 @@ ML Ops Module - Monitoring & Optimization for AI/ML
 Provides:
 - Model performance tracking
 - Cost monitoring and optimization
-- Latency monitoring
+- Latency monitoring (mergeable percentile sketches)
 - Error rate tracking
 - A/B testing for prompts
 - Dashboard and metrics
 """
 
 from .monitoring import MLMonitor, MetricType
+from .streaming import QuantileSketch
 from .cost_tracker import CostTracker
 from .ab_testing import ABTester, Experiment
 from .dashboard import DashboardManager
@@ -18,6 +19,7 @@ from .dashboard import DashboardManager
 __all__ = [
     "MLMonitor",
     "MetricType",
+    "QuantileSketch",
     "CostTracker",
     "ABTester",
     "Experiment",
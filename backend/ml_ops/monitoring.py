@@ -7,16 +7,22 @@ Tracks:
 - Error rates and types
 - Token usage
 - Cost per request
+
+Memory is constant: events are aggregated into time-bucketed rings
+(1-minute buckets for the last hours, 1-hour buckets for the retention
+period) per model/agent, with mergeable latency sketches for
+percentiles. Alerts are evaluated when a minute bucket closes, and
+monitors of several workers can be merged for fleet-wide metrics.
 """
 
 import logging
-import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from collections import defaultdict
-import statistics
+from collections import defaultdict, deque
+
+from .streaming import QuantileSketch, SeriesStats, TimeBucketRing
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +75,16 @@ class AggregatedMetrics:
     model_breakdown: Dict[str, int] = field(default_factory=dict)
 
 
+SeriesKey = Tuple[str, str]  # (model, agent)
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since epoch; naive datetimes are UTC (datetime.utcnow())"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
 class MLMonitor:
     """Monitor ML/AI operations"""
 
@@ -76,29 +92,56 @@ class MLMonitor:
         self,
         retention_days: int = 30,
         alert_thresholds: Optional[Dict[str, float]] = None,
+        minute_buckets: int = 180,
+        alert_window_minutes: int = 5,
+        sketch_accuracy: float = 0.01,
+        raw_event_limit: int = 10000,
     ):
+        """
+        Args:
+            retention_days: Days of hourly buckets kept
+            alert_thresholds: error_rate, avg_latency_ms, cost_per_request
+            minute_buckets: Minutes of 1-minute buckets kept (fine windows)
+            alert_window_minutes: Closed minutes evaluated by each alert check
+            sketch_accuracy: Relative error of latency percentiles
+            raw_event_limit: Most recent raw events kept for export_metrics()
+        """
         self.retention_days = retention_days
         self.alert_thresholds = alert_thresholds or {
             "error_rate": 0.05,  # Alert if >5% errors
             "avg_latency_ms": 10000,  # Alert if avg latency >10s
             "cost_per_request": 0.50,  # Alert if cost >$0.50 per request
         }
+        self.alert_window_minutes = alert_window_minutes
+        self.sketch_accuracy = sketch_accuracy
 
-        # In-memory storage (for production, use a database)
-        self._events: List[MetricEvent] = []
-        self._latency_values: List[float] = []
+        # Bucket = {(model, agent): SeriesStats}
+        self._minutes = TimeBucketRing(60, minute_buckets, dict, on_rollover=self._on_minute_closed)
+        self._hours = TimeBucketRing(3600, retention_days * 24, dict)
 
-        # Real-time counters
+        # Recent raw events only (bounded)
+        self._events: deque = deque(maxlen=raw_event_limit)
+        self.alerts: deque = deque(maxlen=100)
+
+        # Real-time counters (lifetime)
         self._counters = defaultdict(int)
         self._sums = defaultdict(float)
 
+    def _series(self, bucket: Optional[Dict[SeriesKey, SeriesStats]], key: SeriesKey) -> Optional[SeriesStats]:
+        if bucket is None:
+            return None
+        stats = bucket.get(key)
+        if stats is None:
+            stats = bucket[key] = SeriesStats(accuracy=self.sketch_accuracy)
+        return stats
+
     def track_event(self, event: MetricEvent):
         """Track a metric event"""
         self._events.append(event)
 
         # Update real-time counters
         if event.metric_type == MetricType.LATENCY:
-            self._latency_values.append(event.value)
+            self._counters["latency_events"] += 1
             self._sums["latency"] += event.value
 
         elif event.metric_type == MetricType.COST:
@@ -121,15 +164,39 @@ class MLMonitor:
         elif event.metric_type == MetricType.CACHE_MISS:
             self._counters["cache_misses"] += 1
 
-        # Increment request counter
-        self._counters["total_requests"] += 1
-
-        # Check alerts
-        self._check_alerts()
-
-        # Clean old events periodically
-        if self._counters["total_requests"] % 1000 == 0:
-            self._cleanup_old_events()
+        # A request is one success or error event
+        if event.metric_type in (MetricType.SUCCESS, MetricType.ERROR):
+            self._counters["total_requests"] += 1
+
+        # Aggregate into the current minute and hour buckets (a new minute
+        # bucket triggers the alert check)
+        timestamp = _epoch(event.timestamp)
+        key = (event.model, event.agent)
+        for stats in (
+            self._series(self._minutes.bucket(timestamp), key),
+            self._series(self._hours.bucket(timestamp), key),
+        ):
+            if stats is not None:
+                self._aggregate(stats, event)
+
+    @staticmethod
+    def _aggregate(stats: SeriesStats, event: MetricEvent):
+        stats.events += 1
+        if event.metric_type == MetricType.LATENCY:
+            stats.latency.add(event.value)
+        elif event.metric_type == MetricType.COST:
+            stats.cost += event.value
+        elif event.metric_type == MetricType.TOKENS:
+            stats.tokens += event.value
+        elif event.metric_type == MetricType.ERROR:
+            stats.errors += 1
+            stats.error_types[event.metadata.get("error_type", "unknown")] += 1
+        elif event.metric_type == MetricType.SUCCESS:
+            stats.success += 1
+        elif event.metric_type == MetricType.CACHE_HIT:
+            stats.cache_hits += 1
+        elif event.metric_type == MetricType.CACHE_MISS:
+            stats.cache_misses += 1
 
     def track_request(
         self,
@@ -204,6 +271,30 @@ class MLMonitor:
                 metadata=metadata,
             ))
 
+    def _window(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        model: Optional[str] = None,
+        agent: Optional[str] = None,
+    ) -> Tuple[SeriesStats, Dict[str, int]]:
+        """Merged stats of the buckets overlapping a time range, and events per model"""
+        start, end = _epoch(start_time), _epoch(end_time)
+        # Minute buckets when they cover the range, hour buckets otherwise
+        ring = self._minutes
+        if self._minutes.head is None or start < (self._minutes.head + 1) * 60 - self._minutes.span:
+            ring = self._hours
+
+        merged = SeriesStats(accuracy=self.sketch_accuracy)
+        models: Dict[str, int] = defaultdict(int)
+        for _, bucket in ring.buckets(start, end):
+            for (series_model, series_agent), stats in bucket.items():
+                if (model is None or series_model == model) and (agent is None or series_agent == agent):
+                    merged.merge(stats)
+                    if series_model:
+                        models[series_model] += stats.events
+        return merged, models
+
     def get_metrics(
         self,
         start_time: Optional[datetime] = None,
@@ -214,6 +305,9 @@ class MLMonitor:
         """
         Get aggregated metrics for a time period
 
+        The range is resolved to whole buckets (1 minute for recent
+        ranges, 1 hour beyond), and percentiles are sketch estimates.
+
         Args:
             start_time: Start of time range (default: 24h ago)
             end_time: End of time range (default: now)
@@ -228,80 +322,60 @@ class MLMonitor:
         if end_time is None:
             end_time = datetime.utcnow()
 
-        # Filter events
-        filtered_events = [
-            e for e in self._events
-            if start_time <= e.timestamp <= end_time
-            and (model is None or e.model == model)
-            and (agent is None or e.agent == agent)
-        ]
-
-        # Aggregate
-        metrics = AggregatedMetrics()
-
-        latencies = []
-        costs = []
-        tokens_list = []
-        error_types = defaultdict(int)
-        models = defaultdict(int)
-
-        for event in filtered_events:
-            if event.metric_type == MetricType.LATENCY:
-                latencies.append(event.value)
-
-            elif event.metric_type == MetricType.COST:
-                costs.append(event.value)
-                metrics.total_cost += event.value
-
-            elif event.metric_type == MetricType.TOKENS:
-                tokens_list.append(int(event.value))
-                metrics.total_tokens += int(event.value)
-
-            elif event.metric_type == MetricType.ERROR:
-                metrics.failed_requests += 1
-                error_type = event.metadata.get("error_type", "unknown")
-                error_types[error_type] += 1
-
-            elif event.metric_type == MetricType.SUCCESS:
-                metrics.successful_requests += 1
-
-            elif event.metric_type == MetricType.CACHE_HIT:
-                metrics.cache_hits += 1
-
-            elif event.metric_type == MetricType.CACHE_MISS:
-                metrics.cache_misses += 1
-
-            # Track model usage
-            if event.model:
-                models[event.model] += 1
-
-        # Calculate aggregates
+        stats, models = self._window(start_time, end_time, model, agent)
+        return self._to_metrics(stats, models)
+
+    @staticmethod
+    def _to_metrics(stats: SeriesStats, models: Dict[str, int]) -> AggregatedMetrics:
+        metrics = AggregatedMetrics(
+            successful_requests=stats.success,
+            failed_requests=stats.errors,
+            # Rounded to absorb float accumulation error
+            total_cost=round(stats.cost, 10),
+            total_tokens=int(stats.tokens),
+            cache_hits=stats.cache_hits,
+            cache_misses=stats.cache_misses,
+        )
         metrics.total_requests = metrics.successful_requests + metrics.failed_requests
 
-        if latencies:
-            metrics.total_latency_ms = sum(latencies)
-            metrics.avg_latency_ms = statistics.mean(latencies)
-            metrics.p50_latency_ms = statistics.median(latencies)
-            sorted_latencies = sorted(latencies)
-            metrics.p95_latency_ms = sorted_latencies[int(len(sorted_latencies) * 0.95)]
-            metrics.p99_latency_ms = sorted_latencies[int(len(sorted_latencies) * 0.99)]
+        latency = stats.latency
+        if latency.count:
+            metrics.total_latency_ms = latency.sum
+            metrics.avg_latency_ms = latency.mean
+            metrics.p50_latency_ms = latency.quantile(0.50)
+            metrics.p95_latency_ms = latency.quantile(0.95)
+            metrics.p99_latency_ms = latency.quantile(0.99)
 
         if metrics.total_requests > 0:
             metrics.success_rate = metrics.successful_requests / metrics.total_requests
             metrics.avg_cost_per_request = metrics.total_cost / metrics.total_requests
 
-            if tokens_list:
-                metrics.avg_tokens_per_request = sum(tokens_list) / metrics.total_requests
+            if metrics.total_tokens:
+                metrics.avg_tokens_per_request = metrics.total_tokens / metrics.total_requests
 
             total_cache_requests = metrics.cache_hits + metrics.cache_misses
             if total_cache_requests > 0:
                 metrics.cache_hit_rate = metrics.cache_hits / total_cache_requests
 
-        metrics.error_breakdown = dict(error_types)
+        metrics.error_breakdown = dict(stats.error_types)
         metrics.model_breakdown = dict(models)
 
         return metrics
 
+    def get_latency_sketch(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        model: Optional[str] = None,
+        agent: Optional[str] = None,
+    ) -> QuantileSketch:
+        """Latency sketch of a time range (mergeable with other workers' sketches)"""
+        if start_time is None:
+            start_time = datetime.utcnow() - timedelta(hours=24)
+        if end_time is None:
+            end_time = datetime.utcnow()
+        return self._window(start_time, end_time, model, agent)[0].latency
+
     def get_real_time_stats(self) -> Dict[str, Any]:
         """Get real-time statistics (lightweight)"""
         total_requests = self._counters["total_requests"]
@@ -316,8 +390,8 @@ class MLMonitor:
             "total_tokens": int(self._sums["tokens"]),
             "total_latency_ms": self._sums["latency"],
             "avg_latency_ms": (
-                self._sums["latency"] / len(self._latency_values)
-                if self._latency_values
+                self._sums["latency"] / self._counters["latency_events"]
+                if self._counters["latency_events"]
                 else 0
             ),
             "success_rate": (
@@ -327,53 +401,93 @@ class MLMonitor:
             ),
         }
 
-    def _check_alerts(self):
-        """Check if any alert thresholds are exceeded"""
-        stats = self.get_real_time_stats()
+    def _on_minute_closed(self, index: int):
+        """Evaluate alerts over the minutes up to the one that just closed"""
+        end = (index + 1) * 60
+        stats = SeriesStats(accuracy=self.sketch_accuracy)
+        for _, bucket in self._minutes.buckets(end - self.alert_window_minutes * 60, end - 1):
+            for series in bucket.values():
+                stats.merge(series)
+        self._check_alerts(stats, datetime.fromtimestamp(end, timezone.utc).replace(tzinfo=None))
+
+    def _check_alerts(self, stats: SeriesStats, window_end: datetime):
+        """Check if any alert thresholds are exceeded in a window"""
+        total_requests = stats.success + stats.errors
 
-        if stats["total_requests"] < 10:  # Need minimum data
+        if total_requests < 10:  # Need minimum data
             return
 
+        def alert(name: str, value: float, message: str):
+            self.alerts.append({
+                "type": name,
+                "value": value,
+                "threshold": self.alert_thresholds[name],
+                "window_end": window_end.isoformat(),
+            })
+            logger.warning(f"[MLMonitor] ALERT: {message}")
+
         # Check error rate
-        if stats["success_rate"] < (1 - self.alert_thresholds["error_rate"]):
-            error_rate = 1 - stats["success_rate"]
-            logger.warning(
-                f"[MLMonitor] ALERT: High error rate: {error_rate:.2%} "
+        error_rate = stats.errors / total_requests
+        if error_rate > self.alert_thresholds["error_rate"]:
+            alert(
+                "error_rate", error_rate,
+                f"High error rate: {error_rate:.2%} "
                 f"(threshold: {self.alert_thresholds['error_rate']:.2%})"
             )
 
         # Check latency
-        if stats["avg_latency_ms"] > self.alert_thresholds["avg_latency_ms"]:
-            logger.warning(
-                f"[MLMonitor] ALERT: High latency: {stats['avg_latency_ms']:.0f}ms "
+        avg_latency = stats.latency.mean
+        if avg_latency > self.alert_thresholds["avg_latency_ms"]:
+            alert(
+                "avg_latency_ms", avg_latency,
+                f"High latency: {avg_latency:.0f}ms "
                 f"(threshold: {self.alert_thresholds['avg_latency_ms']:.0f}ms)"
             )
 
         # Check cost
-        avg_cost = stats["total_cost"] / stats["total_requests"] if stats["total_requests"] > 0 else 0
+        avg_cost = stats.cost / total_requests
         if avg_cost > self.alert_thresholds["cost_per_request"]:
-            logger.warning(
-                f"[MLMonitor] ALERT: High cost per request: ${avg_cost:.4f} "
+            alert(
+                "cost_per_request", avg_cost,
+                f"High cost per request: ${avg_cost:.4f} "
                 f"(threshold: ${self.alert_thresholds['cost_per_request']:.4f})"
             )
 
-    def _cleanup_old_events(self):
-        """Remove events older than retention period"""
-        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
-        original_count = len(self._events)
-
-        self._events = [e for e in self._events if e.timestamp >= cutoff]
-
-        removed = original_count - len(self._events)
-        if removed > 0:
-            logger.info(f"[MLMonitor] Cleaned up {removed} old events")
+    def export_state(self) -> Dict[str, Any]:
+        """
+        JSON-serializable bucket state, to merge into another monitor
+        (e.g. a fleet aggregator collecting every worker's state)
+        """
+        def ring_state(ring: TimeBucketRing) -> List[Dict[str, Any]]:
+            return [
+                {
+                    "start": bucket_start,
+                    "series": [
+                        {"model": model, "agent": agent, **stats.to_dict()}
+                        for (model, agent), stats in bucket.items()
+                    ],
+                }
+                for bucket_start, bucket in ring.buckets(float("-inf"), float("inf"))
+            ]
+
+        return {"minutes": ring_state(self._minutes), "hours": ring_state(self._hours)}
+
+    def merge_state(self, state: Dict[str, Any]):
+        """Merge another monitor's export_state() into this one's buckets"""
+        for name, ring in (("minutes", self._minutes), ("hours", self._hours)):
+            for exported in state.get(name, []):
+                bucket = ring.bucket(exported["start"])
+                for series in exported["series"]:
+                    stats = self._series(bucket, (series["model"], series["agent"]))
+                    if stats is not None:
+                        stats.merge(SeriesStats.from_dict(series))
 
     def export_metrics(
         self,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
     ) -> List[Dict[str, Any]]:
-        """Export raw metrics for external analysis"""
+        """Export recent raw metrics (up to raw_event_limit) for external analysis"""
         if start_time is None:
             start_time = datetime.utcnow() - timedelta(days=1)
         if end_time is None:
@@ -399,7 +513,9 @@ class MLMonitor:
     def reset(self):
         """Reset all metrics (useful for testing)"""
         self._events.clear()
-        self._latency_values.clear()
+        self._minutes.clear()
+        self._hours.clear()
+        self.alerts.clear()
         self._counters.clear()
         self._sums.clear()
         logger.info("[MLMonitor] Reset all metrics")
@@ -0,0 +1,220 @@
+"""
+Streaming aggregation primitives for ML monitoring
+
+- QuantileSketch: log-bucketed histogram (HDR-style) with bounded
+  relative error; sketches merge exactly, so per-worker sketches combine
+  into fleet-wide percentiles
+- SeriesStats: counters, sums and a latency sketch for one model/agent
+- TimeBucketRing: fixed number of time buckets reused in a ring, with a
+  callback when a new bucket starts
+
+Memory depends on the number of buckets and series, not on traffic.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy `accuracy`.
+
+    Values are counted in logarithmic bins (bin i covers
+    (gamma^(i-1), gamma^i]); a quantile is answered with the bin midpoint,
+    within `accuracy` of the true value. Non-positive values share a bin.
+    """
+
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1):
+        """Record a value"""
+        if value > 0:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch"):
+        """Add another sketch's values (same accuracy) into this one"""
+        if other.accuracy != self.accuracy:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] += count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q (0..1), 0.0 when empty"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state, for merging across workers"""
+        return {
+            "accuracy": self.accuracy,
+            "bins": {str(i): c for i, c in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["accuracy"])
+        for index, count in data["bins"].items():
+            sketch.bins[int(index)] = count
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        if sketch.count:
+            sketch.min, sketch.max = data["min"], data["max"]
+        return sketch
+
+
+@dataclass
+class SeriesStats:
+    """Aggregates of one series (model, agent) over one time bucket"""
+    accuracy: float = 0.01
+    events: int = 0
+    success: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cost: float = 0.0
+    tokens: float = 0.0
+    error_types: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    latency: Optional[QuantileSketch] = None
+
+    def __post_init__(self):
+        if self.latency is None:
+            self.latency = QuantileSketch(self.accuracy)
+
+    def merge(self, other: "SeriesStats"):
+        self.events += other.events
+        self.success += other.success
+        self.errors += other.errors
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.cost += other.cost
+        self.tokens += other.tokens
+        for error_type, count in other.error_types.items():
+            self.error_types[error_type] += count
+        self.latency.merge(other.latency)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "events": self.events,
+            "success": self.success,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cost": self.cost,
+            "tokens": self.tokens,
+            "error_types": dict(self.error_types),
+            "latency": self.latency.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesStats":
+        latency = QuantileSketch.from_dict(data["latency"])
+        stats = cls(accuracy=latency.accuracy, latency=latency)
+        for name in ("events", "success", "errors", "cache_hits", "cache_misses", "cost", "tokens"):
+            setattr(stats, name, data[name])
+        stats.error_types.update(data["error_types"])
+        return stats
+
+
+class TimeBucketRing:
+    """
+    Ring of `size` buckets of `width` seconds.
+
+    A slot is reused (reset) when time moves past it, so the ring always
+    covers the last width * size seconds. `on_rollover(index)` is called
+    with the index of the bucket that just closed when a newer one starts.
+    """
+
+    def __init__(
+        self,
+        width: float,
+        size: int,
+        factory: Callable[[], Any],
+        on_rollover: Optional[Callable[[int], None]] = None,
+    ):
+        self.width = width
+        self.size = size
+        self.factory = factory
+        self.on_rollover = on_rollover
+        self.head: Optional[int] = None
+        self._slots: List[Optional[Tuple[int, Any]]] = [None] * size
+
+    @property
+    def span(self) -> float:
+        return self.width * self.size
+
+    def index_of(self, timestamp: float) -> int:
+        return int(timestamp // self.width)
+
+    def bucket(self, timestamp: float) -> Optional[Any]:
+        """Bucket for a timestamp (created if needed), None if already evicted"""
+        index = self.index_of(timestamp)
+        if self.head is not None and index <= self.head - self.size:
+            return None
+        if self.head is None or index > self.head:
+            closed, self.head = self.head, index
+            if closed is not None and self.on_rollover:
+                self.on_rollover(closed)
+
+        slot = self._slots[index % self.size]
+        if slot is None or slot[0] != index:
+            slot = (index, self.factory())
+            self._slots[index % self.size] = slot
+        return slot[1]
+
+    def buckets(self, start: float, end: float) -> Iterator[Tuple[float, Any]]:
+        """(bucket start time, bucket) of live buckets overlapping [start, end]"""
+        if self.head is None:
+            return
+        oldest = self.head - self.size + 1
+        for slot in self._slots:
+            if slot is None or slot[0] < oldest:
+                continue
+            bucket_start = slot[0] * self.width
+            if bucket_start <= end and bucket_start + self.width > start:
+                yield bucket_start, slot[1]
+
+    def clear(self):
+        self.head = None
+        self._slots = [None] * self.size
@@ -3,7 +3,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from models import AdminStats, SystemConfig, SystemConfigUpdate
 from auth import get_current_admin_user
 from config_service import ConfigService
-from stripe_service import StripeService
+from stripe_service_v2 import StripeServiceV2
 from datetime import datetime, timezone, timedelta
 import logging
 import os
@@ -12,6 +12,7 @@ from pydantic import BaseModel, EmailStr
 from auth import get_password_hash
 
 from config import settings
+from services.project_files import ProjectFileStore
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +21,11 @@ router = APIRouter(prefix='/admin', tags=['admin'])
 # MongoDB connection with centralized config
 client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
 
 # Initialize services
 config_service = ConfigService(db)
-stripe_service = StripeService(db)
+stripe_service = StripeServiceV2(db)
 
 
 # Special endpoint to initialize first admin (only works if no admins exist)
@@ -358,7 +360,9 @@ async def get_user_projects(
     current_admin: dict = Depends(get_current_admin_user)
 ):
     """Get all projects for a specific user"""
-    projects = await db.projects.find({'user_id': user_id}, {'_id': 0}).to_list(1000)
+    projects = await db.projects.aggregate(
+        project_files.metadata_pipeline({'user_id': user_id})
+    ).to_list(1000)
     return {'projects': projects, 'count': len(projects)}
 
 @router.get('/users/{user_id}/invoices')
@@ -2,11 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from motor.motor_asyncio import AsyncIOMotorClient
 from models import User, UserCreate, UserLogin, UserResponse, Token
 from auth import get_password_hash, verify_password, create_access_token, get_current_user
-from stripe_service import StripeService
+from stripe_service_v2 import StripeServiceV2
 from email_service import EmailService
 from datetime import datetime, timezone, timedelta
 import logging
 from config import settings
+from services.project_files import ProjectFileStore
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +16,10 @@ router = APIRouter(prefix='/auth', tags=['authentication'])
 # MongoDB connection with centralized config
 client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
 
 # Initialize services
-stripe_service = StripeService(db)
+stripe_service = StripeServiceV2(db)
 email_service = EmailService(db)
 
 @router.post('/register', response_model=Token)
@@ -131,6 +133,8 @@ async def export_user_data(current_user: dict = Depends(get_current_user)):
     """Export all user data (RGPD)"""
     user = await db.users.find_one({'id': current_user['user_id']}, {'_id': 0, 'hashed_password': 0})
     projects = await db.projects.find({'user_id': current_user['user_id']}, {'_id': 0}).to_list(1000)
+    for project in projects:
+        await project_files.hydrate(project)
     
     export_data = {
         'user': user,
@@ -145,9 +149,17 @@ async def delete_user_account(current_user: dict = Depends(get_current_user)):
     """Delete user account and all data (RGPD)"""
     user_id = current_user['user_id']
     
-    # Delete user's projects
+    # Delete user's projects and their files
+    project_ids = await db.projects.distinct('id', {'user_id': user_id})
+    await project_files.delete_files(project_ids)
     await db.projects.delete_many({'user_id': user_id})
     
+    # Delete user's conversations and their messages
+    conversation_ids = await db.conversations.distinct('id', {'user_id': user_id})
+    if conversation_ids:
+        await db.conversation_messages.delete_many({'conversation_id': {'$in': conversation_ids}})
+    await db.conversations.delete_many({'user_id': user_id})
+    
     # Delete user
     result = await db.users.delete_one({'id': user_id})
     
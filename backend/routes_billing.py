@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Request, status
 from motor.motor_asyncio import AsyncIOMotorClient
 from models import SubscriptionPlan, Invoice
 from auth import get_current_user
-from stripe_service import StripeService, StripeNotConfiguredError
+from stripe_service_v2 import StripeServiceV2, StripeNotConfiguredError
 from config_service import ConfigService
 from email_service import EmailService
 from datetime import datetime, timezone
@@ -20,7 +20,7 @@ client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
 
 # Initialize services
-stripe_service = StripeService(db)
+stripe_service = StripeServiceV2(db)
 config_service = ConfigService(db)
 email_service = EmailService(db)
 
@@ -6,25 +6,22 @@ Features:
 - Export web projects to Expo
 - Convert React components to React Native
 - Generate complete mobile app structure
-- Download as ZIP
+- Download as ZIP (streamed from disk)
+- Background export jobs with status polling
 - Support for Expo Router
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-import io
-import uuid
-import json
 import logging
-from datetime import datetime, timezone
 
 from services.mobile_export_service import (
     mobile_export_service,
     SourceFile,
-    ExportResult,
-    MobileFramework
+    ExportJob,
+    ExportStatus
 )
 
 logger = logging.getLogger(__name__)
@@ -59,6 +56,8 @@ class ExportProgressResponse(BaseModel):
     progress: int
     message: str
     current_file: Optional[str] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
 
 
 class ExportResultResponse(BaseModel):
@@ -88,8 +87,56 @@ class ExportPreviewResponse(BaseModel):
     warnings: List[str]
 
 
-# In-memory storage for exports
-exports_store: Dict[str, Dict] = {}
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _source_files(request: MobileExportRequest) -> List[SourceFile]:
+    return [
+        SourceFile(
+            name=f.name,
+            content=f.content,
+            type=f.type or "unknown"
+        )
+        for f in request.files
+    ]
+
+
+def _use_expo_router(request: MobileExportRequest) -> bool:
+    return request.framework == "expo-router" or request.include_navigation
+
+
+def _progress_response(job: ExportJob) -> ExportProgressResponse:
+    return ExportProgressResponse(
+        id=job.id,
+        status=job.status.value,
+        progress=job.progress,
+        message=job.message,
+        current_file=job.current_file,
+        download_url=f"/api/mobile/download/{job.id}" if job.status == ExportStatus.READY else None,
+        error=job.error
+    )
+
+
+def _result_response(job: ExportJob) -> ExportResultResponse:
+    ready = job.status == ExportStatus.READY
+    return ExportResultResponse(
+        id=job.id,
+        success=ready,
+        download_url=f"/api/mobile/download/{job.id}" if ready else None,
+        error=job.error,
+        stats=job.stats if ready else {},
+        warnings=job.warnings if ready else [],
+        files_count=len(job.files),
+        created_at=job.created_at.isoformat()
+    )
+
+
+def _get_job_or_404(export_id: str) -> ExportJob:
+    job = mobile_export_service.get_job(export_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
 
 
 # =============================================================================
@@ -104,73 +151,34 @@ async def export_to_mobile(request: MobileExportRequest):
     - Converts React components to React Native
     - Generates complete Expo project structure
     - Returns download link for ZIP file
-    """
-    export_id = str(uuid.uuid4())
 
-    try:
-        # Convert input files
-        source_files = [
-            SourceFile(
-                name=f.name,
-                content=f.content,
-                type=f.type or "unknown"
-            )
-            for f in request.files
-        ]
-
-        # Determine if using Expo Router
-        use_expo_router = request.framework == "expo-router" or request.include_navigation
-
-        # Perform export
-        result = await mobile_export_service.export_to_expo(
-            files=source_files,
-            project_name=request.project_name,
-            use_expo_router=use_expo_router
-        )
+    Runs as a background job and waits for it; use /export/jobs to
+    return immediately and poll /jobs/{id} instead.
+    """
+    job = mobile_export_service.submit_export(
+        files=_source_files(request),
+        project_name=request.project_name,
+        use_expo_router=_use_expo_router(request)
+    )
+    await mobile_export_service.wait_for_job(job.id)
+    return _result_response(job)
 
-        if not result.success:
-            return ExportResultResponse(
-                id=export_id,
-                success=False,
-                error=result.error,
-                stats={},
-                warnings=[],
-                files_count=0,
-                created_at=datetime.now(timezone.utc).isoformat()
-            )
 
-        # Store export for download
-        exports_store[export_id] = {
-            "id": export_id,
-            "project_name": request.project_name,
-            "zip_content": result.zip_content,
-            "files": result.files,
-            "stats": result.stats,
-            "warnings": result.warnings,
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
+@router.post("/export/jobs", response_model=ExportProgressResponse, status_code=202)
+async def start_export_job(request: MobileExportRequest):
+    """Start a background export and return its job for polling"""
+    job = mobile_export_service.submit_export(
+        files=_source_files(request),
+        project_name=request.project_name,
+        use_expo_router=_use_expo_router(request)
+    )
+    return _progress_response(job)
 
-        return ExportResultResponse(
-            id=export_id,
-            success=True,
-            download_url=f"/api/mobile/download/{export_id}",
-            stats=result.stats,
-            warnings=result.warnings,
-            files_count=len(result.files),
-            created_at=datetime.now(timezone.utc).isoformat()
-        )
 
-    except Exception as e:
-        logger.exception(f"[MobileExport] Error: {e}")
-        return ExportResultResponse(
-            id=export_id,
-            success=False,
-            error=str(e),
-            stats={},
-            warnings=[],
-            files_count=0,
-            created_at=datetime.now(timezone.utc).isoformat()
-        )
+@router.get("/jobs/{export_id}", response_model=ExportProgressResponse)
+async def get_export_job(export_id: str):
+    """Poll the progress of an export job"""
+    return _progress_response(_get_job_or_404(export_id))
 
 
 @router.post("/preview", response_model=ExportPreviewResponse)
@@ -181,21 +189,11 @@ async def preview_export(request: MobileExportRequest):
     Returns list of files that would be generated
     """
     try:
-        source_files = [
-            SourceFile(
-                name=f.name,
-                content=f.content,
-                type=f.type or "unknown"
-            )
-            for f in request.files
-        ]
-
-        use_expo_router = request.framework == "expo-router" or request.include_navigation
-
         result = await mobile_export_service.export_to_expo(
-            files=source_files,
+            files=_source_files(request),
             project_name=request.project_name,
-            use_expo_router=use_expo_router
+            use_expo_router=_use_expo_router(request),
+            include_zip=False
         )
 
         if not result.success:
@@ -231,23 +229,22 @@ async def download_export(export_id: str):
     """
     Download exported mobile project as ZIP
     """
-    if export_id not in exports_store:
-        raise HTTPException(status_code=404, detail="Export not found")
+    job = _get_job_or_404(export_id)
+    if job.status != ExportStatus.READY:
+        raise HTTPException(status_code=409, detail=f"Export is {job.status.value}")
 
-    export_data = exports_store[export_id]
-    zip_content = export_data.get("zip_content")
+    chunks = mobile_export_service.iter_artifact(export_id)
+    if chunks is None:
+        raise HTTPException(status_code=410, detail="ZIP file expired")
 
-    if not zip_content:
-        raise HTTPException(status_code=404, detail="ZIP file not available")
+    filename = f"{job.project_name.lower().replace(' ', '-')}-mobile.zip"
 
-    project_name = export_data.get("project_name", "mobile-app")
-    filename = f"{project_name.lower().replace(' ', '-')}-mobile.zip"
-
-    return Response(
-        content=zip_content,
+    return StreamingResponse(
+        chunks,
         media_type="application/zip",
         headers={
-            "Content-Disposition": f'attachment; filename="{filename}"'
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(job.size)
         }
     )
 
@@ -257,42 +254,25 @@ async def get_exported_file(export_id: str, file_path: str):
     """
     Get a specific file from the export
     """
-    if export_id not in exports_store:
-        raise HTTPException(status_code=404, detail="Export not found")
+    _get_job_or_404(export_id)
 
-    export_data = exports_store[export_id]
-    files = export_data.get("files", [])
-
-    for f in files:
-        if f.path == file_path:
-            return Response(
-                content=f.content,
-                media_type="text/plain",
-                headers={
-                    "Content-Type": "text/plain; charset=utf-8"
-                }
-            )
+    content = mobile_export_service.read_artifact_file(export_id, file_path)
+    if content is None:
+        raise HTTPException(status_code=404, detail="File not found")
 
-    raise HTTPException(status_code=404, detail="File not found")
+    return Response(
+        content=content,
+        media_type="text/plain",
+        headers={
+            "Content-Type": "text/plain; charset=utf-8"
+        }
+    )
 
 
 @router.get("/status/{export_id}", response_model=ExportResultResponse)
 async def get_export_status(export_id: str):
     """Get export status by ID"""
-    if export_id not in exports_store:
-        raise HTTPException(status_code=404, detail="Export not found")
-
-    export_data = exports_store[export_id]
-
-    return ExportResultResponse(
-        id=export_id,
-        success=True,
-        download_url=f"/api/mobile/download/{export_id}",
-        stats=export_data.get("stats", {}),
-        warnings=export_data.get("warnings", []),
-        files_count=len(export_data.get("files", [])),
-        created_at=export_data.get("created_at", "")
-    )
+    return _result_response(_get_job_or_404(export_id))
 
 
 # =============================================================================
@@ -446,26 +426,21 @@ class ExportHistoryItem(BaseModel):
 @router.get("/history", response_model=List[ExportHistoryItem])
 async def get_export_history(limit: int = 20):
     """Get recent export history"""
-    exports = list(exports_store.values())
-    exports.sort(key=lambda e: e.get("created_at", ""), reverse=True)
-
     return [
         ExportHistoryItem(
-            id=e["id"],
-            project_name=e.get("project_name", "Unknown"),
-            files_count=len(e.get("files", [])),
-            created_at=e.get("created_at", "")
+            id=job.id,
+            project_name=job.project_name,
+            files_count=len(job.files),
+            created_at=job.created_at.isoformat()
         )
-        for e in exports[:limit]
+        for job in mobile_export_service.list_jobs(limit)
     ]
 
 
 @router.delete("/{export_id}")
 async def delete_export(export_id: str):
     """Delete an export"""
-    if export_id not in exports_store:
+    if not mobile_export_service.delete_job(export_id):
         raise HTTPException(status_code=404, detail="Export not found")
 
-    del exports_store[export_id]
-
     return {"success": True, "message": "Export deleted"}
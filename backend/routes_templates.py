@@ -20,6 +20,7 @@ from models_templates import (
 )
 from auth import get_current_user
 from config import settings
+from services.project_files import ProjectFileStore
 from motor.motor_asyncio import AsyncIOMotorClient
 
 router = APIRouter(prefix='/templates', tags=['templates'])
@@ -27,6 +28,7 @@ router = APIRouter(prefix='/templates', tags=['templates'])
 # Connexion MongoDB
 client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
 
 
 # =============================================================================
@@ -444,7 +446,7 @@ async def use_template(
         "tech_stack": template.get("tech_stack", [])
     }
 
-    await db.projects.insert_one(project)
+    await project_files.create_project(project)
 
     # Enregistrer le téléchargement
     download = TemplateDownload(
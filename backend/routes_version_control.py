@@ -11,8 +11,10 @@ Routes:
 - GET  /commits/{id}                   - Get commit details
 - POST /commits/{id}/restore           - Restore to a commit
 - GET  /commits/{id}/diff              - Get commit diff
+- GET  /commits/{id}/diff/{path}       - Get one file's diff hunks
 - POST /commits/compare                - Compare two commits
 - GET  /projects/{id}/files/{path}/history - Get file history
+- GET  /projects/{id}/files/{path}/versions/{hash} - Get a file version
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path
@@ -24,6 +26,7 @@ import logging
 
 from config import settings
 from auth import get_current_user
+from services.project_files import ProjectFileStore
 from services.version_control import (
     VersionControlService,
     Commit,
@@ -40,6 +43,7 @@ db = client[settings.DB_NAME]
 
 # Initialize the version control service
 vc_service = VersionControlService(db)
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
 
 
 # ============================================================================
@@ -141,6 +145,7 @@ class CompareRequest(BaseModel):
     """Request to compare two commits"""
     from_commit_id: str = Field(..., description="Base commit ID (older)")
     to_commit_id: str = Field(..., description="Target commit ID (newer)")
+    summary_only: bool = Field(default=False, description="Return per-file stats without diff hunks")
 
 
 class DiffResponse(BaseModel):
@@ -270,7 +275,7 @@ async def create_commit(
             author_id=commit.author_id,
             author_email=commit.author_email,
             parent_id=commit.parent_id,
-            files_count=len(commit.files_snapshot),
+            files_count=commit.files_count,
             diff_summary={
                 "added": len(commit.diff.get("added", [])),
                 "modified": len(commit.diff.get("modified", [])),
@@ -325,7 +330,7 @@ async def get_commit(
     By default includes full file snapshots. Set include_files=false
     for a lighter response.
     """
-    commit = await vc_service.get_commit(commit_id)
+    commit = await vc_service.get_commit(commit_id, include_files=include_files)
 
     if not commit:
         raise HTTPException(status_code=404, detail="Commit not found")
@@ -400,13 +405,9 @@ async def restore_commit(
         # Update the project's current files
         await db.projects.update_one(
             {"id": commit.project_id},
-            {
-                "$set": {
-                    "files": files,
-                    "updated_at": datetime.now().isoformat()
-                }
-            }
+            {"$set": {"updated_at": datetime.now().isoformat()}}
         )
+        await project_files.save_files(commit.project_id, files)
 
         logger.info(f"Restored project {commit.project_id} to commit {commit_id}")
 
@@ -429,12 +430,15 @@ async def restore_commit(
 @router.get("/commits/{commit_id}/diff", response_model=DiffResponse)
 async def get_commit_diff(
     commit_id: str = Path(..., description="Commit ID"),
+    summary_only: bool = Query(False, description="Return per-file stats without diff hunks"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get the diff for a specific commit.
 
     Returns the changes made in this commit compared to its parent.
+    With summary_only, hunks can be loaded per file from
+    /commits/{id}/diff/{path}.
     """
     commit = await vc_service.get_commit(commit_id)
 
@@ -454,12 +458,46 @@ async def get_commit_diff(
         )
 
     try:
-        diff = await vc_service.get_diff(commit_id)
+        diff = await vc_service.get_diff(commit_id, summary_only=summary_only)
         return DiffResponse(**diff)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.get("/commits/{commit_id}/diff/{file_path:path}")
+async def get_commit_file_diff(
+    commit_id: str = Path(..., description="Commit ID"),
+    file_path: str = Path(..., description="File path within the project"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the diff hunks of a single file modified by a commit.
+    """
+    commit = await vc_service.get_commit(commit_id)
+
+    if not commit:
+        raise HTTPException(status_code=404, detail="Commit not found")
+
+    # Verify user has access
+    project = await db.projects.find_one(
+        {"id": commit.project_id, "user_id": current_user["user_id"]},
+        {"_id": 0, "id": 1}
+    )
+
+    if not project:
+        raise HTTPException(
+            status_code=403,
+            detail="You don't have access to this commit's project"
+        )
+
+    file_diff = await vc_service.get_file_diff(commit_id, file_path)
+
+    if file_diff is None:
+        raise HTTPException(status_code=404, detail="File was not modified by this commit")
+
+    return file_diff
+
+
 @router.post("/commits/compare", response_model=DiffResponse)
 async def compare_commits(
     compare_data: CompareRequest = Body(...),
@@ -501,7 +539,8 @@ async def compare_commits(
     try:
         diff = await vc_service.compare_commits(
             compare_data.from_commit_id,
-            compare_data.to_commit_id
+            compare_data.to_commit_id,
+            summary_only=compare_data.summary_only
         )
         return DiffResponse(**diff)
     except ValueError as e:
@@ -517,12 +556,16 @@ async def get_file_history(
     project_id: str = Path(..., description="Project ID"),
     file_path: str = Path(..., description="File path within the project"),
     limit: int = Query(20, ge=1, le=50, description="Maximum versions to return"),
+    before: Optional[str] = Query(None, description="Cursor: return versions older than this timestamp"),
+    include_content: bool = Query(False, description="Include file content for each version"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get the version history of a specific file.
 
     Shows when the file was added, modified, or deleted across commits.
+    Use next_cursor as `before` to fetch the next page, and the versions
+    endpoint to load the content of a single version.
     """
     # Verify project access
     project = await db.projects.find_one(
@@ -539,14 +582,50 @@ async def get_file_history(
     history = await vc_service.get_file_history(
         project_id=project_id,
         file_name=file_path,
-        limit=limit
+        limit=limit,
+        before=before,
+        include_content=include_content
     )
 
     return {
         "project_id": project_id,
         "file_path": file_path,
         "versions": history,
-        "total_versions": len(history)
+        "total_versions": len(history),
+        "next_cursor": history[-1]["created_at"] if len(history) == limit else None
+    }
+
+
+@router.get("/projects/{project_id}/files/{file_path:path}/versions/{blob_hash}")
+async def get_file_version(
+    project_id: str = Path(..., description="Project ID"),
+    file_path: str = Path(..., description="File path within the project"),
+    blob_hash: str = Path(..., description="Blob hash from the file history"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the content of a file at one version of its history."""
+    # Verify project access
+    project = await db.projects.find_one(
+        {"id": project_id, "user_id": current_user["user_id"]},
+        {"_id": 0, "id": 1}
+    )
+
+    if not project:
+        raise HTTPException(
+            status_code=404,
+            detail="Project not found or you don't have access to it"
+        )
+
+    content = await vc_service.get_file_version(project_id, file_path, blob_hash)
+
+    if content is None:
+        raise HTTPException(status_code=404, detail="File version not found")
+
+    return {
+        "project_id": project_id,
+        "file_path": file_path,
+        "blob_hash": blob_hash,
+        "content": content
     }
 
 
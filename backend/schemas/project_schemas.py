@@ -67,7 +67,9 @@ class ProjectUpdate(BaseModel):
 class ProjectResponse(ProjectBase):
     """Response schema for projects"""
     id: str = Field(..., description="Project unique identifier")
-    files: List[ProjectFileResponse] = Field(default=[], description="Project files")
+    files: List[ProjectFileResponse] = Field(default=[], description="Project files (empty in listings)")
+    file_count: Optional[int] = Field(None, description="Number of files")
+    files_version: Optional[int] = Field(None, description="Files version, for PATCH deltas")
     conversation_history: List[ConversationMessage] = Field(default=[], description="Conversation history")
     conversation_id: Optional[str] = Field(None, description="Associated conversation ID")
     github_repo_url: Optional[str] = Field(None, description="GitHub repository URL")
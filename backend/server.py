@@ -1,6 +1,8 @@
 from fastapi import FastAPI, APIRouter, HTTPException, Body, Depends
+from fastapi.responses import StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import logging
 import os
 from pydantic import BaseModel, Field, ConfigDict
@@ -10,11 +12,11 @@ from datetime import datetime, timezone
 import httpx
 import json
 import base64
-from github import Github, GithubException
 from agents.orchestrator import OrchestratorAgent
 from agents.orchestrator_v2 import OrchestratorV2
 from agents.context_compressor import compress_context_if_needed
 from config import settings
+from config_service import ConfigService
 from routes_auth import router as auth_router
 from routes_billing import router as billing_router
 from routes_admin import router as admin_router
@@ -23,6 +25,10 @@ from routes_version_control import router as version_control_router
 from routes_templates import router as templates_router
 from routes_streaming import router as streaming_router
 from realtime.websocket_routes import router as realtime_router
+from services.project_files import ProjectFileStore, FileChange, ProjectFileConflictError
+from services.conversation_store import ConversationStore
+from services.github_export import github_exporter, GitHubExportFile, GitHubExportError
+from stripe_service_v2 import StripeServiceV2
 from auth import get_current_user
 from fastapi import Path, Query
 from middleware.security import (
@@ -46,6 +52,8 @@ except ImportError:
 # MongoDB connection with centralized config
 client = AsyncIOMotorClient(settings.MONGO_URL)
 db = client[settings.DB_NAME]
+project_files = ProjectFileStore(db, mode=settings.PROJECT_FILES_STORAGE)
+conversation_store = ConversationStore(db)
 
 # Create the main app
 app = FastAPI()
@@ -78,14 +86,52 @@ class ConversationMessage(BaseModel):
     role: str
     content: str
 
+class SequencedMessage(Message):
+    seq: int
+
 class Conversation(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
-    messages: List[Message] = []
+    project_id: Optional[str] = None
+    messages: List[SequencedMessage] = []  # Latest page, oldest first
+    message_count: int = 0
+    messages_cursor: Optional[int] = None  # before_seq for the previous page
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class LastMessage(BaseModel):
+    role: str
+    content: str
+    timestamp: datetime
+
+class ConversationSummary(BaseModel):
+    """Conversation list entry: title and last message only"""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    title: str
+    project_id: Optional[str] = None
+    message_count: int = 0
+    last_message: Optional[LastMessage] = None
+    created_at: datetime
+    updated_at: datetime
+
+class ConversationPage(BaseModel):
+    conversations: List[ConversationSummary]
+    next_cursor: Optional[str] = None
+
+class MessagePage(BaseModel):
+    messages: List[SequencedMessage]
+    next_cursor: Optional[int] = None
+
+class ConversationCreate(BaseModel):
+    title: str = Field("New conversation", min_length=1, max_length=500)
+    project_id: Optional[str] = None
+
+class MessageCreate(BaseModel):
+    role: str = Field(..., pattern="^(user|assistant|system)$")
+    content: str = Field(..., min_length=1)
+
 class ProjectFile(BaseModel):
     name: str
     content: str
@@ -102,9 +148,30 @@ class Project(BaseModel):
     github_repo_url: Optional[str] = None
     vercel_url: Optional[str] = None
     project_type: Optional[str] = None  # saas, ecommerce, blog, etc.
+    file_count: Optional[int] = None
+    files_version: Optional[int] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class ProjectSummary(BaseModel):
+    """Project metadata without file contents or conversation"""
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    name: str
+    description: Optional[str] = None
+    conversation_id: Optional[str] = None
+    github_repo_url: Optional[str] = None
+    vercel_url: Optional[str] = None
+    project_type: Optional[str] = None
+    file_count: int = 0
+    files_version: Optional[int] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ProjectFilesPatch(BaseModel):
+    changes: List[FileChange] = Field(..., min_length=1, max_length=500)
+    expected_version: Optional[int] = None
+
 class ChatRequest(BaseModel):
     message: str
     conversation_id: Optional[str] = None
@@ -191,48 +258,78 @@ async def update_settings(updates: UserSettingsUpdate):
 
 # Conversation Routes
 @api_router.post("/conversations", response_model=Conversation)
-async def create_conversation(title: str = Body(..., embed=True)):
-    conversation = Conversation(title=title)
-    doc = conversation.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['updated_at'] = doc['updated_at'].isoformat()
-    for msg in doc['messages']:
-        msg['timestamp'] = msg['timestamp'].isoformat()
-    
-    await db.conversations.insert_one(doc)
-    return conversation
+async def create_conversation(
+    request: ConversationCreate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    header = await conversation_store.create(current_user["user_id"], request.title, request.project_id)
+    return Conversation(**header)
 
-@api_router.get("/conversations", response_model=List[Conversation])
-async def get_conversations():
-    conversations = await db.conversations.find({}, {"_id": 0}).to_list(1000)
-    
-    for conv in conversations:
-        if isinstance(conv.get('created_at'), str):
-            conv['created_at'] = datetime.fromisoformat(conv['created_at'])
-        if isinstance(conv.get('updated_at'), str):
-            conv['updated_at'] = datetime.fromisoformat(conv['updated_at'])
-        for msg in conv.get('messages', []):
-            if isinstance(msg.get('timestamp'), str):
-                msg['timestamp'] = datetime.fromisoformat(msg['timestamp'])
-    
-    return conversations
+@api_router.get("/conversations", response_model=ConversationPage)
+async def get_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    project_id: Optional[str] = Query(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """List conversations, most recent first, with their last message only"""
+    try:
+        conversations, next_cursor = await conversation_store.list_conversations(
+            current_user["user_id"], limit=limit, cursor=cursor, project_id=project_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"conversations": conversations, "next_cursor": next_cursor}
 
 @api_router.get("/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
-    conversation = await db.conversations.find_one({"id": conversation_id}, {"_id": 0})
+async def get_conversation(
+    conversation_id: str = Path(..., min_length=1, max_length=255),
+    message_limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """Conversation header with its latest messages"""
+    if not validate_id_format(conversation_id):
+        raise HTTPException(status_code=400, detail="Invalid conversation ID format")
+    conversation = await conversation_store.get(conversation_id, current_user["user_id"])
     
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
     
-    if isinstance(conversation.get('created_at'), str):
-        conversation['created_at'] = datetime.fromisoformat(conversation['created_at'])
-    if isinstance(conversation.get('updated_at'), str):
-        conversation['updated_at'] = datetime.fromisoformat(conversation['updated_at'])
-    for msg in conversation.get('messages', []):
-        if isinstance(msg.get('timestamp'), str):
-            msg['timestamp'] = datetime.fromisoformat(msg['timestamp'])
+    messages, messages_cursor = await conversation_store.list_messages(conversation_id, limit=message_limit)
+    return Conversation(**conversation, messages=messages, messages_cursor=messages_cursor)
+
+@api_router.get("/conversations/{conversation_id}/messages", response_model=MessagePage)
+async def get_conversation_messages(
+    conversation_id: str = Path(..., min_length=1, max_length=255),
+    limit: int = Query(50, ge=1, le=200),
+    before_seq: Optional[int] = Query(None, ge=1, description="Return messages older than this seq"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Older messages, loaded incrementally via next_cursor"""
+    if not validate_id_format(conversation_id):
+        raise HTTPException(status_code=400, detail="Invalid conversation ID format")
+    if not await conversation_store.get(conversation_id, current_user["user_id"]):
+        raise HTTPException(status_code=404, detail="Conversation not found")
     
-    return Conversation(**conversation)
+    messages, next_cursor = await conversation_store.list_messages(
+        conversation_id, limit=limit, before_seq=before_seq
+    )
+    return {"messages": messages, "next_cursor": next_cursor}
+
+@api_router.post("/conversations/{conversation_id}/messages", response_model=SequencedMessage)
+async def add_conversation_message(
+    conversation_id: str = Path(..., min_length=1, max_length=255),
+    message: MessageCreate = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    if not validate_id_format(conversation_id):
+        raise HTTPException(status_code=400, detail="Invalid conversation ID format")
+    stored = await conversation_store.append_message(
+        conversation_id, message.role, message.content, user_id=current_user["user_id"]
+    )
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return stored
 
 @api_router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
@@ -241,8 +338,7 @@ async def delete_conversation(
 ):
     if not validate_id_format(conversation_id):
         raise HTTPException(status_code=400, detail="Invalid conversation ID format")
-    result = await db.conversations.delete_one({"id": conversation_id})
-    if result.deleted_count == 0:
+    if not await conversation_store.delete(conversation_id, current_user["user_id"]):
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"message": "Conversation deleted successfully"}
 
@@ -253,13 +349,20 @@ async def create_project(project: Project, current_user: dict = Depends(get_curr
     doc['user_id'] = current_user['user_id']  # Link to user
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
+    doc.pop('file_count', None)
+    doc.pop('files_version', None)
     
-    await db.projects.insert_one(doc)
+    await project_files.create_project(doc)
+    project.file_count = len(project.files)
+    project.files_version = doc.get('files_version')
     return project
 
-@api_router.get("/projects", response_model=List[Project])
+@api_router.get("/projects", response_model=List[ProjectSummary])
 async def get_projects(current_user: dict = Depends(get_current_user)):
-    projects = await db.projects.find({"user_id": current_user['user_id']}, {"_id": 0}).to_list(1000)
+    # Metadata only: file contents are loaded by GET /projects/{id}
+    projects = await db.projects.aggregate(
+        project_files.metadata_pipeline({"user_id": current_user['user_id']})
+    ).to_list(1000)
     
     for proj in projects:
         if isinstance(proj.get('created_at'), str):
@@ -281,6 +384,7 @@ async def get_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
+    await project_files.hydrate(project)
     if isinstance(project.get('created_at'), str):
         project['created_at'] = datetime.fromisoformat(project['created_at'])
     if isinstance(project.get('updated_at'), str):
@@ -300,16 +404,38 @@ async def update_project(
     if not existing:
         raise HTTPException(status_code=404, detail="Project not found")
     project.updated_at = datetime.now(timezone.utc)
-    doc = project.model_dump()
+    doc = project.model_dump(exclude={"files", "file_count", "files_version"})
     doc['updated_at'] = doc['updated_at'].isoformat()
     
     await db.projects.update_one(
         {"id": project_id},
         {"$set": doc}
     )
+    # Only files whose content changed are written
+    await project_files.save_files(project_id, [f.model_dump() for f in project.files])
     
     return project
 
+@api_router.patch("/projects/{project_id}/files")
+async def patch_project_files(
+    project_id: str = Path(..., min_length=1, max_length=255),
+    patch: ProjectFilesPatch = Body(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply per-file upserts, deletes and renames atomically"""
+    if not validate_id_format(project_id):
+        raise HTTPException(status_code=400, detail="Invalid project ID format")
+    existing = await db.projects.find_one({"id": project_id, "user_id": current_user["user_id"]}, {"id": 1})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    try:
+        return await project_files.apply_changes(project_id, patch.changes, patch.expected_version)
+    except ProjectFileConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @api_router.delete("/projects/{project_id}")
 async def delete_project(
     project_id: str = Path(..., min_length=1, max_length=255),
@@ -320,6 +446,7 @@ async def delete_project(
     result = await db.projects.delete_one({"id": project_id, "user_id": current_user["user_id"]})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Project not found")
+    await project_files.delete_files([project_id])
     return {"message": "Project deleted successfully"}
 
 # OpenRouter Models List
@@ -433,74 +560,71 @@ When generating code:
         raise HTTPException(status_code=500, detail=str(e))
 
 # GitHub Export
+async def _prepare_github_export(request: ExportGithubRequest, current_user: dict) -> Dict[str, Any]:
+    """Validate the request and build GitHubExporter.export() arguments"""
+    project = await get_project(request.project_id, current_user)
+    
+    if not project.files:
+        raise HTTPException(status_code=400, detail="Project has no files to export")
+    
+    # Validate repo name
+    repo_name = request.repo_name.strip()
+    if not repo_name or '/' in repo_name or ' ' in repo_name:
+        raise HTTPException(status_code=400, detail="Invalid repository name")
+    
+    files = [GitHubExportFile(path=f.name, content=f.content) for f in project.files]
+    if not any(f.path == "README.md" for f in files):
+        readme_content = f"# {project.name}\n\n{project.description or 'Created with Devora'}\n"
+        files.insert(0, GitHubExportFile(path="README.md", content=readme_content))
+    
+    # Re-exporting to the repository linked to the project is incremental
+    linked = bool(project.github_repo_url) and project.github_repo_url.rstrip('/').endswith(f"/{repo_name}")
+    return {
+        "token": request.github_token,
+        "repo_name": repo_name,
+        "files": files,
+        "description": project.description or f"Created with Devora - {project.name}",
+        "private": request.private,
+        "existing_ok": linked,
+        "message": "Update from Devora" if linked else "Initial commit - Created with Devora",
+    }
+
+async def _link_github_repo(project_id: str, repo_url: str, current_user: dict):
+    await db.projects.update_one(
+        {"id": project_id, "user_id": current_user["user_id"]},
+        {"$set": {"github_repo_url": repo_url, "updated_at": datetime.now(timezone.utc).isoformat()}}
+    )
+
+def _github_error(e: GitHubExportError, repo_name: str) -> HTTPException:
+    if e.status_code == 409:
+        return HTTPException(
+            status_code=400, 
+            detail=f"Le repository '{repo_name}' existe deja. Choisissez un autre nom."
+        )
+    return HTTPException(status_code=400, detail=f"Erreur GitHub: {str(e)}")
+
 @api_router.post("/github/export")
-async def export_to_github(request: ExportGithubRequest):
-    """Export project to GitHub repository"""
+async def export_to_github(
+    request: ExportGithubRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export project to GitHub repository in a single commit"""
     try:
-        # Get project
-        project = await get_project(request.project_id)
-        
-        if not project.files:
-            raise HTTPException(status_code=400, detail="Project has no files to export")
-        
-        # Validate repo name
-        repo_name = request.repo_name.strip()
-        if not repo_name or '/' in repo_name or ' ' in repo_name:
-            raise HTTPException(status_code=400, detail="Invalid repository name")
-        
-        # Create GitHub client
-        g = Github(request.github_token)
-        user = g.get_user()
-        
-        # Create repository
+        export_args = await _prepare_github_export(request, current_user)
         try:
-            repo = user.create_repo(
-                name=repo_name,
-                description=project.description or f"Created with Devora - {project.name}",
-                private=request.private,
-                auto_init=False  # Don't init to avoid merge conflicts
-            )
-        except GithubException as e:
-            if "already exists" in str(e).lower() or e.status == 422:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Le repository '{repo_name}' existe deja. Choisissez un autre nom."
-                )
-            raise HTTPException(status_code=400, detail=f"Erreur GitHub: {str(e)}")
+            result = await github_exporter.export(**export_args)
+        except GitHubExportError as e:
+            raise _github_error(e, export_args["repo_name"])
         
-        # Add README first to initialize repo
-        readme_content = f"# {project.name}\n\n{project.description or 'Created with Devora'}\n"
-        try:
-            repo.create_file(
-                path="README.md",
-                message="Initial commit - Created with Devora",
-                content=readme_content
-            )
-        except GithubException as e:
-            logging.warning(f"README creation warning: {str(e)}")
-        
-        # Add project files
-        files_created = 0
-        for file in project.files:
-            try:
-                repo.create_file(
-                    path=file.name,
-                    message=f"Add {file.name}",
-                    content=file.content
-                )
-                files_created += 1
-            except GithubException as e:
-                logging.error(f"Error creating file {file.name}: {str(e)}")
-        
-        # Update project with GitHub URL
-        project.github_repo_url = repo.html_url
-        await update_project(request.project_id, project)
+        await _link_github_repo(request.project_id, result.repo_url, current_user)
         
         return {
             "success": True,
-            "repo_url": repo.html_url,
-            "files_created": files_created,
-            "message": f"Projet exporte sur GitHub avec {files_created} fichier(s)"
+            "repo_url": result.repo_url,
+            "commit_sha": result.commit_sha,
+            "files_created": result.files_pushed,
+            "files_unchanged": result.files_unchanged,
+            "message": f"Projet exporte sur GitHub avec {result.files_pushed} fichier(s)"
         }
         
     except HTTPException:
@@ -509,6 +633,31 @@ async def export_to_github(request: ExportGithubRequest):
         logging.error(f"GitHub export error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'export: {str(e)}")
 
+@api_router.post("/github/export/stream")
+async def export_to_github_stream(
+    request: ExportGithubRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export project to GitHub, streaming progress as Server-Sent Events"""
+    export_args = await _prepare_github_export(request, current_user)
+    
+    async def event_generator():
+        async for event in github_exporter.export_with_stream(**export_args):
+            if event.startswith("event: complete"):
+                data = json.loads(event.split("data: ", 1)[1])
+                await _link_github_repo(request.project_id, data["repo_url"], current_user)
+            yield event
+    
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 # Vercel Deploy
 @api_router.post("/vercel/deploy")
 async def deploy_to_vercel(request: DeployVercelRequest):
@@ -665,7 +814,8 @@ async def generate_with_agentic_system(request: AgenticRequest):
             conversation,
             files=files_as_dicts,
             keep_recent_messages=6,
-            max_file_tokens=3000
+            max_file_tokens=3000,
+            query=request.message
         )
         
         if compression_stats.get('compressed'):
@@ -940,6 +1090,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_storage_indexes():
+    await project_files.ensure_indexes()
+    await conversation_store.ensure_indexes()
+    await conversation_store.assign_legacy_owners()
+
+@app.on_event("startup")
+async def watch_system_config():
+    # Invalidates the cached system config when another worker changes it
+    app.state.config_watcher = asyncio.create_task(ConfigService(db).watch_changes())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.config_watcher.cancel()
+    await github_exporter.close()
+    StripeServiceV2.shutdown_executor()
     client.close()
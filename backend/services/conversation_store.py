@@ -0,0 +1,333 @@
+"""
+Conversation Store
+
+Conversations are split into a header document (`conversations`) and
+one document per message (`conversation_messages`) keyed by
+(conversation_id, seq):
+- Appending a message is one insert plus a counter bump on the header
+- Headers carry the message count and a preview of the last message,
+  so conversation lists never touch the messages collection
+- Both lists use keyset (cursor) pagination on indexed keys
+- Conversations with embedded messages are migrated on first access
+- Conversations created before ownership was recorded are assigned to
+  the owner of the project that links them (assign_legacy_owners)
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+LAST_MESSAGE_PREVIEW_CHARS = 200
+
+HEADER_PROJECTION = {"_id": 0, "messages": 0}
+
+# Conversations looked up per batch when assigning legacy owners
+LEGACY_OWNER_BATCH_SIZE = 500
+
+
+class ConversationStore:
+    """
+    Header + messages storage for chat conversations.
+
+    Example:
+        store = ConversationStore(db)
+        await store.ensure_indexes()
+
+        conv = await store.create("user_1", "Landing page")
+        await store.append_message(conv["id"], "user", "Build a landing page")
+        page, next_cursor = await store.list_conversations("user_1", limit=20)
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.conversations = db.conversations
+        self.messages = db.conversation_messages
+
+    async def ensure_indexes(self) -> None:
+        """Create the list and message indexes"""
+        try:
+            await self.conversations.create_index(
+                [("user_id", 1), ("updated_at", -1), ("id", -1)],
+                name="user_conversations_idx"
+            )
+            await self.messages.create_index(
+                [("conversation_id", 1), ("seq", 1)],
+                unique=True,
+                name="conversation_seq_idx"
+            )
+        except Exception as e:
+            logger.warning(f"Error creating conversation indexes (may already exist): {e}")
+
+    # ------------------------------------------------------------------
+    # Conversations
+    # ------------------------------------------------------------------
+
+    async def create(
+        self,
+        user_id: str,
+        title: str,
+        project_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create an empty conversation and return its header"""
+        now = datetime.now(timezone.utc).isoformat()
+        header = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "project_id": project_id,
+            "title": title,
+            "message_count": 0,
+            "last_message": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.conversations.insert_one(dict(header))
+        return header
+
+    async def get(self, conversation_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Conversation header, or None if it does not belong to the user"""
+        header = await self.conversations.find_one(
+            {"id": conversation_id, "user_id": user_id}, {"_id": 0}
+        )
+        if header is None:
+            return None
+        if "messages" in header:
+            header = await self._migrate(header)
+        return header
+
+    async def list_conversations(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Page of conversation headers, most recently updated first.
+
+        Args:
+            user_id: Owner of the conversations
+            limit: Page size
+            cursor: next_cursor of the previous page
+            project_id: Only conversations of this project
+
+        Returns:
+            Tuple of (headers, next_cursor); next_cursor is None on the last page
+        """
+        query: Dict[str, Any] = {"user_id": user_id}
+        if project_id:
+            query["project_id"] = project_id
+        if cursor:
+            updated_at, conversation_id = self._decode_cursor(cursor)
+            query["$or"] = [
+                {"updated_at": {"$lt": updated_at}},
+                {"updated_at": updated_at, "id": {"$lt": conversation_id}},
+            ]
+
+        headers = await self.conversations.find(query, HEADER_PROJECTION).sort(
+            [("updated_at", -1), ("id", -1)]
+        ).limit(limit).to_list(limit)
+
+        # Embedded-message conversations have no preview yet
+        for i, header in enumerate(headers):
+            if "message_count" not in header:
+                headers[i] = await self._migrate(
+                    await self.conversations.find_one({"id": header["id"]}, {"_id": 0})
+                )
+
+        next_cursor = None
+        if len(headers) == limit:
+            last = headers[-1]
+            next_cursor = f"{last['updated_at']}|{last['id']}"
+        return headers, next_cursor
+
+    async def delete(self, conversation_id: str, user_id: str) -> bool:
+        """Delete a conversation and its messages"""
+        result = await self.conversations.delete_one({"id": conversation_id, "user_id": user_id})
+        if result.deleted_count == 0:
+            return False
+        await self.messages.delete_many({"conversation_id": conversation_id})
+        return True
+
+    async def assign_legacy_owners(self, batch_size: int = LEGACY_OWNER_BATCH_SIZE) -> int:
+        """
+        Give owner-less conversations the owner of their project.
+
+        Conversations were created without a user_id before the routes
+        required authentication; the only link to an owner is a project's
+        conversation_id. Conversations no project points to stay hidden
+        from every user.
+
+        Returns:
+            Number of conversations assigned an owner
+        """
+        assigned = 0
+        cursor = self.conversations.find({"user_id": {"$exists": False}}, {"_id": 0, "id": 1})
+        while True:
+            batch = [doc["id"] for doc in await cursor.to_list(batch_size)]
+            if not batch:
+                break
+            projects = self.db.projects.find(
+                {"conversation_id": {"$in": batch}, "user_id": {"$exists": True}},
+                {"_id": 0, "id": 1, "user_id": 1, "conversation_id": 1}
+            )
+            updates = [
+                UpdateOne(
+                    {"id": project["conversation_id"], "user_id": {"$exists": False}},
+                    {"$set": {"user_id": project["user_id"], "project_id": project["id"]}}
+                )
+                async for project in projects
+            ]
+            if updates:
+                result = await self.conversations.bulk_write(updates, ordered=False)
+                assigned += result.modified_count
+
+        orphaned = await self.conversations.count_documents({"user_id": {"$exists": False}})
+        if assigned or orphaned:
+            logger.info(
+                f"Assigned an owner to {assigned} legacy conversations; "
+                f"{orphaned} have no project and stay hidden"
+            )
+        return assigned
+
+    # ------------------------------------------------------------------
+    # Messages
+    # ------------------------------------------------------------------
+
+    async def append_message(
+        self,
+        conversation_id: str,
+        role: str,
+        content: str,
+        user_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Append a message to a conversation.
+
+        The header's message_count is incremented atomically and its new
+        value is the message's seq, so concurrent appends never collide.
+
+        Returns:
+            The stored message, or None if the conversation does not exist
+        """
+        query: Dict[str, Any] = {"id": conversation_id}
+        if user_id is not None:
+            query["user_id"] = user_id
+
+        header = await self.conversations.find_one(query, {"_id": 0, "id": 1, "message_count": 1})
+        if header is None:
+            return None
+        if "message_count" not in header:
+            await self._migrate(await self.conversations.find_one(query, {"_id": 0}))
+
+        now = datetime.now(timezone.utc).isoformat()
+        message = {
+            "id": str(uuid.uuid4()),
+            "role": role,
+            "content": content,
+            "timestamp": now,
+        }
+        updated = await self.conversations.find_one_and_update(
+            query,
+            {
+                "$inc": {"message_count": 1},
+                "$set": {"updated_at": now, "last_message": self._preview(message)},
+            },
+            projection={"_id": 0, "message_count": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated is None:
+            return None
+
+        message["seq"] = updated["message_count"]
+        await self.messages.insert_one({"conversation_id": conversation_id, **message})
+        return message
+
+    async def list_messages(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        before_seq: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Page of messages ending at the newest (or just before `before_seq`).
+
+        Messages are returned in chronological order; pass next_cursor as
+        before_seq to load older messages.
+
+        Returns:
+            Tuple of (messages, next_cursor); next_cursor is None when the
+            first message has been reached
+        """
+        query: Dict[str, Any] = {"conversation_id": conversation_id}
+        if before_seq is not None:
+            query["seq"] = {"$lt": before_seq}
+
+        page = await self.messages.find(
+            query, {"_id": 0, "conversation_id": 0}
+        ).sort("seq", -1).limit(limit).to_list(limit)
+        page.reverse()
+
+        next_cursor = page[0]["seq"] if len(page) == limit and page[0]["seq"] > 1 else None
+        return page, next_cursor
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _preview(message: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "role": message["role"],
+            "content": message["content"][:LAST_MESSAGE_PREVIEW_CHARS],
+            "timestamp": message["timestamp"],
+        }
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        updated_at, sep, conversation_id = cursor.rpartition("|")
+        if not sep or not updated_at or not conversation_id:
+            raise ValueError("Invalid conversation cursor")
+        return updated_at, conversation_id
+
+    async def _migrate(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Move embedded messages to the messages collection"""
+        embedded = doc.pop("messages", None) or []
+        docs = []
+        for seq, msg in enumerate(embedded, start=1):
+            timestamp = msg.get("timestamp")
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.isoformat()
+            docs.append({
+                "conversation_id": doc["id"],
+                "seq": seq,
+                "id": msg.get("id") or str(uuid.uuid4()),
+                "role": msg["role"],
+                "content": msg["content"],
+                "timestamp": timestamp or doc.get("updated_at"),
+            })
+
+        if docs:
+            try:
+                await self.messages.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # A concurrent migration already inserted some of them
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+
+        doc["message_count"] = len(docs)
+        doc["last_message"] = self._preview(docs[-1]) if docs else None
+        await self.conversations.update_one(
+            {"id": doc["id"], "messages": {"$exists": True}},
+            {
+                "$set": {"message_count": doc["message_count"], "last_message": doc["last_message"]},
+                "$unset": {"messages": ""}
+            }
+        )
+        return doc
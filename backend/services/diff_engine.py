@@ -0,0 +1,481 @@
+"""
+Diff Engine for Version Control
+
+Line-based diffing used by the version control service:
+- Linear-space Myers diff (minimal edit script) over interned lines
+- Per-file size/line limits and binary detection
+- CPU-heavy diffs run on a process pool, small ones inline
+- Results cached by (old blob hash, new blob hash)
+- Summary (stats only) or full unified hunks
+"""
+
+import asyncio
+import difflib
+import logging
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+Match = difflib.Match
+
+
+@dataclass(frozen=True)
+class DiffLimits:
+    """Guards applied before diffing a file"""
+    max_bytes: int = 1_000_000
+    max_lines: int = 20_000
+    # Diffs smaller than this run inline instead of on the pool
+    inline_max_lines: int = 2_000
+    # Edit distance beyond which a region is reported as a plain replacement
+    max_edit_distance: int = 1_000
+    context_lines: int = 3
+
+
+def is_binary(content: str, sample_size: int = 8000) -> bool:
+    """Heuristic binary detection on the first bytes of a file"""
+    sample = content[:sample_size]
+    if "\x00" in sample:
+        return True
+    if not sample:
+        return False
+    control = sum(1 for ch in sample if ord(ch) < 32 and ch not in "\n\r\t\f\b")
+    return control / len(sample) > 0.3
+
+
+# ============================================================================
+# Myers diff
+# ============================================================================
+
+class _EditBudgetExceeded(Exception):
+    """The region needs more edits than the configured budget"""
+
+
+def _middle_snake(
+    a: List[int], b: List[int],
+    a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+    max_cost: int
+) -> Tuple[int, int, int, int]:
+    """
+    Find the middle snake of the shortest edit script (Myers 1986, 4b).
+
+    Returns:
+        (x_start, y_start, x_end, y_end) relative to (a_lo, b_lo)
+
+    Raises:
+        _EditBudgetExceeded: If the edit distance exceeds max_cost
+    """
+    n = a_hi - a_lo
+    m = b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    vf = [0] * (2 * offset + 1)
+    vb = [0] * (2 * offset + 1)
+
+    for d in range(max_d + 1):
+        if 2 * d > max_cost:
+            raise _EditBudgetExceeded()
+
+        # Forward search
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                x = vf[offset + k + 1]
+            else:
+                x = vf[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            vf[offset + k] = x
+            c = delta - k
+            if odd and -(d - 1) <= c <= d - 1 and x + vb[offset + c] >= n:
+                return x0, y0, x, y
+
+        # Reverse search (diagonal c on the reversed sequences)
+        for c in range(-d, d + 1, 2):
+            if c == -d or (c != d and vb[offset + c - 1] < vb[offset + c + 1]):
+                x = vb[offset + c + 1]
+            else:
+                x = vb[offset + c - 1] + 1
+            y = x - c
+            x0, y0 = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            vb[offset + c] = x
+            k = delta - c
+            if not odd and -d <= k <= d and x + vf[offset + k] >= n:
+                return n - x, m - y, n - x0, m - y0
+
+    raise AssertionError("middle snake not found")
+
+
+def _myers_blocks(
+    a: List[int], b: List[int],
+    a_lo: int, a_hi: int, b_lo: int, b_hi: int,
+    blocks: List[Tuple[int, int, int]],
+    max_cost: int
+) -> None:
+    """Append matching runs of a[a_lo:a_hi] / b[b_lo:b_hi] in order"""
+    # Common prefix
+    start = 0
+    while a_lo + start < a_hi and b_lo + start < b_hi and a[a_lo + start] == b[b_lo + start]:
+        start += 1
+    if start:
+        blocks.append((a_lo, b_lo, start))
+        a_lo += start
+        b_lo += start
+
+    # Common suffix
+    end = 0
+    while a_hi - end > a_lo and b_hi - end > b_lo and a[a_hi - 1 - end] == b[b_hi - 1 - end]:
+        end += 1
+    a_hi -= end
+    b_hi -= end
+
+    if a_lo < a_hi and b_lo < b_hi:
+        try:
+            x0, y0, x1, y1 = _middle_snake(a, b, a_lo, a_hi, b_lo, b_hi, max_cost)
+        except _EditBudgetExceeded:
+            # Leave the whole region unmatched (reported as a replacement)
+            pass
+        else:
+            _myers_blocks(a, b, a_lo, a_lo + x0, b_lo, b_lo + y0, blocks, max_cost)
+            if x1 > x0:
+                blocks.append((a_lo + x0, b_lo + y0, x1 - x0))
+            _myers_blocks(a, b, a_lo + x1, a_hi, b_lo + y1, b_hi, blocks, max_cost)
+
+    if end:
+        blocks.append((a_hi, b_hi, end))
+
+
+def myers_matching_blocks(
+    a: List[str],
+    b: List[str],
+    max_edit_distance: int = DiffLimits.max_edit_distance
+) -> List[Match]:
+    """
+    Matching blocks of a minimal line diff (within the edit budget), in
+    difflib's format.
+
+    Args:
+        a: Old lines
+        b: New lines
+        max_edit_distance: Per-region edit budget before giving up on
+            alignment (keeps pathological inputs bounded)
+
+    Returns:
+        List of difflib.Match, ending with the (len(a), len(b), 0) sentinel
+    """
+    # Intern lines so comparisons are integer comparisons
+    ids: Dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+
+    # Lines present on one side only can never match: drop them before
+    # diffing, which keeps churn-heavy files (lockfiles) cheap
+    a_set, b_set = set(a_ids), set(b_ids)
+    a_keep = [i for i, line in enumerate(a_ids) if line in b_set]
+    b_keep = [j for j, line in enumerate(b_ids) if line in a_set]
+    a_red = [a_ids[i] for i in a_keep]
+    b_red = [b_ids[j] for j in b_keep]
+
+    raw: List[Tuple[int, int, int]] = []
+    _myers_blocks(a_red, b_red, 0, len(a_red), 0, len(b_red), raw, max_edit_distance)
+
+    # Map back to original positions and merge adjacent runs, as difflib does
+    merged: List[Match] = []
+    for i, j, size in raw:
+        for t in range(size):
+            oi, oj = a_keep[i + t], b_keep[j + t]
+            if merged and merged[-1].a + merged[-1].size == oi and merged[-1].b + merged[-1].size == oj:
+                last = merged[-1]
+                merged[-1] = Match(last.a, last.b, last.size + 1)
+            else:
+                merged.append(Match(oi, oj, 1))
+    merged.append(Match(len(a), len(b), 0))
+    return merged
+
+
+class _MyersMatcher(difflib.SequenceMatcher):
+    """SequenceMatcher whose matching blocks come from Myers' algorithm"""
+
+    def __init__(self, a: List[str], b: List[str], max_edit_distance: int):
+        self.max_edit_distance = max_edit_distance
+        super().__init__(None, a, b, autojunk=False)
+
+    def get_matching_blocks(self):
+        if self.matching_blocks is None:
+            self.matching_blocks = myers_matching_blocks(self.a, self.b, self.max_edit_distance)
+        return self.matching_blocks
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range, same format as difflib"""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def compute_file_diff(
+    name: str,
+    old_content: str,
+    new_content: str,
+    limits: DiffLimits = DiffLimits(),
+    summary_only: bool = False
+) -> Dict[str, Any]:
+    """
+    Diff one file (pure function, safe to run in a worker process).
+
+    Args:
+        name: File name, used in the ---/+++ headers
+        old_content: Previous content
+        new_content: Current content
+        limits: Size guards
+        summary_only: Skip hunk formatting
+
+    Returns:
+        Dict with name, diff_lines, additions, deletions, binary, too_large
+    """
+    result = {
+        "name": name,
+        "diff_lines": [],
+        "additions": 0,
+        "deletions": 0,
+        "binary": False,
+        "too_large": False,
+    }
+
+    if is_binary(old_content) or is_binary(new_content):
+        result["binary"] = True
+        return result
+
+    old_lines = old_content.splitlines(keepends=True)
+    new_lines = new_content.splitlines(keepends=True)
+
+    too_large = (
+        max(len(old_content), len(new_content)) > limits.max_bytes
+        or max(len(old_lines), len(new_lines)) > limits.max_lines
+    )
+    if too_large:
+        # Approximate stats from line multisets, no hunks
+        old_counts = Counter(old_lines)
+        new_counts = Counter(new_lines)
+        result["too_large"] = True
+        result["additions"] = sum((new_counts - old_counts).values())
+        result["deletions"] = sum((old_counts - new_counts).values())
+        return result
+
+    matcher = _MyersMatcher(old_lines, new_lines, limits.max_edit_distance)
+
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            result["deletions"] += i2 - i1
+        if tag in ("replace", "insert"):
+            result["additions"] += j2 - j1
+
+    if summary_only:
+        return result
+
+    diff_lines = []
+    for group in matcher.get_grouped_opcodes(limits.context_lines):
+        if not diff_lines:
+            diff_lines.append(f"--- a/{name}")
+            diff_lines.append(f"+++ b/{name}")
+        first, last = group[0], group[-1]
+        diff_lines.append(
+            f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                diff_lines.extend(" " + line for line in old_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                diff_lines.extend("-" + line for line in old_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                diff_lines.extend("+" + line for line in new_lines[j1:j2])
+
+    result["diff_lines"] = diff_lines
+    return result
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+
+class _DiffCache:
+    """Thread-safe LRU of file diffs keyed by blob hash pair"""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple[str, str], value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def contains(self, key: Tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiffEngine:
+    """
+    Async front-end for file diffs.
+
+    Example:
+        engine = DiffEngine()
+        file_diff = await engine.diff_file("app.py", old_hash, new_hash, old, new)
+        summary = await engine.diff_file("app.py", old_hash, new_hash, old, new, summary_only=True)
+    """
+
+    def __init__(
+        self,
+        limits: DiffLimits = DiffLimits(),
+        max_workers: Optional[int] = None,
+        cache_size: int = 2048
+    ):
+        self.limits = limits
+        self.max_workers = max_workers
+        self._cache = _DiffCache(cache_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def is_cached(self, old_hash: Optional[str], new_hash: Optional[str]) -> bool:
+        """Whether the diff between two blobs is already cached"""
+        return bool(old_hash and new_hash) and self._cache.contains((old_hash, new_hash))
+
+    async def diff_file(
+        self,
+        name: str,
+        old_hash: Optional[str],
+        new_hash: Optional[str],
+        old_content: Optional[str],
+        new_content: Optional[str],
+        summary_only: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Diff one file, using the cache when both blob hashes are known.
+
+        Args:
+            name: File name
+            old_hash: Blob hash of the previous content (None if unknown)
+            new_hash: Blob hash of the current content (None if unknown)
+            old_content: Previous content (None if expected to be cached)
+            new_content: Current content (None if expected to be cached)
+            summary_only: Drop hunks from the returned result
+
+        Returns:
+            FileDiff-compatible dict, or None if contents were omitted and
+            the diff is not (or no longer) cached
+        """
+        if old_hash is not None and old_hash == new_hash:
+            return {"name": name, "diff_lines": [], "additions": 0, "deletions": 0,
+                    "binary": False, "too_large": False}
+
+        cache_key = (old_hash, new_hash) if old_hash and new_hash else None
+        result = self._cache.get(cache_key) if cache_key else None
+
+        if result is None:
+            if old_content is None or new_content is None:
+                return None
+            line_count = old_content.count("\n") + new_content.count("\n")
+            if line_count <= self.limits.inline_max_lines:
+                result = compute_file_diff(name, old_content, new_content, self.limits)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._get_executor(),
+                    compute_file_diff, name, old_content, new_content, self.limits
+                )
+            if cache_key:
+                self._cache.put(cache_key, result)
+
+        result = {**result, "name": name}
+        if summary_only:
+            result["diff_lines"] = []
+        return result
+
+    async def diff_files(
+        self,
+        pairs: List[Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]],
+        summary_only: bool = False
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Diff several files concurrently.
+
+        Args:
+            pairs: (name, old_hash, new_hash, old_content, new_content) tuples
+            summary_only: Drop hunks from the returned results
+
+        Returns:
+            FileDiff-compatible dicts (see diff_file), in input order
+        """
+        return list(await asyncio.gather(*(
+            self.diff_file(*pair, summary_only=summary_only) for pair in pairs
+        )))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics and configured limits"""
+        total = self._cache.hits + self._cache.misses
+        return {
+            "cache_entries": len(self._cache),
+            "cache_hits": self._cache.hits,
+            "cache_misses": self._cache.misses,
+            "hit_rate": round(self._cache.hits / total, 3) if total else 0.0,
+            "limits": asdict(self.limits),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Shared engine, so the cache is reused across service instances
+_diff_engine: Optional[DiffEngine] = None
+
+
+def get_diff_engine() -> DiffEngine:
+    """Get or create the shared DiffEngine"""
+    global _diff_engine
+    if _diff_engine is None:
+        _diff_engine = DiffEngine()
+    return _diff_engine
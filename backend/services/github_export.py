@@ -0,0 +1,354 @@
+"""
+GitHub Export Service
+
+Pushes a project to GitHub with the Git Data API instead of one
+Contents API commit per file:
+- Blobs are created concurrently (bounded) over a pooled async client
+- One tree, one commit and one ref update per export
+- Re-exports compare local git blob SHAs with the remote tree and only
+  upload files that changed; an unchanged project makes no commit
+- Progress can be streamed as Server-Sent Events
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable, Awaitable, AsyncIterator
+
+import httpx
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API = "https://api.github.com"
+
+FILE_MODE = "100644"
+
+
+class GitHubExportError(Exception):
+    """GitHub rejected an export request"""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GitHubExportFile(BaseModel):
+    path: str
+    content: str
+
+
+class GitHubExportProgress(BaseModel):
+    stage: str
+    progress: int
+    message: str
+
+
+class GitHubExportResult(BaseModel):
+    success: bool
+    repo_url: Optional[str] = None
+    commit_sha: Optional[str] = None
+    created_repo: bool = False
+    files_pushed: int = 0
+    files_unchanged: int = 0
+    files_deleted: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+ProgressCallback = Callable[[GitHubExportProgress], Awaitable[None]]
+
+
+def git_blob_sha(content: str) -> str:
+    """SHA git assigns to a blob with this content"""
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GitHubExporter:
+    """
+    Bulk exporter built on the Git Data API.
+
+    Example:
+        exporter = GitHubExporter()
+        result = await exporter.export(
+            token, "my-app",
+            [GitHubExportFile(path="index.html", content="<h1>Hi</h1>")],
+            description="Created with Devora"
+        )
+    """
+
+    def __init__(
+        self,
+        api_url: str = GITHUB_API,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self._transport = transport
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.api_url,
+                timeout=60.0,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency * 2,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                headers={
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                },
+                transport=self._transport
+            )
+        return self._http_client
+
+    async def close(self):
+        if self._http_client:
+            await self._http_client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        token: str,
+        json_body: Optional[Dict[str, Any]] = None,
+        allow_404: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Call the API, retrying rate limits and server errors with backoff"""
+        client = await self._get_client()
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.request(method, path, json=json_body, headers=headers)
+            except httpx.RequestError as e:
+                if attempt == self.max_retries:
+                    raise GitHubExportError(f"GitHub unreachable: {e}", 502)
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 404 and allow_404:
+                return None
+            retryable = response.status_code >= 500 or (
+                response.status_code in (403, 429) and (
+                    response.headers.get("retry-after")
+                    or response.headers.get("x-ratelimit-remaining") == "0"
+                )
+            )
+            if retryable and attempt < self.max_retries:
+                delay = float(response.headers.get("retry-after") or 2 ** attempt)
+                await asyncio.sleep(min(delay, 30.0))
+                continue
+            if response.status_code >= 400:
+                try:
+                    message = response.json().get("message", response.text)
+                except ValueError:
+                    message = response.text
+                raise GitHubExportError(f"GitHub {method} {path}: {message}", response.status_code)
+            return response.json() if response.content else {}
+
+        raise GitHubExportError(f"GitHub {method} {path}: retries exhausted", 502)
+
+    async def export(
+        self,
+        token: str,
+        repo_name: str,
+        files: List[GitHubExportFile],
+        description: str = "",
+        private: bool = False,
+        create: bool = True,
+        existing_ok: bool = True,
+        prune: bool = False,
+        message: str = "Export from Devora",
+        on_progress: Optional[ProgressCallback] = None
+    ) -> GitHubExportResult:
+        """
+        Export files to a repository of the token's user.
+
+        Args:
+            token: GitHub token
+            repo_name: Repository name (created if missing and `create` is set)
+            files: Files to push
+            description: Description of a newly created repository
+            private: Visibility of a newly created repository
+            create: Create the repository if it does not exist
+            existing_ok: Allow exporting into a repository that already exists
+            prune: Delete remote files that are not in `files`
+            message: Commit message
+            on_progress: Awaited with progress updates
+
+        Returns:
+            GitHubExportResult; commit_sha is None when nothing changed
+
+        Raises:
+            GitHubExportError: On any GitHub API failure
+        """
+        async def report(stage: str, progress: int, text: str):
+            if on_progress:
+                await on_progress(GitHubExportProgress(stage=stage, progress=progress, message=text))
+
+        await report("repository", 5, "Preparing repository")
+        user = await self._request("GET", "/user", token)
+        owner = user["login"]
+        repo_path = f"/repos/{owner}/{repo_name}"
+
+        repo = await self._request("GET", repo_path, token, allow_404=True)
+        created_repo = False
+        if repo is not None and not existing_ok:
+            raise GitHubExportError(f"Repository {owner}/{repo_name} already exists", 409)
+        if repo is None:
+            if not create:
+                raise GitHubExportError(f"Repository {owner}/{repo_name} not found", 404)
+            # auto_init gives the repository a first commit to build on
+            repo = await self._request("POST", "/user/repos", token, {
+                "name": repo_name,
+                "description": description,
+                "private": private,
+                "auto_init": True,
+            })
+            created_repo = True
+
+        branch = repo.get("default_branch") or "main"
+        try:
+            ref = await self._request("GET", f"{repo_path}/git/ref/heads/{branch}", token)
+        except GitHubExportError as e:
+            # 409 "Git Repository is empty" (or no such branch): the first
+            # commit has no parent and the ref is created after it
+            if e.status_code not in (404, 409):
+                raise
+            ref = None
+
+        head_sha = base_tree_sha = None
+        remote: Dict[str, str] = {}
+        await report("diff", 10, "Comparing with repository contents")
+        if ref is not None:
+            head_sha = ref["object"]["sha"]
+            head_commit = await self._request("GET", f"{repo_path}/git/commits/{head_sha}", token)
+            base_tree_sha = head_commit["tree"]["sha"]
+            remote_tree = await self._request(
+                "GET", f"{repo_path}/git/trees/{base_tree_sha}?recursive=1", token
+            )
+            remote = {
+                entry["path"]: entry["sha"]
+                for entry in remote_tree.get("tree", []) if entry.get("type") == "blob"
+            }
+            if remote_tree.get("truncated"):
+                # Too large to list completely: upload everything
+                remote = {}
+
+        changed = [f for f in files if remote.get(f.path) != git_blob_sha(f.content)]
+        local_paths = {f.path for f in files}
+        deleted = [path for path in remote if path not in local_paths] if prune else []
+        unchanged = len(files) - len(changed)
+
+        if not changed and not deleted:
+            await report("done", 100, "Repository already up to date")
+            return GitHubExportResult(
+                success=True,
+                repo_url=repo["html_url"],
+                created_repo=created_repo,
+                files_unchanged=unchanged
+            )
+
+        tree_entries = await self._create_blobs(token, repo_path, changed, report)
+        tree_entries += [
+            {"path": path, "mode": FILE_MODE, "type": "blob", "sha": None}
+            for path in deleted
+        ]
+
+        await report("commit", 90, "Creating commit")
+        tree_body: Dict[str, Any] = {"tree": tree_entries}
+        if base_tree_sha is not None:
+            tree_body["base_tree"] = base_tree_sha
+        tree = await self._request("POST", f"{repo_path}/git/trees", token, tree_body)
+        commit = await self._request("POST", f"{repo_path}/git/commits", token, {
+            "message": message,
+            "tree": tree["sha"],
+            "parents": [head_sha] if head_sha is not None else [],
+        })
+        if head_sha is None:
+            await self._request("POST", f"{repo_path}/git/refs", token, {
+                "ref": f"refs/heads/{branch}",
+                "sha": commit["sha"],
+            })
+        else:
+            await self._request("PATCH", f"{repo_path}/git/refs/heads/{branch}", token, {
+                "sha": commit["sha"],
+            })
+
+        await report("done", 100, f"Pushed {len(changed)} file(s) in one commit")
+        return GitHubExportResult(
+            success=True,
+            repo_url=repo["html_url"],
+            commit_sha=commit["sha"],
+            created_repo=created_repo,
+            files_pushed=len(changed),
+            files_unchanged=unchanged,
+            files_deleted=len(deleted)
+        )
+
+    async def _create_blobs(
+        self,
+        token: str,
+        repo_path: str,
+        files: List[GitHubExportFile],
+        report: Callable[[str, int, str], Awaitable[None]]
+    ) -> List[Dict[str, Any]]:
+        """Upload blobs concurrently and return their tree entries, in input order"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = 0
+
+        async def create(file: GitHubExportFile) -> Dict[str, Any]:
+            nonlocal done
+            async with semaphore:
+                blob = await self._request("POST", f"{repo_path}/git/blobs", token, {
+                    "content": file.content,
+                    "encoding": "utf-8",
+                })
+            done += 1
+            await report("blobs", 10 + int(80 * done / len(files)), f"Uploaded {file.path}")
+            return {"path": file.path, "mode": FILE_MODE, "type": "blob", "sha": blob["sha"]}
+
+        return list(await asyncio.gather(*(create(f) for f in files)))
+
+    async def export_with_stream(self, *args, **kwargs) -> AsyncIterator[str]:
+        """
+        Run export() and yield its progress as Server-Sent Events.
+
+        Emits `progress` events, then a final `complete` or `error` event.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def on_progress(progress: GitHubExportProgress):
+            await queue.put(("progress", progress.model_dump()))
+
+        async def run():
+            try:
+                result = await self.export(*args, on_progress=on_progress, **kwargs)
+                await queue.put(("complete", json.loads(result.model_dump_json())))
+            except GitHubExportError as e:
+                await queue.put(("error", {"error": str(e), "status_code": e.status_code}))
+            except Exception as e:
+                logger.exception("GitHub export failed")
+                await queue.put(("error", {"error": str(e), "status_code": 500}))
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event in ("complete", "error"):
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+github_exporter = GitHubExporter()
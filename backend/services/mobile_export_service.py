@@ -15,10 +15,19 @@ Features:
 import os
 import re
 import json
+import time
+import uuid
+import shutil
+import asyncio
 import logging
+import tempfile
+import threading
 import zipfile
 import io
-from typing import List, Dict, Optional, Any, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Any, Tuple, Set, Iterator, BinaryIO
 from datetime import datetime, timezone
 from enum import Enum
 from dataclasses import dataclass, field
@@ -207,111 +216,131 @@ class CSSToStyleSheetConverter:
         "overflow-scroll": {"overflow": "scroll"},
     }
 
+    TEXT_SIZE_MAP = {
+        "text-xs": 12, "text-sm": 14, "text-base": 16,
+        "text-lg": 18, "text-xl": 20, "text-2xl": 24,
+        "text-3xl": 30, "text-4xl": 36, "text-5xl": 48
+    }
+
+    ROUNDED_MAP = {
+        "rounded-none": 0, "rounded-sm": 2, "rounded": 4,
+        "rounded-md": 6, "rounded-lg": 8, "rounded-xl": 12,
+        "rounded-2xl": 16, "rounded-3xl": 24, "rounded-full": 9999
+    }
+
+    _SPACING_RE = re.compile(r'^([mp])([xytrbl])?-(\d+(?:\.\d+)?|\[.+\])$')
+    _SIZE_RE = re.compile(r'^([wh])-(\d+|full|screen|auto|\[.+\])$')
+    _COLOR_RE = re.compile(r'^(text|bg|border)-(\w+)(?:-(\d+))?$')
+    _GAP_RE = re.compile(r'^gap-(\d+)$')
+    _NON_DIGIT_RE = re.compile(r'[^\d]')
+
     @classmethod
     def convert_tailwind_classes(cls, class_string: str) -> Dict[str, Any]:
         """Convert Tailwind classes to RN StyleSheet properties"""
-        styles = {}
-        classes = class_string.split()
-
-        for css_class in classes:
-            # Direct mapping
-            if css_class in cls.TAILWIND_MAP:
-                styles.update(cls.TAILWIND_MAP[css_class])
-                continue
-
-            # Dynamic values
-            # Spacing: p-4, m-2, px-4, py-2, etc.
-            spacing_match = re.match(r'^([mp])([xytrbl])?-(\d+(?:\.\d+)?|\[.+\])$', css_class)
-            if spacing_match:
-                prop_type = "padding" if spacing_match.group(1) == "p" else "margin"
-                direction = spacing_match.group(2)
-                value_str = spacing_match.group(3)
-
-                # Handle custom values like [16px]
-                if value_str.startswith('[') and value_str.endswith(']'):
-                    value = int(re.sub(r'[^\d]', '', value_str))
-                else:
-                    value = int(float(value_str) * 4)
-
-                if direction is None:
-                    styles[prop_type] = value
-                elif direction == 'x':
-                    styles[f"{prop_type}Horizontal"] = value
-                elif direction == 'y':
-                    styles[f"{prop_type}Vertical"] = value
-                elif direction == 't':
-                    styles[f"{prop_type}Top"] = value
-                elif direction == 'r':
-                    styles[f"{prop_type}Right"] = value
-                elif direction == 'b':
-                    styles[f"{prop_type}Bottom"] = value
-                elif direction == 'l':
-                    styles[f"{prop_type}Left"] = value
-                continue
-
-            # Width/Height: w-full, h-screen, w-64, etc.
-            size_match = re.match(r'^([wh])-(\d+|full|screen|auto|\[.+\])$', css_class)
-            if size_match:
-                prop = "width" if size_match.group(1) == "w" else "height"
-                value_str = size_match.group(2)
-
-                if value_str == "full":
-                    styles[prop] = "100%"
-                elif value_str == "screen":
-                    styles[prop] = "100%"
-                elif value_str == "auto":
-                    styles[prop] = "auto"
-                elif value_str.startswith('['):
-                    value = int(re.sub(r'[^\d]', '', value_str))
-                    styles[prop] = value
-                else:
-                    styles[prop] = int(float(value_str) * 4)
-                continue
-
-            # Text size: text-xs, text-sm, text-lg, text-xl, etc.
-            text_size_map = {
-                "text-xs": 12, "text-sm": 14, "text-base": 16,
-                "text-lg": 18, "text-xl": 20, "text-2xl": 24,
-                "text-3xl": 30, "text-4xl": 36, "text-5xl": 48
-            }
-            if css_class in text_size_map:
-                styles["fontSize"] = text_size_map[css_class]
-                continue
-
-            # Colors: text-white, bg-black, text-gray-500, etc.
-            color_match = re.match(r'^(text|bg|border)-(\w+)(?:-(\d+))?$', css_class)
-            if color_match:
-                prop_prefix = color_match.group(1)
-                color_name = color_match.group(2)
-                shade = color_match.group(3)
-
-                color_value = cls._get_color_value(color_name, shade)
-                if color_value:
-                    if prop_prefix == "text":
-                        styles["color"] = color_value
-                    elif prop_prefix == "bg":
-                        styles["backgroundColor"] = color_value
-                    elif prop_prefix == "border":
-                        styles["borderColor"] = color_value
-                continue
-
-            # Rounded corners: rounded, rounded-lg, rounded-full
-            rounded_map = {
-                "rounded-none": 0, "rounded-sm": 2, "rounded": 4,
-                "rounded-md": 6, "rounded-lg": 8, "rounded-xl": 12,
-                "rounded-2xl": 16, "rounded-3xl": 24, "rounded-full": 9999
-            }
-            if css_class in rounded_map:
-                styles["borderRadius"] = rounded_map[css_class]
-                continue
+        # Memoized: the same class strings repeat across a project
+        return dict(cls._convert_class_string(class_string))
 
-            # Gap: gap-2, gap-4, etc.
-            gap_match = re.match(r'^gap-(\d+)$', css_class)
-            if gap_match:
-                styles["gap"] = int(gap_match.group(1)) * 4
-                continue
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _convert_class_string(cls, class_string: str) -> Tuple[Tuple[str, Any], ...]:
+        styles: Dict[str, Any] = {}
+        for css_class in class_string.split():
+            styles.update(cls._convert_class(css_class))
+        return tuple(styles.items())
 
-        return styles
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _convert_class(cls, css_class: str) -> Tuple[Tuple[str, Any], ...]:
+        """Style properties of a single Tailwind class"""
+        styles: Dict[str, Any] = {}
+
+        # Direct mapping
+        if css_class in cls.TAILWIND_MAP:
+            return tuple(cls.TAILWIND_MAP[css_class].items())
+
+        # Dynamic values
+        # Spacing: p-4, m-2, px-4, py-2, etc.
+        spacing_match = cls._SPACING_RE.match(css_class)
+        if spacing_match:
+            prop_type = "padding" if spacing_match.group(1) == "p" else "margin"
+            direction = spacing_match.group(2)
+            value_str = spacing_match.group(3)
+
+            # Handle custom values like [16px]
+            if value_str.startswith('[') and value_str.endswith(']'):
+                value = int(cls._NON_DIGIT_RE.sub('', value_str))
+            else:
+                value = int(float(value_str) * 4)
+
+            if direction is None:
+                styles[prop_type] = value
+            elif direction == 'x':
+                styles[f"{prop_type}Horizontal"] = value
+            elif direction == 'y':
+                styles[f"{prop_type}Vertical"] = value
+            elif direction == 't':
+                styles[f"{prop_type}Top"] = value
+            elif direction == 'r':
+                styles[f"{prop_type}Right"] = value
+            elif direction == 'b':
+                styles[f"{prop_type}Bottom"] = value
+            elif direction == 'l':
+                styles[f"{prop_type}Left"] = value
+            return tuple(styles.items())
+
+        # Width/Height: w-full, h-screen, w-64, etc.
+        size_match = cls._SIZE_RE.match(css_class)
+        if size_match:
+            prop = "width" if size_match.group(1) == "w" else "height"
+            value_str = size_match.group(2)
+
+            if value_str == "full":
+                styles[prop] = "100%"
+            elif value_str == "screen":
+                styles[prop] = "100%"
+            elif value_str == "auto":
+                styles[prop] = "auto"
+            elif value_str.startswith('['):
+                value = int(cls._NON_DIGIT_RE.sub('', value_str))
+                styles[prop] = value
+            else:
+                styles[prop] = int(float(value_str) * 4)
+            return tuple(styles.items())
+
+        # Text size: text-xs, text-sm, text-lg, text-xl, etc.
+        if css_class in cls.TEXT_SIZE_MAP:
+            styles["fontSize"] = cls.TEXT_SIZE_MAP[css_class]
+            return tuple(styles.items())
+
+        # Colors: text-white, bg-black, text-gray-500, etc.
+        color_match = cls._COLOR_RE.match(css_class)
+        if color_match:
+            prop_prefix = color_match.group(1)
+            color_name = color_match.group(2)
+            shade = color_match.group(3)
+
+            color_value = cls._get_color_value(color_name, shade)
+            if color_value:
+                if prop_prefix == "text":
+                    styles["color"] = color_value
+                elif prop_prefix == "bg":
+                    styles["backgroundColor"] = color_value
+                elif prop_prefix == "border":
+                    styles["borderColor"] = color_value
+            return tuple(styles.items())
+
+        # Rounded corners: rounded, rounded-lg, rounded-full
+        if css_class in cls.ROUNDED_MAP:
+            styles["borderRadius"] = cls.ROUNDED_MAP[css_class]
+            return tuple(styles.items())
+
+        # Gap: gap-2, gap-4, etc.
+        gap_match = cls._GAP_RE.match(css_class)
+        if gap_match:
+            styles["gap"] = int(gap_match.group(1)) * 4
+            return tuple(styles.items())
+
+        return ()
 
     @staticmethod
     def _get_color_value(color_name: str, shade: Optional[str]) -> Optional[str]:
@@ -402,11 +431,40 @@ class ReactToReactNativeConverter:
         "aside": "View",
     }
 
+    # JSX tokens rewritten by convert_component. Tags are matched by shape
+    # and resolved through HTML_TO_RN, so each file is scanned once
+    _TOKEN_RE = re.compile(
+        r"(?P<react_dom>import.*from\s+['\"]react-dom['\"];?)"
+        r"|(?P<react>import.*from\s+['\"]react['\"];?)"
+        r"|<(?P<close>/?)(?P<tag>[A-Za-z][\w.]*)(?=[\s/>])"
+        r'|className="(?P<classes>[^"]+)"'
+        r"|(?P<on_click>onClick=)"
+        r"|src=\{(?P<src_expr>[^}]+)\}"
+        r'|src="(?P<src_uri>[^"]+)"'
+        r'|(?P<password>type="password")'
+        r"|(?P<on_change>onChange=)"
+    )
+    _EXPORT_DEFAULT_RE = re.compile(r'(export default \w+;?)')
+    _STYLE_KEY_RE = re.compile(r'"(\w+)":')
+
+    # Rewrites that only apply when the file contains a TextInput
+    _TEXT_INPUT_REWRITES = {
+        "password": "secureTextEntry={true}",
+        "on_change": "onChangeText=",
+    }
+
     def __init__(self):
         self.css_converter = CSSToStyleSheetConverter()
         self.style_counter = 0
         self.extracted_styles: Dict[str, Dict] = {}
 
+    @classmethod
+    def tokenize(cls, content: str) -> Iterator[Tuple[str, re.Match]]:
+        """Yield (kind, match) for each JSX token convert_component rewrites"""
+        for match in cls._TOKEN_RE.finditer(content):
+            kind = match.lastgroup
+            yield ("tag" if kind == "close" else kind), match
+
     def convert_component(self, content: str, filename: str) -> Tuple[str, List[str]]:
         """
         Convert a React component to React Native
@@ -414,218 +472,464 @@ class ReactToReactNativeConverter:
         Returns: (converted_content, warnings)
         """
         warnings = []
-        result = content
 
         # Track imports needed
         rn_imports = set(["View", "Text", "StyleSheet"])
 
-        # Convert HTML tags to RN components
-        for html_tag, rn_component in self.HTML_TO_RN.items():
-            # Opening tags with attributes
-            pattern = rf'<{html_tag}(\s[^>]*)?>|<{html_tag}>'
-            matches = re.findall(pattern, result, re.IGNORECASE)
-
-            if matches:
-                rn_imports.add(rn_component)
-
-            # Replace opening tags
-            result = re.sub(
-                rf'<{html_tag}(\s)',
-                f'<{rn_component}\\1',
-                result,
-                flags=re.IGNORECASE
-            )
-            result = re.sub(
-                rf'<{html_tag}>',
-                f'<{rn_component}>',
-                result,
-                flags=re.IGNORECASE
-            )
-
-            # Replace closing tags
-            result = re.sub(
-                rf'</{html_tag}>',
-                f'</{rn_component}>',
-                result,
-                flags=re.IGNORECASE
-            )
-
-            # Self-closing tags
-            result = re.sub(
-                rf'<{html_tag}(\s[^>]*)?\/>' ,
-                f'<{rn_component}\\1/>',
-                result,
-                flags=re.IGNORECASE
-            )
+        parts: List[str] = []
+        pos = 0
+        react_import_slots: List[int] = []
+        text_input_slots: List[Tuple[int, str]] = []
+        view_count = 0
+
+        for kind, match in self.tokenize(content):
+            parts.append(content[pos:match.start()])
+            pos = match.end()
+
+            if kind == "tag":
+                tag = match.group("tag")
+                # Lowercase names are HTML elements; others are components
+                rn_component = self.HTML_TO_RN.get(tag, tag)
+                if not match.group("close"):
+                    if rn_component != tag:
+                        rn_imports.add(rn_component)
+                    if rn_component.startswith("View"):
+                        view_count += 1
+                parts.append(f"<{match.group('close')}{rn_component}")
+            elif kind == "classes":
+                parts.append(self._convert_classname(match.group("classes")))
+            elif kind == "on_click":
+                parts.append("onPress=")
+            elif kind == "src_expr":
+                parts.append(f"source={{{{{match.group('src_expr')}}}}}")
+            elif kind == "src_uri":
+                parts.append(f'source={{{{uri: "{match.group("src_uri")}"}}}}')
+            elif kind in self._TEXT_INPUT_REWRITES:
+                # Decided once the whole file has been seen
+                text_input_slots.append((len(parts), kind))
+                parts.append(match.group(0))
+            elif kind == "react":
+                # The react-native import follows it
+                parts.append(match.group(0))
+                react_import_slots.append(len(parts))
+                parts.append("")
+            # react_dom imports are dropped
+
+        parts.append(content[pos:])
 
-        # Convert className to style
-        result = self._convert_classnames(result)
-
-        # Convert onClick to onPress
-        result = re.sub(r'onClick=', 'onPress=', result)
+        if "TextInput" in rn_imports:
+            for index, kind in text_input_slots:
+                parts[index] = self._TEXT_INPUT_REWRITES[kind]
 
         # Handle href (convert to onPress with Linking)
-        if 'href=' in result:
+        if 'href=' in content:
             rn_imports.add("Linking")
             warnings.append(f"{filename}: href converted to onPress with Linking")
 
-        # Convert img src to Image source
-        result = re.sub(
-            r'src=\{([^}]+)\}',
-            r'source={{\1}}',
-            result
-        )
-        result = re.sub(
-            r'src="([^"]+)"',
-            r'source={{uri: "\1"}}',
-            result
-        )
-
-        # Handle input types
-        if "TextInput" in rn_imports:
-            rn_imports.add("TextInput")
-            # Convert type="password" to secureTextEntry
-            result = re.sub(
-                r'type="password"',
-                'secureTextEntry={true}',
-                result
-            )
-            # Convert placeholder (same in RN)
-            # Convert onChange to onChangeText
-            result = re.sub(r'onChange=', 'onChangeText=', result)
-
         # Add ScrollView if needed for long content
-        if result.count('<View') > 5:
+        if view_count > 5:
             rn_imports.add("ScrollView")
             warnings.append(f"{filename}: Consider wrapping in ScrollView for scrollable content")
 
         # Generate import statement
         imports_list = sorted(list(rn_imports))
         import_statement = f"import {{ {', '.join(imports_list)} }} from 'react-native';"
+        for index in react_import_slots:
+            parts[index] = f"\n{import_statement}"
 
-        # Replace react-dom imports
-        result = re.sub(
-            r"import.*from\s+['\"]react-dom['\"];?",
-            "",
-            result
-        )
-
-        # Add RN imports
-        result = re.sub(
-            r"(import.*from\s+['\"]react['\"];?)",
-            f"\\1\n{import_statement}",
-            result
-        )
-
-        # If no react import found, add both
-        if "import" not in result or "react" not in result.lower():
-            result = f"import React from 'react';\n{import_statement}\n\n{result}"
-
-        return result, warnings
-
-    def _convert_classnames(self, content: str) -> str:
-        """Convert className with Tailwind to StyleSheet"""
-        # Find all className attributes
-        pattern = r'className="([^"]+)"'
-
-        def replace_classname(match):
-            classes = match.group(1)
-            styles = self.css_converter.convert_tailwind_classes(classes)
-
-            if styles:
-                self.style_counter += 1
-                style_name = f"style{self.style_counter}"
-                self.extracted_styles[style_name] = styles
-                return f'style={{styles.{style_name}}}'
-            return ''
-
-        result = re.sub(pattern, replace_classname, content)
+        result = "".join(parts)
 
         # Add StyleSheet definition at the end if styles were extracted
         if self.extracted_styles:
             styles_code = self._generate_stylesheet()
             # Find the last export or end of file
             if "export default" in result:
-                result = re.sub(
-                    r'(export default \w+;?)',
-                    f'{styles_code}\n\n\\1',
+                result = self._EXPORT_DEFAULT_RE.sub(
+                    lambda m: f"{styles_code}\n\n{m.group(1)}",
                     result
                 )
             else:
                 result += f"\n\n{styles_code}"
 
-        return result
+        # If no react import found, add both
+        if "import" not in result or "react" not in result.lower():
+            result = f"import React from 'react';\n{import_statement}\n\n{result}"
+
+        return result, warnings
+
+    def _convert_classname(self, classes: str) -> str:
+        """Convert one className with Tailwind to a StyleSheet reference"""
+        styles = self.css_converter.convert_tailwind_classes(classes)
+
+        if styles:
+            self.style_counter += 1
+            style_name = f"style{self.style_counter}"
+            self.extracted_styles[style_name] = styles
+            return f'style={{styles.{style_name}}}'
+        return ''
 
     def _generate_stylesheet(self) -> str:
         """Generate StyleSheet.create() code"""
         styles_obj = json.dumps(self.extracted_styles, indent=2)
         # Remove quotes from property names
-        styles_obj = re.sub(r'"(\w+)":', r'\1:', styles_obj)
+        styles_obj = self._STYLE_KEY_RE.sub(r'\1:', styles_obj)
         return f"const styles = StyleSheet.create({styles_obj});"
 
 
+def convert_source_file(
+    source_file: SourceFile,
+    use_expo_router: bool
+) -> Tuple[List[ConvertedFile], List[str]]:
+    """Process a single source file"""
+    converted = []
+    warnings = []
+
+    filename = source_file.name.lower()
+
+    # Skip non-convertible files
+    skip_patterns = [
+        '.css', '.scss', '.sass', '.less',  # CSS (handled inline)
+        '.svg',  # SVG (needs special handling)
+        'index.html', '.html',
+        'vite.config', 'next.config', 'webpack.config',
+        'tailwind.config', 'postcss.config',
+        '.env', '.gitignore',
+        'package.json', 'package-lock.json',
+        'tsconfig.json', 'jsconfig.json'
+    ]
+
+    if any(pattern in filename for pattern in skip_patterns):
+        return [], [f"Skipped: {source_file.name}"]
+
+    # Convert React components
+    if filename.endswith(('.tsx', '.jsx', '.ts', '.js')):
+        # Fresh converter state for each file
+        converter = ReactToReactNativeConverter()
+
+        converted_content, file_warnings = converter.convert_component(
+            source_file.content,
+            source_file.name
+        )
+
+        warnings.extend(file_warnings)
+
+        # Determine output path
+        if 'page' in filename or 'screen' in filename:
+            # Page/Screen -> app/ directory for Expo Router
+            if use_expo_router:
+                out_name = source_file.name.replace('Page', '').replace('Screen', '')
+                out_name = out_name.replace('.jsx', '.tsx').replace('.js', '.tsx')
+                output_path = f"app/{out_name}"
+            else:
+                output_path = f"screens/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
+        elif 'component' in filename.lower() or source_file.type == 'component':
+            output_path = f"components/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
+        elif 'hook' in filename.lower() or filename.startswith('use'):
+            output_path = f"hooks/{source_file.name}"
+        elif 'util' in filename.lower() or 'helper' in filename.lower():
+            output_path = f"utils/{source_file.name}"
+        else:
+            output_path = f"src/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
+
+        converted.append(ConvertedFile(
+            path=output_path,
+            content=converted_content,
+            original=source_file.name
+        ))
+
+    return converted, warnings
+
+
+def convert_source_batch(
+    files: List[SourceFile],
+    use_expo_router: bool
+) -> List[Tuple[List[ConvertedFile], List[str], bool]]:
+    """
+    Convert a batch of source files (runs in a worker process)
+
+    Returns: one (converted, warnings, failed) tuple per file
+    """
+    results = []
+    for source_file in files:
+        try:
+            converted, warnings = convert_source_file(source_file, use_expo_router)
+            results.append((converted, warnings, False))
+        except Exception as e:
+            results.append(([], [f"Error processing {source_file.name}: {str(e)}"], True))
+    return results
+
+
+def write_zip(files: List[ConvertedFile], fileobj: BinaryIO) -> None:
+    """Write converted files as a zip archive into a file object"""
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for file in files:
+            zf.writestr(file.path, file.content)
+
+
+class ExportArtifactStore:
+    """
+    Disk store for export archives, bounded by count, size and age
+
+    Least recently used archives are evicted first. Open handles survive
+    eviction, so a download in progress is never cut short.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_entries: int = 50,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: int = 3600
+    ):
+        self.root = root or os.path.join(tempfile.gettempdir(), "devora-mobile-exports")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # key -> (size, stored_at)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+        # Archives from a previous process are not tracked: remove them
+        for name in os.listdir(self.root):
+            if name.endswith(".zip"):
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.zip")
+
+    def put(self, key: str, fileobj: BinaryIO) -> int:
+        """Copy an archive into the store and return its size"""
+        fileobj.seek(0)
+        tmp_path = f"{self._path(key)}.part"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, 1024 * 1024)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[0]
+            self._entries[key] = (size, time.monotonic())
+            self._total_bytes += size
+            self._evict_locked()
+        return size
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open an archive for reading, or None if missing or expired"""
+        with self._lock:
+            self._purge_expired_locked()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            return open(self._path(key), "rb")
+        except FileNotFoundError:
+            return None
+
+    def read_member(self, key: str, member: str) -> Optional[bytes]:
+        """Read a single file out of an archive"""
+        fileobj = self.open(key)
+        if fileobj is None:
+            return None
+        with fileobj, zipfile.ZipFile(fileobj) as zf:
+            try:
+                return zf.read(member)
+            except KeyError:
+                return None
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._total_bytes -= entry[0]
+        self._remove(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._purge_expired_locked()
+            return key in self._entries
+
+    def _evict_locked(self) -> None:
+        self._purge_expired_locked()
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            key, (size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self._remove(key)
+
+    def _purge_expired_locked(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._entries:
+            key, (size, stored_at) = next(iter(self._entries.items()))
+            if stored_at > cutoff:
+                break
+            del self._entries[key]
+            self._total_bytes -= size
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+@dataclass
+class ExportJob:
+    """Background export job"""
+    id: str
+    project_name: str
+    status: ExportStatus = ExportStatus.PENDING
+    progress: int = 0
+    message: str = "Queued"
+    current_file: Optional[str] = None
+    files: List[Dict[str, Any]] = field(default_factory=list)  # path, original, size
+    warnings: List[str] = field(default_factory=list)
+    stats: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    size: int = 0
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (ExportStatus.READY, ExportStatus.ERROR)
+
+
 class MobileExportService:
     """
     Service for exporting web projects to mobile (React Native/Expo)
     """
 
-    def __init__(self):
-        self.converter = ReactToReactNativeConverter()
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        batch_size: int = 25,
+        max_concurrent_jobs: int = 2,
+        max_jobs: int = 200,
+        spool_max_size: int = 8 * 1024 * 1024,
+        artifact_store: Optional[ExportArtifactStore] = None
+    ):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_jobs = max_jobs
+        self.spool_max_size = spool_max_size
+        self._artifact_store = artifact_store
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._job_slots = asyncio.Semaphore(max_concurrent_jobs)
+        self.jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def artifacts(self) -> ExportArtifactStore:
+        # Created lazily so importing the module does not touch the disk
+        if self._artifact_store is None:
+            self._artifact_store = ExportArtifactStore()
+        return self._artifact_store
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    async def _convert_files(
+        self,
+        files: List[SourceFile],
+        use_expo_router: bool,
+        job: Optional[ExportJob] = None
+    ) -> Tuple[List[ConvertedFile], List[str], Dict[str, int]]:
+        """Convert source files in batches on the worker pool"""
+        converted_files: List[ConvertedFile] = []
+        warnings: List[str] = []
+        stats = {
+            "total_files": len(files),
+            "converted": 0,
+            "skipped": 0,
+            "warnings": 0
+        }
+        if not files:
+            return converted_files, warnings, stats
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        batches = [files[i:i + self.batch_size] for i in range(0, len(files), self.batch_size)]
+        futures = [
+            loop.run_in_executor(executor, convert_source_batch, batch, use_expo_router)
+            for batch in batches
+        ]
+
+        done_files = 0
+        for batch, future in zip(batches, futures):
+            # Consumed in submission order so output order is stable
+            for converted, file_warnings, _failed in await future:
+                if converted:
+                    converted_files.extend(converted)
+                    stats["converted"] += 1
+                else:
+                    stats["skipped"] += 1
+                warnings.extend(file_warnings)
+                stats["warnings"] += len(file_warnings)
+
+            done_files += len(batch)
+            if job is not None:
+                job.progress = 5 + int(70 * done_files / len(files))
+                job.current_file = batch[-1].name
+                job.message = f"Converted {done_files}/{len(files)} files"
+
+        return converted_files, warnings, stats
 
     async def export_to_expo(
         self,
         files: List[SourceFile],
         project_name: str,
-        use_expo_router: bool = True
+        use_expo_router: bool = True,
+        include_zip: bool = True
     ) -> ExportResult:
         """
         Export web project to Expo
 
+        Conversion runs on the worker pool. For large projects prefer
+        submit_export, which streams the archive to disk instead of
+        returning it in memory.
+
         Args:
             files: List of source files from web project
             project_name: Name for the mobile project
             use_expo_router: Use Expo Router for navigation
+            include_zip: Build the zip archive in zip_content
 
         Returns:
             ExportResult with converted files
         """
         try:
-            converted_files = []
-            warnings = []
-            stats = {
-                "total_files": len(files),
-                "converted": 0,
-                "skipped": 0,
-                "warnings": 0
-            }
-
             # Generate base Expo project files
-            base_files = self._generate_expo_base_files(project_name, use_expo_router)
-            converted_files.extend(base_files)
+            converted_files = self._generate_expo_base_files(project_name, use_expo_router)
 
-            # Process each source file
-            for source_file in files:
-                try:
-                    converted, file_warnings = self._process_file(
-                        source_file,
-                        use_expo_router
-                    )
-
-                    if converted:
-                        converted_files.extend(converted)
-                        stats["converted"] += 1
-                    else:
-                        stats["skipped"] += 1
-
-                    warnings.extend(file_warnings)
-                    stats["warnings"] += len(file_warnings)
-
-                except Exception as e:
-                    warnings.append(f"Error processing {source_file.name}: {str(e)}")
-                    stats["skipped"] += 1
+            converted, warnings, stats = await self._convert_files(files, use_expo_router)
+            converted_files.extend(converted)
 
-            # Generate zip file
-            zip_content = self._create_zip(converted_files)
+            zip_content = None
+            if include_zip:
+                buffer = io.BytesIO()
+                await asyncio.to_thread(write_zip, converted_files, buffer)
+                zip_content = buffer.getvalue()
 
             return ExportResult(
                 success=True,
@@ -642,6 +946,130 @@ class MobileExportService:
                 error=str(e)
             )
 
+    # ------------------------------------------------------------------
+    # Background jobs
+    # ------------------------------------------------------------------
+
+    def submit_export(
+        self,
+        files: List[SourceFile],
+        project_name: str,
+        use_expo_router: bool = True
+    ) -> ExportJob:
+        """
+        Start a background export and return its job immediately
+
+        Poll get_job for progress; once READY, stream the archive with
+        iter_artifact.
+        """
+        job = ExportJob(id=str(uuid.uuid4()), project_name=project_name)
+        self.jobs[job.id] = job
+        self._prune_jobs()
+
+        task = asyncio.get_running_loop().create_task(self._run_job(job, files, use_expo_router))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run_job(self, job: ExportJob, files: List[SourceFile], use_expo_router: bool) -> None:
+        try:
+            async with self._job_slots:
+                job.status = ExportStatus.CONVERTING
+                job.message = "Converting files"
+                converted_files = self._generate_expo_base_files(job.project_name, use_expo_router)
+                converted, job.warnings, job.stats = await self._convert_files(files, use_expo_router, job)
+                converted_files.extend(converted)
+
+                job.status = ExportStatus.PACKAGING
+                job.progress = 80
+                job.current_file = None
+                job.message = "Packaging archive"
+                job.size = await asyncio.to_thread(self._package, job.id, converted_files)
+                job.files = [
+                    {"path": f.path, "original": f.original, "size": len(f.content.encode("utf-8"))}
+                    for f in converted_files
+                ]
+
+                job.status = ExportStatus.READY
+                job.progress = 100
+                job.message = "Export ready"
+
+        except Exception as e:
+            logger.exception(f"Mobile export job {job.id} failed")
+            job.status = ExportStatus.ERROR
+            job.error = str(e)
+            job.message = "Export failed"
+
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.done.set()
+
+    def _package(self, job_id: str, files: List[ConvertedFile]) -> int:
+        """Zip into a spooled temp file, then move it to the artifact store"""
+        with tempfile.SpooledTemporaryFile(max_size=self.spool_max_size) as spool:
+            write_zip(files, spool)
+            return self.artifacts.put(job_id, spool)
+
+    def _prune_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond max_jobs"""
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].finished:
+                del self.jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[ExportJob]:
+        return self.jobs.get(job_id)
+
+    async def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[ExportJob]:
+        """Wait for a job to finish (or the timeout to expire)"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def list_jobs(self, limit: int = 20) -> List[ExportJob]:
+        """Most recent jobs first"""
+        return list(reversed(self.jobs.values()))[:limit]
+
+    def delete_job(self, job_id: str) -> bool:
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        self.artifacts.delete(job_id)
+        return True
+
+    def iter_artifact(self, job_id: str, chunk_size: int = 64 * 1024) -> Optional[Iterator[bytes]]:
+        """Chunks of a job's archive, or None if it is not (or no longer) available"""
+        fileobj = self.artifacts.open(job_id)
+        if fileobj is None:
+            return None
+
+        def chunks() -> Iterator[bytes]:
+            with fileobj:
+                while True:
+                    chunk = fileobj.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+        return chunks()
+
+    def read_artifact_file(self, job_id: str, path: str) -> Optional[bytes]:
+        """Read a single converted file from a job's archive"""
+        return self.artifacts.read_member(job_id, path)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
     def _generate_expo_base_files(
         self,
         project_name: str,
@@ -922,81 +1350,6 @@ npx eas build --platform all
 
         return files
 
-    def _process_file(
-        self,
-        source_file: SourceFile,
-        use_expo_router: bool
-    ) -> Tuple[List[ConvertedFile], List[str]]:
-        """Process a single source file"""
-        converted = []
-        warnings = []
-
-        filename = source_file.name.lower()
-
-        # Skip non-convertible files
-        skip_patterns = [
-            '.css', '.scss', '.sass', '.less',  # CSS (handled inline)
-            '.svg',  # SVG (needs special handling)
-            'index.html', '.html',
-            'vite.config', 'next.config', 'webpack.config',
-            'tailwind.config', 'postcss.config',
-            '.env', '.gitignore',
-            'package.json', 'package-lock.json',
-            'tsconfig.json', 'jsconfig.json'
-        ]
-
-        if any(pattern in filename for pattern in skip_patterns):
-            return [], [f"Skipped: {source_file.name}"]
-
-        # Convert React components
-        if filename.endswith(('.tsx', '.jsx', '.ts', '.js')):
-            # Reset converter state for each file
-            self.converter = ReactToReactNativeConverter()
-
-            converted_content, file_warnings = self.converter.convert_component(
-                source_file.content,
-                source_file.name
-            )
-
-            warnings.extend(file_warnings)
-
-            # Determine output path
-            if 'page' in filename or 'screen' in filename:
-                # Page/Screen -> app/ directory for Expo Router
-                if use_expo_router:
-                    out_name = source_file.name.replace('Page', '').replace('Screen', '')
-                    out_name = out_name.replace('.jsx', '.tsx').replace('.js', '.tsx')
-                    output_path = f"app/{out_name}"
-                else:
-                    output_path = f"screens/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
-            elif 'component' in filename.lower() or source_file.type == 'component':
-                output_path = f"components/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
-            elif 'hook' in filename.lower() or filename.startswith('use'):
-                output_path = f"hooks/{source_file.name}"
-            elif 'util' in filename.lower() or 'helper' in filename.lower():
-                output_path = f"utils/{source_file.name}"
-            else:
-                output_path = f"src/{source_file.name.replace('.jsx', '.tsx').replace('.js', '.tsx')}"
-
-            converted.append(ConvertedFile(
-                path=output_path,
-                content=converted_content,
-                original=source_file.name
-            ))
-
-        return converted, warnings
-
-    def _create_zip(self, files: List[ConvertedFile]) -> bytes:
-        """Create zip archive from converted files"""
-        buffer = io.BytesIO()
-
-        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file in files:
-                zf.writestr(file.path, file.content)
-
-        buffer.seek(0)
-        return buffer.read()
-
 
 # Singleton instance
 mobile_export_service = MobileExportService()
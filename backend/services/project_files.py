@@ -0,0 +1,468 @@
+"""
+Project File Storage
+
+Stores project file contents in their own `project_files` collection
+(mirroring the `project_files` table in database/schema.sql) instead of
+embedding them in the project document:
+- Project documents only carry metadata, a file count and a files version
+- Saves only write files whose content hash changed
+- Per-file deltas (upsert/delete/rename) are applied atomically, in a
+  transaction (replica set / mongos); on a standalone server a failed
+  delta is rolled back by compensation instead
+- Projects still using embedded files are read transparently and
+  migrated on their next write
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Any, Literal
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import BaseModel, Field
+from pymongo import UpdateOne, DeleteOne, InsertOne, ReturnDocument
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+NORMALIZED = "normalized"
+EMBEDDED = "embedded"
+
+# MongoDB "IllegalOperation": transactions need a replica set or mongos
+TRANSACTIONS_UNSUPPORTED_CODE = 20
+# Concurrent transaction touched the same documents
+WRITE_CONFLICT_CODE = 112
+
+
+class FileChange(BaseModel):
+    """A single file delta"""
+    op: Literal["upsert", "delete", "rename"]
+    name: str = Field(..., min_length=1, max_length=500, description="File path")
+    content: Optional[str] = Field(None, description="New content (upsert)")
+    language: Optional[str] = Field(None, description="File language (upsert)")
+    new_name: Optional[str] = Field(None, min_length=1, max_length=500, description="Target path (rename)")
+
+
+class ProjectFileConflictError(Exception):
+    """The project's files changed since the version the client edited"""
+
+
+class _VersionMoved(Exception):
+    """Another writer claimed the files_version read by this attempt"""
+
+
+def _is_write_conflict(error: OperationFailure) -> bool:
+    return error.code == WRITE_CONFLICT_CODE or error.has_error_label("TransientTransactionError")
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ProjectFileStore:
+    """
+    Per-file storage for project contents.
+
+    Example:
+        store = ProjectFileStore(db)
+        await store.ensure_indexes()
+
+        result = await store.apply_changes("proj_123", [
+            FileChange(op="upsert", name="index.html", content="<h1>Hi</h1>"),
+            FileChange(op="rename", name="app.js", new_name="main.js"),
+        ], expected_version=4)
+    """
+
+    COLLECTION_NAME = "project_files"
+
+    # Attempts of a delta without expected_version racing other writers
+    MAX_CONFLICT_RETRIES = 5
+
+    def __init__(self, db: AsyncIOMotorDatabase, mode: str = NORMALIZED):
+        """
+        Args:
+            db: Motor database
+            mode: "normalized" to store new and updated projects per file,
+                "embedded" to keep the legacy single-document layout
+        """
+        self.db = db
+        self.projects = db.projects
+        self.files = db[self.COLLECTION_NAME]
+        self.mode = mode
+        self._transactions_supported = True
+
+    async def ensure_indexes(self) -> None:
+        """Create the (project_id, name) index"""
+        try:
+            await self.files.create_index(
+                [("project_id", 1), ("name", 1)],
+                unique=True,
+                name="project_file_idx"
+            )
+        except Exception as e:
+            logger.warning(f"Error creating project_files index (may already exist): {e}")
+
+    @staticmethod
+    def is_normalized(project: Dict[str, Any]) -> bool:
+        return project.get("files_storage") == NORMALIZED
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def load_files(self, project_id: str) -> List[Dict[str, Any]]:
+        """Files of a normalized project, in their original order"""
+        cursor = self.files.find(
+            {"project_id": project_id},
+            {"_id": 0, "name": 1, "content": 1, "language": 1, "position": 1}
+        ).sort("position", 1)
+        files = await cursor.to_list(None)
+        for f in files:
+            f.pop("position", None)
+        return files
+
+    async def hydrate(self, project: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill `files` on a project document, whatever its storage"""
+        if self.is_normalized(project):
+            project["files"] = await self.load_files(project["id"])
+        return project
+
+    def metadata_pipeline(
+        self,
+        query: Dict[str, Any],
+        limit: int = 1000,
+        sort: Optional[Dict[str, int]] = None,
+        skip: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Aggregation returning project metadata with a file count, no contents"""
+        stages: List[Dict[str, Any]] = [{"$match": query}]
+        if sort:
+            stages.append({"$sort": sort})
+        if skip:
+            stages.append({"$skip": skip})
+        return stages + [
+            {"$limit": limit},
+            {"$addFields": {
+                "file_count": {"$ifNull": ["$file_count", {"$size": {"$ifNull": ["$files", []]}}]}
+            }},
+            {"$project": {"_id": 0, "files": 0, "conversation_history": 0}},
+        ]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    async def create_project(self, doc: Dict[str, Any]) -> None:
+        """Insert a new project document and its files"""
+        if self.mode != NORMALIZED:
+            await self.projects.insert_one(doc)
+            return
+
+        files = doc.pop("files", []) or []
+        doc.update(files_storage=NORMALIZED, file_count=len(files), files_version=0)
+
+        async def create(session):
+            if files:
+                await self.files.insert_many(
+                    [self._file_doc(doc["id"], f, position) for position, f in enumerate(files)],
+                    session=session
+                )
+            await self.projects.insert_one(doc, session=session)
+
+        await self._atomic(create)
+
+    async def save_files(self, project_id: str, files: List[Dict[str, Any]]) -> None:
+        """
+        Replace a project's files with a full snapshot.
+
+        Only files whose content changed are written.
+        """
+        project = await self.projects.find_one(
+            {"id": project_id}, {"_id": 0, "id": 1, "files_storage": 1}
+        )
+        if project is None:
+            raise ValueError(f"Project {project_id} not found")
+
+        if not self.is_normalized(project):
+            if self.mode != NORMALIZED:
+                await self.projects.update_one({"id": project_id}, {"$set": {"files": files}})
+                return
+            await self.migrate_project(project_id)
+
+        existing = {
+            f["name"]: f for f in await self.files.find(
+                {"project_id": project_id},
+                {"_id": 0, "name": 1, "hash": 1, "language": 1, "position": 1}
+            ).to_list(None)
+        }
+        incoming = {f["name"]: f for f in files}
+
+        changes = [
+            FileChange(op="upsert", name=f["name"], content=f.get("content", ""), language=f.get("language"))
+            for f in files
+            if f["name"] not in existing
+            or existing[f["name"]].get("hash") != _content_hash(f.get("content", ""))
+            # No language means "keep the stored one"
+            or (f.get("language") is not None and existing[f["name"]].get("language") != f.get("language"))
+        ]
+        changes += [FileChange(op="delete", name=name) for name in existing if name not in incoming]
+
+        if changes:
+            await self.apply_changes(project_id, changes)
+
+    async def apply_changes(
+        self,
+        project_id: str,
+        changes: List[FileChange],
+        expected_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply per-file deltas atomically.
+
+        Deltas are validated against the files read at a given files_version
+        and that version is the compare-and-swap guard of the write, so they
+        never apply on top of a concurrent change. Without expected_version
+        the whole read-validate-write is retried on a race.
+
+        Args:
+            project_id: Target project
+            changes: Deltas, applied in order
+            expected_version: files_version the client edited; the update is
+                rejected if the project moved on since
+
+        Returns:
+            Dict with the new files_version and file_count
+
+        Raises:
+            ValueError: If a change is invalid (missing file, name clash)
+            ProjectFileConflictError: If expected_version is stale, or the
+                project kept changing concurrently
+        """
+        project = await self.projects.find_one(
+            {"id": project_id}, {"_id": 0, "id": 1, "files_storage": 1}
+        )
+        if project is None:
+            raise ValueError(f"Project {project_id} not found")
+        if not self.is_normalized(project):
+            await self.migrate_project(project_id)
+
+        now = datetime.now(timezone.utc).isoformat()
+
+        async def apply(session):
+            current = await self.projects.find_one(
+                {"id": project_id}, {"_id": 0, "files_version": 1}, session=session
+            )
+            if current is None:
+                raise ValueError(f"Project {project_id} not found")
+            version = current.get("files_version", 0)
+            if expected_version is not None and version != expected_version:
+                raise ProjectFileConflictError(
+                    f"Project {project_id} files changed since version {expected_version}"
+                )
+
+            positions = {
+                f["name"]: f.get("position", 0) for f in await self.files.find(
+                    {"project_id": project_id}, {"_id": 0, "name": 1, "position": 1}, session=session
+                ).to_list(None)
+            }
+            file_count = len(positions)
+            operations = self._build_operations(project_id, changes, positions)
+
+            # Claim the version read above: fails if anyone wrote since
+            updated = await self.projects.find_one_and_update(
+                {"id": project_id, "files_version": version},
+                {"$inc": {"files_version": 1}, "$set": {"file_count": len(positions), "updated_at": now}},
+                projection={"files_version": 1, "file_count": 1},
+                return_document=ReturnDocument.AFTER,
+                session=session
+            )
+            if updated is None:
+                raise _VersionMoved()
+            if operations:
+                if session is None:
+                    await self._bulk_write_or_restore(project_id, changes, operations, version, file_count)
+                else:
+                    await self.files.bulk_write(operations, ordered=True, session=session)
+            return updated
+
+        for _ in range(self.MAX_CONFLICT_RETRIES):
+            try:
+                updated = await self._atomic(apply)
+            except _VersionMoved:
+                pass
+            except OperationFailure as e:
+                if not _is_write_conflict(e):
+                    raise
+            else:
+                return {
+                    "files_version": updated["files_version"],
+                    "file_count": updated["file_count"],
+                    "updated_at": now,
+                }
+            if expected_version is not None:
+                break
+
+        raise ProjectFileConflictError(
+            f"Project {project_id} files changed concurrently"
+            + (f" since version {expected_version}" if expected_version is not None else "")
+        )
+
+    async def migrate_project(self, project_id: str) -> None:
+        """Move an embedded project's files to the project_files collection"""
+        project = await self.projects.find_one(
+            {"id": project_id}, {"_id": 0, "files": 1, "files_storage": 1}
+        )
+        if project is None or self.is_normalized(project):
+            return
+
+        files = project.get("files") or []
+
+        async def migrate(session):
+            if files:
+                await self.files.bulk_write([
+                    UpdateOne(
+                        {"project_id": project_id, "name": f["name"]},
+                        {"$set": self._file_doc(project_id, f, position)},
+                        upsert=True
+                    )
+                    for position, f in enumerate(files)
+                ], ordered=False, session=session)
+            await self.projects.update_one(
+                {"id": project_id, "files_storage": {"$ne": NORMALIZED}},
+                {
+                    "$set": {"files_storage": NORMALIZED, "file_count": len(files), "files_version": 0},
+                    "$unset": {"files": ""}
+                },
+                session=session
+            )
+
+        await self._atomic(migrate)
+        logger.info(f"Migrated {len(files)} files of project {project_id} to per-file storage")
+
+    async def delete_files(self, project_ids: List[str]) -> None:
+        """Delete the stored files of the given projects"""
+        if project_ids:
+            await self.files.delete_many({"project_id": {"$in": project_ids}})
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _build_operations(
+        self,
+        project_id: str,
+        changes: List[FileChange],
+        positions: Dict[str, int]
+    ) -> list:
+        """Validate deltas against current names and build bulk operations.
+
+        `positions` is updated in place to reflect the result.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        next_position = max(positions.values(), default=-1) + 1
+        operations = []
+
+        for change in changes:
+            selector = {"project_id": project_id, "name": change.name}
+
+            if change.op == "upsert":
+                if change.content is None:
+                    raise ValueError(f"Upsert of '{change.name}' requires content")
+                fields = {
+                    "content": change.content,
+                    "hash": _content_hash(change.content),
+                    "size": len(change.content.encode("utf-8")),
+                    "updated_at": now,
+                }
+                if change.language is not None:
+                    fields["language"] = change.language
+                if change.name not in positions:
+                    positions[change.name] = next_position
+                    fields["position"] = next_position
+                    fields.setdefault("language", "text")
+                    next_position += 1
+                operations.append(UpdateOne(selector, {"$set": fields}, upsert=True))
+
+            elif change.op == "delete":
+                if change.name not in positions:
+                    raise ValueError(f"File '{change.name}' not found")
+                del positions[change.name]
+                operations.append(DeleteOne(selector))
+
+            else:
+                if not change.new_name:
+                    raise ValueError(f"Rename of '{change.name}' requires new_name")
+                if change.name not in positions:
+                    raise ValueError(f"File '{change.name}' not found")
+                if change.new_name in positions:
+                    raise ValueError(f"File '{change.new_name}' already exists")
+                positions[change.new_name] = positions.pop(change.name)
+                operations.append(UpdateOne(selector, {"$set": {"name": change.new_name, "updated_at": now}}))
+
+        return operations
+
+    @staticmethod
+    def _file_doc(project_id: str, f: Dict[str, Any], position: int) -> Dict[str, Any]:
+        content = f.get("content", "")
+        return {
+            "project_id": project_id,
+            "name": f["name"],
+            "content": content,
+            "language": f.get("language") or "text",
+            "hash": _content_hash(content),
+            "size": len(content.encode("utf-8")),
+            "position": position,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def _bulk_write_or_restore(
+        self,
+        project_id: str,
+        changes: List[FileChange],
+        operations: list,
+        version: int,
+        file_count: int
+    ) -> None:
+        """Apply file operations without a transaction, undoing them on failure.
+
+        The files the deltas touch are saved first; if the bulk write fails
+        midway they are put back and the claimed version is released, so a
+        failed delta leaves the project as it was.
+        """
+        names = {c.name for c in changes} | {c.new_name for c in changes if c.new_name}
+        selector = {"project_id": project_id, "name": {"$in": list(names)}}
+        saved = await self.files.find(selector).to_list(None)
+
+        try:
+            await self.files.bulk_write(operations, ordered=True)
+        except Exception:
+            logger.error(f"File changes of project {project_id} failed, restoring previous files")
+            restore = [DeleteOne({"_id": doc["_id"]}) for doc in await self.files.find(selector).to_list(None)]
+            restore += [InsertOne(doc) for doc in saved]
+            if restore:
+                await self.files.bulk_write(restore, ordered=True)
+            await self.projects.update_one(
+                {"id": project_id, "files_version": version + 1},
+                {"$set": {"files_version": version, "file_count": file_count}}
+            )
+            raise
+
+    async def _atomic(self, operation):
+        """Run `operation(session)` in a transaction when the server supports it.
+
+        Standalone servers have no transactions: the operation then runs
+        without a session, relying on its own ordering (version claim first)
+        and, for file deltas, on compensation (_bulk_write_or_restore).
+        """
+        if self._transactions_supported:
+            try:
+                async with await self.db.client.start_session() as session:
+                    async with session.start_transaction():
+                        return await operation(session)
+            except OperationFailure as e:
+                if e.code != TRANSACTIONS_UNSUPPORTED_CODE:
+                    raise
+                logger.warning("MongoDB transactions unavailable, applying file changes without one")
+                self._transactions_supported = False
+
+        return await operation(None)
@@ -1 +1,1036 @@
-"""\nGit-like Version Control Service for Devora Projects\n\nThis service provides version control functionality for project files, including:\n- Creating commits with file snapshots\n- Viewing commit history\n- Restoring to previous versions\n- Computing and viewing diffs between versions\n\nThe service uses MongoDB for persistent storage and supports async operations.\n"""\n\nfrom typing import List, Dict, Optional, Any\nfrom datetime import datetime, timezone\nfrom uuid import uuid4\nimport difflib\nimport logging\nfrom pydantic import BaseModel, Field, ConfigDict\nfrom motor.motor_asyncio import AsyncIOMotorDatabase\n\nlogger = logging.getLogger(__name__)\n\n\nclass FileSnapshot(BaseModel):\n    """Represents a file at a specific point in time"""\n    model_config = ConfigDict(extra="ignore")\n\n    name: str = Field(..., description="File path/name")\n    content: str = Field(..., description="File content at this version")\n    language: Optional[str] = Field(None, description="Programming language/file type")\n\n\nclass FileDiff(BaseModel):\n    """Represents the diff for a modified file"""\n    model_config = ConfigDict(extra="ignore")\n\n    name: str = Field(..., description="File name")\n    diff_lines: List[str] = Field(default=[], description="Unified diff lines")\n    additions: int = Field(default=0, description="Number of lines added")\n    deletions: int = Field(default=0, description="Number of lines deleted")\n\n\nclass CommitDiff(BaseModel):\n    """Represents the diff between commits"""\n    model_config = ConfigDict(extra="ignore")\n\n    added: List[str] = Field(default=[], description="Names of new files")\n    modified: List[FileDiff] = Field(default=[], description="Modified files with diffs")\n    deleted: List[str] = Field(default=[], description="Names of deleted files")\n    unchanged: List[str] = Field(default=[], description="Names of unchanged files")\n    stats: Dict[str, int] = Field(\n        default_factory=lambda: {"files_changed": 0, "additions": 0, "deletions": 0},\n        description="Summary statistics"\n    )\n\n\nclass CommitCreate(BaseModel):\n    """Schema for creating a new commit"""\n    message: str = Field(..., min_length=1, max_length=500, description="Commit message")\n    files: List[Dict[str, Any]] = Field(..., description="Current files snapshot")\n\n\nclass Commit(BaseModel):\n    """Represents a single commit in the project history"""\n    model_config = ConfigDict(extra="ignore")\n\n    id: str = Field(default_factory=lambda: str(uuid4()), description="Unique commit ID")\n    project_id: str = Field(..., description="Associated project ID")\n    message: str = Field(..., description="Commit message describing changes")\n    author_id: str = Field(..., description="ID of user who made the commit")\n    author_email: Optional[str] = Field(None, description="Email of the author")\n    parent_id: Optional[str] = Field(None, description="ID of parent commit (None for first commit)")\n    files_snapshot: List[Dict[str, Any]] = Field(\n        default=[],\n        description="Complete snapshot of all files at this commit"\n    )\n    diff: Dict[str, Any] = Field(\n        default_factory=dict,\n        description="Diff from parent commit"\n    )\n    created_at: datetime = Field(\n        default_factory=lambda: datetime.now(timezone.utc),\n        description="Commit timestamp"\n    )\n\n    def to_summary(self) -> Dict[str, Any]:\n        """Return a summary without full file contents for listing"""\n        return {\n            "id": self.id,\n            "project_id": self.project_id,\n            "message": self.message,\n            "author_id": self.author_id,\n            "author_email": self.author_email,\n            "parent_id": self.parent_id,\n            "files_count": len(self.files_snapshot),\n            "diff_summary": {\n                "added": len(self.diff.get("added", [])),\n                "modified": len(self.diff.get("modified", [])),\n                "deleted": len(self.diff.get("deleted", [])),\n            },\n            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,\n        }\n\n\nclass VersionControlService:\n    """\n    Service de version control Git-like pour les projets Devora.\n\n    Provides Git-like version control functionality:\n    - commit(): Create a new commit with current file state\n    - get_history(): Retrieve commit history for a project\n    - get_latest_commit(): Get the most recent commit\n    - restore(): Restore files to a specific commit state\n    - get_diff(): Get detailed diff for a commit\n    - compare_commits(): Compare two commits directly\n\n    Example usage:\n        ```python\n        vc_service = VersionControlService(db)\n\n        # Create a commit\n        commit = await vc_service.commit(\n            project_id="proj_123",\n            message="Add login functionality",\n            files=[{"name": "auth.py", "content": "...", "language": "python"}],\n            author_id="user_456"\n        )\n\n        # Get history\n        history = await vc_service.get_history("proj_123")\n\n        # Restore to previous version\n        files = await vc_service.restore(commit.id)\n        ```\n    """\n\n    def __init__(self, db: AsyncIOMotorDatabase):\n        """\n        Initialize the version control service.\n\n        Args:\n            db: AsyncIOMotorDatabase instance for MongoDB operations\n        """\n        self.db = db\n        self.commits_collection = db.commits\n\n    async def ensure_indexes(self) -> None:\n        """Create necessary indexes for optimal query performance"""\n        try:\n            # Index for querying commits by project (most common query)\n            await self.commits_collection.create_index(\n                [("project_id", 1), ("created_at", -1)],\n                name="project_commits_idx"\n            )\n            # Index for looking up commits by ID\n            await self.commits_collection.create_index(\n                "id",\n                unique=True,\n                name="commit_id_idx"\n            )\n            # Index for parent chain traversal\n            await self.commits_collection.create_index(\n                "parent_id",\n                name="parent_commit_idx"\n            )\n            logger.info("Version control indexes created successfully")\n        except Exception as e:\n            logger.warning(f"Error creating indexes (may already exist): {e}")\n\n    async def commit(\n        self,\n        project_id: str,\n        message: str,\n        files: List[Dict[str, Any]],\n        author_id: str,\n        author_email: Optional[str] = None\n    ) -> Commit:\n        """\n        Create a new commit with the current file state.\n\n        This is the primary method for saving a version of the project.\n        It automatically calculates the diff from the parent commit.\n\n        Args:\n            project_id: The project to commit to\n            message: Descriptive commit message\n            files: List of file dicts with 'name', 'content', and optionally 'language'\n            author_id: ID of the user making the commit\n            author_email: Optional email of the author\n\n        Returns:\n            The created Commit object\n\n        Raises:\n            ValueError: If project_id or message is empty\n        """\n        if not project_id or not project_id.strip():\n            raise ValueError("project_id is required")\n        if not message or not message.strip():\n            raise ValueError("Commit message is required")\n\n        # Normalize files to ensure consistent structure\n        normalized_files = self._normalize_files(files)\n\n        # Retrieve the latest commit for diff calculation\n        latest = await self.get_latest_commit(project_id)\n\n        # Calculate the diff from the parent commit\n        parent_files = latest.files_snapshot if latest else []\n        diff = self._calculate_diff(parent_files, normalized_files)\n\n        # Create the commit\n        commit = Commit(\n            id=str(uuid4()),\n            project_id=project_id,\n            message=message.strip(),\n            author_id=author_id,\n            author_email=author_email,\n            parent_id=latest.id if latest else None,\n            files_snapshot=normalized_files,\n            diff=diff,\n            created_at=datetime.now(timezone.utc)\n        )\n\n        # Serialize for MongoDB\n        doc = commit.model_dump()\n        doc['created_at'] = doc['created_at'].isoformat()\n\n        await self.commits_collection.insert_one(doc)\n\n        logger.info(\n            f"Created commit {commit.id[:8]} for project {project_id}: "\n            f"+{len(diff['added'])} ~{len(diff['modified'])} -{len(diff['deleted'])}"\n        )\n\n        return commit\n\n    async def get_history(\n        self,\n        project_id: str,\n        limit: int = 50,\n        skip: int = 0,\n        include_files: bool = False\n    ) -> List[Dict[str, Any]]:\n        """\n        Retrieve commit history for a project.\n\n        Args:\n            project_id: The project to get history for\n            limit: Maximum number of commits to return (default 50, max 100)\n            skip: Number of commits to skip for pagination\n            include_files: If True, include full file snapshots (can be large)\n\n        Returns:\n            List of commit summaries (or full commits if include_files=True)\n        """\n        limit = min(limit, 100)  # Cap at 100 for performance\n\n        projection = {"_id": 0}\n        if not include_files:\n            projection["files_snapshot"] = 0\n\n        cursor = self.commits_collection.find(\n            {"project_id": project_id},\n            projection\n        ).sort("created_at", -1).skip(skip).limit(limit)\n\n        commits = await cursor.to_list(limit)\n\n        # Parse dates\n        for commit in commits:\n            if isinstance(commit.get('created_at'), str):\n                commit['created_at'] = datetime.fromisoformat(\n                    commit['created_at'].replace('Z', '+00:00')\n                )\n\n        return commits\n\n    async def get_latest_commit(self, project_id: str) -> Optional[Commit]:\n        """\n        Retrieve the most recent commit for a project.\n\n        Args:\n            project_id: The project to get the latest commit for\n\n        Returns:\n            The latest Commit or None if no commits exist\n        """\n        doc = await self.commits_collection.find_one(\n            {"project_id": project_id},\n            {"_id": 0},\n            sort=[("created_at", -1)]\n        )\n\n        if not doc:\n            return None\n\n        # Parse datetime\n        if isinstance(doc.get('created_at'), str):\n            doc['created_at'] = datetime.fromisoformat(\n                doc['created_at'].replace('Z', '+00:00')\n            )\n\n        return Commit(**doc)\n\n    async def get_commit(self, commit_id: str) -> Optional[Commit]:\n        """\n        Retrieve a specific commit by ID.\n\n        Args:\n            commit_id: The unique commit identifier\n\n        Returns:\n            The Commit or None if not found\n        """\n        doc = await self.commits_collection.find_one(\n            {"id": commit_id},\n            {"_id": 0}\n        )\n\n        if not doc:\n            return None\n\n        # Parse datetime\n        if isinstance(doc.get('created_at'), str):\n            doc['created_at'] = datetime.fromisoformat(\n                doc['created_at'].replace('Z', '+00:00')\n            )\n\n        return Commit(**doc)\n\n    async def restore(self, commit_id: str) -> List[Dict[str, Any]]:\n        """\n        Restore files to a specific commit state.\n\n        This returns the file snapshot from the commit, which can then\n        be used to update the project's current files.\n\n        Args:\n            commit_id: The commit to restore to\n\n        Returns:\n            List of file dicts from the commit\n\n        Raises:\n            ValueError: If the commit is not found\n        """\n        commit = await self.get_commit(commit_id)\n\n        if not commit:\n            raise ValueError(f"Commit {commit_id} not found")\n\n        logger.info(f"Restored {len(commit.files_snapshot)} files from commit {commit_id[:8]}")\n\n        return commit.files_snapshot\n\n    async def get_diff(self, commit_id: str) -> Dict[str, Any]:\n        """\n        Get the detailed diff for a specific commit.\n\n        Args:\n            commit_id: The commit to get the diff for\n\n        Returns:\n            The diff dict with 'added', 'modified', 'deleted', 'unchanged'\n\n        Raises:\n            ValueError: If the commit is not found\n        """\n        commit = await self.get_commit(commit_id)\n\n        if not commit:\n            raise ValueError(f"Commit {commit_id} not found")\n\n        return commit.diff\n\n    async def compare_commits(\n        self,\n        from_commit_id: str,\n        to_commit_id: str\n    ) -> Dict[str, Any]:\n        """\n        Compare two commits and return the diff between them.\n\n        Args:\n            from_commit_id: The base commit (older)\n            to_commit_id: The target commit (newer)\n\n        Returns:\n            Diff between the two commits\n\n        Raises:\n            ValueError: If either commit is not found\n        """\n        from_commit = await self.get_commit(from_commit_id)\n        to_commit = await self.get_commit(to_commit_id)\n\n        if not from_commit:\n            raise ValueError(f"Commit {from_commit_id} not found")\n        if not to_commit:\n            raise ValueError(f"Commit {to_commit_id} not found")\n\n        return self._calculate_diff(\n            from_commit.files_snapshot,\n            to_commit.files_snapshot\n        )\n\n    async def get_commit_count(self, project_id: str) -> int:\n        """\n        Get the total number of commits for a project.\n\n        Args:\n            project_id: The project to count commits for\n\n        Returns:\n            Number of commits\n        """\n        return await self.commits_collection.count_documents({"project_id": project_id})\n\n    async def get_file_history(\n        self,\n        project_id: str,\n        file_name: str,\n        limit: int = 20\n    ) -> List[Dict[str, Any]]:\n        """\n        Get the history of changes for a specific file.\n\n        Args:\n            project_id: The project containing the file\n            file_name: The name/path of the file\n            limit: Maximum number of versions to return\n\n        Returns:\n            List of dicts with commit info and file content for each version\n        """\n        cursor = self.commits_collection.find(\n            {"project_id": project_id},\n            {"_id": 0}\n        ).sort("created_at", -1)\n\n        file_history = []\n        previous_content = None\n\n        async for doc in cursor:\n            # Find the file in this commit\n            file_snapshot = None\n            for f in doc.get('files_snapshot', []):\n                if f.get('name') == file_name:\n                    file_snapshot = f\n                    break\n\n            # Track when file was added/modified/deleted\n            current_content = file_snapshot.get('content') if file_snapshot else None\n\n            if current_content != previous_content:\n                entry = {\n                    "commit_id": doc['id'],\n                    "commit_message": doc['message'],\n                    "author_id": doc['author_id'],\n                    "created_at": doc['created_at'],\n                    "file_exists": file_snapshot is not None,\n                    "content": current_content,\n                }\n\n                if file_snapshot is None and previous_content is not None:\n                    entry["change_type"] = "deleted"\n                elif previous_content is None and current_content is not None:\n                    entry["change_type"] = "added"\n                else:\n                    entry["change_type"] = "modified"\n\n                file_history.append(entry)\n                previous_content = current_content\n\n                if len(file_history) >= limit:\n                    break\n\n        return file_history\n\n    def _normalize_files(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:\n        """\n        Normalize file dicts to ensure consistent structure.\n\n        Args:\n            files: Raw file list\n\n        Returns:\n            Normalized file list with consistent keys\n        """\n        normalized = []\n        for f in files:\n            normalized.append({\n                "name": f.get("name", ""),\n                "content": f.get("content", ""),\n                "language": f.get("language", self._detect_language(f.get("name", "")))\n            })\n        return normalized\n\n    def _detect_language(self, filename: str) -> str:\n        """Detect programming language from file extension"""\n        ext_map = {\n            ".py": "python",\n            ".js": "javascript",\n            ".ts": "typescript",\n            ".tsx": "typescript",\n            ".jsx": "javascript",\n            ".html": "html",\n            ".css": "css",\n            ".json": "json",\n            ".md": "markdown",\n            ".sql": "sql",\n            ".sh": "bash",\n            ".yaml": "yaml",\n            ".yml": "yaml",\n        }\n\n        for ext, lang in ext_map.items():\n            if filename.lower().endswith(ext):\n                return lang\n        return "text"\n\n    def _calculate_diff(\n        self,\n        old_files: List[Dict[str, Any]],\n        new_files: List[Dict[str, Any]]\n    ) -> Dict[str, Any]:\n        """\n        Calculate the diff between two file snapshots.\n\n        Uses Python's difflib for unified diff generation.\n\n        Args:\n            old_files: Previous file state\n            new_files: Current file state\n\n        Returns:\n            Dict with 'added', 'modified', 'deleted', 'unchanged', and 'stats'\n        """\n        old_map = {f.get("name", ""): f.get("content", "") for f in old_files if f.get("name")}\n        new_map = {f.get("name", ""): f.get("content", "") for f in new_files if f.get("name")}\n\n        diff = {\n            "added": [],\n            "modified": [],\n            "deleted": [],\n            "unchanged": [],\n            "stats": {\n                "files_changed": 0,\n                "additions": 0,\n                "deletions": 0\n            }\n        }\n\n        # Process new/modified files\n        for name, content in new_map.items():\n            if name not in old_map:\n                # New file\n                diff["added"].append(name)\n                diff["stats"]["files_changed"] += 1\n                diff["stats"]["additions"] += len(content.splitlines())\n            elif old_map[name] != content:\n                # Modified file - compute unified diff\n                old_lines = old_map[name].splitlines(keepends=True)\n                new_lines = content.splitlines(keepends=True)\n\n                unified_diff = list(difflib.unified_diff(\n                    old_lines,\n                    new_lines,\n                    fromfile=f"a/{name}",\n                    tofile=f"b/{name}",\n                    lineterm=""\n                ))\n\n                # Count additions and deletions\n                additions = sum(1 for line in unified_diff if line.startswith('+') and not line.startswith('+++'))\n                deletions = sum(1 for line in unified_diff if line.startswith('-') and not line.startswith('---'))\n\n                diff["modified"].append({\n                    "name": name,\n                    "diff_lines": unified_diff,\n                    "additions": additions,\n                    "deletions": deletions\n                })\n\n                diff["stats"]["files_changed"] += 1\n                diff["stats"]["additions"] += additions\n                diff["stats"]["deletions"] += deletions\n            else:\n                # Unchanged\n                diff["unchanged"].append(name)\n\n        # Process deleted files\n        for name in old_map:\n            if name not in new_map:\n                diff["deleted"].append(name)\n                diff["stats"]["files_changed"] += 1\n                diff["stats"]["deletions"] += len(old_map[name].splitlines())\n\n        return diff\n\n\n# Factory function for easy service creation\ndef create_version_control_service(db: AsyncIOMotorDatabase) -> VersionControlService:\n    """\n    Factory function to create a VersionControlService instance.\n\n    Args:\n        db: AsyncIOMotorDatabase instance\n\n    Returns:\n        Configured VersionControlService\n    """\n    return VersionControlService(db)\n
\ No newline at end of file
+"""
+Git-like Version Control Service for Devora Projects
+
+This service provides version control functionality for project files, including:
+- Creating commits with file snapshots
+- Viewing commit history
+- Restoring to previous versions
+- Computing and viewing diffs between versions
+
+Storage is content-addressed, like git: file contents live once in a blob
+collection keyed by their SHA-256, and each commit only stores a tree of
+(path -> blob hash). Unchanged files cost nothing on subsequent commits.
+
+The service uses MongoDB for persistent storage and supports async operations.
+"""
+
+from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, timezone
+from uuid import uuid4
+import hashlib
+import logging
+from pydantic import BaseModel, Field, ConfigDict
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .diff_engine import DiffEngine, get_diff_engine
+
+logger = logging.getLogger(__name__)
+
+# MongoDB duplicate key error code (concurrent blob upserts)
+DUPLICATE_KEY_ERROR = 11000
+
+
+def compute_blob_hash(content: str) -> str:
+    """SHA-256 of a file's content, used as its blob key"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class FileSnapshot(BaseModel):
+    """Represents a file at a specific point in time"""
+    model_config = ConfigDict(extra="ignore")
+
+    name: str = Field(..., description="File path/name")
+    content: str = Field(..., description="File content at this version")
+    language: Optional[str] = Field(None, description="Programming language/file type")
+
+
+class TreeEntry(BaseModel):
+    """A file in a commit tree, pointing to its content blob"""
+    model_config = ConfigDict(extra="ignore")
+
+    name: str = Field(..., description="File path/name")
+    hash: str = Field(..., description="SHA-256 of the file content")
+    language: Optional[str] = Field(None, description="Programming language/file type")
+    lines: int = Field(default=0, description="Number of lines in the file")
+
+
+class FileDiff(BaseModel):
+    """Represents the diff for a modified file"""
+    model_config = ConfigDict(extra="ignore")
+
+    name: str = Field(..., description="File name")
+    diff_lines: List[str] = Field(default=[], description="Unified diff lines")
+    additions: int = Field(default=0, description="Number of lines added")
+    deletions: int = Field(default=0, description="Number of lines deleted")
+    binary: bool = Field(default=False, description="File detected as binary, not diffed")
+    too_large: bool = Field(default=False, description="File over the diff limits, stats are approximate")
+
+
+class CommitDiff(BaseModel):
+    """Represents the diff between commits"""
+    model_config = ConfigDict(extra="ignore")
+
+    added: List[str] = Field(default=[], description="Names of new files")
+    modified: List[FileDiff] = Field(default=[], description="Modified files with diffs")
+    deleted: List[str] = Field(default=[], description="Names of deleted files")
+    unchanged: List[str] = Field(default=[], description="Names of unchanged files")
+    stats: Dict[str, int] = Field(
+        default_factory=lambda: {"files_changed": 0, "additions": 0, "deletions": 0},
+        description="Summary statistics"
+    )
+
+
+class CommitCreate(BaseModel):
+    """Schema for creating a new commit"""
+    message: str = Field(..., min_length=1, max_length=500, description="Commit message")
+    files: List[Dict[str, Any]] = Field(..., description="Current files snapshot")
+
+
+class Commit(BaseModel):
+    """Represents a single commit in the project history"""
+    model_config = ConfigDict(extra="ignore")
+
+    id: str = Field(default_factory=lambda: str(uuid4()), description="Unique commit ID")
+    project_id: str = Field(..., description="Associated project ID")
+    message: str = Field(..., description="Commit message describing changes")
+    author_id: str = Field(..., description="ID of user who made the commit")
+    author_email: Optional[str] = Field(None, description="Email of the author")
+    parent_id: Optional[str] = Field(None, description="ID of parent commit (None for first commit)")
+    tree: List[Dict[str, Any]] = Field(
+        default=[],
+        description="Files at this commit as (name, blob hash, language, lines) entries"
+    )
+    files_count: int = Field(default=0, description="Number of files in the tree")
+    files_snapshot: List[Dict[str, Any]] = Field(
+        default=[],
+        description="Complete snapshot of all files at this commit (hydrated from blobs on demand)"
+    )
+    diff: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Diff from parent commit"
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Commit timestamp"
+    )
+
+    def to_summary(self) -> Dict[str, Any]:
+        """Return a summary without full file contents for listing"""
+        return {
+            "id": self.id,
+            "project_id": self.project_id,
+            "message": self.message,
+            "author_id": self.author_id,
+            "author_email": self.author_email,
+            "parent_id": self.parent_id,
+            "files_count": self.files_count or len(self.tree) or len(self.files_snapshot),
+            "diff_summary": {
+                "added": len(self.diff.get("added", [])),
+                "modified": len(self.diff.get("modified", [])),
+                "deleted": len(self.diff.get("deleted", [])),
+            },
+            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
+        }
+
+
+class VersionControlService:
+    """
+    Service de version control Git-like pour les projets Devora.
+
+    Provides Git-like version control functionality:
+    - commit(): Create a new commit with current file state
+    - get_history(): Retrieve commit history for a project
+    - get_latest_commit(): Get the most recent commit
+    - restore(): Restore files to a specific commit state
+    - get_diff(): Get detailed diff for a commit
+    - compare_commits(): Compare two commits directly
+
+    Example usage:
+        ```python
+        vc_service = VersionControlService(db)
+
+        # Create a commit
+        commit = await vc_service.commit(
+            project_id="proj_123",
+            message="Add login functionality",
+            files=[{"name": "auth.py", "content": "...", "language": "python"}],
+            author_id="user_456"
+        )
+
+        # Get history
+        history = await vc_service.get_history("proj_123")
+
+        # Restore to previous version
+        files = await vc_service.restore(commit.id)
+        ```
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, diff_engine: Optional[DiffEngine] = None):
+        """
+        Initialize the version control service.
+
+        Args:
+            db: AsyncIOMotorDatabase instance for MongoDB operations
+            diff_engine: Diff engine (defaults to the shared, cached engine)
+        """
+        self.db = db
+        self.diff_engine = diff_engine or get_diff_engine()
+        self.commits_collection = db.commits
+        self.blobs_collection = db.blobs
+        self.file_changes_collection = db.file_changes
+
+    async def ensure_indexes(self) -> None:
+        """Create necessary indexes for optimal query performance"""
+        try:
+            # Index for querying commits by project (most common query)
+            await self.commits_collection.create_index(
+                [("project_id", 1), ("created_at", -1)],
+                name="project_commits_idx"
+            )
+            # Index for looking up commits by ID
+            await self.commits_collection.create_index(
+                "id",
+                unique=True,
+                name="commit_id_idx"
+            )
+            # Index for parent chain traversal
+            await self.commits_collection.create_index(
+                "parent_id",
+                name="parent_commit_idx"
+            )
+            # Content-addressed blob lookup
+            await self.blobs_collection.create_index(
+                "hash",
+                unique=True,
+                name="blob_hash_idx"
+            )
+            # Per-file history: one range scan per (project, path)
+            await self.file_changes_collection.create_index(
+                [("project_id", 1), ("path", 1), ("created_at", -1)],
+                name="file_history_idx"
+            )
+            logger.info("Version control indexes created successfully")
+        except Exception as e:
+            logger.warning(f"Error creating indexes (may already exist): {e}")
+
+    async def commit(
+        self,
+        project_id: str,
+        message: str,
+        files: List[Dict[str, Any]],
+        author_id: str,
+        author_email: Optional[str] = None
+    ) -> Commit:
+        """
+        Create a new commit with the current file state.
+
+        This is the primary method for saving a version of the project.
+        Only blobs that the parent tree does not already reference are
+        written, and only files whose hash changed are diffed.
+
+        Args:
+            project_id: The project to commit to
+            message: Descriptive commit message
+            files: List of file dicts with 'name', 'content', and optionally 'language'
+            author_id: ID of the user making the commit
+            author_email: Optional email of the author
+
+        Returns:
+            The created Commit object
+
+        Raises:
+            ValueError: If project_id or message is empty
+        """
+        if not project_id or not project_id.strip():
+            raise ValueError("project_id is required")
+        if not message or not message.strip():
+            raise ValueError("Commit message is required")
+
+        # Normalize files to ensure consistent structure
+        normalized_files = self._normalize_files(files)
+        tree, contents = self._build_tree(normalized_files)
+
+        # Retrieve the parent tree only (no file contents)
+        parent_doc = await self.commits_collection.find_one(
+            {"project_id": project_id},
+            {"_id": 0, "id": 1, "tree": 1, "files_snapshot": 1},
+            sort=[("created_at", -1)]
+        )
+        parent_tree, parent_contents = self._load_tree(parent_doc)
+
+        # Blobs already referenced by a tree-based parent are known to exist
+        stored_hashes = {e["hash"] for e in parent_tree} if parent_doc and "tree" in parent_doc else set()
+        await self._store_blobs({h: c for h, c in contents.items() if h not in stored_hashes})
+
+        # Stats only: hunks are computed on demand (and are cached by the
+        # engine, so a diff viewed right after committing is free)
+        diff = await self._diff_trees(
+            parent_tree,
+            tree,
+            known_contents={**parent_contents, **contents},
+            include_unchanged=False,
+            summary_only=True
+        )
+
+        # Create the commit
+        commit = Commit(
+            id=str(uuid4()),
+            project_id=project_id,
+            message=message.strip(),
+            author_id=author_id,
+            author_email=author_email,
+            parent_id=parent_doc["id"] if parent_doc else None,
+            tree=tree,
+            files_count=len(tree),
+            diff=diff,
+            created_at=datetime.now(timezone.utc)
+        )
+
+        # Serialize for MongoDB - contents live in blobs, not in the commit
+        doc = commit.model_dump(exclude={"files_snapshot"})
+        doc['created_at'] = doc['created_at'].isoformat()
+
+        await self.commits_collection.insert_one(doc)
+        await self._index_file_changes(doc)
+
+        commit.files_snapshot = normalized_files
+
+        logger.info(
+            f"Created commit {commit.id[:8]} for project {project_id}: "
+            f"+{len(diff['added'])} ~{len(diff['modified'])} -{len(diff['deleted'])}"
+        )
+
+        return commit
+
+    async def get_history(
+        self,
+        project_id: str,
+        limit: int = 50,
+        skip: int = 0,
+        include_files: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve commit history for a project.
+
+        Args:
+            project_id: The project to get history for
+            limit: Maximum number of commits to return (default 50, max 100)
+            skip: Number of commits to skip for pagination
+            include_files: If True, include full file snapshots (can be large)
+
+        Returns:
+            List of commit summaries (or full commits if include_files=True)
+        """
+        limit = min(limit, 100)  # Cap at 100 for performance
+
+        projection = {"_id": 0}
+        if not include_files:
+            projection["files_snapshot"] = 0
+            projection["tree"] = 0
+
+        cursor = self.commits_collection.find(
+            {"project_id": project_id},
+            projection
+        ).sort("created_at", -1).skip(skip).limit(limit)
+
+        commits = await cursor.to_list(limit)
+
+        # Parse dates
+        for commit in commits:
+            if isinstance(commit.get('created_at'), str):
+                commit['created_at'] = datetime.fromisoformat(
+                    commit['created_at'].replace('Z', '+00:00')
+                )
+
+        if include_files:
+            # One blob query for every commit on the page
+            hashes = {e["hash"] for c in commits if "tree" in c for e in c["tree"]}
+            blobs = await self._fetch_blobs(hashes)
+            for commit in commits:
+                if "tree" in commit:
+                    commit["files_snapshot"] = self._tree_to_files(commit["tree"], blobs)
+
+        return commits
+
+    async def get_latest_commit(self, project_id: str) -> Optional[Commit]:
+        """
+        Retrieve the most recent commit for a project.
+
+        The returned commit carries its tree; file contents are not loaded.
+
+        Args:
+            project_id: The project to get the latest commit for
+
+        Returns:
+            The latest Commit or None if no commits exist
+        """
+        doc = await self.commits_collection.find_one(
+            {"project_id": project_id},
+            {"_id": 0},
+            sort=[("created_at", -1)]
+        )
+
+        return self._doc_to_commit(doc)
+
+    async def get_commit(self, commit_id: str, include_files: bool = False) -> Optional[Commit]:
+        """
+        Retrieve a specific commit by ID.
+
+        Args:
+            commit_id: The unique commit identifier
+            include_files: If True, hydrate files_snapshot from the blob store
+
+        Returns:
+            The Commit or None if not found
+        """
+        doc = await self.commits_collection.find_one(
+            {"id": commit_id},
+            {"_id": 0}
+        )
+
+        commit = self._doc_to_commit(doc)
+        if commit and include_files and commit.tree and not commit.files_snapshot:
+            blobs = await self._fetch_blobs({e["hash"] for e in commit.tree})
+            commit.files_snapshot = self._tree_to_files(commit.tree, blobs)
+
+        return commit
+
+    async def restore(self, commit_id: str) -> List[Dict[str, Any]]:
+        """
+        Restore files to a specific commit state.
+
+        This rebuilds the file snapshot from the commit tree, which can then
+        be used to update the project's current files.
+
+        Args:
+            commit_id: The commit to restore to
+
+        Returns:
+            List of file dicts from the commit
+
+        Raises:
+            ValueError: If the commit is not found
+        """
+        commit = await self.get_commit(commit_id, include_files=True)
+
+        if not commit:
+            raise ValueError(f"Commit {commit_id} not found")
+
+        logger.info(f"Restored {len(commit.files_snapshot)} files from commit {commit_id[:8]}")
+
+        return commit.files_snapshot
+
+    async def get_diff(self, commit_id: str, summary_only: bool = False) -> Dict[str, Any]:
+        """
+        Get the detailed diff for a specific commit.
+
+        Args:
+            commit_id: The commit to get the diff for
+            summary_only: Return per-file stats without diff hunks
+
+        Returns:
+            The diff dict with 'added', 'modified', 'deleted', 'unchanged'
+
+        Raises:
+            ValueError: If the commit is not found
+        """
+        commit = await self.get_commit(commit_id)
+
+        if not commit:
+            raise ValueError(f"Commit {commit_id} not found")
+
+        diff = dict(commit.diff)
+        if "unchanged" not in diff:
+            # Tree-based commits don't store the unchanged list
+            changed = set(diff.get("added", [])) | {m["name"] for m in diff.get("modified", [])}
+            diff["unchanged"] = [e["name"] for e in commit.tree if e["name"] not in changed]
+
+        if summary_only:
+            diff["modified"] = [{**m, "diff_lines": []} for m in diff.get("modified", [])]
+        elif commit.tree and diff.get("modified"):
+            # Tree-based commits store stats only; build hunks from the parent
+            diff["modified"] = await self._diff_modified_files(
+                commit, [m["name"] for m in diff["modified"]]
+            )
+
+        return diff
+
+    async def get_file_diff(self, commit_id: str, file_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the diff hunks of one file changed by a commit.
+
+        Args:
+            commit_id: The commit that changed the file
+            file_name: The name/path of the file
+
+        Returns:
+            FileDiff dict, or None if the file was not modified by the commit
+
+        Raises:
+            ValueError: If the commit is not found
+        """
+        commit = await self.get_commit(commit_id)
+
+        if not commit:
+            raise ValueError(f"Commit {commit_id} not found")
+
+        if not commit.tree:
+            # Legacy commit with stored hunks
+            return next((m for m in commit.diff.get("modified", []) if m["name"] == file_name), None)
+
+        diffs = await self._diff_modified_files(commit, [file_name])
+        return diffs[0] if diffs else None
+
+    async def compare_commits(
+        self,
+        from_commit_id: str,
+        to_commit_id: str,
+        summary_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compare two commits and return the diff between them.
+
+        Args:
+            from_commit_id: The base commit (older)
+            to_commit_id: The target commit (newer)
+            summary_only: Return per-file stats without diff hunks
+
+        Returns:
+            Diff between the two commits
+
+        Raises:
+            ValueError: If either commit is not found
+        """
+        projection = {"_id": 0, "id": 1, "tree": 1, "files_snapshot": 1}
+        from_doc = await self.commits_collection.find_one({"id": from_commit_id}, projection)
+        to_doc = await self.commits_collection.find_one({"id": to_commit_id}, projection)
+
+        if not from_doc:
+            raise ValueError(f"Commit {from_commit_id} not found")
+        if not to_doc:
+            raise ValueError(f"Commit {to_commit_id} not found")
+
+        from_tree, from_contents = self._load_tree(from_doc)
+        to_tree, to_contents = self._load_tree(to_doc)
+
+        return await self._diff_trees(
+            from_tree,
+            to_tree,
+            known_contents={**from_contents, **to_contents},
+            summary_only=summary_only
+        )
+
+    async def get_commit_count(self, project_id: str) -> int:
+        """
+        Get the total number of commits for a project.
+
+        Args:
+            project_id: The project to count commits for
+
+        Returns:
+            Number of commits
+        """
+        return await self.commits_collection.count_documents({"project_id": project_id})
+
+    async def get_file_history(
+        self,
+        project_id: str,
+        file_name: str,
+        limit: int = 20,
+        before: Optional[str] = None,
+        include_content: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the history of changes for a specific file.
+
+        Reads the per-file change index, newest first. Contents are only
+        loaded when include_content is set; otherwise use get_file_version.
+
+        Args:
+            project_id: The project containing the file
+            file_name: The name/path of the file
+            limit: Maximum number of versions to return
+            before: Only return changes older than this created_at (pagination cursor)
+            include_content: Also load the file content of each version
+
+        Returns:
+            List of dicts with commit info and blob hash for each version
+        """
+        query: Dict[str, Any] = {"project_id": project_id, "path": file_name}
+        if before:
+            query["created_at"] = {"$lt": before}
+
+        cursor = self.file_changes_collection.find(
+            query,
+            {"_id": 0, "project_id": 0, "path": 0}
+        ).sort("created_at", -1).limit(limit)
+
+        file_history = await cursor.to_list(limit)
+
+        contents = await self._fetch_blobs({e["blob_hash"] for e in file_history}) if include_content else {}
+        for entry in file_history:
+            entry["file_exists"] = entry["change_type"] != "deleted"
+            if include_content:
+                entry["content"] = contents.get(entry["blob_hash"])
+
+        return file_history
+
+    async def get_file_version(
+        self,
+        project_id: str,
+        file_name: str,
+        blob_hash: str
+    ) -> Optional[str]:
+        """
+        Get the content of one version of a file from its history.
+
+        Args:
+            project_id: The project containing the file
+            file_name: The name/path of the file
+            blob_hash: Blob hash from a get_file_history entry
+
+        Returns:
+            The file content, or None if that version isn't in the file's history
+        """
+        change = await self.file_changes_collection.find_one(
+            {"project_id": project_id, "path": file_name, "blob_hash": blob_hash},
+            {"_id": 0, "blob_hash": 1}
+        )
+        if not change:
+            return None
+
+        blobs = await self._fetch_blobs([blob_hash])
+        return blobs.get(blob_hash)
+
+    async def rebuild_file_index(self, project_id: str) -> int:
+        """
+        Rebuild the per-file change index of a project from its commits.
+
+        Needed once for projects whose commits predate the index.
+
+        Args:
+            project_id: The project to reindex
+
+        Returns:
+            Number of index entries written
+        """
+        await self.file_changes_collection.delete_many({"project_id": project_id})
+
+        cursor = self.commits_collection.find(
+            {"project_id": project_id},
+            {"_id": 0, "id": 1, "message": 1, "author_id": 1, "created_at": 1,
+             "tree": 1, "files_snapshot": 1}
+        ).sort("created_at", 1)
+
+        written = 0
+        previous: Dict[str, str] = {}
+        async for doc in cursor:
+            tree, _ = self._load_tree(doc)
+            current = {e["name"]: e["hash"] for e in tree}
+            changes = self._tree_changes(previous, current)
+            if changes:
+                await self.file_changes_collection.insert_many(
+                    [self._file_change_doc(project_id, doc, *change) for change in changes],
+                    ordered=False
+                )
+                written += len(changes)
+            previous = current
+
+        logger.info(f"Rebuilt file history index for project {project_id}: {written} entries")
+        return written
+
+    async def migrate_legacy_commits(self, project_id: Optional[str] = None, batch_size: int = 100) -> int:
+        """
+        Convert commits that still embed full snapshots to blob-backed trees.
+
+        Args:
+            project_id: Restrict the migration to one project (default: all)
+            batch_size: Number of commits converted per bulk write
+
+        Returns:
+            Number of commits migrated
+        """
+        query: Dict[str, Any] = {"tree": {"$exists": False}, "files_snapshot": {"$exists": True}}
+        if project_id:
+            query["project_id"] = project_id
+
+        migrated = 0
+        operations = []
+        projects = set()
+        cursor = self.commits_collection.find(query, {"_id": 0, "id": 1, "project_id": 1, "files_snapshot": 1})
+
+        async for doc in cursor:
+            projects.add(doc["project_id"])
+            tree, contents = self._build_tree(self._normalize_files(doc.get("files_snapshot", [])))
+            await self._store_blobs(contents)
+            operations.append(UpdateOne(
+                {"id": doc["id"]},
+                {"$set": {"tree": tree, "files_count": len(tree)}, "$unset": {"files_snapshot": ""}}
+            ))
+
+            if len(operations) >= batch_size:
+                await self.commits_collection.bulk_write(operations, ordered=False)
+                migrated += len(operations)
+                operations = []
+
+        if operations:
+            await self.commits_collection.bulk_write(operations, ordered=False)
+            migrated += len(operations)
+
+        for migrated_project in projects:
+            await self.rebuild_file_index(migrated_project)
+
+        logger.info(f"Migrated {migrated} legacy commits to blob storage")
+        return migrated
+
+    async def _index_file_changes(self, doc: Dict[str, Any]) -> None:
+        """Record the files touched by a new commit in the per-file index"""
+        diff = doc["diff"]
+        hashes = {e["name"]: e["hash"] for e in doc["tree"]}
+
+        changes = (
+            [(name, hashes[name], "added") for name in diff["added"]]
+            + [(m["name"], hashes[m["name"]], "modified") for m in diff["modified"]]
+            + [(name, None, "deleted") for name in diff["deleted"]]
+        )
+        if changes:
+            await self.file_changes_collection.insert_many(
+                [self._file_change_doc(doc["project_id"], doc, *change) for change in changes],
+                ordered=False
+            )
+
+    @staticmethod
+    def _tree_changes(
+        old: Dict[str, str],
+        new: Dict[str, str]
+    ) -> List[Tuple[str, Optional[str], str]]:
+        """(path, blob hash, change type) for every path that differs"""
+        changes = []
+        for name, blob_hash in new.items():
+            if name not in old:
+                changes.append((name, blob_hash, "added"))
+            elif old[name] != blob_hash:
+                changes.append((name, blob_hash, "modified"))
+        changes.extend((name, None, "deleted") for name in old if name not in new)
+        return changes
+
+    @staticmethod
+    def _file_change_doc(
+        project_id: str,
+        commit_doc: Dict[str, Any],
+        path: str,
+        blob_hash: Optional[str],
+        change_type: str
+    ) -> Dict[str, Any]:
+        """Index entry for one file touched by a commit"""
+        created_at = commit_doc["created_at"]
+        return {
+            "project_id": project_id,
+            "path": path,
+            "commit_id": commit_doc["id"],
+            "commit_message": commit_doc["message"],
+            "author_id": commit_doc["author_id"],
+            "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+            "blob_hash": blob_hash,
+            "change_type": change_type,
+        }
+
+    def _doc_to_commit(self, doc: Optional[Dict[str, Any]]) -> Optional[Commit]:
+        """Build a Commit from a stored document"""
+        if not doc:
+            return None
+
+        # Parse datetime
+        if isinstance(doc.get('created_at'), str):
+            doc['created_at'] = datetime.fromisoformat(
+                doc['created_at'].replace('Z', '+00:00')
+            )
+
+        return Commit(**doc)
+
+    def _build_tree(
+        self,
+        files: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Hash normalized files into tree entries.
+
+        Args:
+            files: Normalized file list
+
+        Returns:
+            Tuple of (tree entries, {blob hash: content})
+        """
+        tree = []
+        contents = {}
+        for f in files:
+            if not f["name"]:
+                continue
+            blob_hash = compute_blob_hash(f["content"])
+            contents[blob_hash] = f["content"]
+            tree.append(TreeEntry(
+                name=f["name"],
+                hash=blob_hash,
+                language=f["language"],
+                lines=len(f["content"].splitlines())
+            ).model_dump())
+        return tree, contents
+
+    def _load_tree(
+        self,
+        doc: Optional[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """
+        Get the tree of a stored commit, supporting legacy snapshot commits.
+
+        Returns:
+            Tuple of (tree entries, contents already in memory)
+        """
+        if not doc:
+            return [], {}
+        if "tree" in doc:
+            return doc["tree"], {}
+        return self._build_tree(self._normalize_files(doc.get("files_snapshot", [])))
+
+    def _tree_to_files(
+        self,
+        tree: List[Dict[str, Any]],
+        blobs: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """Rebuild a file snapshot from a tree and fetched blobs"""
+        return [
+            {"name": e["name"], "content": blobs.get(e["hash"], ""), "language": e.get("language")}
+            for e in tree
+        ]
+
+    async def _store_blobs(self, contents: Dict[str, str]) -> None:
+        """Insert blobs that don't exist yet (idempotent)"""
+        if not contents:
+            return
+
+        now = datetime.now(timezone.utc).isoformat()
+        operations = [
+            UpdateOne(
+                {"hash": blob_hash},
+                {"$setOnInsert": {
+                    "hash": blob_hash,
+                    "content": content,
+                    "size": len(content.encode("utf-8")),
+                    "created_at": now
+                }},
+                upsert=True
+            )
+            for blob_hash, content in contents.items()
+        ]
+
+        try:
+            await self.blobs_collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Concurrent commits may race to insert the same blob
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != DUPLICATE_KEY_ERROR for err in errors):
+                raise
+
+    async def _fetch_blobs(self, hashes) -> Dict[str, str]:
+        """Load blob contents for a set of hashes in one query"""
+        hashes = [h for h in hashes if h]
+        if not hashes:
+            return {}
+
+        cursor = self.blobs_collection.find(
+            {"hash": {"$in": hashes}},
+            {"_id": 0, "hash": 1, "content": 1}
+        )
+        return {doc["hash"]: doc["content"] async for doc in cursor}
+
+    def _normalize_files(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Normalize file dicts to ensure consistent structure.
+
+        Args:
+            files: Raw file list
+
+        Returns:
+            Normalized file list with consistent keys
+        """
+        normalized = []
+        for f in files:
+            normalized.append({
+                "name": f.get("name", ""),
+                "content": f.get("content", ""),
+                "language": f.get("language", self._detect_language(f.get("name", "")))
+            })
+        return normalized
+
+    def _detect_language(self, filename: str) -> str:
+        """Detect programming language from file extension"""
+        ext_map = {
+            ".py": "python",
+            ".js": "javascript",
+            ".ts": "typescript",
+            ".tsx": "typescript",
+            ".jsx": "javascript",
+            ".html": "html",
+            ".css": "css",
+            ".json": "json",
+            ".md": "markdown",
+            ".sql": "sql",
+            ".sh": "bash",
+            ".yaml": "yaml",
+            ".yml": "yaml",
+        }
+
+        for ext, lang in ext_map.items():
+            if filename.lower().endswith(ext):
+                return lang
+        return "text"
+
+    async def _diff_trees(
+        self,
+        old_tree: List[Dict[str, Any]],
+        new_tree: List[Dict[str, Any]],
+        known_contents: Optional[Dict[str, str]] = None,
+        include_unchanged: bool = True,
+        summary_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Calculate the diff between two trees.
+
+        Files are compared by blob hash; contents are only loaded for
+        modified files, and only if they are not already in memory.
+
+        Args:
+            old_tree: Previous tree entries
+            new_tree: Current tree entries
+            known_contents: Blob contents already available, by hash
+            include_unchanged: Whether to list unchanged file names
+            summary_only: Compute per-file stats without keeping hunks
+
+        Returns:
+            Dict with 'added', 'modified', 'deleted', 'unchanged', and 'stats'
+        """
+        old_map = {e["name"]: e for e in old_tree}
+        new_map = {e["name"]: e for e in new_tree}
+
+        diff = {
+            "added": [],
+            "modified": [],
+            "deleted": [],
+            "stats": {
+                "files_changed": 0,
+                "additions": 0,
+                "deletions": 0
+            }
+        }
+        if include_unchanged:
+            diff["unchanged"] = []
+
+        modified = [
+            (old_map[name], entry) for name, entry in new_map.items()
+            if name in old_map and old_map[name]["hash"] != entry["hash"]
+        ]
+
+        file_diffs = await self._diff_entries(modified, known_contents, summary_only)
+
+        modified_names = set()
+        for file_diff in file_diffs:
+            diff["modified"].append(file_diff)
+            modified_names.add(file_diff["name"])
+            diff["stats"]["files_changed"] += 1
+            diff["stats"]["additions"] += file_diff["additions"]
+            diff["stats"]["deletions"] += file_diff["deletions"]
+
+        for name, entry in new_map.items():
+            if name not in old_map:
+                # New file
+                diff["added"].append(name)
+                diff["stats"]["files_changed"] += 1
+                diff["stats"]["additions"] += entry.get("lines", 0)
+            elif include_unchanged and name not in modified_names:
+                diff["unchanged"].append(name)
+
+        # Process deleted files
+        for name, entry in old_map.items():
+            if name not in new_map:
+                diff["deleted"].append(name)
+                diff["stats"]["files_changed"] += 1
+                diff["stats"]["deletions"] += entry.get("lines", 0)
+
+        return diff
+
+    async def _diff_entries(
+        self,
+        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+        known_contents: Optional[Dict[str, str]] = None,
+        summary_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Diff (old entry, new entry) pairs through the diff engine.
+
+        Blobs are fetched in one query, and only for pairs whose diff is
+        not already cached by the engine.
+        """
+        contents = dict(known_contents or {})
+        uncached = [
+            pair for pair in pairs
+            if not self.diff_engine.is_cached(pair[0]["hash"], pair[1]["hash"])
+        ]
+
+        for attempt in range(2):
+            needed = {e["hash"] for pair in uncached for e in pair} - contents.keys()
+            contents.update(await self._fetch_blobs(needed))
+
+            results = await self.diff_engine.diff_files(
+                [
+                    (
+                        new_entry["name"],
+                        old_entry["hash"],
+                        new_entry["hash"],
+                        contents.get(old_entry["hash"], "" if attempt else None),
+                        contents.get(new_entry["hash"], "" if attempt else None),
+                    )
+                    for old_entry, new_entry in pairs
+                ],
+                summary_only=summary_only
+            )
+
+            # A cached diff may have been evicted meanwhile: load its blobs and retry
+            uncached = [pair for pair, result in zip(pairs, results) if result is None]
+            if not uncached:
+                break
+
+        return results
+
+    async def _diff_modified_files(self, commit: Commit, names: List[str]) -> List[Dict[str, Any]]:
+        """Diff hunks of the given files of a tree-based commit against its parent"""
+        parent_doc = None
+        if commit.parent_id:
+            parent_doc = await self.commits_collection.find_one(
+                {"id": commit.parent_id},
+                {"_id": 0, "tree": 1, "files_snapshot": 1}
+            )
+        parent_tree, parent_contents = self._load_tree(parent_doc)
+
+        old_map = {e["name"]: e for e in parent_tree}
+        new_map = {e["name"]: e for e in commit.tree}
+        pairs = [
+            (old_map[name], new_map[name]) for name in names
+            if name in old_map and name in new_map and old_map[name]["hash"] != new_map[name]["hash"]
+        ]
+        return await self._diff_entries(pairs, parent_contents)
+
+
+# Factory function for easy service creation
+def create_version_control_service(db: AsyncIOMotorDatabase) -> VersionControlService:
+    """
+    Factory function to create a VersionControlService instance.
+
+    Args:
+        db: AsyncIOMotorDatabase instance
+
+    Returns:
+        Configured VersionControlService
+    """
+    return VersionControlService(db)
@@ -20,6 +20,7 @@ class StripeService:
         self.db = db
         self.config_service = ConfigService(db)
         self._stripe_configured = False
+        self._api_key: Optional[str] = None
     
     async def _ensure_stripe_configured(self):
         """Configure Stripe avec les clés de la DB
@@ -27,17 +28,19 @@ class StripeService:
         Raises:
             StripeNotConfiguredError: Si Stripe n'est pas configuré dans les paramètres système
         """
-        if not self._stripe_configured:
-            api_key, webhook_secret, test_mode = await self.config_service.get_stripe_keys()
-            if api_key:
-                stripe.api_key = api_key
-                self._stripe_configured = True
-                logger.info(f"Stripe configured in {'test' if test_mode else 'live'} mode")
-            else:
-                logger.error("Stripe API key not configured - payment system unavailable")
-                raise StripeNotConfiguredError(
-                    "Le système de paiement n'est pas configuré. Contactez l'administrateur."
-                )
+        # Config en cache : la clé n'est réappliquée que si elle a changé
+        api_key, webhook_secret, test_mode = await self.config_service.get_stripe_keys()
+        if not api_key:
+            self._stripe_configured = False
+            logger.error("Stripe API key not configured - payment system unavailable")
+            raise StripeNotConfiguredError(
+                "Le système de paiement n'est pas configuré. Contactez l'administrateur."
+            )
+        if not self._stripe_configured or api_key != self._api_key:
+            stripe.api_key = api_key
+            self._api_key = api_key
+            self._stripe_configured = True
+            logger.info(f"Stripe configured in {'test' if test_mode else 'live'} mode")
     
     async def get_webhook_secret(self) -> Optional[str]:
         """Retourne le webhook secret depuis la config"""
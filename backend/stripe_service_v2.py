@@ -6,6 +6,8 @@ Improvements over v1:
 - Webhook event deduplication
 - Comprehensive error handling
 - Async batch operations
+- Stripe SDK calls run on a bounded thread pool, off the event loop
+- Short-TTL cache for customer/subscription lookups, invalidated by webhooks
 """
 import stripe
 from typing import Optional, Dict, Any, List
@@ -17,6 +19,10 @@ import asyncio
 from datetime import datetime, timezone, timedelta
 import hashlib
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 logger = logging.getLogger(__name__)
 
@@ -34,12 +40,94 @@ class StripeServiceV2:
     RETRY_DELAY_BASE = 1.0  # seconds
     RETRY_MULTIPLIER = 2.0
 
+    # Concurrency and cache configuration
+    MAX_WORKERS = 8
+    BATCH_CONCURRENCY = 8
+    CACHE_TTL = 60.0  # seconds
+    CACHE_MAX_ENTRIES = 10000
+
+    # Shared by all instances: the SDK is blocking, so calls are bounded
+    # by this pool rather than by the number of pending requests
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    # Shared lookup cache, so a webhook handled by any instance invalidates it
+    _cache: Dict[str, tuple] = {}
+
+    # Monthly price ID per amount in cents, created once per process
+    _prices: Dict[int, str] = {}
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.config_service = ConfigService(db)
         self._stripe_configured = False
+        self._api_key: Optional[str] = None
         self._webhook_secret: Optional[str] = None
 
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.MAX_WORKERS,
+                    thread_name_prefix="stripe"
+                )
+            return cls._executor
+
+    @classmethod
+    def shutdown_executor(cls):
+        """Stop the Stripe thread pool (application shutdown)"""
+        with cls._executor_lock:
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+
+    # ------------------------------------------------------------------
+    # Lookup cache
+    # ------------------------------------------------------------------
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        return value
+
+    def _cache_set(self, key: str, value: Any):
+        if len(self._cache) >= self.CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for stale in [k for k, (expires_at, _) in self._cache.items() if expires_at < now]:
+                del self._cache[stale]
+            if len(self._cache) >= self.CACHE_MAX_ENTRIES:
+                # Entries are inserted in expiry order: drop the oldest
+                del self._cache[next(iter(self._cache))]
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic() + self.CACHE_TTL, value)
+
+    def invalidate_cache(self, customer_id: Optional[str] = None, subscription_id: Optional[str] = None):
+        """Drop cached lookups for a customer and/or subscription"""
+        if customer_id:
+            self._cache.pop(f"customer:{customer_id}", None)
+        if subscription_id:
+            self._cache.pop(f"subscription:{subscription_id}", None)
+
+    def invalidate_for_event(self, event: Dict[str, Any]):
+        """
+        Drop cached lookups affected by a webhook event
+
+        Args:
+            event: Verified Stripe event
+        """
+        obj = event.get("data", {}).get("object", {}) or {}
+        object_type = obj.get("object")
+
+        customer_id = obj.get("id") if object_type == "customer" else obj.get("customer")
+        subscription_id = obj.get("id") if object_type == "subscription" else obj.get("subscription")
+        self.invalidate_cache(customer_id=customer_id, subscription_id=subscription_id)
+
     async def _ensure_stripe_configured(self):
         """
         Configure Stripe with keys from database
@@ -47,23 +135,28 @@ class StripeServiceV2:
         Raises:
             StripeNotConfiguredError: If Stripe is not configured
         """
-        if not self._stripe_configured:
-            api_key, webhook_secret, test_mode = await self.config_service.get_stripe_keys()
-            if api_key:
-                stripe.api_key = api_key
-                self._webhook_secret = webhook_secret
-                self._stripe_configured = True
-                logger.info(f"Stripe configured in {'test' if test_mode else 'live'} mode")
-            else:
-                logger.error("Stripe API key not configured")
-                raise StripeNotConfiguredError(
-                    "Payment system not configured. Contact administrator."
-                )
+        # Keys come from the cached config; the SDK is only reconfigured
+        # when the API key actually changed
+        api_key, webhook_secret, test_mode = await self.config_service.get_stripe_keys()
+        if not api_key:
+            self._stripe_configured = False
+            logger.error("Stripe API key not configured")
+            raise StripeNotConfiguredError(
+                "Payment system not configured. Contact administrator."
+            )
+        self._webhook_secret = webhook_secret
+        if not self._stripe_configured or api_key != self._api_key:
+            stripe.api_key = api_key
+            self._api_key = api_key
+            self._stripe_configured = True
+            logger.info(f"Stripe configured in {'test' if test_mode else 'live'} mode")
 
     async def _retry_with_backoff(self, func, *args, **kwargs):
         """
         Execute Stripe API call with exponential backoff retry
 
+        The blocking SDK call runs on the Stripe thread pool.
+
         Args:
             func: Stripe API function to call
             *args: Positional arguments
@@ -76,10 +169,11 @@ class StripeServiceV2:
             stripe.error.StripeError: If all retries fail
         """
         last_exception = None
+        loop = asyncio.get_running_loop()
 
         for attempt in range(self.MAX_RETRIES):
             try:
-                return func(*args, **kwargs)
+                return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
             except stripe.error.RateLimitError as e:
                 last_exception = e
                 if attempt < self.MAX_RETRIES - 1:
@@ -191,23 +285,16 @@ class StripeServiceV2:
         await self._ensure_stripe_configured()
         billing_settings = await self.config_service.get_billing_settings()
 
-        # Create price dynamically
-        price = await self._retry_with_backoff(
-            stripe.Price.create,
-            unit_amount=int(billing_settings["price"] * 100),
-            currency="eur",
-            recurring={"interval": "month"},
-            product_data={
-                "name": "Devora Pro",
-                "description": "Full access to Devora platform"
-            }
-        )
+        price_id = await self._get_price_id(int(billing_settings["price"] * 100))
 
-        # Generate idempotency key
+        # Same key only for identical parameters: a retry within the hour
+        # gets the same session back instead of an IdempotencyError
         idempotency_key = self._generate_idempotency_key(
             "create_checkout",
             customer_id=customer_id,
             user_id=user_id,
+            price_id=price_id,
+            trial_days=trial_days,
             timestamp=datetime.now(timezone.utc).strftime("%Y%m%d%H")  # Per-hour idempotency
         )
 
@@ -216,7 +303,7 @@ class StripeServiceV2:
                 stripe.checkout.Session.create,
                 customer=customer_id,
                 payment_method_types=["card"],
-                line_items=[{"price": price.id, "quantity": 1}],
+                line_items=[{"price": price_id, "quantity": 1}],
                 mode="subscription",
                 subscription_data={
                     "trial_period_days": trial_days,
@@ -239,6 +326,29 @@ class StripeServiceV2:
             logger.error(f"Error creating checkout session: {e}")
             raise
 
+    async def _get_price_id(self, unit_amount: int) -> str:
+        """
+        Monthly price for an amount (in cents), created once
+
+        The idempotency key depends only on the amount, so workers creating
+        it concurrently get the same Stripe price.
+        """
+        price_id = self._prices.get(unit_amount)
+        if price_id is None:
+            price = await self._retry_with_backoff(
+                stripe.Price.create,
+                unit_amount=unit_amount,
+                currency="eur",
+                recurring={"interval": "month"},
+                product_data={
+                    "name": "Devora Pro",
+                    "description": "Full access to Devora platform"
+                },
+                idempotency_key=self._generate_idempotency_key("create_price", unit_amount=unit_amount)
+            )
+            price_id = self._prices[unit_amount] = price.id
+        return price_id
+
     async def create_portal_session(
         self,
         customer_id: str,
@@ -306,6 +416,7 @@ class StripeServiceV2:
                 )
                 logger.info(f"Subscription {subscription_id} canceled immediately")
 
+            self.invalidate_cache(subscription_id=subscription_id)
             return True
         except stripe.error.StripeError as e:
             logger.error(f"Error canceling subscription: {e}")
@@ -319,11 +430,15 @@ class StripeServiceV2:
             subscription_id: Subscription ID
 
         Returns:
-            Subscription data or None if not found
+            Subscription data or None if not found (cached for CACHE_TTL)
 
         Raises:
             stripe.error.StripeError: If retrieval fails
         """
+        cached = self._cache_get(f"subscription:{subscription_id}")
+        if cached is not None:
+            return dict(cached)
+
         await self._ensure_stripe_configured()
 
         try:
@@ -332,7 +447,7 @@ class StripeServiceV2:
                 subscription_id
             )
 
-            return {
+            data = {
                 "id": subscription.id,
                 "status": subscription.status,
                 "current_period_end": subscription.current_period_end,
@@ -340,6 +455,8 @@ class StripeServiceV2:
                 "canceled_at": subscription.canceled_at,
                 "trial_end": subscription.trial_end
             }
+            self._cache_set(f"subscription:{subscription_id}", data)
+            return dict(data)
         except stripe.error.StripeError as e:
             logger.error(f"Error retrieving subscription: {e}")
             return None
@@ -397,6 +514,8 @@ class StripeServiceV2:
         """
         Verify Stripe webhook signature
 
+        Cached lookups touched by the event are invalidated.
+
         Args:
             payload: Raw webhook payload
             sig_header: Stripe signature header
@@ -407,8 +526,10 @@ class StripeServiceV2:
         Raises:
             ValueError: If signature verification fails
         """
-        if not self._webhook_secret:
-            await self._ensure_stripe_configured()
+        # Only the webhook secret is needed (cached config, picks up a
+        # rotated secret); a missing API key must not turn this into a 500
+        _, webhook_secret, _ = await self.config_service.get_stripe_keys()
+        self._webhook_secret = webhook_secret
 
         if not self._webhook_secret:
             raise ValueError("Webhook secret not configured")
@@ -417,12 +538,14 @@ class StripeServiceV2:
             event = stripe.Webhook.construct_event(
                 payload, sig_header, self._webhook_secret
             )
-            return event
         except ValueError:
             raise ValueError("Invalid payload")
         except stripe.error.SignatureVerificationError:
             raise ValueError("Invalid signature")
 
+        self.invalidate_for_event(event)
+        return event
+
     async def is_webhook_duplicate(self, event_id: str) -> bool:
         """
         Check if webhook event has already been processed
@@ -449,10 +572,45 @@ class StripeServiceV2:
 
         return False
 
+    async def get_customer(self, customer_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get customer details
+
+        Args:
+            customer_id: Customer ID
+
+        Returns:
+            Customer data or None if retrieval fails (cached for CACHE_TTL)
+        """
+        cached = self._cache_get(f"customer:{customer_id}")
+        if cached is not None:
+            return dict(cached)
+
+        await self._ensure_stripe_configured()
+
+        try:
+            customer = await self._retry_with_backoff(
+                stripe.Customer.retrieve,
+                customer_id
+            )
+        except stripe.error.StripeError as e:
+            logger.error(f"Error retrieving customer {customer_id}: {e}")
+            return None
+
+        data = {
+            "email": customer.email,
+            "name": customer.name,
+            "created": customer.created
+        }
+        self._cache_set(f"customer:{customer_id}", data)
+        return dict(data)
+
     async def batch_retrieve_customers(self, customer_ids: List[str]) -> Dict[str, Any]:
         """
         Batch retrieve multiple customers (for admin dashboard)
 
+        Customers are fetched concurrently, at most BATCH_CONCURRENCY at a time.
+
         Args:
             customer_ids: List of customer IDs
 
@@ -461,20 +619,12 @@ class StripeServiceV2:
         """
         await self._ensure_stripe_configured()
 
-        results = {}
-        for customer_id in customer_ids:
-            try:
-                customer = await self._retry_with_backoff(
-                    stripe.Customer.retrieve,
-                    customer_id
-                )
-                results[customer_id] = {
-                    "email": customer.email,
-                    "name": customer.name,
-                    "created": customer.created
-                }
-            except stripe.error.StripeError as e:
-                logger.error(f"Error retrieving customer {customer_id}: {e}")
-                results[customer_id] = None
+        semaphore = asyncio.Semaphore(self.BATCH_CONCURRENCY)
+
+        async def retrieve(customer_id: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self.get_customer(customer_id)
 
-        return results
+        unique_ids = list(dict.fromkeys(customer_ids))
+        customers = await asyncio.gather(*(retrieve(cid) for cid in unique_ids))
+        return dict(zip(unique_ids, customers))
@@ -188,6 +188,22 @@ async def async_mock_db() -> AsyncGenerator[MockDatabase, None]:
     db.clear_all()
 
 
+@pytest.fixture
+def mongo_db():
+    """
+    Provide an in-memory Motor database (mongomock-motor).
+
+    Supports queries, updates, aggregations and unique indexes, but not
+    sessions: stores run their standalone (no transaction) code path.
+
+    Returns:
+        AsyncIOMotorDatabase-compatible database, empty for each test.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+
+    return AsyncMongoMockClient()["devora_test"]
+
+
 # =============================================================================
 # Test Data Fixtures
 # =============================================================================
@@ -653,6 +669,19 @@ async def async_test_client():
         yield client
 
 
+@pytest.fixture
+def fake_github():
+    """
+    Provide an in-process fake GitHub API.
+
+    Returns:
+        FakeGitHub instance; serve `fake_github.app` with httpx.ASGITransport.
+    """
+    from tests.fake_github import FakeGitHub
+
+    return FakeGitHub()
+
+
 # =============================================================================
 # Utility Fixtures
 # =============================================================================
@@ -0,0 +1,177 @@
+"""
+In-process fake of the GitHub REST endpoints used by GitHubExporter.
+
+Serve it with httpx.ASGITransport. It keeps repositories, blobs, trees,
+commits and refs in memory and records every request, so tests can assert
+on exactly what an export sent.
+"""
+
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request, Body
+
+
+def _object_sha(kind: str, payload: Any) -> str:
+    data = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(kind.encode("utf-8") + b"\0" + data).hexdigest()
+
+
+class FakeGitHub:
+    """Git Data API state for one user"""
+
+    def __init__(self, login: str = "devora-user"):
+        self.login = login
+        self.repos: Dict[str, Dict[str, Any]] = {}
+        self.blobs: Dict[str, str] = {}
+        self.trees: Dict[str, Dict[str, str]] = {}
+        self.commits: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[str] = []
+        self.app = self._build_app()
+
+    def calls(self, method: str, suffix: str = "") -> List[str]:
+        """Recorded requests with this method, optionally filtered by path suffix"""
+        return [r for r in self.requests if r.startswith(f"{method} ") and r.endswith(suffix)]
+
+    def files(self, repo_name: str) -> Dict[str, str]:
+        """Contents of the default branch of a repository"""
+        repo = self.repos[repo_name]
+        commit = self.commits[repo["refs"][repo["default_branch"]]]
+        return {path: self.blobs[sha] for path, sha in self.trees[commit["tree"]].items()}
+
+    def _store_blob(self, content: str) -> str:
+        data = content.encode("utf-8")
+        sha = hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+        self.blobs[sha] = content
+        return sha
+
+    def _store_tree(self, entries: Dict[str, str]) -> str:
+        sha = _object_sha("tree", entries)
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def _store_commit(self, message: str, tree: str, parents: List[str]) -> str:
+        commit = {"message": message, "tree": tree, "parents": parents}
+        sha = _object_sha("commit", commit)
+        self.commits[sha] = commit
+        return sha
+
+    def _repo(self, owner: str, name: str) -> Dict[str, Any]:
+        if owner != self.login or name not in self.repos:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return self.repos[name]
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI()
+        fake = self
+
+        @app.middleware("http")
+        async def record(request: Request, call_next):
+            fake.requests.append(f"{request.method} {request.url.path}")
+            return await call_next(request)
+
+        @app.get("/user")
+        async def get_user():
+            return {"login": fake.login}
+
+        @app.post("/user/repos", status_code=201)
+        async def create_repo(body: Dict[str, Any] = Body(...)):
+            name = body["name"]
+            if name in fake.repos:
+                raise HTTPException(status_code=422, detail="name already exists on this account")
+            refs: Dict[str, str] = {}
+            if body.get("auto_init"):
+                tree = {"README.md": fake._store_blob(f"# {name}\n")}
+                refs["main"] = fake._store_commit("Initial commit", fake._store_tree(tree), [])
+            fake.repos[name] = {
+                "name": name,
+                "private": body.get("private", False),
+                "default_branch": "main",
+                "refs": refs,
+            }
+            return fake._repo_json(name)
+
+        @app.get("/repos/{owner}/{repo}")
+        async def get_repo(owner: str, repo: str):
+            fake._repo(owner, repo)
+            return fake._repo_json(repo)
+
+        @app.get("/repos/{owner}/{repo}/git/ref/heads/{branch}")
+        async def get_ref(owner: str, repo: str, branch: str):
+            refs = fake._repo(owner, repo)["refs"]
+            if not refs:
+                raise HTTPException(status_code=409, detail="Git Repository is empty.")
+            sha = refs.get(branch)
+            if sha is None:
+                raise HTTPException(status_code=404, detail="Not Found")
+            return {"ref": f"refs/heads/{branch}", "object": {"sha": sha, "type": "commit"}}
+
+        @app.post("/repos/{owner}/{repo}/git/refs", status_code=201)
+        async def create_ref(owner: str, repo: str, body: Dict[str, Any] = Body(...)):
+            refs = fake._repo(owner, repo)["refs"]
+            branch = body["ref"].removeprefix("refs/heads/")
+            if branch in refs:
+                raise HTTPException(status_code=422, detail="Reference already exists")
+            refs[branch] = body["sha"]
+            return {"ref": body["ref"], "object": {"sha": body["sha"], "type": "commit"}}
+
+        @app.patch("/repos/{owner}/{repo}/git/refs/heads/{branch}")
+        async def update_ref(owner: str, repo: str, branch: str, body: Dict[str, Any] = Body(...)):
+            refs = fake._repo(owner, repo)["refs"]
+            if fake.commits[body["sha"]]["parents"] != [refs[branch]] and not body.get("force"):
+                raise HTTPException(status_code=422, detail="Update is not a fast forward")
+            refs[branch] = body["sha"]
+            return {"ref": f"refs/heads/{branch}", "object": {"sha": body["sha"], "type": "commit"}}
+
+        @app.get("/repos/{owner}/{repo}/git/commits/{sha}")
+        async def get_commit(owner: str, repo: str, sha: str):
+            fake._repo(owner, repo)
+            commit = fake.commits[sha]
+            return {"sha": sha, "message": commit["message"], "tree": {"sha": commit["tree"]}}
+
+        @app.post("/repos/{owner}/{repo}/git/commits", status_code=201)
+        async def create_commit(owner: str, repo: str, body: Dict[str, Any] = Body(...)):
+            fake._repo(owner, repo)
+            sha = fake._store_commit(body["message"], body["tree"], body["parents"])
+            return {"sha": sha, "tree": {"sha": body["tree"]}}
+
+        @app.get("/repos/{owner}/{repo}/git/trees/{sha}")
+        async def get_tree(owner: str, repo: str, sha: str, recursive: Optional[str] = None):
+            fake._repo(owner, repo)
+            return {
+                "sha": sha,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": blob}
+                    for path, blob in fake.trees[sha].items()
+                ],
+                "truncated": False,
+            }
+
+        @app.post("/repos/{owner}/{repo}/git/trees", status_code=201)
+        async def create_tree(owner: str, repo: str, body: Dict[str, Any] = Body(...)):
+            fake._repo(owner, repo)
+            entries = dict(fake.trees[body["base_tree"]]) if body.get("base_tree") else {}
+            for entry in body["tree"]:
+                if entry["sha"] is None:
+                    entries.pop(entry["path"], None)
+                else:
+                    entries[entry["path"]] = entry["sha"]
+            return {"sha": fake._store_tree(entries)}
+
+        @app.post("/repos/{owner}/{repo}/git/blobs", status_code=201)
+        async def create_blob(owner: str, repo: str, body: Dict[str, Any] = Body(...)):
+            fake._repo(owner, repo)
+            return {"sha": fake._store_blob(body["content"])}
+
+        return app
+
+    def _repo_json(self, name: str) -> Dict[str, Any]:
+        repo = self.repos[name]
+        return {
+            "name": name,
+            "full_name": f"{self.login}/{name}",
+            "html_url": f"https://github.com/{self.login}/{name}",
+            "private": repo["private"],
+            "default_branch": repo["default_branch"],
+        }
@@ -295,6 +295,30 @@ def test_monitoring_error_breakdown():
     assert "rate_limit" in metrics.error_breakdown
 
 
+def test_monitoring_percentiles_merge_across_workers():
+    """Test sketch percentiles and fleet-wide merging"""
+    workers = [MLMonitor(), MLMonitor()]
+
+    for i in range(1, 1001):
+        workers[i % 2].track_request(
+            success=True,
+            latency_ms=float(i),
+            model="test-model",
+            agent="test-agent",
+        )
+
+    fleet = MLMonitor()
+    for worker in workers:
+        fleet.merge_state(worker.export_state())
+
+    metrics = fleet.get_metrics(model="test-model")
+
+    assert metrics.total_requests == 1000
+    assert abs(metrics.p50_latency_ms - 500) <= 500 * 0.02
+    assert abs(metrics.p95_latency_ms - 950) <= 950 * 0.02
+    assert fleet.get_metrics(model="other-model").total_requests == 0
+
+
 # ═══════════════════════════════════════════════════════════════
 # Cost Tracker Tests
 # ═══════════════════════════════════════════════════════════════
@@ -146,6 +146,138 @@ class TestCaching:
         key3 = generate_cache_key("arg1", "different", kwarg1="value1")
         assert key1 != key3
 
+    @pytest.mark.asyncio
+    async def test_tag_invalidation_only_changes_dependent_keys(self):
+        """Test that bumping a tag re-keys its dependents without touching others"""
+        from infrastructure.cache.tags import CacheTags, TagVersions
+        from unittest.mock import AsyncMock, MagicMock
+
+        generations = {}
+        client = MagicMock()
+        client.mget = AsyncMock(side_effect=lambda keys: [generations.get(k) for k in keys])
+        pipe = MagicMock()
+        pipe.incr.side_effect = lambda k: generations.__setitem__(k, str(int(generations.get(k, 0)) + 1))
+        pipe.execute = AsyncMock()
+        client.pipeline.return_value = pipe
+
+        tags = TagVersions()
+        user_key = await tags.stamp(client, "projects:list", [CacheTags.user("u1")])
+        project_key = await tags.stamp(client, "project:p1", [CacheTags.project("p1")])
+
+        await tags.bump(client, CacheTags.user("u1"))
+
+        assert await tags.stamp(client, "projects:list", [CacheTags.user("u1")]) != user_key
+        assert await tags.stamp(client, "project:p1", [CacheTags.project("p1")]) == project_key
+
+    @pytest.mark.asyncio
+    async def test_get_or_set_computes_a_cold_key_once(self):
+        """Test that concurrent misses share one computation and one lease"""
+        import asyncio
+        from infrastructure.cache.stampede import StampedeGuard
+        from unittest.mock import AsyncMock, MagicMock
+
+        client = MagicMock()
+        client.get = AsyncMock(return_value=None)
+        client.set = AsyncMock(return_value=True)
+        client.setex = AsyncMock()
+        client.eval = AsyncMock()
+
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"templates": []}
+
+        guard = StampedeGuard()
+        results = await asyncio.gather(*(
+            guard.get_or_compute(client, "popular_templates", load, ttl=60) for _ in range(20)
+        ))
+
+        assert len(calls) == 1
+        assert all(value == {"templates": []} for value, _ in results)
+        assert client.set.await_count == 1
+        client.eval.assert_awaited_once()
+
+    def test_codec_preserves_types_and_compresses(self):
+        """Test codec round trips, compression and legacy JSON reads"""
+        from datetime import datetime, timezone
+        from bson import ObjectId
+        from infrastructure.cache.codec import CacheCodec, FLAG_COMPRESSED, FLAG_JSON
+
+        codec = CacheCodec(compress_threshold=256)
+        doc = {
+            "_id": ObjectId(),
+            "created_at": datetime(2024, 1, 2, 3, 4, 5, 6000, tzinfo=timezone.utc),
+            "content": "x" * 1000,
+        }
+
+        data = codec.encode(doc)
+        assert data[1] & FLAG_COMPRESSED and len(data) < 256
+        assert codec.decode(data) == doc
+
+        # Non-BSON values fall back to JSON, old entries stay readable
+        assert codec.encode({1: "a"})[1] & FLAG_JSON
+        assert codec.decode(codec.encode({1: "a"})) == {"1": "a"}
+        assert codec.decode('{"legacy": true}') == {"legacy": True}
+
+    def test_near_cache_bounds_and_invalidation(self):
+        """Test L1 size bounds, peer invalidation and racing reads"""
+        import json
+        from infrastructure.cache.near_cache import NearCache
+
+        near = NearCache(max_entries=10, max_bytes=10)
+        assert near.lookup("a") is None  # not subscribed: bypassed
+        near._connected = True
+
+        for key in ("a", "b", "c"):
+            near.store(key, b"1234", near.version())
+        assert near.lookup("a") is None and near.lookup("c") == b"1234"
+        assert near.get_metrics()["bytes"] == 8
+
+        # A read that raced with an invalidation is not kept
+        version = near.version()
+        near._on_message(json.dumps({"n": "peer", "k": ["c"]}))
+        near.store("d", b"old", version)
+        assert near.lookup("d") is None and near.lookup("c") is None
+
+    @pytest.mark.asyncio
+    async def test_tag_generations_are_served_from_near_cache(self):
+        """Test that hot tagged keys skip Redis until a tag is bumped"""
+        import json
+        from infrastructure.cache.near_cache import NearCache
+        from infrastructure.cache.tags import CacheTags, TagVersions
+        from unittest.mock import AsyncMock, MagicMock
+
+        generations = {}
+        client = MagicMock()
+        client.mget = AsyncMock(side_effect=lambda keys: [generations.get(k) for k in keys])
+        client.publish = AsyncMock()
+        pipe = MagicMock()
+        pipe.incr.side_effect = lambda k: generations.__setitem__(k, str(int(generations.get(k, 0)) + 1))
+        pipe.execute = AsyncMock()
+        client.pipeline.return_value = pipe
+
+        near = NearCache()
+        near._connected = True
+        tags = TagVersions(near_cache=near)
+        templates = [CacheTags.collection("templates"), CacheTags.function("popular")]
+
+        key = await tags.stamp(client, "popular_templates", templates)
+        assert await tags.stamp(client, "popular_templates", templates) == key
+        assert client.mget.await_count == 1
+
+        # A local bump is published and re-read once
+        await tags.bump(client, CacheTags.collection("templates"))
+        assert json.loads(client.publish.await_args.args[1])["k"] == ["devora:tag:collection:templates"]
+        bumped = await tags.stamp(client, "popular_templates", templates)
+        assert bumped != key and client.mget.await_count == 2
+
+        # A bump from another worker arrives as an invalidation
+        generations["devora:tag:func:popular"] = "5"
+        near._on_message(json.dumps({"n": "peer", "k": ["devora:tag:func:popular"]}))
+        assert await tags.stamp(client, "popular_templates", templates) == "popular_templates@1.5"
+
 
 class TestStripeV2:
     """Test Stripe service V2"""
@@ -178,6 +310,104 @@ class TestStripeV2:
         )
         assert key1 != key3
 
+    @pytest.mark.asyncio
+    async def test_batch_retrieve_customers_is_cached_until_webhook(self):
+        """Test concurrent batch retrieval, lookup caching and webhook invalidation"""
+        import stripe
+        from stripe_service_v2 import StripeServiceV2
+        from unittest.mock import AsyncMock, Mock, patch
+
+        service = StripeServiceV2(Mock())
+        service.config_service.get_stripe_keys = AsyncMock(return_value=("sk_test", "whsec", True))
+        StripeServiceV2._cache.clear()
+
+        retrieved = []
+
+        def retrieve(customer_id):
+            retrieved.append(customer_id)
+            return Mock(email=f"{customer_id}@test.com", created=1)
+
+        with patch.object(stripe.Customer, "retrieve", side_effect=retrieve):
+            customers = await service.batch_retrieve_customers(["cus_1", "cus_2", "cus_1"])
+            assert set(customers) == {"cus_1", "cus_2"}
+            assert sorted(retrieved) == ["cus_1", "cus_2"]
+
+            # Cached, shared across instances, until a webhook touches the customer
+            other = StripeServiceV2(Mock())
+            await service.get_customer("cus_1")
+            assert len(retrieved) == 2
+            other.invalidate_for_event({"data": {"object": {"object": "subscription", "id": "sub_1", "customer": "cus_1"}}})
+            await service.get_customer("cus_1")
+            assert retrieved[-1] == "cus_1" and len(retrieved) == 3
+
+    @pytest.mark.asyncio
+    async def test_checkout_retry_reuses_price_and_idempotency_key(self):
+        """Test that checking out twice in a row does not trip Stripe idempotency"""
+        import stripe
+        from stripe_service_v2 import StripeServiceV2
+        from unittest.mock import AsyncMock, Mock, patch
+
+        service = StripeServiceV2(Mock())
+        service.config_service.get_stripe_keys = AsyncMock(return_value=("sk_test", "whsec", True))
+        service.config_service.get_billing_settings = AsyncMock(return_value={"price": 9.9})
+        StripeServiceV2._prices.clear()
+
+        # Stripe rejects a reused idempotency key sent with different parameters
+        seen = {}
+
+        def idempotent(kind):
+            def create(idempotency_key, **params):
+                if seen.setdefault(idempotency_key, params) != params:
+                    raise stripe.error.IdempotencyError("Keys for idempotent requests can only be used with the same parameters")
+                return Mock(id=f"{kind}_{len(seen)}", url="https://checkout.test")
+            return create
+
+        with patch.object(stripe.Price, "create", side_effect=idempotent("price")) as create_price, \
+                patch.object(stripe.checkout.Session, "create", side_effect=idempotent("cs")):
+            first = await service.create_checkout_session("cus_1", "https://app/ok", "https://app/ko", "user_1")
+            second = await service.create_checkout_session("cus_1", "https://app/ok", "https://app/ko", "user_1")
+
+        assert first == second
+        assert create_price.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_webhook_without_api_key_is_rejected_as_invalid(self):
+        """Test that a missing API key does not turn webhook verification into a 500"""
+        from stripe_service_v2 import StripeServiceV2
+        from unittest.mock import AsyncMock, Mock
+
+        service = StripeServiceV2(Mock())
+        service.config_service.get_stripe_keys = AsyncMock(return_value=(None, None, True))
+
+        with pytest.raises(ValueError):
+            await service.verify_webhook_signature(b"{}", "t=1,v1=sig")
+
+
+class TestConfigService:
+    """Test system config caching"""
+
+    @pytest.mark.asyncio
+    async def test_config_is_cached_until_updated(self):
+        """Test that lookups hit the DB once and updates invalidate the cache"""
+        from config_service import ConfigService
+        from models import SystemConfigUpdate
+        from unittest.mock import AsyncMock, Mock
+
+        db = Mock()
+        db.name = "config_cache_test"
+        db.system_config.find_one = AsyncMock(return_value={"id": "system_config", "stripe_api_key": "sk_1"})
+        db.system_config.update_one = AsyncMock()
+        ConfigService(db).invalidate()
+
+        assert (await ConfigService(db).get_stripe_keys())[0] == "sk_1"
+        await ConfigService(db).get_billing_settings()
+        assert db.system_config.find_one.await_count == 1
+
+        db.system_config.find_one.return_value = {"id": "system_config", "stripe_api_key": "sk_2"}
+        await ConfigService(db).update_config(SystemConfigUpdate(stripe_api_key="sk_2"), "admin")
+        assert (await ConfigService(db).get_stripe_keys())[0] == "sk_2"
+        assert db.system_config.find_one.await_count == 2
+
 
 class TestOAuth:
     """Test OAuth functionality"""
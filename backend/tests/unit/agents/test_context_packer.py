@@ -0,0 +1,93 @@
+"""
+Tests for relevance-ranked context packing
+
+Run with: pytest tests/unit/agents/test_context_packer.py -v
+"""
+
+from agents.context_packer import ContextPacker, tokenize, get_analysis_cache_stats
+from agents.context_compressor import compress_context_if_needed
+
+
+def _project_files():
+    return [
+        {
+            "name": "src/App.jsx",
+            "content": "import Header from './components/Header'\n"
+                       "export default function App() { return <Header/> }\n",
+            "language": "javascript",
+        },
+        {
+            "name": "src/components/Header.jsx",
+            "content": "export default function Header() { return <nav>Menu</nav> }\n",
+            "language": "javascript",
+        },
+        {
+            "name": "src/utils/pricing.js",
+            "content": "export function computePrice(plan) { return plan.price * 100 }\n"
+                       + "// filler\n" * 4000,
+            "language": "javascript",
+        },
+    ]
+
+
+def test_tokenize_splits_identifiers():
+    """camelCase and snake_case identifiers are split into terms"""
+    terms = tokenize("getUserById snake_case")
+
+    assert "user" in terms
+    assert "snake" in terms
+    assert "getuserbyid" in terms
+
+
+def test_score_files_prefers_relevant_and_imported_files():
+    """Direct matches rank first, importers rank above unrelated files"""
+    packer = ContextPacker()
+    scores = packer.score_files(_project_files(), "rename the header menu")
+
+    assert scores[1] > scores[0] > scores[2]
+
+
+def test_pack_files_respects_budget():
+    """Large irrelevant files fall back to signatures"""
+    packer = ContextPacker()
+    packed, stats = packer.pack_files(_project_files(), "rename the header menu", token_budget=200)
+
+    assert [f["name"] for f in packed] == [f["name"] for f in _project_files()]
+    assert packed[2]["_packed"] == "signatures"
+    assert "computePrice" in packed[2]["content"]
+    assert stats["tokens_used"] <= 200
+
+
+def test_analysis_is_cached_by_content_hash():
+    """Repeated packing of unchanged files hits the analysis cache"""
+    packer = ContextPacker()
+    packer.pack_files(_project_files(), "header")
+    hits_before = get_analysis_cache_stats()["hits"]
+    packer.pack_files(_project_files(), "pricing")
+
+    assert get_analysis_cache_stats()["hits"] > hits_before
+
+
+def test_pack_conversation_keeps_relevant_turns():
+    """Middle turns matching the request survive, others are dropped"""
+    packer = ContextPacker()
+    messages = [
+        {"role": "user", "content": f"message {i} about " + ("stripe pricing" if i == 3 else "colors")}
+        for i in range(20)
+    ]
+    selected, dropped = packer.pack_conversation(messages, "stripe pricing", token_budget=60, keep_recent=4)
+
+    assert messages[3] in selected
+    assert selected[0] == messages[0]
+    assert selected[-4:] == messages[-4:]
+    assert len(dropped) == len(messages) - len(selected)
+
+
+def test_compress_context_with_query_packs_files():
+    """Passing the request to compress_context_if_needed enables packing"""
+    _, files, stats = compress_context_if_needed(
+        [], files=_project_files(), query="header", file_token_budget=200
+    )
+
+    assert stats["packed"] is True
+    assert files[2]["_packed"] == "signatures"
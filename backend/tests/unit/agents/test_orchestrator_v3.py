@@ -0,0 +1,93 @@
+"""
+Tests for OrchestratorV3 incremental repair
+
+Run with: pytest tests/unit/agents/test_orchestrator_v3.py -v
+"""
+
+import pytest
+
+from agents.orchestrator_v3 import CONFIG_OWNER, OrchestratorV3, WorkflowContext
+
+
+def _context(orchestrator):
+    ctx = WorkflowContext(user_request="build a saas")
+    orchestrator._collect_files(ctx, "frontend", [
+        {"name": "app/page.tsx", "content": "import { cn } from '@/lib/utils'\n", "language": "typescript"},
+        {"name": "app/dashboard/page.tsx", "content": "export default function D() {}\n", "language": "typescript"},
+    ])
+    orchestrator._collect_files(ctx, "backend", [
+        {"name": "lib/utils.ts", "content": "export function cn() {}\n", "language": "typescript"},
+    ])
+    orchestrator._collect_files(ctx, CONFIG_OWNER, [
+        {"name": "package.json", "content": "{}", "language": "json"},
+    ])
+    return ctx
+
+
+def test_plan_repair_targets_owning_agents():
+    orchestrator = OrchestratorV3("test-key")
+    ctx = _context(orchestrator)
+
+    plan = orchestrator._plan_repair([
+        "console.log found in app/page.tsx",
+        "Missing page: /settings",
+        "Invalid JSON in package.json",
+    ], ctx)
+
+    assert plan == {
+        "frontend": {
+            "files": ["app/page.tsx"],
+            "issues": ["console.log found in app/page.tsx", "Missing page: /settings"],
+        }
+    }
+    # Issues that cannot be attributed to a file need a full regeneration
+    assert orchestrator._plan_repair(["Layout looks off"], ctx) is None
+
+
+def test_merge_carries_unchanged_files_forward():
+    orchestrator = OrchestratorV3("test-key")
+    ctx = _context(orchestrator)
+
+    changed = orchestrator._merge_files(ctx, "frontend", [
+        {"name": "app/page.tsx", "content": "export default function P() {}\n", "language": "typescript"},
+        {"name": "app/dashboard/page.tsx", "content": "export default function D() {}\n", "language": "typescript"},
+    ])
+
+    assert changed == ["app/page.tsx"]
+    assert [f["name"] for f in ctx.generated_files] == [
+        "app/page.tsx", "app/dashboard/page.tsx", "lib/utils.ts", "package.json"
+    ]
+
+
+def test_dependency_summary_lists_local_imports():
+    orchestrator = OrchestratorV3("test-key")
+    files = _context(orchestrator).generated_files
+
+    summary = orchestrator._dependency_summary(files[:1], files)
+
+    assert summary.startswith("- lib/utils.ts: exports cn")
+    assert "app/dashboard/page.tsx" in summary
+
+
+@pytest.mark.asyncio
+async def test_agents_are_consumed_in_completion_order():
+    import asyncio
+
+    orchestrator = OrchestratorV3("test-key", agent_timeout=0.2)
+
+    class Agent:
+        def __init__(self, delay):
+            self.delay = delay
+
+        async def execute(self, task):
+            await asyncio.sleep(self.delay)
+            return {"success": True, "files": []}
+
+    order = []
+    async for name, result in orchestrator._in_completion_order({
+        "slow": orchestrator._execute_agent("slow", Agent(1), {}),
+        "fast": orchestrator._execute_agent("fast", Agent(0), {}),
+    }):
+        order.append((name, result.get("timed_out", False)))
+
+    assert order == [("fast", False), ("slow", True)]
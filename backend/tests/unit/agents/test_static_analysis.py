@@ -0,0 +1,67 @@
+"""
+Tests for parser-backed static analysis of generated code
+
+Run with: pytest tests/unit/agents/test_static_analysis.py -v
+"""
+
+import pytest
+
+from agents.static_analysis import StaticAnalyzer, analyze_source, tokenize_js
+
+
+def _rules(analysis):
+    return [(f["rule"], f["line"]) for f in analysis["findings"]]
+
+
+def test_tokenizer_ignores_strings_comments_and_templates():
+    tokens, comments = tokenize_js(
+        "// console.log('x')\n"
+        "const s = 'a { b' + `c ${ {d: 1}.d } }` + /[}]/g;\n"
+        "<p>Don't stop</p>\n"
+    )
+
+    assert [c.line for c in comments] == [1]
+    assert ("regex", "/[}]/g", 2) in tokens
+    assert not any(t.value == "console" for t in tokens)
+    assert [t.value for t in tokens if t.kind == "punct" and t.value in "{}"] == ["{", "}"]
+
+
+def test_rules_run_on_the_shared_parse():
+    analysis = analyze_source(
+        "app/page.tsx",
+        "import { cn } from '@/lib/utils'\n"
+        "// any: console.log in a comment is fine\n"
+        "export default function Page(props: any) {\n"
+        "  const [open] = useState(false)\n"
+        "  console.log(open)\n"
+        "}\n",
+    )
+
+    assert _rules(analysis) == [("console_log", 5), ("any_type", 3), ("use_client", 4)]
+    assert analysis["imports"] == ["@/lib/utils"]
+    assert analysis["exports"] == ["default"]
+
+    assert _rules(analyze_source("lib/a.ts", "export function f() {\n  return [1, 2\n}\n")) == [("syntax", 3)]
+    assert _rules(analyze_source("api/main.py", "def f(:\n")) == [("syntax", 1)]
+    # JSX closing tags are not regex literals
+    assert _rules(analyze_source("components/l.tsx", "const u = <ul>{items.map(i => (<li key={i}>{i}</li>))}</ul>\n")) == []
+    assert _rules(analyze_source(
+        "components/l.jsx", "export const L = ({xs}) => <ul>{xs.map(x => <li key={x.id}>{x.name}</li>)}</ul>;\n"
+    )) == []
+    assert _rules(analyze_source("package.json", '{"name": }')) == [("syntax", 1)]
+
+
+@pytest.mark.asyncio
+async def test_analyzer_caches_by_content_hash():
+    analyzer = StaticAnalyzer()
+    files = [{"name": f"lib/m{i}.ts", "content": f"export const v{i} = {i}\n"} for i in range(3)]
+
+    await analyzer.analyze(files)
+    before = analyzer.get_metrics()
+    files[0] = {"name": "lib/m0.ts", "content": "export const v0 = 'changed'\n"}
+    results = await analyzer.analyze(files)
+    after = analyzer.get_metrics()
+
+    assert after["analyzed"] - before["analyzed"] == 1
+    assert after["cache_hits"] - before["cache_hits"] == 2
+    assert [r["file"] for r in results] == ["lib/m0.ts", "lib/m1.ts", "lib/m2.ts"]
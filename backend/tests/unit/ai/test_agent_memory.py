@@ -0,0 +1,79 @@
+"""
+Tests for vector recall in the agent memory system
+
+Run with: pytest tests/unit/ai/test_agent_memory.py -v
+"""
+
+import pytest
+
+from ai.memory import MemoryType, MemoryVectorIndex
+from ai.memory.agent_memory import create_agent_memory
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings: one dimension per keyword"""
+
+    model = "fake"
+    KEYWORDS = ("typescript", "tailwind", "python", "docker")
+
+    def _embed(self, text):
+        text = text.lower()
+        return [float(word in text) for word in self.KEYWORDS] + [0.01]
+
+    async def embed_text(self, text):
+        return self._embed(text)
+
+    async def embed_batch(self, texts):
+        return [self._embed(text) for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_recall_ranks_by_similarity(mongo_db):
+    """The closest memory comes first from the vector index"""
+    memory = await create_agent_memory("u1", mongo_db, initialize_indexes=True,
+                                       embedding_service=FakeEmbeddings())
+    docker_id = await memory.remember("Deploys with Docker", memory_type=MemoryType.LONG_TERM)
+    await memory.remember("Prefers TypeScript", memory_type=MemoryType.LONG_TERM)
+
+    recalled = await memory.recall("docker compose setup", k=1)
+    assert [m.id for m in recalled] == [docker_id]
+
+
+@pytest.mark.asyncio
+async def test_systems_share_an_index_only_when_given_one(mongo_db):
+    """Each system owns its index unless a shared one is passed in"""
+    embeddings = FakeEmbeddings()
+    first = await create_agent_memory("u1", mongo_db, embedding_service=embeddings)
+    second = await create_agent_memory("u1", mongo_db, embedding_service=embeddings)
+    assert first.vector_index is not second.vector_index
+
+    shared = MemoryVectorIndex(mongo_db, embeddings)
+    first = await create_agent_memory("u1", mongo_db, vector_index=shared)
+    second = await create_agent_memory("u1", mongo_db, vector_index=shared)
+    assert first.vector_index is second.vector_index is shared
+
+
+@pytest.mark.asyncio
+async def test_stale_partition_is_reloaded(mongo_db):
+    """Writes from another worker's index are picked up on the next check"""
+    embeddings = FakeEmbeddings()
+    worker_a = await create_agent_memory(
+        "u1", mongo_db, initialize_indexes=True,
+        vector_index=MemoryVectorIndex(mongo_db, embeddings, version_check_interval=0)
+    )
+    worker_b = await create_agent_memory(
+        "u1", mongo_db,
+        vector_index=MemoryVectorIndex(mongo_db, embeddings, version_check_interval=0)
+    )
+
+    python_id = await worker_a.remember("Writes Python", memory_type=MemoryType.LONG_TERM)
+    assert [m.id for m in await worker_b.recall("python scripts", k=1)] == [python_id]
+    resident = worker_b.vector_index._partitions["u1"]
+
+    tailwind_id = await worker_a.remember("Styles with Tailwind", memory_type=MemoryType.LONG_TERM)
+    assert [m.id for m in await worker_b.recall("tailwind classes", k=1)] == [tailwind_id]
+    assert worker_b.vector_index._partitions["u1"] is not resident
+
+    await worker_a.vector_index.remove("u1", [tailwind_id])
+    hits = await worker_b.vector_index.search("u1", "tailwind classes", top_k=5)
+    assert [memory_id for memory_id, _ in hits] == [python_id]
@@ -0,0 +1,101 @@
+"""
+Tests for the MongoDB memory store
+
+Run with: pytest tests/unit/ai/test_memory_store.py -v
+"""
+
+import pytest
+
+from ai.memory import Memory, MemoryStore, MemoryType, compute_content_hash
+
+
+async def _store(mongo_db):
+    store = MemoryStore(mongo_db)
+    await store.initialize_indexes()
+    return store
+
+
+def _memory(content, **kwargs):
+    return Memory(user_id="u1", memory_type=MemoryType.LONG_TERM, content=content, **kwargs)
+
+
+async def _insert_legacy(store, memory_id, content):
+    """Insert a document written before content_hash existed"""
+    doc = _memory(content, id=memory_id).to_mongo_dict()
+    del doc["content_hash"]
+    await store.collection.insert_one(doc)
+
+
+@pytest.mark.asyncio
+async def test_upsert_reinforces_duplicate_content(mongo_db):
+    """Same normalized content for a user is stored once and boosted"""
+    store = await _store(mongo_db)
+
+    first_id, created = await store.upsert(_memory("Prefers TypeScript", importance=0.5))
+    assert created
+
+    again_id, created = await store.upsert(_memory("  prefers typescript ", importance=0.9), boost=0.2)
+    assert (again_id, created) == (first_id, False)
+
+    docs = await store.collection.find({"user_id": "u1"}).to_list(None)
+    assert len(docs) == 1
+    assert docs[0]["importance"] == pytest.approx(0.7)
+
+
+@pytest.mark.asyncio
+async def test_backfill_leaves_legacy_duplicates_unhashed(mongo_db):
+    """The unique index keeps only one hashed copy of duplicate content"""
+    store = await _store(mongo_db)
+    await _insert_legacy(store, "m1", "Uses Tailwind")
+    await _insert_legacy(store, "m2", "uses tailwind")
+    await _insert_legacy(store, "m3", "Deploys on Vercel")
+
+    assert await store.backfill_content_hashes(batch_size=2) == 2
+
+    hashed = {
+        doc["id"]: doc.get("content_hash")
+        async for doc in store.collection.find({}, {"id": 1, "content_hash": 1})
+    }
+    assert hashed["m3"] == compute_content_hash("Deploys on Vercel")
+    assert sum(1 for key in ("m1", "m2") if hashed[key]) == 1
+
+
+@pytest.mark.asyncio
+async def test_update_of_unhashed_legacy_duplicate(mongo_db):
+    """Updating a duplicate left unhashed must not trip the unique index"""
+    store = await _store(mongo_db)
+    await _insert_legacy(store, "m1", "Uses Tailwind")
+    await _insert_legacy(store, "m2", "uses tailwind")
+    await store.backfill_content_hashes()
+    unhashed = await store.collection.find_one({"content_hash": {"$exists": False}})
+
+    memory = await store.get(unhashed["id"])
+    assert memory.content_hash == compute_content_hash("Uses Tailwind")
+
+    memory.importance = 0.9
+    assert await store.update(memory)
+
+    doc = await store.collection.find_one({"id": unhashed["id"]})
+    assert (doc["importance"], doc["access_count"]) == (0.9, 1)
+    assert "content_hash" not in doc
+
+
+@pytest.mark.asyncio
+async def test_update_rehashes_changed_content(mongo_db):
+    """Edited content gets a new hash unless it duplicates another memory"""
+    store = await _store(mongo_db)
+    await store.add(_memory("Uses Tailwind", id="m1"))
+    await store.add(_memory("Uses Bootstrap", id="m2"))
+
+    memory = await store.get("m1")
+    memory.content = "Uses Tailwind v4"
+    assert await store.update(memory)
+    doc = await store.collection.find_one({"id": "m1"})
+    assert doc["content_hash"] == compute_content_hash("Uses Tailwind v4")
+
+    memory = await store.get("m2")
+    memory.content = "uses tailwind v4"
+    assert await store.update(memory)
+    doc = await store.collection.find_one({"id": "m2"})
+    assert doc["content"] == "uses tailwind v4"
+    assert "content_hash" not in doc
@@ -0,0 +1,117 @@
+"""
+Tests for the analytics ingestion buffer
+
+Run with: pytest tests/unit/analytics/test_ingestion.py -v
+"""
+
+from contextlib import asynccontextmanager
+
+import asyncpg
+import pytest
+
+from analytics import AnalyticsIngestionBuffer, OverflowPolicy
+
+
+class FakeConnection:
+    """Records COPYed rows; rejects events named 'bad'"""
+
+    def __init__(self):
+        self.rows = []
+        self.copies = 0
+        self.down = False
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies += 1
+        if self.down:
+            raise ConnectionRefusedError("database unavailable")
+        if any(record[1] == "bad" for record in records):
+            raise asyncpg.exceptions.DataError("invalid input syntax")
+        self.rows.extend(records)
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def _buffer(**kwargs):
+    # Events stay buffered until flush(): no background flusher without a loop
+    return AnalyticsIngestionBuffer(FakePool(), **kwargs)
+
+
+def _names(rows):
+    return [row[1] for row in rows]
+
+
+def test_drop_oldest_keeps_newest_events():
+    buffer = _buffer(max_buffer=3)
+    for i in range(5):
+        assert buffer.submit("u1", f"e{i}", {})
+
+    assert _names(buffer._buffer) == ["e2", "e3", "e4"]
+    assert buffer.get_stats()["dropped_overflow"] == 2
+
+
+def test_sample_admits_by_headroom(monkeypatch):
+    """Above the high-water mark new events are kept with falling probability"""
+    buffer = _buffer(max_buffer=4, overflow_policy=OverflowPolicy.SAMPLE, high_watermark=0.5)
+    monkeypatch.setattr("analytics.ingestion.random.random", lambda: 0.6)
+
+    results = [buffer.submit("u1", f"e{i}", {}) for i in range(6)]
+
+    # Sizes 0-2 are admitted; at size 3 the keep probability is 0.5
+    assert results == [True, True, True, False, False, False]
+    assert _names(buffer._buffer) == ["e0", "e1", "e2"]
+    assert buffer.get_stats()["dropped_sampled"] == 3
+
+
+def test_sample_rejects_when_full(monkeypatch):
+    buffer = _buffer(max_buffer=2, overflow_policy=OverflowPolicy.SAMPLE, high_watermark=1.0)
+    monkeypatch.setattr("analytics.ingestion.random.random", lambda: 0.0)
+
+    assert [buffer.submit("u1", f"e{i}", {}) for i in range(3)] == [True, True, False]
+    assert _names(buffer._buffer) == ["e0", "e1"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_are_isolated_by_bisection():
+    buffer = _buffer(batch_size=8, flush_interval=60)
+    for name in ["a", "b", "bad", "c", "d", "e", "bad", "f"]:
+        buffer.submit("u1", name, {})
+
+    assert await buffer.flush()
+    await buffer.stop()
+
+    assert _names(buffer.db_pool.conn.rows) == ["a", "b", "c", "d", "e", "f"]
+    stats = buffer.get_stats()
+    assert (stats["written"], stats["rejected"], stats["batches"]) == (6, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_requeued_in_order():
+    buffer = _buffer(batch_size=2, max_buffer=4, flush_interval=60)
+    conn = buffer.db_pool.conn
+    for i in range(3):
+        buffer.submit("u1", f"e{i}", {})
+
+    conn.down = True
+    assert not await buffer.flush()
+    assert _names(buffer._buffer) == ["e0", "e1", "e2"]
+
+    # Requeued events count against capacity; the oldest goes first
+    buffer.submit("u1", "e3", {})
+    assert not await buffer.flush()
+    buffer.submit("u1", "e4", {})
+    assert _names(buffer._buffer) == ["e1", "e2", "e3", "e4"]
+
+    conn.down = False
+    assert await buffer.flush()
+    await buffer.stop()
+
+    assert _names(conn.rows) == ["e1", "e2", "e3", "e4"]
+    stats = buffer.get_stats()
+    assert (stats["failed_batches"], stats["dropped_overflow"]) == (2, 1)
@@ -0,0 +1,85 @@
+"""
+Tests for analytics partition and rollup maintenance
+
+Run with: pytest tests/unit/analytics/test_metrics_service.py -v
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from analytics import MetricsService
+
+
+class FakeConnection:
+    """Answers the maintenance functions and records the calls"""
+
+    RESULTS = {
+        "ensure_analytics_partitions": 2,
+        "refresh_analytics_rollups": "2025-01-01T00:00:00+00:00",
+        "drop_analytics_partitions": 1,
+    }
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def fetchval(self, query, *args):
+        name = query.split("SELECT ", 1)[1].split("(", 1)[0]
+        self.calls.append((name, args))
+        if self.fail:
+            raise ConnectionRefusedError("database unavailable")
+        return self.RESULTS[name]
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+@pytest.mark.asyncio
+async def test_maintenance_refreshes_rollups():
+    service = MetricsService(FakePool())
+
+    summary = await service.run_maintenance(months_ahead=3)
+
+    assert service.db_pool.conn.calls == [
+        ("ensure_analytics_partitions", (3,)),
+        ("refresh_analytics_rollups", ()),
+    ]
+    assert summary == {
+        "partitions_created": 2,
+        "partitions_dropped": 0,
+        "rollup_watermark": "2025-01-01T00:00:00+00:00",
+    }
+
+
+@pytest.mark.asyncio
+async def test_maintenance_applies_retention_when_asked():
+    service = MetricsService(FakePool())
+
+    summary = await service.run_maintenance(retention_months=24)
+
+    assert service.db_pool.conn.calls[-1] == ("drop_analytics_partitions", (24,))
+    assert summary["partitions_dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_background_maintenance_survives_failures():
+    service = MetricsService(FakePool())
+    conn = service.db_pool.conn
+    conn.fail = True
+
+    service.start_maintenance(interval=0)
+    for _ in range(20):
+        await asyncio.sleep(0)
+    await service.stop_maintenance()
+
+    refreshes = [name for name, _ in conn.calls if name == "ensure_analytics_partitions"]
+    assert len(refreshes) > 1
+    assert service._maintenance_task is None
@@ -0,0 +1,119 @@
+"""
+Tests for conversation headers and paginated messages
+
+Run with: pytest tests/unit/services/test_conversation_store.py -v
+"""
+
+import pytest
+
+from services.conversation_store import ConversationStore
+
+
+async def _store(mongo_db):
+    store = ConversationStore(mongo_db)
+    await store.ensure_indexes()
+    return store
+
+
+@pytest.mark.asyncio
+async def test_conversation_pages_break_ties_on_id(mongo_db):
+    """Headers sharing updated_at are neither skipped nor repeated"""
+    store = await _store(mongo_db)
+    for i in range(5):
+        await store.create("u1", f"Chat {i}")
+    await store.create("u2", "Someone else's")
+    # Same timestamp for all of u1's conversations
+    await mongo_db.conversations.update_many(
+        {"user_id": "u1"}, {"$set": {"updated_at": "2025-01-01T00:00:00+00:00"}}
+    )
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await store.list_conversations("u1", limit=2, cursor=cursor)
+        seen.extend(header["id"] for header in page)
+        if cursor is None:
+            break
+        assert cursor.startswith("2025-01-01T00:00:00+00:00|")
+
+    expected = sorted(
+        [doc["id"] async for doc in mongo_db.conversations.find({"user_id": "u1"})],
+        reverse=True
+    )
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(mongo_db):
+    store = await _store(mongo_db)
+    with pytest.raises(ValueError):
+        await store.list_conversations("u1", cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_messages_get_sequential_seq_and_page_backwards(mongo_db):
+    """seq follows message_count; before_seq walks to the first message"""
+    store = await _store(mongo_db)
+    conv = await store.create("u1", "Chat")
+    for i in range(1, 6):
+        message = await store.append_message(conv["id"], "user", f"message {i}", user_id="u1")
+        assert message["seq"] == i
+
+    assert await store.append_message(conv["id"], "user", "hi", user_id="u2") is None
+
+    page, cursor = await store.list_messages(conv["id"], limit=2)
+    assert ([m["seq"] for m in page], cursor) == ([4, 5], 4)
+    page, cursor = await store.list_messages(conv["id"], limit=2, before_seq=cursor)
+    assert ([m["seq"] for m in page], cursor) == ([2, 3], 2)
+    page, cursor = await store.list_messages(conv["id"], limit=2, before_seq=cursor)
+    assert ([m["content"] for m in page], cursor) == (["message 1"], None)
+
+    header = await store.get(conv["id"], "u1")
+    assert header["message_count"] == 5
+    assert header["last_message"]["content"] == "message 5"
+
+
+@pytest.mark.asyncio
+async def test_embedded_messages_are_migrated_on_first_access(mongo_db):
+    """A legacy document moves its messages out and gains a preview"""
+    store = await _store(mongo_db)
+    await mongo_db.conversations.insert_one({
+        "id": "c1",
+        "user_id": "u1",
+        "title": "Legacy",
+        "messages": [
+            {"id": "m1", "role": "user", "content": "Build a blog", "timestamp": "2024-05-01T10:00:00"},
+            {"role": "assistant", "content": "Here it is"},
+        ],
+        "created_at": "2024-05-01T10:00:00",
+        "updated_at": "2024-05-01T10:01:00",
+    })
+
+    page, _ = await store.list_conversations("u1")
+    assert (page[0]["message_count"], page[0]["last_message"]["content"]) == (2, "Here it is")
+    doc = await mongo_db.conversations.find_one({"id": "c1"})
+    assert "messages" not in doc
+
+    messages, _ = await store.list_messages("c1")
+    assert [(m["seq"], m["content"]) for m in messages] == [(1, "Build a blog"), (2, "Here it is")]
+    assert messages[0]["id"] == "m1"
+    assert messages[1]["timestamp"] == "2024-05-01T10:01:00"
+
+    message = await store.append_message("c1", "user", "Add a dark mode", user_id="u1")
+    assert message["seq"] == 3
+
+
+@pytest.mark.asyncio
+async def test_legacy_conversations_get_their_project_owner(mongo_db):
+    """Owner-less conversations are assigned through the linking project"""
+    store = await _store(mongo_db)
+    await mongo_db.conversations.insert_many([
+        {"id": "c1", "title": "Linked", "messages": [], "updated_at": "2024-05-01T10:00:00"},
+        {"id": "c2", "title": "Orphan", "messages": [], "updated_at": "2024-05-01T10:00:00"},
+    ])
+    await mongo_db.projects.insert_one({"id": "p1", "user_id": "u1", "conversation_id": "c1"})
+
+    assert await store.assign_legacy_owners(batch_size=1) == 1
+
+    page, _ = await store.list_conversations("u1")
+    assert [(h["id"], h["project_id"]) for h in page] == [("c1", "p1")]
+    assert await store.get("c2", "u1") is None
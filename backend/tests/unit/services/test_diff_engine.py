@@ -0,0 +1,85 @@
+"""
+Tests for the version control diff engine
+
+Run with: pytest tests/unit/services/test_diff_engine.py -v
+"""
+
+import asyncio
+import difflib
+import random
+
+from services.diff_engine import (
+    DiffEngine,
+    DiffLimits,
+    compute_file_diff,
+    myers_matching_blocks,
+)
+
+
+def _lcs_length(a, b):
+    rows = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) - 1, -1, -1):
+        for j in range(len(b) - 1, -1, -1):
+            rows[i][j] = rows[i + 1][j + 1] + 1 if a[i] == b[j] else max(rows[i + 1][j], rows[i][j + 1])
+    return rows[0][0]
+
+
+def test_myers_blocks_are_a_longest_common_subsequence():
+    """Matching blocks are ordered, valid and of maximal total size"""
+    rng = random.Random(7)
+    for _ in range(300):
+        a = [rng.choice("abcd") for _ in range(rng.randint(0, 12))]
+        b = [rng.choice("abcd") for _ in range(rng.randint(0, 12))]
+        blocks = myers_matching_blocks(a, b, max_edit_distance=10 ** 6)
+
+        assert blocks[-1] == (len(a), len(b), 0)
+        for block in blocks[:-1]:
+            assert a[block.a:block.a + block.size] == b[block.b:block.b + block.size]
+        assert sum(block.size for block in blocks) == _lcs_length(a, b)
+
+
+def test_unified_output_matches_difflib():
+    """Hunks use the same format as difflib.unified_diff"""
+    old = "".join(f"line {i}\n" for i in range(100))
+    new = old.replace("line 50\n", "line fifty\n").replace("line 10\n", "")
+
+    result = compute_file_diff("app.py", old, new)
+    expected = list(difflib.unified_diff(
+        old.splitlines(keepends=True),
+        new.splitlines(keepends=True),
+        fromfile="a/app.py",
+        tofile="b/app.py",
+        lineterm=""
+    ))
+
+    assert result["diff_lines"] == expected
+    assert (result["additions"], result["deletions"]) == (1, 2)
+
+
+def test_guards_for_binary_and_large_files():
+    """Binary files are skipped, oversized files get stats only"""
+    assert compute_file_diff("logo.png", "\x89PNG\x00\x00", "\x89PNG\x00\x01")["binary"] is True
+
+    limits = DiffLimits(max_lines=10)
+    result = compute_file_diff("bundle.js", "a\n" * 20, "a\n" * 19 + "b\n", limits)
+
+    assert result["too_large"] is True
+    assert result["diff_lines"] == []
+    assert (result["additions"], result["deletions"]) == (1, 1)
+
+
+def test_engine_caches_by_blob_hashes():
+    """Second diff of the same blob pair is served from the cache"""
+    engine = DiffEngine()
+
+    async def run():
+        full = await engine.diff_file("a.txt", "h1", "h2", "x\n", "y\n")
+        summary = await engine.diff_file("a.txt", "h1", "h2", None, None, summary_only=True)
+        return full, summary
+
+    full, summary = asyncio.run(run())
+
+    assert full["diff_lines"]
+    assert summary["diff_lines"] == []
+    assert summary["additions"] == 1
+    assert engine.get_stats()["cache_hits"] == 1
@@ -0,0 +1,74 @@
+"""
+Tests for the Git Data API GitHub exporter
+
+Run with: pytest tests/unit/services/test_github_export.py -v
+"""
+
+import httpx
+import pytest
+
+from services.github_export import GitHubExporter, GitHubExportFile
+
+
+def _files(contents):
+    return [GitHubExportFile(path=path, content=content) for path, content in contents.items()]
+
+
+@pytest.mark.asyncio
+async def test_export_creates_repo_with_a_single_commit(fake_github):
+    """All files land in one tree, one commit and one ref update"""
+    exporter = GitHubExporter(api_url="http://github.test", transport=httpx.ASGITransport(app=fake_github.app))
+    files = _files({"index.html": "<h1>Hi</h1>", "app.js": "console.log(1)", "style.css": "body {}"})
+
+    result = await exporter.export("token", "my-app", files)
+    await exporter.close()
+
+    assert result.created_repo
+    assert result.files_pushed == 3
+    assert fake_github.files("my-app") == {
+        "README.md": "# my-app\n",
+        "index.html": "<h1>Hi</h1>",
+        "app.js": "console.log(1)",
+        "style.css": "body {}",
+    }
+    assert len(fake_github.calls("POST", "/git/blobs")) == 3
+    assert len(fake_github.calls("POST", "/git/commits")) == 1
+    assert len(fake_github.calls("PATCH")) == 1
+
+
+@pytest.mark.asyncio
+async def test_reexport_only_pushes_changed_files(fake_github):
+    """Unchanged blobs are skipped and an unchanged project makes no commit"""
+    exporter = GitHubExporter(api_url="http://github.test", transport=httpx.ASGITransport(app=fake_github.app))
+    await exporter.export("token", "my-app", _files({"index.html": "v1", "app.js": "same"}))
+    fake_github.requests.clear()
+
+    result = await exporter.export("token", "my-app", _files({"index.html": "v2", "app.js": "same"}))
+    assert (result.files_pushed, result.files_unchanged) == (1, 1)
+    assert len(fake_github.calls("POST", "/git/blobs")) == 1
+    assert fake_github.files("my-app")["index.html"] == "v2"
+
+    fake_github.requests.clear()
+    result = await exporter.export("token", "my-app", _files({"index.html": "v2", "app.js": "same"}))
+    await exporter.close()
+
+    assert result.commit_sha is None
+    assert fake_github.calls("POST") == []
+
+
+@pytest.mark.asyncio
+async def test_export_into_empty_repository_creates_the_branch(fake_github):
+    """An existing repository without commits gets a root commit and a new ref"""
+    transport = httpx.ASGITransport(app=fake_github.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://github.test") as client:
+        await client.post("/user/repos", json={"name": "empty-app"})
+    exporter = GitHubExporter(api_url="http://github.test", transport=httpx.ASGITransport(app=fake_github.app))
+
+    result = await exporter.export("token", "empty-app", _files({"index.html": "<h1>Hi</h1>"}))
+    await exporter.close()
+
+    assert not result.created_repo and result.files_pushed == 1
+    assert fake_github.files("empty-app") == {"index.html": "<h1>Hi</h1>"}
+    assert fake_github.commits[result.commit_sha]["parents"] == []
+    assert len(fake_github.calls("POST", "/git/refs")) == 1
+    assert fake_github.calls("PATCH") == []
@@ -0,0 +1,52 @@
+"""
+Tests for the React -> React Native converter
+
+Run with: pytest tests/unit/services/test_mobile_export.py -v
+"""
+
+from services.mobile_export_service import (
+    CSSToStyleSheetConverter,
+    ReactToReactNativeConverter,
+)
+
+
+def test_tags_are_mapped_and_components_left_alone():
+    """HTML elements become RN components; capitalized JSX components do not"""
+    source = (
+        "import React from 'react';\n"
+        "export default function App() {\n"
+        "  return <div><Button onClick={go}>ok</Button><img src=\"a.png\" /></div>;\n"
+        "}\n"
+    )
+    converted, _ = ReactToReactNativeConverter().convert_component(source, "App.jsx")
+
+    assert "<View><Button onPress={go}>ok</Button>" in converted
+    assert '<Image source={{uri: "a.png"}} />' in converted
+    assert "</View>" in converted
+    assert "import { Image, StyleSheet, Text, View } from 'react-native';" in converted
+
+
+def test_input_rewrites_only_apply_with_text_input():
+    """secureTextEntry/onChangeText are only used when the file has inputs"""
+    converter = ReactToReactNativeConverter()
+    with_input, _ = converter.convert_component(
+        '<input type="password" onChange={set} />', "Login.jsx"
+    )
+    without_input, _ = ReactToReactNativeConverter().convert_component(
+        '<Select onChange={set} />', "Picker.jsx"
+    )
+
+    assert '<TextInput secureTextEntry={true} onChangeText={set} />' in with_input
+    assert '<Select onChange={set} />' in without_input
+
+
+def test_tailwind_mapping_is_memoized_and_not_shared():
+    """Repeated class strings hit the cache and callers get their own dict"""
+    CSSToStyleSheetConverter._convert_class_string.cache_clear()
+
+    first = CSSToStyleSheetConverter.convert_tailwind_classes("p-4 bg-white rounded-lg")
+    first["padding"] = 0
+    second = CSSToStyleSheetConverter.convert_tailwind_classes("p-4 bg-white rounded-lg")
+
+    assert second == {"padding": 16, "backgroundColor": "#ffffff", "borderRadius": 8}
+    assert CSSToStyleSheetConverter._convert_class_string.cache_info().hits == 1
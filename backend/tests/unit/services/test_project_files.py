@@ -0,0 +1,152 @@
+"""
+Tests for per-file project storage
+
+Run with: pytest tests/unit/services/test_project_files.py -v
+"""
+
+import pytest
+
+from services.project_files import FileChange, ProjectFileConflictError, ProjectFileStore
+
+
+async def _demo_store(mongo_db):
+    store = ProjectFileStore(mongo_db)
+    # mongomock has no sessions: exercise the standalone path
+    store._transactions_supported = False
+    await store.ensure_indexes()
+    await store.create_project({
+        "id": "p1",
+        "user_id": "u1",
+        "name": "Demo",
+        "files": [
+            {"name": "index.html", "content": "<h1>Hi</h1>", "language": "html"},
+            {"name": "app.js", "content": "console.log(1)", "language": "javascript"},
+        ],
+    })
+    return store
+
+
+async def _names(store):
+    return [f["name"] for f in await store.load_files("p1")]
+
+
+@pytest.mark.asyncio
+async def test_create_stores_files_outside_the_project_document(mongo_db):
+    """Files go to project_files; listings only see a count"""
+    store = await _demo_store(mongo_db)
+    doc = await mongo_db.projects.find_one({"id": "p1"}, {"_id": 0})
+    assert "files" not in doc
+    assert (doc["file_count"], doc["files_version"]) == (2, 0)
+
+    listed = await mongo_db.projects.aggregate(store.metadata_pipeline({"user_id": "u1"})).to_list(None)
+    assert listed[0]["file_count"] == 2 and "files" not in listed[0]
+
+    project = await store.hydrate(doc)
+    assert [f["name"] for f in project["files"]] == ["index.html", "app.js"]
+
+
+@pytest.mark.asyncio
+async def test_patch_upsert_delete_rename(mongo_db):
+    """Deltas apply in order, keep file order and bump the version"""
+    store = await _demo_store(mongo_db)
+    result = await store.apply_changes("p1", [
+        FileChange(op="upsert", name="style.css", content="body {}"),
+        FileChange(op="upsert", name="index.html", content="<h1>Hello</h1>"),
+        FileChange(op="rename", name="app.js", new_name="main.js"),
+        FileChange(op="delete", name="style.css"),
+    ], expected_version=0)
+
+    assert (result["files_version"], result["file_count"]) == (1, 2)
+    files = await store.load_files("p1")
+    assert [(f["name"], f["content"]) for f in files] == [
+        ("index.html", "<h1>Hello</h1>"),
+        ("main.js", "console.log(1)"),
+    ]
+
+    with pytest.raises(ValueError):
+        await store.apply_changes("p1", [FileChange(op="delete", name="missing.js")])
+
+
+@pytest.mark.asyncio
+async def test_stale_expected_version_is_a_conflict(mongo_db):
+    """A client editing an old version is rejected and nothing is written"""
+    store = await _demo_store(mongo_db)
+    await store.apply_changes("p1", [FileChange(op="upsert", name="a.txt", content="a")], expected_version=0)
+
+    with pytest.raises(ProjectFileConflictError):
+        await store.apply_changes("p1", [FileChange(op="delete", name="a.txt")], expected_version=0)
+    assert await _names(store) == ["index.html", "app.js", "a.txt"]
+
+
+@pytest.mark.asyncio
+async def test_patch_racing_another_writer_is_retried_on_fresh_state(mongo_db):
+    """A writer sneaking in between read and version claim forces a retry"""
+    store = await _demo_store(mongo_db)
+    claim = store.projects.find_one_and_update
+    competitors = [[FileChange(op="rename", name="app.js", new_name="main.js")]]
+
+    async def claim_after_competitor(*args, **kwargs):
+        if competitors:
+            await store.apply_changes("p1", competitors.pop())
+        return await claim(*args, **kwargs)
+
+    store.projects.find_one_and_update = claim_after_competitor
+    await store.apply_changes("p1", [FileChange(op="upsert", name="app.js", content="new")])
+
+    doc = await mongo_db.projects.find_one({"id": "p1"})
+    assert (doc["files_version"], doc["file_count"]) == (2, 3)
+    assert await _names(store) == ["index.html", "main.js", "app.js"]
+
+    # A client that sent a version is told instead
+    competitors.append([FileChange(op="upsert", name="notes.txt", content="x")])
+    with pytest.raises(ProjectFileConflictError):
+        await store.apply_changes("p1", [FileChange(op="delete", name="app.js")], expected_version=2)
+
+
+@pytest.mark.asyncio
+async def test_failed_patch_is_rolled_back_without_transactions(mongo_db):
+    """A bulk write failing midway restores the files and the version"""
+    store = await _demo_store(mongo_db)
+    bulk_write = store.files.bulk_write
+
+    async def fail_midway(operations, **kwargs):
+        # Only the patch fails; the restore goes through
+        store.files.bulk_write = bulk_write
+        await bulk_write(operations[:1], **kwargs)
+        raise RuntimeError("connection lost")
+
+    store.files.bulk_write = fail_midway
+    with pytest.raises(RuntimeError):
+        await store.apply_changes("p1", [
+            FileChange(op="rename", name="app.js", new_name="main.js"),
+            FileChange(op="delete", name="index.html"),
+        ])
+
+    doc = await mongo_db.projects.find_one({"id": "p1"})
+    assert (doc["files_version"], doc["file_count"]) == (0, 2)
+    assert sorted(await _names(store)) == ["app.js", "index.html"]
+
+
+@pytest.mark.asyncio
+async def test_migrate_embedded_project(mongo_db):
+    """A legacy project is migrated on its first write, in order"""
+    store = ProjectFileStore(mongo_db)
+    store._transactions_supported = False
+    await mongo_db.projects.insert_one({
+        "id": "legacy",
+        "files": [
+            {"name": "b.js", "content": "b", "language": "javascript"},
+            {"name": "a.js", "content": "a", "language": "javascript"},
+        ],
+    })
+
+    project = await store.hydrate(await mongo_db.projects.find_one({"id": "legacy"}, {"_id": 0}))
+    assert [f["name"] for f in project["files"]] == ["b.js", "a.js"]
+
+    # Same contents, no language: nothing to rewrite
+    await store.save_files("legacy", [{"name": "b.js", "content": "b"}, {"name": "a.js", "content": "a"}])
+
+    doc = await mongo_db.projects.find_one({"id": "legacy"})
+    assert "files" not in doc and store.is_normalized(doc)
+    assert (doc["files_version"], doc["file_count"]) == (0, 2)
+    assert [f["name"] for f in await store.load_files("legacy")] == ["b.js", "a.js"]
@@ -24,6 +24,11 @@ interface ApiResponse<T = unknown> {
   success: boolean;
 }
 
+interface ConversationPage<T = unknown> {
+  conversations: T[];
+  next_cursor: string | null;
+}
+
 interface RetryConfig {
   maxRetries: number;
   retryDelay: number;
@@ -321,8 +326,20 @@ export const api = {
 
   // Conversations endpoints
   conversations: {
-    list: (projectId: string) =>
-      apiClient.get(`/api/conversations?project_id=${projectId}`).then((r) => r.data),
+    // One page of conversations; pass the previous page's next_cursor to continue
+    listPage: (projectId: string, cursor?: string | null, limit?: number) =>
+      apiClient
+        .get<ConversationPage>('/api/conversations', {
+          params: { project_id: projectId, cursor: cursor ?? undefined, limit },
+        })
+        .then((r) => r.data),
+
+    list: (projectId: string, cursor?: string | null) =>
+      apiClient
+        .get<ConversationPage>('/api/conversations', {
+          params: { project_id: projectId, cursor: cursor ?? undefined },
+        })
+        .then((r) => r.data.conversations),
 
     get: (id: string) =>
       apiClient.get(`/api/conversations/${id}`).then((r) => r.data),
@@ -390,4 +407,4 @@ export const api = {
 
 // Export utilities
 export { tokenManager, apiClient, createApiClient, withRetry };
-export type { ApiResponse, ApiError };
+export type { ApiResponse, ApiError, ConversationPage };
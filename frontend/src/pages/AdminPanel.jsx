@@ -1010,9 +1010,9 @@ const AdminPanel = () => {
                                       🚀 Vercel
                                     </span>
                                   )}
-                                  {project.files && (
+                                  {project.file_count > 0 && (
                                     <span className="text-xs bg-emerald-500/20 text-emerald-300 px-2 py-1 rounded">
-                                      📄 {Object.keys(project.files).length} fichier(s)
+                                      📄 {project.file_count} fichier(s)
                                     </span>
                                   )}
                                 </div>
@@ -122,7 +122,7 @@ const Dashboard = () => {
 
                     <div className="flex items-center gap-2 text-sm text-gray-400">
                       <FileCode className="w-4 h-4" />
-                      {project.files?.length || 0} fichier(s)
+                      {project.file_count ?? project.files?.length ?? 0} fichier(s)
                     </div>
 
                     {project.github_repo_url && (
@@ -34,9 +34,13 @@ from .workflow_engine import (
     WorkflowEngine,
     Workflow,
     WorkflowStep,
-    WorkflowStepType
+    WorkflowStepType,
+    ConditionError,
+    compile_condition
 )
 
+from .workflow_store import WorkflowStore
+
 from .quality_gate_engine import (
     QualityGateEngine,
     QualityCheck,
@@ -69,6 +73,9 @@ __all__ = [
     "Workflow",
     "WorkflowStep",
     "WorkflowStepType",
+    "WorkflowStore",
+    "ConditionError",
+    "compile_condition",
 
     # Quality Gate
     "QualityGateEngine",
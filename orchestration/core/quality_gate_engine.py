@@ -26,6 +26,7 @@ import logging
 from datetime import datetime
 import json
 import os
+import shlex
 
 
 class CheckStatus(Enum):
@@ -404,7 +405,10 @@ class QualityGateEngine:
         timeout: int = 60,
         cwd: Optional[str] = None
     ) -> Tuple[bool, str]:
-        """Execute a shell command.
+        """Execute a check command.
+
+        The command is split and executed directly, without spawning an
+        intermediate shell for every check.
 
         Args:
             command: Command to execute
@@ -415,8 +419,8 @@ class QualityGateEngine:
             Tuple of (success, output)
         """
         try:
-            process = await asyncio.create_subprocess_shell(
-                command,
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(command),
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.STDOUT,
                 cwd=cwd or self.project_root
@@ -434,6 +438,7 @@ class QualityGateEngine:
 
         except asyncio.TimeoutError:
             process.kill()
+            await process.wait()
             raise
         except Exception as e:
             return False, f"Command execution failed: {str(e)}"
@@ -82,6 +82,58 @@ def test_workflow_engine():
         return False
 
 
+def test_workflow_durability():
+    print("Testing WorkflowEngine durability...")
+    
+    try:
+        import asyncio
+        import os
+        import tempfile
+        from workflow_engine import WorkflowEngine, compile_condition, ConditionError
+        from workflow_store import WorkflowStore
+        
+        class FakeSquadManager:
+            def __init__(self):
+                self.calls = []
+            
+            async def execute_squad(self, squad_name, context):
+                self.calls.append(squad_name)
+                return {"squad": squad_name}
+        
+        store_path = os.path.join(tempfile.mkdtemp(), "workflows.db")
+        
+        async def run():
+            first = FakeSquadManager()
+            engine = WorkflowEngine(first, store=WorkflowStore(store_path))
+            await engine.execute_workflow("api_development", {"task": "x"}, run_id="run-1")
+            
+            # A new engine (e.g. after a restart) reuses the persisted steps
+            second = FakeSquadManager()
+            engine = WorkflowEngine(second, store=WorkflowStore(store_path))
+            result = await engine.execute_workflow("api_development", {"task": "x"}, run_id="run-1")
+            return first.calls, second.calls, result
+        
+        first_calls, second_calls, result = asyncio.run(run())
+        assert first_calls == ["architecture", "backend", "data", "quality"]
+        assert second_calls == []
+        assert result.metrics["cached_steps"] == 3
+        print("  OK: completed steps reused on resume")
+        
+        assert compile_condition("context['mode'] == 'fast' and not context.skip")({"context": {"mode": "fast"}})
+        try:
+            compile_condition("__import__('os').system('true')")
+            raise AssertionError("unsafe condition accepted")
+        except ConditionError:
+            print("  OK: unsafe condition rejected")
+        
+        return True
+    except Exception as e:
+        print(f"  FAIL: WorkflowEngine durability test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_quality_gate():
     print("Testing QualityGateEngine...")
     
@@ -136,6 +188,7 @@ def main():
     results.append(("Imports", test_imports()))
     results.append(("SquadManager", test_squad_manager()))
     results.append(("WorkflowEngine", test_workflow_engine()))
+    results.append(("WorkflowEngine durability", test_workflow_durability()))
     results.append(("QualityGateEngine", test_quality_gate()))
     results.append(("OrchestratorUltimate", test_orchestrator()))
     
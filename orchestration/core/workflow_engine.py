@@ -18,16 +18,31 @@ Each workflow defines:
 - Parallel vs sequential execution
 - Quality gates and checkpoints
 - Expected outputs
+
+Execution is durable: step outputs are persisted (see workflow_store)
+keyed by run and input hash, an interrupted run resumes from its
+completed steps, and steps without dependencies between them run
+concurrently.
 """
 
+import ast
 import asyncio
-from typing import Any, Dict, List, Optional, Callable
+import hashlib
+import operator
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Callable, Set
 from dataclasses import dataclass, field
 from enum import Enum
 import logging
 from datetime import datetime
 import json
 
+try:
+    from .workflow_store import WorkflowStore, to_json
+except ImportError:
+    from workflow_store import WorkflowStore, to_json
+
 
 class WorkflowStepType(Enum):
     """Types of workflow steps."""
@@ -48,6 +63,9 @@ class WorkflowStep:
         condition: Optional condition for conditional steps
         timeout: Step timeout in seconds
         required: Whether step is required
+        depends_on: Steps whose outputs this step needs. None means the
+            previous step of the workflow; [] means no dependency, so the
+            step runs concurrently with the steps before it
     """
     name: str
     type: WorkflowStepType
@@ -55,6 +73,7 @@ class WorkflowStep:
     condition: Optional[str] = None
     timeout: int = 300
     required: bool = True
+    depends_on: Optional[List[str]] = None
 
 
 @dataclass
@@ -77,6 +96,99 @@ class Workflow:
     tags: List[str] = field(default_factory=list)
 
 
+class ConditionError(ValueError):
+    """Raised when a step condition is not a supported expression."""
+
+
+_COMPARISONS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+    ast.Is: operator.is_, ast.IsNot: operator.is_not,
+}
+_CONDITION_FUNCTIONS = {"len": len, "bool": bool}
+
+
+@lru_cache(maxsize=256)
+def compile_condition(condition: str) -> Callable[[Dict[str, Any]], Any]:
+    """Compile a step condition into a safe evaluator.
+
+    Supported: literals, names from the evaluation namespace, `a.b` and
+    `a["b"]` lookups (dict keys only), comparisons, and/or/not, and the
+    functions len() and bool(). Anything else is rejected at compile time.
+
+    Args:
+        condition: Expression such as `context.has_payments and not outputs.design.errors`
+
+    Returns:
+        Function evaluating the condition against a namespace
+
+    Raises:
+        ConditionError: If the expression uses an unsupported construct
+    """
+    try:
+        tree = ast.parse(condition, mode="eval").body
+    except SyntaxError as e:
+        raise ConditionError(f"Invalid condition '{condition}': {e.msg}") from e
+
+    def build(node: ast.AST) -> Callable[[Dict[str, Any]], Any]:
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return lambda ns: value
+        if isinstance(node, ast.Name):
+            name = node.id
+            return lambda ns: ns.get(name)
+        if isinstance(node, ast.Attribute) and not node.attr.startswith("_"):
+            target, key = build(node.value), node.attr
+            return lambda ns: _lookup(target(ns), key)
+        if isinstance(node, ast.Subscript):
+            target, key = build(node.value), build(node.slice)
+            return lambda ns: _lookup(target(ns), key(ns))
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            items = [build(item) for item in node.elts]
+            return lambda ns: [item(ns) for item in items]
+        if isinstance(node, ast.BoolOp):
+            values = [build(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                return lambda ns: all(value(ns) for value in values)
+            return lambda ns: any(value(ns) for value in values)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = build(node.operand)
+            return lambda ns: not operand(ns)
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            left = build(node.left)
+            pairs = [(_COMPARISONS[type(op)], build(right)) for op, right in zip(node.ops, node.comparators)]
+
+            def compare(ns):
+                current = left(ns)
+                for op, right in pairs:
+                    value = right(ns)
+                    if not op(current, value):
+                        return False
+                    current = value
+                return True
+            return compare
+        if (
+            isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id in _CONDITION_FUNCTIONS and not node.keywords and len(node.args) == 1
+        ):
+            func, arg = _CONDITION_FUNCTIONS[node.func.id], build(node.args[0])
+            return lambda ns: func(arg(ns))
+        raise ConditionError(f"Unsupported expression in condition '{condition}': {ast.dump(node)[:60]}")
+
+    return build(tree)
+
+
+def _lookup(value: Any, key: Any) -> Any:
+    """Dict/list lookup returning None when missing."""
+    if isinstance(value, dict):
+        return value.get(key)
+    if isinstance(value, (list, tuple)) and isinstance(key, int) and -len(value) <= key < len(value):
+        return value[key]
+    return None
+
+
 class WorkflowEngine:
     """Engine for executing predefined workflows.
 
@@ -88,16 +200,20 @@ class WorkflowEngine:
     def __init__(
         self,
         squad_manager: Any,
-        callbacks: Optional[List[Callable]] = None
+        callbacks: Optional[List[Callable]] = None,
+        store: Optional[WorkflowStore] = None
     ):
         """Initialize workflow engine.
 
         Args:
             squad_manager: SquadManager instance
             callbacks: List of callback functions
+            store: Store for runs and step outputs (SQLite file at
+                DEVORA_WORKFLOW_STORE by default)
         """
         self.squad_manager = squad_manager
         self.callbacks = callbacks or []
+        self.store = store or WorkflowStore()
 
         # Setup logging
         self.logger = logging.getLogger("devora.workflow_engine")
@@ -448,13 +564,20 @@ class WorkflowEngine:
     async def execute_workflow(
         self,
         workflow_name: str,
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        run_id: Optional[str] = None
     ) -> Any:
         """Execute a workflow.
 
+        Steps start as soon as the steps they depend on have completed.
+        Each completed step is persisted; executing again with the same
+        run_id (e.g. after a restart) reuses every step whose inputs are
+        unchanged.
+
         Args:
             workflow_name: Name of workflow to execute
             context: Execution context
+            run_id: Run to resume (a new run by default)
 
         Returns:
             WorkflowResult with execution details
@@ -468,69 +591,128 @@ class WorkflowEngine:
         if not workflow:
             raise ValueError(f"Workflow '{workflow_name}' not found")
 
-        self.logger.info(f"Executing workflow: {workflow_name}")
+        dependencies = self._resolve_dependencies(workflow)
+        run_id = run_id or uuid.uuid4().hex
+
+        self.logger.info(f"Executing workflow: {workflow_name} (run {run_id})")
 
         start_time = datetime.now()
 
+        await self.store.start_run(run_id, workflow_name, context)
+        completed = await self.store.get_steps(run_id)
+
         self._emit_callback("workflow_started", {
             "workflow": workflow_name,
-            "steps": len(workflow.steps)
+            "run_id": run_id,
+            "steps": len(workflow.steps),
+            "completed_steps": len(completed)
         })
 
-        outputs = {}
+        steps = {step.name: step for step in workflow.steps}
+        step_indexes = {step.name: index for index, step in enumerate(workflow.steps)}
+        outputs: Dict[str, Any] = {}
         errors = []
+        finished: Set[str] = set()
+        running: Dict[asyncio.Task, str] = {}
+        failed_step: Optional[str] = None
+        cached_steps = 0
+
+        def ready(name: str) -> bool:
+            return (
+                name not in finished and name not in running.values()
+                and all(dep in finished for dep in dependencies[name])
+            )
 
-        # Execute each step
-        for step_index, step in enumerate(workflow.steps):
-            try:
-                self._emit_callback("workflow_step_started", {
-                    "workflow": workflow_name,
-                    "step": step.name,
-                    "step_index": step_index + 1,
-                    "total_steps": len(workflow.steps)
-                })
-
-                step_result = await self._execute_step(step, context, outputs)
-                outputs[step.name] = step_result
-
-                self._emit_callback("workflow_step_completed", {
-                    "workflow": workflow_name,
-                    "step": step.name,
-                    "status": "success"
-                })
-
-            except Exception as e:
-                error = {
-                    "step": step.name,
-                    "error": str(e),
-                    "timestamp": datetime.now().isoformat()
-                }
-                errors.append(error)
-
-                self.logger.error(f"Workflow step failed: {step.name}: {str(e)}")
+        while True:
+            if failed_step is None:
+                for name in [n for n in steps if ready(n)]:
+                    step = steps[name]
+                    step_outputs = {
+                        dep: outputs[dep] for dep in self._ancestors(name, dependencies) if dep in outputs
+                    }
+                    input_hash = self._input_hash(step, context, step_outputs)
+
+                    cached = completed.get(name)
+                    if cached and cached[0] == input_hash:
+                        outputs[name] = cached[1]
+                        finished.add(name)
+                        cached_steps += 1
+                        self._emit_callback("workflow_step_completed", {
+                            "workflow": workflow_name,
+                            "step": name,
+                            "status": "success",
+                            "cached": True
+                        })
+                        continue
 
-                if step.required:
-                    self._emit_callback("workflow_failed", {
+                    self._emit_callback("workflow_step_started", {
+                        "workflow": workflow_name,
+                        "step": name,
+                        "step_index": step_indexes[name] + 1,
+                        "total_steps": len(workflow.steps)
+                    })
+                    task = asyncio.create_task(
+                        self._run_step(run_id, step, context, step_outputs, input_hash)
+                    )
+                    running[task] = name
+
+                if any(ready(n) for n in steps):
+                    continue  # cached steps unlocked their dependents
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                step = steps[name]
+                finished.add(name)
+                try:
+                    outputs[name] = task.result()
+                    self._emit_callback("workflow_step_completed", {
                         "workflow": workflow_name,
-                        "step": step.name,
-                        "error": str(e)
+                        "step": name,
+                        "status": "success"
                     })
+                except Exception as e:
+                    errors.append({
+                        "step": name,
+                        "error": str(e),
+                        "timestamp": datetime.now().isoformat()
+                    })
+
+                    self.logger.error(f"Workflow step failed: {name}: {str(e)}")
 
-                    return OrchestratorResult(
-                        status="failed",
-                        outputs=outputs,
-                        errors=errors,
-                        execution_plan={
+                    if step.required and failed_step is None:
+                        # Stop scheduling; running steps finish and are persisted
+                        failed_step = name
+                        self._emit_callback("workflow_failed", {
                             "workflow": workflow_name,
-                            "completed_steps": step_index,
-                            "total_steps": len(workflow.steps)
-                        }
-                    )
+                            "step": name,
+                            "error": str(e)
+                        })
+
+        if failed_step is not None:
+            await self.store.finish_run(run_id, "failed")
+            return OrchestratorResult(
+                status="failed",
+                outputs=outputs,
+                errors=errors,
+                execution_plan={
+                    "workflow": workflow_name,
+                    "run_id": run_id,
+                    "completed_steps": len(outputs),
+                    "total_steps": len(workflow.steps)
+                }
+            )
+
+        await self.store.finish_run(run_id, "success")
 
         execution_time = (datetime.now() - start_time).total_seconds()
 
         self._emit_callback("workflow_completed", {
             "workflow": workflow_name,
+            "run_id": run_id,
             "execution_time": execution_time
         })
 
@@ -548,20 +730,111 @@ class WorkflowEngine:
 
         return OrchestratorResult(
             status="success",
-            outputs=outputs,
+            outputs={step.name: outputs[step.name] for step in workflow.steps if step.name in outputs},
             metrics={
                 "execution_time": execution_time,
                 "total_tokens": total_tokens,
-                "agents_executed": agents_executed
+                "agents_executed": agents_executed,
+                "cached_steps": cached_steps
             },
             errors=errors,
             execution_plan={
                 "workflow": workflow_name,
-                "completed_steps": len(workflow.steps),
+                "run_id": run_id,
+                "completed_steps": len(outputs),
                 "total_steps": len(workflow.steps)
             }
         )
 
+    async def resume_incomplete_runs(self) -> List[Any]:
+        """Resume every run interrupted by a crash or restart.
+
+        Returns:
+            Results of the resumed runs
+        """
+        results = []
+        for run in await self.store.incomplete_runs():
+            if run["workflow"] not in self.workflows:
+                self.logger.error(f"Cannot resume run {run['run_id']}: unknown workflow {run['workflow']}")
+                await self.store.finish_run(run["run_id"], "failed")
+                continue
+            self.logger.info(f"Resuming workflow run {run['run_id']} ({run['workflow']})")
+            results.append(await self.execute_workflow(run["workflow"], run["context"], run["run_id"]))
+        return results
+
+    def _resolve_dependencies(self, workflow: Workflow) -> Dict[str, List[str]]:
+        """Dependencies of each step, validated (known steps, no cycle).
+
+        Raises:
+            ValueError: If a dependency is unknown or cyclic
+        """
+        dependencies: Dict[str, List[str]] = {}
+        previous = None
+        for step in workflow.steps:
+            if step.depends_on is None:
+                dependencies[step.name] = [previous] if previous else []
+            else:
+                dependencies[step.name] = list(step.depends_on)
+            previous = step.name
+
+        for name, deps in dependencies.items():
+            for dep in deps:
+                if dep not in dependencies:
+                    raise ValueError(f"Step '{name}' depends on unknown step '{dep}'")
+
+        visiting: Set[str] = set()
+        visited: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Workflow '{workflow.name}' has a dependency cycle at step '{name}'")
+            visiting.add(name)
+            for dep in dependencies[name]:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in dependencies:
+            visit(name)
+
+        return dependencies
+
+    @staticmethod
+    def _ancestors(name: str, dependencies: Dict[str, List[str]]) -> List[str]:
+        """Transitive dependencies of a step."""
+        ancestors: List[str] = []
+        stack = list(dependencies[name])
+        while stack:
+            dep = stack.pop()
+            if dep not in ancestors:
+                ancestors.append(dep)
+                stack.extend(dependencies[dep])
+        return ancestors
+
+    @staticmethod
+    def _input_hash(step: WorkflowStep, context: Dict[str, Any], previous_outputs: Dict[str, Any]) -> str:
+        """Hash of everything a step's output depends on."""
+        payload = to_json({
+            "step": [step.name, step.type.value, step.squads, step.condition],
+            "context": context,
+            "previous_outputs": previous_outputs
+        })
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _run_step(
+        self,
+        run_id: str,
+        step: WorkflowStep,
+        context: Dict[str, Any],
+        previous_outputs: Dict[str, Any],
+        input_hash: str
+    ) -> Any:
+        """Execute a step and persist its output."""
+        result = await self._execute_step(step, context, previous_outputs)
+        return await self.store.save_step(run_id, step.name, input_hash, result)
+
     async def _execute_step(
         self,
         step: WorkflowStep,
@@ -573,7 +846,7 @@ class WorkflowEngine:
         Args:
             step: Workflow step to execute
             context: Execution context
-            previous_outputs: Outputs from previous steps
+            previous_outputs: Outputs from the steps this step depends on
 
         Returns:
             Step execution results
@@ -691,11 +964,12 @@ class WorkflowEngine:
         Returns:
             Checkpoint results
         """
-        # Run quality checks at checkpoint
+        # Completed steps are already persisted, so the checkpoint only
+        # records which outputs it covers
         return {
             "status": "checkpoint",
             "timestamp": datetime.now().isoformat(),
-            "context_snapshot": context
+            "completed_steps": sorted(context.get("previous_outputs", {}))
         }
 
     def _evaluate_condition(
@@ -715,10 +989,12 @@ class WorkflowEngine:
         if not condition:
             return True
 
-        # Simple condition evaluation
-        # In production, use safer expression evaluator
         try:
-            return eval(condition, {"context": context})
+            evaluate = compile_condition(condition)
+            return bool(evaluate({
+                "context": context,
+                "outputs": context.get("previous_outputs", {})
+            }))
         except Exception as e:
             self.logger.error(f"Condition evaluation failed: {str(e)}")
             return False
@@ -0,0 +1,162 @@
+"""
+Workflow Store - Durable Workflow State for Devora
+
+Persists workflow runs and the output of every completed step in a local
+SQLite database, so a workflow interrupted by a crash or a redeploy
+resumes from its completed steps instead of re-running them (and their
+LLM calls).
+
+Step outputs are keyed by run and step, together with the hash of the
+step's inputs: an output is only reused while its inputs are unchanged.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_STORE_PATH = os.getenv("DEVORA_WORKFLOW_STORE", ".devora/workflow_runs.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    run_id TEXT PRIMARY KEY,
+    workflow TEXT NOT NULL,
+    context TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS workflow_steps (
+    run_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    input_hash TEXT NOT NULL,
+    output TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, step)
+);
+CREATE INDEX IF NOT EXISTS idx_workflow_runs_status ON workflow_runs (status);
+"""
+
+
+def to_json(value: Any) -> str:
+    """Stable JSON encoding (sorted keys, non-JSON values as strings)."""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class WorkflowStore:
+    """SQLite store for workflow runs and step outputs.
+
+    The database is opened on first use. Calls run in a worker thread so
+    the event loop never waits on disk I/O.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """Initialize workflow store.
+
+        Args:
+            path: SQLite database file (":memory:" for a non-durable store)
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("devora.workflow_store")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: Tuple = (), fetch: bool = False) -> List[Tuple]:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchall() if fetch else []
+
+    async def _run(self, sql: str, params: Tuple = (), fetch: bool = False) -> List[Tuple]:
+        return await asyncio.to_thread(self._execute, sql, params, fetch)
+
+    async def start_run(self, run_id: str, workflow: str, context: Dict[str, Any]) -> None:
+        """Record a run as running (kept as is when it already exists).
+
+        Args:
+            run_id: Workflow run identifier
+            workflow: Workflow name
+            context: Execution context, needed to resume the run
+        """
+        now = datetime.now().isoformat()
+        await self._run(
+            "INSERT INTO workflow_runs (run_id, workflow, context, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'running', ?, ?) "
+            "ON CONFLICT(run_id) DO UPDATE SET status = 'running', updated_at = excluded.updated_at",
+            (run_id, workflow, to_json(context), now, now)
+        )
+
+    async def finish_run(self, run_id: str, status: str) -> None:
+        """Mark a run as finished ("success" or "failed")."""
+        await self._run(
+            "UPDATE workflow_runs SET status = ?, updated_at = ? WHERE run_id = ?",
+            (status, datetime.now().isoformat(), run_id)
+        )
+
+    async def get_steps(self, run_id: str) -> Dict[str, Tuple[str, Any]]:
+        """Completed steps of a run.
+
+        Returns:
+            Dictionary of step name to (input hash, output)
+        """
+        rows = await self._run(
+            "SELECT step, input_hash, output FROM workflow_steps WHERE run_id = ?",
+            (run_id,), fetch=True
+        )
+        return {step: (input_hash, json.loads(output)) for step, input_hash, output in rows}
+
+    async def save_step(self, run_id: str, step: str, input_hash: str, output: Any) -> Any:
+        """Persist a completed step.
+
+        Returns:
+            The output as it will be read back on resume
+        """
+        encoded = to_json(output)
+        await self._run(
+            "INSERT OR REPLACE INTO workflow_steps (run_id, step, input_hash, output, completed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (run_id, step, input_hash, encoded, datetime.now().isoformat())
+        )
+        return json.loads(encoded)
+
+    async def incomplete_runs(self) -> List[Dict[str, Any]]:
+        """Runs that were still running when the process stopped."""
+        rows = await self._run(
+            "SELECT run_id, workflow, context FROM workflow_runs WHERE status = 'running' "
+            "ORDER BY created_at",
+            fetch=True
+        )
+        return [
+            {"run_id": run_id, "workflow": workflow, "context": json.loads(context)}
+            for run_id, workflow, context in rows
+        ]
+
+    async def delete_run(self, run_id: str) -> None:
+        """Forget a run and its step outputs."""
+        await self._run("DELETE FROM workflow_steps WHERE run_id = ?", (run_id,))
+        await self._run("DELETE FROM workflow_runs WHERE run_id = ?", (run_id,))
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -338,6 +338,48 @@ def test_responses():
     return True
 
 
+async def test_progress_backpressure():
+    """Test des abonnés bornés du ProgressEmitter."""
+    print("\n=== Test ProgressEmitter (backpressure) ===")
+
+    from orchestration.utils import ProgressEmitter, BackpressurePolicy
+
+    try:
+        emitter = ProgressEmitter(session_id="test_backpressure")
+
+        # Un callback async lent ne doit pas ralentir l'émission
+        async def slow_callback(event):
+            await asyncio.sleep(10)
+
+        emitter.on_any(slow_callback)
+        latest = emitter.subscribe(maxsize=2, policy=BackpressurePolicy.COALESCE)
+        strict = emitter.subscribe(maxsize=2, policy=BackpressurePolicy.DISCONNECT)
+
+        for i in range(10):
+            await asyncio.wait_for(emitter.task_progress("task_1", i / 10, "En cours..."), timeout=0.1)
+        print("✓ Émission non bloquante")
+
+        assert latest.qsize() == 1 and latest.get_nowait().data["progress"] == 0.9
+        print("✓ Coalescence du dernier événement par étape")
+
+        assert strict.close_reason == "slow_consumer"
+        assert emitter.get_stats()["disconnected_subscribers"] == 1
+        print("✓ Abonné lent déconnecté")
+
+        # Reconnexion : rejeu depuis le dernier numéro reçu
+        stream = await emitter.create_sse_stream(last_event_id=8)
+        assert [stream.get_nowait().seq for _ in range(stream.qsize())] == [9, 10]
+        print("✓ Rejeu depuis Last-Event-ID")
+
+        emitter.close()
+
+    except Exception as e:
+        print(f"✗ Erreur backpressure: {e}")
+        return False
+
+    return True
+
+
 async def main():
     """Exécute tous les tests."""
     print("=" * 60)
@@ -355,6 +397,7 @@ async def main():
     # Tests asynchrones
     results.append(("LLMClient", await test_llm_client()))
     results.append(("ProgressEmitter", await test_progress_emitter()))
+    results.append(("ProgressEmitter backpressure", await test_progress_backpressure()))
 
     # Résumé
     print("\n" + "=" * 60)
@@ -33,6 +33,9 @@ from .progress_emitter import (
     ProgressEvent,
     EventType,
     EventPriority,
+    BackpressurePolicy,
+    Subscription,
+    SubscriptionClosed,
     default_emitter,
     emit_event,
 )
@@ -64,6 +67,9 @@ __all__ = [
     "ProgressEvent",
     "EventType",
     "EventPriority",
+    "BackpressurePolicy",
+    "Subscription",
+    "SubscriptionClosed",
     "default_emitter",
     "emit_event",
 ]
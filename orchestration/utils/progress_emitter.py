@@ -3,6 +3,13 @@
 
 Gère l'émission d'événements de progression via SSE (Server-Sent Events)
 et callbacks pour intégration avec le frontend.
+
+L'émission ne bloque jamais le producteur : chaque abonné (flux SSE ou
+callback async) a son propre buffer borné, avec une politique appliquée
+quand il déborde (supprimer le plus ancien, ne garder que le dernier
+événement par étape, ou déconnecter l'abonné). Les événements sont
+numérotés pour qu'un client qui se reconnecte reprenne depuis le buffer
+de rejeu.
 """
 
 import asyncio
@@ -10,8 +17,8 @@ import json
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
-from collections import deque
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+from collections import OrderedDict, deque
 
 
 class EventType(Enum):
@@ -45,6 +52,13 @@ class EventType(Enum):
     DEBUG = "debug"
 
 
+class BackpressurePolicy(Enum):
+    """Politique d'un abonné dont le buffer est plein."""
+    DROP_OLDEST = "drop_oldest"  # Supprime l'événement le plus ancien
+    COALESCE = "coalesce"  # Ne garde que le dernier événement par étape
+    DISCONNECT = "disconnect"  # Ferme l'abonnement (le client se reconnecte)
+
+
 class EventPriority(Enum):
     """Priorité des événements."""
     LOW = 0
@@ -63,10 +77,12 @@ class ProgressEvent:
     session_id: Optional[str] = None
     agent_id: Optional[str] = None
     task_id: Optional[str] = None
+    seq: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convertit l'événement en dictionnaire."""
         return {
+            "seq": self.seq,
             "type": self.type.value,
             "timestamp": self.timestamp,
             "data": self.data,
@@ -80,11 +96,190 @@ class ProgressEvent:
         """
         Convertit l'événement au format SSE.
 
+        Le numéro de séquence est envoyé comme `id`, que le navigateur
+        renvoie dans Last-Event-ID à la reconnexion.
+
         Returns:
             Chaîne formatée SSE
         """
         data = json.dumps(self.to_dict(), ensure_ascii=False)
-        return f"event: {self.type.value}\ndata: {data}\n\n"
+        event_id = f"id: {self.seq}\n" if self.seq is not None else ""
+        return f"{event_id}event: {self.type.value}\ndata: {data}\n\n"
+
+
+class SubscriptionClosed(Exception):
+    """Levée par Subscription.get() quand l'abonnement est fermé et vide."""
+
+
+class Subscription:
+    """
+    Abonné au flux d'événements avec son propre buffer borné.
+
+    S'utilise comme une queue (`await get()`) ou un itérateur async.
+    Ses offres ne bloquent jamais : quand le buffer est plein, la
+    politique de l'abonné s'applique.
+    """
+
+    def __init__(
+        self,
+        emitter: "ProgressEmitter",
+        maxsize: int = 100,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        event_types: Optional[Set[EventType]] = None,
+        name: Optional[str] = None,
+    ):
+        """
+        Args:
+            emitter: Émetteur source
+            maxsize: Nombre maximum d'événements en attente
+            policy: Politique en cas de débordement
+            event_types: Types reçus (tous par défaut)
+            name: Nom affiché dans les statistiques
+        """
+        self.emitter = emitter
+        self.maxsize = maxsize
+        self.policy = policy
+        self.event_types = event_types
+        self.name = name or f"subscriber_{id(self):x}"
+
+        self._buffer: "OrderedDict[Hashable, ProgressEvent]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+
+        # Dernier numéro de séquence remis au consommateur
+        self.last_seq = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # Événements manquants car sortis du buffer de rejeu
+        self.missed = 0
+
+    def _key(self, event: ProgressEvent) -> Hashable:
+        if self.policy == BackpressurePolicy.COALESCE:
+            # Une étape = un type d'événement pour un agent / une tâche
+            return (event.type, event.agent_id, event.task_id)
+        return event.seq
+
+    def offer(self, event: ProgressEvent) -> None:
+        """Ajoute un événement sans jamais bloquer."""
+        if self.closed or (self.event_types and event.type not in self.event_types):
+            return
+
+        key = self._key(event)
+        if key in self._buffer:
+            del self._buffer[key]
+            self.coalesced += 1
+        elif len(self._buffer) >= self.maxsize:
+            self.dropped += 1
+            self.emitter._stats["dropped_events"] += 1
+            if self.policy == BackpressurePolicy.DISCONNECT:
+                self.emitter._stats["disconnected_subscribers"] += 1
+                self.close("slow_consumer")
+                return
+            self._buffer.popitem(last=False)
+
+        self._buffer[key] = event
+        self._ready.set()
+
+    def get_nowait(self) -> ProgressEvent:
+        """
+        Retire le prochain événement.
+
+        Raises:
+            asyncio.QueueEmpty: Si aucun événement n'est en attente
+        """
+        if not self._buffer:
+            raise asyncio.QueueEmpty()
+        _, event = self._buffer.popitem(last=False)
+        self.last_seq = event.seq
+        return event
+
+    async def get(self) -> ProgressEvent:
+        """
+        Attend le prochain événement.
+
+        Raises:
+            SubscriptionClosed: Si l'abonnement est fermé et vide
+        """
+        while not self._buffer:
+            if self.closed:
+                raise SubscriptionClosed(self.close_reason)
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        """Nombre d'événements en attente."""
+        return len(self._buffer)
+
+    def empty(self) -> bool:
+        """True si aucun événement n'est en attente."""
+        return not self._buffer
+
+    @property
+    def lag(self) -> int:
+        """Nombre d'événements émis que le consommateur n'a pas encore reçus."""
+        return max(0, self.emitter.last_seq - self.last_seq)
+
+    def close(self, reason: str = "closed") -> None:
+        """Ferme l'abonnement ; les événements en attente restent lisibles."""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        self.emitter._subscriptions.discard(self)
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ProgressEvent:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques de l'abonné."""
+        return {
+            "name": self.name,
+            "policy": self.policy.value,
+            "buffered": len(self._buffer),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "missed": self.missed,
+            "lag": self.lag,
+            "closed": self.closed,
+            "close_reason": self.close_reason,
+        }
+
+
+class CallbackSubscription(Subscription):
+    """Abonné qui remet ses événements à un callback async, dans l'ordre."""
+
+    def __init__(self, emitter: "ProgressEmitter", callback: Callable, **kwargs):
+        super().__init__(emitter, name=getattr(callback, "__name__", None), **kwargs)
+        self.callback = callback
+        self._task: Optional[asyncio.Task] = None
+
+    def offer(self, event: ProgressEvent) -> None:
+        super().offer(event)
+        # Démarré au premier événement : on() peut être appelé hors boucle
+        if self._task is None and not self.closed:
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self):
+        async for event in self:
+            try:
+                await self.callback(event)
+            except Exception as e:
+                # Log l'erreur mais continue
+                print(f"Error in callback: {e}")
+
+    def close(self, reason: str = "closed") -> None:
+        super().close(reason)
+        if self._task is not None and reason != "slow_consumer":
+            self._task.cancel()
 
 
 class ProgressEmitter:
@@ -94,31 +289,37 @@ class ProgressEmitter:
         self,
         session_id: Optional[str] = None,
         buffer_size: int = 1000,
+        callback_buffer_size: int = 1000,
     ):
         """
         Initialise l'émetteur de progression.
 
         Args:
             session_id: ID de session pour tous les événements
-            buffer_size: Taille du buffer d'événements
+            buffer_size: Taille du buffer d'événements (et de rejeu)
+            callback_buffer_size: Taille du buffer de chaque callback async
         """
         self.session_id = session_id or self._generate_session_id()
         self.buffer_size = buffer_size
+        self.callback_buffer_size = callback_buffer_size
 
-        # Buffer circulaire d'événements
+        # Buffer circulaire d'événements, sert aussi au rejeu
         self._event_buffer: deque = deque(maxlen=buffer_size)
+        self.last_seq = 0
 
-        # Callbacks enregistrés
+        # Callbacks sync enregistrés (appelés directement)
         self._callbacks: Dict[EventType, List[Callable]] = {}
         self._global_callbacks: List[Callable] = []
 
-        # Queues pour SSE
-        self._sse_queues: Set[asyncio.Queue] = set()
+        # Abonnés : flux SSE et callbacks async
+        self._subscriptions: Set[Subscription] = set()
 
         # Statistiques
         self._stats = {
             "total_events": 0,
             "events_by_type": {},
+            "dropped_events": 0,
+            "disconnected_subscribers": 0,
             "start_time": datetime.now().isoformat(),
         }
 
@@ -138,6 +339,9 @@ class ProgressEmitter:
         """
         Émet un événement de progression.
 
+        Ne bloque jamais : les callbacks async et les flux SSE reçoivent
+        l'événement dans leur propre buffer.
+
         Args:
             event_type: Type d'événement
             data: Données de l'événement
@@ -148,6 +352,7 @@ class ProgressEmitter:
         Returns:
             L'événement créé
         """
+        self.last_seq += 1
         event = ProgressEvent(
             type=event_type,
             timestamp=datetime.now().isoformat(),
@@ -156,6 +361,7 @@ class ProgressEmitter:
             session_id=self.session_id,
             agent_id=agent_id,
             task_id=task_id,
+            seq=self.last_seq,
         )
 
         # Ajout au buffer
@@ -168,49 +374,29 @@ class ProgressEmitter:
             self._stats["events_by_type"].get(type_key, 0) + 1
         )
 
-        # Callbacks spécifiques au type
-        if event_type in self._callbacks:
-            for callback in self._callbacks[event_type]:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback(event)
-                    else:
-                        callback(event)
-                except Exception as e:
-                    # Log l'erreur mais continue
-                    print(f"Error in callback: {e}")
-
-        # Callbacks globaux
-        for callback in self._global_callbacks:
+        # Callbacks sync : spécifiques au type puis globaux
+        for callback in self._callbacks.get(event_type, []) + self._global_callbacks:
             try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(event)
-                else:
-                    callback(event)
+                callback(event)
             except Exception as e:
-                print(f"Error in global callback: {e}")
+                # Log l'erreur mais continue
+                print(f"Error in callback: {e}")
 
-        # Envoi aux queues SSE
-        await self._broadcast_to_sse(event)
+        # Diffusion aux abonnés (flux SSE, callbacks async)
+        self._broadcast(event)
 
         return event
 
-    async def _broadcast_to_sse(self, event: ProgressEvent):
+    def _broadcast(self, event: ProgressEvent):
         """
-        Diffuse un événement à toutes les queues SSE.
+        Diffuse un événement à tous les abonnés, sans attendre.
 
         Args:
             event: Événement à diffuser
         """
-        # Copie de la liste pour éviter les modifications pendant l'itération
-        queues = list(self._sse_queues)
-
-        for queue in queues:
-            try:
-                await queue.put(event)
-            except Exception:
-                # Queue fermée ou pleine, la retirer
-                self._sse_queues.discard(queue)
+        # Copie : un abonné peut se déconnecter pendant l'itération
+        for subscription in list(self._subscriptions):
+            subscription.offer(event)
 
     def on(self, event_type: EventType, callback: Callable):
         """
@@ -218,8 +404,14 @@ class ProgressEmitter:
 
         Args:
             event_type: Type d'événement à écouter
-            callback: Fonction à appeler (sync ou async)
+            callback: Fonction à appeler (sync ou async). Un callback async
+                a son propre buffer et ne ralentit jamais l'émission.
         """
+        if asyncio.iscoroutinefunction(callback):
+            self._subscriptions.add(CallbackSubscription(
+                self, callback, maxsize=self.callback_buffer_size, event_types={event_type}
+            ))
+            return
         if event_type not in self._callbacks:
             self._callbacks[event_type] = []
         self._callbacks[event_type].append(callback)
@@ -231,27 +423,89 @@ class ProgressEmitter:
         Args:
             callback: Fonction à appeler (sync ou async)
         """
+        if asyncio.iscoroutinefunction(callback):
+            self._subscriptions.add(CallbackSubscription(
+                self, callback, maxsize=self.callback_buffer_size
+            ))
+            return
         self._global_callbacks.append(callback)
 
-    async def create_sse_stream(self) -> asyncio.Queue:
+    def subscribe(
+        self,
+        maxsize: int = 100,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        last_seq: Optional[int] = None,
+        event_types: Optional[Set[EventType]] = None,
+        name: Optional[str] = None,
+    ) -> Subscription:
         """
-        Crée une nouvelle queue pour streaming SSE.
+        Crée un abonné avec son propre buffer borné.
+
+        Args:
+            maxsize: Nombre maximum d'événements en attente
+            policy: Politique quand le consommateur ne suit pas
+            last_seq: Dernier événement reçu avant une reconnexion
+                (Last-Event-ID) ; les suivants sont rejoués depuis le buffer
+            event_types: Types reçus (tous par défaut)
+            name: Nom affiché dans les statistiques
 
         Returns:
-            Queue d'événements pour SSE
+            L'abonnement
         """
-        queue: asyncio.Queue = asyncio.Queue(maxsize=100)
-        self._sse_queues.add(queue)
-        return queue
+        subscription = Subscription(self, maxsize, policy, event_types, name)
+        if last_seq is not None:
+            subscription.last_seq = last_seq
+            replay = self.get_events_since(last_seq)
+            first_seq = replay[0].seq if replay else self.last_seq + 1
+            subscription.missed = max(0, first_seq - last_seq - 1)
+            for event in replay:
+                subscription.offer(event)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    async def create_sse_stream(
+        self,
+        last_event_id: Optional[int] = None,
+        policy: BackpressurePolicy = BackpressurePolicy.DROP_OLDEST,
+        maxsize: int = 100,
+    ) -> Subscription:
+        """
+        Crée un nouvel abonné pour streaming SSE.
+
+        Args:
+            last_event_id: En-tête Last-Event-ID du client qui se reconnecte
+            policy: Politique quand le client ne suit pas
+            maxsize: Nombre maximum d'événements en attente
+
+        Returns:
+            Abonnement (s'utilise comme une queue : `await stream.get()`)
+        """
+        return self.subscribe(maxsize=maxsize, policy=policy, last_seq=last_event_id, name="sse")
+
+    def remove_sse_stream(self, stream: Subscription):
+        """
+        Retire un flux SSE.
+
+        Args:
+            stream: Abonnement à retirer
+        """
+        stream.close()
 
-    def remove_sse_stream(self, queue: asyncio.Queue):
+    def get_events_since(self, seq: int) -> List[ProgressEvent]:
         """
-        Retire une queue SSE.
+        Événements du buffer de rejeu postérieurs à un numéro de séquence.
 
         Args:
-            queue: Queue à retirer
+            seq: Dernier numéro de séquence reçu
+
+        Returns:
+            Liste d'événements, dans l'ordre
         """
-        self._sse_queues.discard(queue)
+        if not self._event_buffer or self._event_buffer[-1].seq <= seq:
+            return []
+        # Numéros consécutifs : position directe dans le buffer
+        start = max(0, seq - self._event_buffer[0].seq + 1)
+        return list(self._event_buffer)[start:]
 
     def get_events(
         self,
@@ -282,16 +536,25 @@ class ProgressEmitter:
         Returns:
             Dictionnaire de statistiques
         """
+        subscribers = [s.stats() for s in self._subscriptions]
         return {
             **self._stats,
-            "active_sse_streams": len(self._sse_queues),
+            "last_seq": self.last_seq,
+            "active_sse_streams": sum(1 for s in subscribers if s["name"] == "sse"),
             "buffer_size": len(self._event_buffer),
+            "max_lag": max((s["lag"] for s in subscribers), default=0),
+            "subscribers": subscribers,
         }
 
     def clear_buffer(self):
         """Vide le buffer d'événements."""
         self._event_buffer.clear()
 
+    def close(self):
+        """Ferme tous les abonnés (flux SSE et callbacks async)."""
+        for subscription in list(self._subscriptions):
+            subscription.close()
+
     # Méthodes utilitaires pour événements courants
 
     async def workflow_start(self, workflow_id: str, data: Dict[str, Any]):